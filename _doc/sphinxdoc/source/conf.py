@@ -86,6 +86,7 @@ epkg_dictionary.update({
     'cffi': "https://cffi.readthedocs.io/en/latest/",
     'Converters with options': 'http://www.xavierdupre.fr/app/sklearn-onnx/helpsphinx/parameterized.html',
     'coo_matrix': 'https://docs.scipy.org/doc/scipy/reference/generated/scipy.sparse.coo_matrix.html',
+    'csr_matrix': 'https://docs.scipy.org/doc/scipy/reference/generated/scipy.sparse.csr_matrix.html',
     'csv': 'https://en.wikipedia.org/wiki/Comma-separated_values',
     'cython': 'https://cython.org/',
     "DataFrame": "https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.html",
@@ -0,0 +1,74 @@
+"""
+@brief      test tree node (time=5s)
+"""
+import os
+import subprocess
+import sys
+import unittest
+from pyquickhelper.pycode import ExtTestCase
+
+
+class TestImportTime(ExtTestCase):
+
+    def _importtime(self, code):
+        """
+        Runs *code* with option `-X importtime`, returns
+        `{module: time}` and the standard output.
+        """
+        root = os.path.abspath(
+            os.path.join(os.path.dirname(__file__), '..', '..'))
+        env = os.environ.copy()
+        env['PYTHONPATH'] = os.pathsep.join(
+            [root] + env.get('PYTHONPATH', '').split(os.pathsep))
+        res = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-W', 'ignore', '-c', code],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env,
+            check=True)
+        times = {}
+        for line in res.stderr.decode('utf-8', errors='ignore').split('\n'):
+            if not line.startswith('import time:'):
+                continue
+            spl = line[len('import time:'):].split('|')
+            if len(spl) != 3 or not spl[1].strip().isdigit():
+                continue
+            times[spl[2].strip()] = int(spl[1].strip())
+        return times, res.stdout.decode('utf-8', errors='ignore')
+
+    def test_import_onnxrt(self):
+        times, _ = self._importtime(
+            "import mlprodict.onnxrt\n"
+            "import mlprodict.onnxrt.ops_cpu")
+        self.assertIn('mlprodict.onnxrt', times)
+        ops = [k for k in times if '.ops_cpu.op_' in k]
+        self.assertEqual(ops, [])
+        # cumulative times in microseconds
+        duration = (times['mlprodict.onnxrt'] +
+                    times.get('mlprodict.onnxrt.ops_cpu', 0)) * 1e-6
+        self.assertLess(duration, 3)
+
+    def test_import_load_one_model(self):
+        # operators are imported with importlib,
+        # option importtime does not report them
+        _, out = self._importtime(
+            "import sys\n"
+            "import numpy\n"
+            "from onnx.helper import make_model, make_node, make_graph\n"
+            "from onnx.helper import make_tensor_value_info\n"
+            "from onnx import TensorProto\n"
+            "from mlprodict.onnxrt import OnnxInference\n"
+            "X = make_tensor_value_info('X', TensorProto.FLOAT, None)\n"
+            "Y = make_tensor_value_info('Y', TensorProto.FLOAT, None)\n"
+            "g = make_graph([make_node('Add', ['X', 'X'], ['Y'])],\n"
+            "               'g', [X], [Y])\n"
+            "OnnxInference(make_model(g)).run(\n"
+            "    {'X': numpy.ones((2, 2), dtype=numpy.float32)})\n"
+            "print(' '.join(sys.modules))")
+        ops = set(k.split('.')[-1] for k in out.split() if '.ops_cpu.op_' in k)
+        self.assertIn('op_add', ops)
+        self.assertNotIn('op_tree_ensemble_classifier', ops)
+        self.assertNotIn('op_svm_regressor', ops)
+        self.assertLess(len(ops), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
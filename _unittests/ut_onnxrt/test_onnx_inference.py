@@ -2,9 +2,11 @@
 @brief      test log(time=2s)
 """
 import unittest
+import pickle
 from logging import getLogger
 import numpy
 from onnx import helper, TensorProto
+from onnx.numpy_helper import from_array
 from onnx.helper import (
     make_model, make_node, make_function,
     make_graph, make_tensor_value_info, make_opsetid)
@@ -244,6 +246,137 @@ class TestOnnxInference(ExtTestCase):
             got = oinf.run({'X': X, 'A': A, 'B': B})['Y']
             self.assertEqualArray(expected, got)
 
+    def test_clean_right_away(self):
+        X = make_tensor_value_info('X', TensorProto.FLOAT, [None, None])
+        Z = make_tensor_value_info('Z', TensorProto.FLOAT, None)
+        then_out = make_tensor_value_info('T', TensorProto.FLOAT, None)
+        else_out = make_tensor_value_info('E', TensorProto.FLOAT, None)
+        # A is only used by the subgraphs, it must survive until If is run
+        then_branch = make_graph(
+            [make_node('Identity', ['A'], ['T'])], 'then', [], [then_out])
+        else_branch = make_graph(
+            [make_node('Neg', ['A'], ['E'])], 'else', [], [else_out])
+        graph = make_graph(
+            [make_node('Add', ['X', 'X'], ['A']),
+             make_node('Mul', ['X', 'X'], ['B']),
+             make_node('ReduceSum', ['B'], ['S'], keepdims=0),
+             make_node('Cast', ['S'], ['C'], to=TensorProto.BOOL),
+             make_node('If', ['C'], ['I'], then_branch=then_branch,
+                       else_branch=else_branch),
+             make_node('Add', ['I', 'X'], ['Z'])],
+            'example', [X], [Z])
+        onnx_model = make_model(
+            graph, opset_imports=[make_opsetid('', TARGET_OPSET)])
+
+        oinf = OnnxInference(onnx_model)
+        clean = {node.op_type: node.variable_to_clean
+                 for node in oinf.sequence_}
+        self.assertEqual(clean['If'], ['A', 'C'])
+        self.assertEqual(clean['Add'], ['I'])
+        self.assertNotIn('X', clean['Mul'])
+
+        x = numpy.array([[0, 1], [2, 3]], dtype=numpy.float32)
+        expected = oinf.run({'X': x})
+        for node_time in [False, True]:
+            with self.subTest(node_time=node_time):
+                got = oinf.run({'X': x}, clean_right_away=True,
+                               node_time=node_time)
+                if node_time:
+                    got = got[0]
+                self.assertEqualArray(expected['Z'], got['Z'])
+        self.assertEqualArray(x * 3, expected['Z'])
+        buf = BufferedPrint()
+        got = oinf.run({'X': x}, clean_right_away=True,
+                       verbose=1, fLOG=buf.fprint)
+        self.assertEqualArray(expected['Z'], got['Z'])
+        self.assertIn('+kr', str(buf))
+
+    def test_memory_planning(self):
+        X = make_tensor_value_info('X', TensorProto.FLOAT, [None, None])
+        Z = make_tensor_value_info('Z', TensorProto.FLOAT, None)
+        V = make_tensor_value_info('V', TensorProto.FLOAT, None)
+        graph = make_graph(
+            [make_node('Exp', ['X'], ['A']),
+             make_node('Add', ['A', 'X'], ['B']),
+             make_node('Relu', ['B'], ['C']),
+             make_node('Mul', ['C', 'A'], ['D']),
+             make_node('Tanh', ['D'], ['E']),
+             make_node('Sub', ['E', 'X'], ['F']),
+             make_node('Sigmoid', ['F'], ['G']),
+             make_node('Abs', ['G'], ['Z']),
+             make_node('Flatten', ['G'], ['V'])],
+            'example', [X], [Z, V])
+        onnx_model = make_model(
+            graph, opset_imports=[make_opsetid('', TARGET_OPSET)])
+
+        oinf = OnnxInference(onnx_model, inplace=False)
+        oinfm = OnnxInference(onnx_model, memory_planning=True)
+        x1 = numpy.random.randn(5, 3).astype(numpy.float32)
+        x2 = numpy.random.randn(5, 3).astype(numpy.float32)
+        x3 = numpy.random.randn(7, 3).astype(numpy.float32)
+        expected = [oinf.run({'X': x}) for x in [x1, x2, x3, x1]]
+        got = [oinfm.run({'X': x}, clean_right_away=clean)
+               for x, clean in [(x1, False), (x2, False),
+                                (x3, False), (x1, True)]]
+        for exp, res in zip(expected, got):
+            self.assertEqualArray(exp['Z'], res['Z'])
+            self.assertEqualArray(exp['V'], res['V'])
+
+        self.assertEqual(len(oinfm._memory_plans), 2)
+        plan = list(oinfm._memory_plans.values())[0]
+        # G is shared with output V
+        self.assertEqual(plan.planned, ['A', 'B', 'C', 'D', 'E', 'F'])
+        self.assertEqual(len(plan.buffers), 3)
+        self.assertEqual(plan.nbytes, 3 * x1.nbytes)
+
+    def test_parallel(self):
+        X = make_tensor_value_info('X', TensorProto.FLOAT, [None, None])
+        Z = make_tensor_value_info('Z', TensorProto.FLOAT, None)
+        W1 = numpy.random.randn(3, 4).astype(numpy.float32)
+        W2 = numpy.random.randn(3, 4).astype(numpy.float32)
+        graph = make_graph(
+            [make_node('MatMul', ['X', 'W1'], ['A']),
+             make_node('Relu', ['A'], ['B']),
+             make_node('MatMul', ['X', 'W2'], ['C']),
+             make_node('Reshape', ['C', 'shape'], ['CR']),
+             make_node('Tanh', ['CR'], ['D']),
+             make_node('Add', ['B', 'D'], ['E']),
+             make_node('Exp', ['E'], ['Z'])],
+            'example', [X], [Z],
+            [from_array(W1, name='W1'), from_array(W2, name='W2'),
+             from_array(numpy.array([-1, 4], dtype=numpy.int64),
+                        name='shape')])
+        onnx_model = make_model(
+            graph, opset_imports=[make_opsetid('', TARGET_OPSET)])
+
+        oinf = OnnxInference(onnx_model)
+        oinfp = OnnxInference(onnx_model, parallel=3)
+        sched = oinfp._parallel_scheduler
+        names = [node.outputs[0] for node in oinfp.sequence_]
+        succ = {names[i]: set(names[j] for j in sched.successors[i])
+                for i in range(len(names))}
+        self.assertEqual(succ['A'], {'B'})
+        self.assertEqual(succ['E'], {'Z'})
+        self.assertEqual(
+            set(names[i] for i in sched.roots), {'A', 'C'})
+
+        for n in [1, 5, 100]:
+            x = numpy.random.randn(n, 3).astype(numpy.float32)
+            expected = oinf.run({'X': x})
+            for clean in [False, True]:
+                with self.subTest(n=n, clean=clean):
+                    got = oinfp.run({'X': x}, clean_right_away=clean)
+                    self.assertEqualArray(expected['Z'], got['Z'])
+
+        oinfp2 = pickle.loads(pickle.dumps(oinfp))
+        self.assertEqual(oinfp2.parallel, 3)
+        got = oinfp2.run({'X': x})
+        self.assertEqualArray(expected['Z'], got['Z'])
+        self.assertRaise(
+            lambda: OnnxInference(
+                onnx_model, parallel=2, memory_planning=True),
+            RuntimeError)
+
 
 if __name__ == "__main__":
     TestOnnxInference().test_make_function()
@@ -1,12 +1,15 @@
 """
 @brief      test log(time=2s)
 """
+import json
+import os
 import unittest
 from logging import getLogger
 import numpy
 import pandas
 from onnx import helper, TensorProto
-from pyquickhelper.pycode import ExtTestCase, ignore_warnings
+from pyquickhelper.pycode import (
+    ExtTestCase, ignore_warnings, get_temp_folder)
 from mlprodict.onnxrt import OnnxInference
 from mlprodict.onnx_tools.onnx_tools import insert_node
 
@@ -17,8 +20,7 @@ class TestOnnxProfiling(ExtTestCase):
         logger = getLogger('skl2onnx')
         logger.disabled = True
 
-    @ignore_warnings(DeprecationWarning)
-    def test_profile_onnxruntime1(self):
+    def _model(self):
         X = helper.make_tensor_value_info(
             'X', TensorProto.FLOAT, [None, 2])  # pylint: disable=E1101
         Y = helper.make_tensor_value_info(
@@ -47,7 +49,11 @@ class TestOnnxProfiling(ExtTestCase):
             numpy.float32)
         Y = (numpy.random.randn(4, 2) * 100000).astype(  # pylint: disable=E1101
             numpy.float32)
+        return model_def, X, Y
 
+    @ignore_warnings(DeprecationWarning)
+    def test_profile_onnxruntime1(self):
+        model_def, X, Y = self._model()
         oinf = OnnxInference(model_def, runtime='onnxruntime1')
         oinf.run({'X': X, 'Y': Y})
         self.assertRaise(lambda: oinf.get_profiling(), RuntimeError)
@@ -61,6 +67,67 @@ class TestOnnxProfiling(ExtTestCase):
         self.assertIn('Add', set(df['args_op_name']))
         self.assertIn('Cast', set(df['args_op_name']))
 
+    @ignore_warnings(DeprecationWarning)
+    def test_profile_python(self):
+        model_def, X, Y = self._model()
+        oinf = OnnxInference(model_def)
+        self.assertRaise(lambda: oinf.get_profiling(), RuntimeError)
+
+        ort = OnnxInference(model_def, runtime='onnxruntime1',
+                            runtime_options=dict(enable_profiling=True))
+        ort.run({'X': X, 'Y': Y})
+        df_ort = ort.get_profiling(as_df=True)
+
+        for parallel in [None, 2]:
+            with self.subTest(parallel=parallel):
+                oinf = OnnxInference(
+                    model_def, parallel=parallel,
+                    runtime_options=dict(enable_profiling=True))
+                for _ in range(10):
+                    got = oinf.run({'X': X, 'Y': Y})
+                self.assertEqualArray(
+                    OnnxInference(model_def).run({'X': X, 'Y': Y})['Z'],
+                    got['Z'])
+                df = oinf.get_profiling(as_df=True)
+                self.assertIsInstance(df, pandas.DataFrame)
+                self.assertEqual(df.shape[0], 10 * 5)
+                self.assertEqual(
+                    set(df[df['cat'] == 'Node'].columns) - set(df_ort.columns),
+                    set())
+                self.assertEqual(set(df['args_op_name'].dropna()),
+                                 {'Add', 'Cast'})
+                self.assertEqual(
+                    list(df[df['cat'] == 'Session']['name'].unique()),
+                    ['model_run'])
+                add = df[df['name'] == 'Zt_kernel_time']
+                self.assertEqual(add.shape[0], 10)
+                self.assertEqual(
+                    add['args_input_type_shape'].iloc[0],
+                    [{'float': [4, 2]}, {'float': [4, 2]}])
+                self.assertEqual(set(add['args_output_size']), {'32'})
+                self.assertEqual(set(add['args_activation_size']), {'64'})
+
+                summary = oinf.profiler_.summary()
+                self.assertEqual(list(summary['count']), [10] * 4)
+                self.assertEqual(list(sorted(summary['op_name'])),
+                                 ['Add', 'Add', 'Cast', 'Cast'])
+                hist = oinf.profiler_.histograms(bins=5)
+                self.assertEqual(len(hist), 4)
+                for counts, _ in hist.values():
+                    self.assertEqual(counts.sum(), 10)
+
+                temp = get_temp_folder(
+                    __file__, "temp_profile_python_%r" % parallel)
+                name = os.path.join(temp, "trace.json")
+                oinf.profiler_.to_chrome_trace(name)
+                with open(name, 'r') as f:
+                    trace = json.load(f)
+                self.assertEqual(len(trace), 50)
+                self.assertIn('args', trace[0])
+
+                oinf.profiler_.reset()
+                self.assertEqual(oinf.get_profiling(), [])
+
 
 if __name__ == "__main__":
     unittest.main()
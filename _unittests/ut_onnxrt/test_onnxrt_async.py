@@ -0,0 +1,176 @@
+"""
+@brief      test log(time=3s)
+"""
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+import numpy
+from onnx.helper import (
+    make_model, make_node, make_graph, make_tensor_value_info)
+from onnx import TensorProto
+from pyquickhelper.pycode import ExtTestCase
+from mlprodict.onnxrt import OnnxInference
+
+
+class TestOnnxrtAsync(ExtTestCase):
+
+    def _model(self, n=5):
+        nodes = [make_node('Neg', ['X' if i == 0 else 'Y%d' % (i - 1)],
+                           ['Y%d' % i]) for i in range(n)]
+        nodes.append(make_node('Identity', ['Y%d' % (n - 1)], ['Y']))
+        graph = make_graph(
+            nodes, 'g',
+            [make_tensor_value_info('X', TensorProto.FLOAT, None)],
+            [make_tensor_value_info('Y', TensorProto.FLOAT, None)])
+        return make_model(graph)
+
+    def test_run_async(self):
+        x = numpy.arange(6).reshape((2, 3)).astype(numpy.float32)
+        for rt in ['python', 'python_compiled', 'onnxruntime1']:
+            with self.subTest(runtime=rt):
+                oinf = OnnxInference(self._model(), runtime=rt)
+
+                async def main():
+                    return await asyncio.gather(
+                        *[oinf.run_async({'X': x + i}) for i in range(5)])
+
+                res = asyncio.run(main())
+                for i, r in enumerate(res):
+                    self.assertEqualArray(-(x + i), r['Y'])
+
+    def test_run_async_options(self):
+        x = numpy.arange(6).reshape((2, 3)).astype(numpy.float32)
+        for kwargs in [dict(parallel=2), dict(memory_planning=True),
+                       dict(fast_plans=True)]:
+            with self.subTest(**kwargs):
+                oinf = OnnxInference(self._model(), **kwargs)
+                used = []
+                if 'parallel' in kwargs:
+                    scheduler = oinf._parallel_scheduler  # pylint: disable=W0212
+                    scheduler_run = scheduler.run
+
+                    def run(*args, scheduler_run=scheduler_run, **kw):
+                        used.append(kw.get('cancel', None) is not None)
+                        return scheduler_run(*args, **kw)
+
+                    scheduler.run = run
+
+                async def main(oinf=oinf):
+                    res = []
+                    for i in range(3):
+                        res.append(await oinf.run_async({'X': x + i}))
+                    return res
+
+                res = asyncio.run(main())
+                for i, r in enumerate(res):
+                    self.assertEqualArray(-(x + i), r['Y'])
+                if 'parallel' in kwargs:
+                    self.assertEqual(used, [True, True, True])
+                elif 'memory_planning' in kwargs:
+                    self.assertEqual(
+                        len(oinf._memory_plans), 1)  # pylint: disable=W0212
+                else:
+                    self.assertEqual(
+                        len(oinf._fast_plans), 1)  # pylint: disable=W0212
+
+                cancel = threading.Event()
+                cancel.set()
+                self.assertRaise(lambda oinf=oinf: oinf.run(
+                    {'X': x}, cancel=cancel), CancelledError)
+
+    def test_run_async_bound(self):
+        x = numpy.arange(6).reshape((2, 3)).astype(numpy.float32)
+        oinf = OnnxInference(self._model())
+        oinf.max_async_runs = 2
+        lock = threading.Lock()
+        running = [0, 0]
+        run = oinf.run
+
+        def counting_run(*args, **kwargs):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.01)
+            try:
+                return run(*args, **kwargs)
+            finally:
+                with lock:
+                    running[0] -= 1
+
+        oinf.run = counting_run
+
+        async def main(executor):
+            return await asyncio.gather(
+                *[oinf.run_async({'X': x}, executor=executor)
+                  for i in range(8)])
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            res = asyncio.run(main(executor))
+        self.assertEqual(len(res), 8)
+        self.assertEqual(running, [0, 2])
+
+    def test_run_cancel(self):
+        x = numpy.arange(6).reshape((2, 3)).astype(numpy.float32)
+        oinf = OnnxInference(self._model())
+        cancel = threading.Event()
+        self.assertEqualArray(-x, oinf.run({'X': x}, cancel=cancel)['Y'])
+        cancel.set()
+        self.assertRaise(lambda: oinf.run({'X': x}, cancel=cancel),
+                         CancelledError)
+
+        # profiling
+        for kwargs in [{}, dict(parallel=2)]:
+            with self.subTest(**kwargs):
+                oinf = OnnxInference(
+                    self._model(),
+                    runtime_options=dict(enable_profiling=True), **kwargs)
+                self.assertEqualArray(
+                    -x, oinf.run({'X': x}, cancel=threading.Event())['Y'])
+                self.assertRaise(lambda oinf=oinf: oinf.run(
+                    {'X': x}, cancel=cancel), CancelledError)
+
+        # cancellation between two nodes
+        oinf = OnnxInference(self._model(), inplace=False)
+        started, resume = threading.Event(), threading.Event()
+        ops = oinf.sequence_[1].ops_
+        ops_run = ops.run
+        calls = []
+
+        def slow_run(*args, **kwargs):
+            started.set()
+            resume.wait()
+            calls.append(1)
+            return ops_run(*args, **kwargs)
+
+        ops.run = slow_run
+        after = oinf.sequence_[2].ops_
+        after_run = after.run
+
+        def next_run(*args, **kwargs):
+            calls.append(2)
+            return after_run(*args, **kwargs)
+
+        after.run = next_run
+
+        async def main():
+            task = asyncio.ensure_future(oinf.run_async({'X': x}))
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, started.wait)
+            task.cancel()
+            await asyncio.sleep(0.01)
+            resume.set()
+            try:
+                await task
+            except asyncio.CancelledError:
+                return True
+            return False
+
+        self.assertTrue(asyncio.run(main()))
+        # the node following the cancellation is never executed
+        self.assertEqual(calls, [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
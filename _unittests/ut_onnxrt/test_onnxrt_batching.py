@@ -0,0 +1,105 @@
+"""
+@brief      test log(time=3s)
+"""
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import numpy
+from sklearn.datasets import load_iris
+from sklearn.linear_model import LogisticRegression
+from pyquickhelper.pycode import ExtTestCase, ignore_warnings
+from mlprodict.onnx_conv import to_onnx
+from mlprodict.onnxrt import OnnxInference
+from mlprodict.onnxrt.onnx_inference_batching import BatchingSession
+
+
+class TestOnnxrtBatching(ExtTestCase):
+
+    def setUp(self):
+        X, y = load_iris(return_X_y=True)
+        self.X = X.astype(numpy.float32)
+        model = LogisticRegression(max_iter=500).fit(self.X, y)
+        self.onx = to_onnx(model, self.X[:1])
+
+    @ignore_warnings(DeprecationWarning)
+    def test_batching_session(self):
+        for rt in ['python', 'onnxruntime1']:
+            with self.subTest(runtime=rt):
+                oinf = OnnxInference(self.onx, runtime=rt)
+                expected = oinf.run({'X': self.X})
+                calls = []
+
+                class Counter:
+                    output_names = oinf.output_names
+
+                    def run(self, inputs):
+                        calls.append(inputs['X'].shape[0])
+                        return oinf.run(inputs)
+
+                with BatchingSession(Counter(), max_batch=16,
+                                     max_wait_ms=20) as sess:
+                    with ThreadPoolExecutor(max_workers=16) as executor:
+                        results = list(executor.map(
+                            lambda i: sess.run({'X': self.X[i:i + 1]}),
+                            range(self.X.shape[0])))
+
+                self.assertEqual(sum(calls), self.X.shape[0])
+                self.assertLess(len(calls), self.X.shape[0])
+                self.assertLessEqual(max(calls), 16)
+                for i, res in enumerate(results):
+                    self.assertEqualArray(
+                        expected['output_label'][i:i + 1],
+                        res['output_label'])
+                    # ZipMap
+                    self.assertEqual(len(res['output_probability']), 1)
+                    self.assertEqual(
+                        list(sorted(res['output_probability'][0])), [0, 1, 2])
+                    for k, v in res['output_probability'][0].items():
+                        self.assertAlmostEqual(
+                            expected['output_probability'][i][k], v,
+                            places=5)
+
+    def test_batching_session_error(self):
+        oinf = OnnxInference(self.onx)
+        with BatchingSession(oinf, max_wait_ms=1) as sess:
+            future = sess.submit({'X': self.X[:2]})
+            self.assertEqual(future.result()['output_label'].shape, (2, ))
+            self.assertRaise(
+                lambda: sess.run({'X': self.X[:2, :2]}), RuntimeError)
+        self.assertRaise(lambda: sess.run({'X': self.X[:2]}), RuntimeError)
+
+    def test_batching_session_invalid_request(self):
+        oinf = OnnxInference(self.onx)
+        with BatchingSession(oinf, max_wait_ms=1) as sess:
+            # not an array, the thread must survive
+            self.assertRaise(lambda: sess.run({'X': [[1.0]]}),
+                             AttributeError)
+            self.assertRaise(lambda: sess.run({}), StopIteration)
+            res = sess.run({'X': self.X[:3]})
+            self.assertEqual(res['output_label'].shape, (3, ))
+
+    def test_batching_session_max_batch(self):
+        oinf = OnnxInference(self.onx)
+        expected = oinf.run({'X': self.X})['output_label']
+        calls = []
+
+        class Counter:
+            def run(self, inputs):
+                calls.append(inputs['X'].shape[0])
+                return oinf.run(inputs)
+
+        with BatchingSession(Counter(), max_batch=10,
+                             max_wait_ms=50) as sess:
+            futures = [sess.submit({'X': self.X[i:i + 3]})
+                       for i in range(0, 30, 3)]
+            futures.append(sess.submit({'X': self.X[30:45]}))
+            results = [f.result()['output_label'] for f in futures]
+
+        self.assertEqualArray(expected[:45], numpy.hstack(results))
+        self.assertEqual(sum(calls), 45)
+        # only the request with 15 rows exceeds max_batch
+        self.assertEqual(max(calls), 15)
+        self.assertLessEqual(max(c for c in calls if c != 15), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,13 +1,15 @@
 """
 @brief      test log(time=2s)
 """
+import os
 import unittest
 from logging import getLogger
 import timeit
 from io import BytesIO
 import pickle
 import numpy
-from pyquickhelper.pycode import ExtTestCase, skipif_circleci
+from pyquickhelper.pycode import (
+    ExtTestCase, skipif_circleci, get_temp_folder)
 from sklearn.datasets import load_iris
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import AdaBoostRegressor
@@ -15,6 +17,7 @@ from sklearn.tree import DecisionTreeRegressor
 from skl2onnx import to_onnx
 from skl2onnx.algebra.onnx_ops import OnnxAdd  # pylint: disable=E0611
 from mlprodict.onnxrt import OnnxInference
+from mlprodict.onnxrt.onnx_inference_cache import CompiledCodeCache
 from mlprodict import __max_supported_opset__ as TARGET_OPSET
 
 
@@ -45,6 +48,41 @@ class TestOnnxrtCompiled(ExtTestCase):
             ' def compiled_run(dict_inputs, yield_ops=None, context=None, attributes=None):',
             str(oinf))
 
+    def test_onnxt_compiled_cache(self):
+        temp = get_temp_folder(__file__, "temp_onnxt_compiled_cache")
+        idi = numpy.identity(2).astype(numpy.float32)
+        model_defs = []
+        for i in range(3):
+            onx = OnnxAdd('X', idi * (i + 1), output_names=['Y'],
+                          op_version=TARGET_OPSET)
+            model_defs.append(onx.to_onnx({'X': idi}))
+
+        oinf = OnnxInference(model_defs[0], runtime="python_compiled",
+                             compiled_cache=temp)
+        self.assertEqual(idi * 2, oinf.run({'X': idi})['Y'])
+        files = [n for n in os.listdir(temp) if n.endswith('.mlpc')]
+        self.assertEqual(len(files), 1)
+
+        # the cache is used, the initializer is not part of the code
+        cache = CompiledCodeCache(temp)
+        key = cache.key(oinf)
+        code, compiled = cache.get(key)
+        self.assertEqual(code, oinf._run_compiled_code)  # pylint: disable=W0212,E1101
+        cache.set(key, code.replace('n0_add', 'n0_add '), compiled)
+        oinf2 = OnnxInference(model_defs[1], runtime="python_compiled",
+                              compiled_cache=cache)
+        self.assertIn('n0_add ', oinf2._run_compiled_code)  # pylint: disable=W0212,E1101
+        self.assertEqual(idi * 3, oinf2.run({'X': idi})['Y'])
+        oinf3 = pickle.loads(pickle.dumps(oinf2))
+        self.assertIn('n0_add ', oinf3._run_compiled_code)  # pylint: disable=W0212,E1101
+
+        # debug version and eviction
+        oinf4 = OnnxInference(model_defs[2], runtime="python_compiled_debug",
+                              compiled_cache=CompiledCodeCache(temp, 1))
+        self.assertIn('debug_print', oinf4._run_compiled_code)  # pylint: disable=W0212,E1101
+        files = [n for n in os.listdir(temp) if n.endswith('.mlpc')]
+        self.assertEqual(len(files), 0)
+
     def test_onnxt_idi_debug(self):
         idi = numpy.identity(2).astype(numpy.float32)
         onx = OnnxAdd('X', idi, output_names=['Y'],
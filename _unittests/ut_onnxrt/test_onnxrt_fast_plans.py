@@ -0,0 +1,91 @@
+"""
+@brief      test log(time=3s)
+"""
+import unittest
+import numpy
+from onnx import TensorProto
+from onnx.helper import (
+    make_model, make_node, make_graph, make_tensor_value_info,
+    make_opsetid)
+from onnx.numpy_helper import from_array
+from pyquickhelper.pycode import ExtTestCase, ignore_warnings
+from sklearn.datasets import load_iris
+from sklearn.ensemble import RandomForestClassifier
+from mlprodict.onnx_conv import to_onnx
+from mlprodict.onnxrt import OnnxInference
+from mlprodict.onnxrt.ops_cpu._op import RuntimeTypeError
+
+
+class TestOnnxrtFastPlans(ExtTestCase):
+
+    def _model(self):
+        X = make_tensor_value_info('X', TensorProto.FLOAT, None)
+        Y = make_tensor_value_info('Y', TensorProto.FLOAT, None)
+        Z = make_tensor_value_info('Z', TensorProto.INT64, None)
+        graph = make_graph(
+            [make_node('Add', ['X', 'C'], ['a']),
+             make_node('Abs', ['a'], ['b']),
+             make_node('ReduceSum', ['b', 'axes'], ['Y'], keepdims=0),
+             make_node('ArgMax', ['b'], ['Z'], axis=1)],
+            'g', [X], [Y, Z],
+            [from_array(numpy.array([1.5], dtype=numpy.float32), name='C'),
+             from_array(numpy.array([1], dtype=numpy.int64), name='axes')])
+        return make_model(graph, opset_imports=[make_opsetid('', 15)])
+
+    def test_fast_plans(self):
+        model = self._model()
+        oinf = OnnxInference(model)
+        fast = OnnxInference(model, fast_plans=True)
+        for shape in [(3, 4), (3, 4), (5, 2), (3, 4)]:
+            x = numpy.random.randn(*shape).astype(numpy.float32)
+            exp = oinf.run({'X': x})
+            got = fast.run({'X': x})
+            self.assertEqualArray(exp['Y'], got['Y'])
+            self.assertEqualArray(exp['Z'], got['Z'])
+        self.assertEqual(len(fast._fast_plans), 2)  # pylint: disable=W0212
+
+        plan = list(fast._fast_plans.values())[0]  # pylint: disable=W0212
+        kernels = {node.onnx_node.op_type: kernel
+                   for kernel, node, _, __ in plan}
+        # no check
+        self.assertEqual(kernels['Add'].__name__, '_run')
+        self.assertEqual(kernels['Abs'].__name__, '_run')
+        self.assertEqual(kernels['ArgMax'].__name__, '_run')
+        # ReduceSum changes the output in method run
+        self.assertEqual(kernels['ReduceSum'].__name__, 'run')
+
+    def test_fast_plans_lru(self):
+        fast = OnnxInference(self._model(), fast_plans=True)
+        fast.max_fast_plans = 2
+        for n in [2, 3, 2, 4]:
+            fast.run({'X': numpy.ones((n, 3), dtype=numpy.float32)})
+        keys = list(fast._fast_plans)  # pylint: disable=W0212
+        self.assertEqual(len(keys), 2)
+        self.assertEqual([k[0][1][0] for k in keys], [2, 4])
+
+    def test_fast_plans_check_new_signature(self):
+        fast = OnnxInference(self._model(), fast_plans=True)
+        fast.run({'X': numpy.ones((2, 3), dtype=numpy.float32)})
+        # a new signature is always checked
+        self.assertRaise(
+            lambda: fast.run({'X': numpy.ones((2, 3), dtype=numpy.float64)}),
+            RuntimeTypeError)
+        self.assertEqual(len(fast._fast_plans), 1)  # pylint: disable=W0212
+
+    @ignore_warnings((DeprecationWarning, UserWarning))
+    def test_fast_plans_tree(self):
+        X, y = load_iris(return_X_y=True)
+        X = X.astype(numpy.float32)
+        model = RandomForestClassifier(n_estimators=3).fit(X, y)
+        onx = to_onnx(model, X[:1], options={'zipmap': False})
+        oinf = OnnxInference(onx)
+        fast = OnnxInference(onx, fast_plans=True)
+        exp = oinf.run({'X': X})
+        for _ in range(2):
+            got = fast.run({'X': X}, clean_right_away=True)
+            self.assertEqualArray(exp['label'], got['label'])
+            self.assertEqualArray(exp['probabilities'], got['probabilities'])
+
+
+if __name__ == "__main__":
+    unittest.main()
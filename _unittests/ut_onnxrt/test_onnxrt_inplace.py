@@ -0,0 +1,137 @@
+"""
+@brief      test log(time=2s)
+"""
+import unittest
+import numpy
+from onnx import TensorProto
+from onnx.helper import (
+    make_model, make_node, make_graph, make_tensor_value_info,
+    make_opsetid)
+from onnx.numpy_helper import from_array
+from pyquickhelper.pycode import ExtTestCase
+from mlprodict.onnxrt import OnnxInference
+
+
+class TestOnnxrtInplace(ExtTestCase):
+
+    def _model(self, nodes, outputs=('Y', ), inits=None):
+        X = make_tensor_value_info('X', TensorProto.FLOAT, None)
+        graph = make_graph(
+            nodes, 'g', [X],
+            [make_tensor_value_info(o, TensorProto.FLOAT, None)
+             for o in outputs],
+            [from_array(v, name=k) for k, v in (inits or {}).items()])
+        return make_model(graph, opset_imports=[make_opsetid('', 15)])
+
+    def _check(self, model, **kwargs):
+        x = numpy.random.randn(4, 3).astype(numpy.float32)
+        exp = OnnxInference(model, inplace=False).run({'X': x})
+        oinf = OnnxInference(model, **kwargs)
+        xc = x.copy()
+        got = oinf.run({'X': xc})
+        self.assertEqual(set(exp), set(got))
+        for k, v in exp.items():
+            self.assertEqualArray(v, got[k])
+        self.assertEqualArray(x, xc)
+        return oinf
+
+    def _inplaces(self, oinf):
+        return {node.op_type: node.ops_.inplaces for node in oinf.sequence_}
+
+    def test_inplace_shape_reader(self):
+        model = self._model([
+            make_node('Exp', ['X'], ['a']),
+            make_node('Shape', ['a'], ['sh']),
+            make_node('Softmax', ['a'], ['b'], axis=1),
+            make_node('Reshape', ['b', 'sh'], ['Y'])])
+        oinf = self._check(model)
+        ins = self._inplaces(oinf)
+        self.assertEqual(ins['Exp'], {})
+        self.assertEqual(ins['Shape'], {})
+        self.assertEqual(ins['Softmax'], {0: True})
+        self.assertTrue(ins['Reshape'][0])
+        self.assertIn('a', oinf.inplaces_)
+
+    def test_inplace_last_reader(self):
+        model = self._model([
+            make_node('Exp', ['X'], ['a']),
+            make_node('Add', ['a', 'X'], ['b']),
+            make_node('Relu', ['a'], ['c']),
+            make_node('Mul', ['b', 'c'], ['Y'])])
+        oinf = self._check(model)
+        ins = self._inplaces(oinf)
+        self.assertEqual(ins['Add'], {})
+        self.assertEqual(ins['Relu'], {0: True})
+        self.assertEqual(ins['Mul'], {0: True, 1: True})
+
+        # the previous rule applies with a parallel execution
+        oinf = self._check(model, parallel=2)
+        ins = self._inplaces(oinf)
+        self.assertEqual(ins['Relu'], {})
+
+    def test_inplace_not_fresh(self):
+        # a view on an intermediate result
+        model = self._model([
+            make_node('Exp', ['X'], ['a']),
+            make_node('Squeeze', ['a'], ['b']),
+            make_node('Sigmoid', ['b'], ['Y'])])
+        oinf = self._check(model)
+        ins = self._inplaces(oinf)
+        self.assertEqual(ins['Squeeze'], {0: True})
+        self.assertEqual(ins['Sigmoid'], {0: True})
+
+        # Identity returns its input which is an output,
+        # Sigmoid cannot overwrite it
+        model = self._model([
+            make_node('Exp', ['X'], ['a']),
+            make_node('Identity', ['a'], ['Z']),
+            make_node('Sigmoid', ['a'], ['Y'])], outputs=['Y', 'Z'])
+        oinf = self._check(model)
+        ins = self._inplaces(oinf)
+        self.assertEqual(ins['Sigmoid'], {})
+
+    def test_inplace_view_input(self):
+        # X cannot be modified, nor a view on it
+        model = self._model([
+            make_node('Reshape', ['X', 'sh'], ['a']),
+            make_node('Shape', ['a'], ['s']),
+            make_node('Relu', ['a'], ['b']),
+            make_node('Sigmoid', ['b'], ['Y'])],
+            inits={'sh': numpy.array([3, 4], dtype=numpy.int64)})
+        oinf = self._check(model)
+        ins = self._inplaces(oinf)
+        self.assertEqual(ins['Reshape'], {})
+        self.assertEqual(ins['Relu'], {})
+        self.assertEqual(ins['Sigmoid'], {0: True})
+
+    def test_inplace_reduce_noop(self):
+        # ReduceSum returns its input with noop_with_empty_axes=1,
+        # Relu cannot overwrite it
+        model = self._model([
+            make_node('Neg', ['X'], ['a']),
+            make_node('ReduceSum', ['a'], ['r'], noop_with_empty_axes=1),
+            make_node('Relu', ['a'], ['b']),
+            make_node('Add', ['r', 'b'], ['Y'])])
+        oinf = self._check(model)
+        ins = self._inplaces(oinf)
+        self.assertEqual(ins['Relu'], {})
+
+    def test_inplace_cast_view(self):
+        # Cast returns its input if the type does not change,
+        # the sequential and the parallel runtimes consider it as a view
+        model = self._model([
+            make_node('Exp', ['X'], ['a']),
+            make_node('Cast', ['a'], ['b'], to=TensorProto.FLOAT),
+            make_node('Relu', ['a'], ['c']),
+            make_node('Add', ['b', 'c'], ['Y'])])
+        oinf = self._check(model)
+        ins = self._inplaces(oinf)
+        self.assertEqual(ins['Cast'], {0: True})
+        self.assertEqual(ins['Relu'], {})
+        oinf = self._check(model, parallel=2)
+        ins = self._inplaces(oinf)
+        self.assertEqual(ins['Relu'], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
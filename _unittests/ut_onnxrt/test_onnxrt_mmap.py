@@ -0,0 +1,122 @@
+"""
+@brief      test log(time=3s)
+"""
+import os
+import pickle
+import unittest
+import numpy
+from onnx import TensorProto, save_model, load
+from onnx.helper import (
+    make_model, make_node, make_graph, make_tensor_value_info)
+from onnx.numpy_helper import from_array, to_array
+from pyquickhelper.pycode import ExtTestCase, get_temp_folder
+from mlprodict.onnxrt import OnnxInference
+from mlprodict.onnxrt.onnx_inference_mmap import raw_data_locations
+
+
+class TestOnnxrtMmap(ExtTestCase):
+
+    def _model(self):
+        W = numpy.random.randn(2, 3, 3, 3).astype(numpy.float32)
+        B = numpy.random.randn(2).astype(numpy.float32)
+        shape = numpy.array([-1, 50], dtype=numpy.int64)
+        C = numpy.random.randn(50, 7).astype(numpy.float64)
+        X = make_tensor_value_info('X', TensorProto.FLOAT, None)
+        Y = make_tensor_value_info('Y', TensorProto.DOUBLE, None)
+        graph = make_graph(
+            [make_node('Conv', ['X', 'W', 'B'], ['c'], pads=[1, 1, 1, 1]),
+             make_node('Reshape', ['c', 'shape'], ['r']),
+             make_node('Constant', [], ['one'],
+                       value=from_array(numpy.array([1.5])), name='cst'),
+             make_node('Cast', ['r'], ['rd'], to=TensorProto.DOUBLE),
+             make_node('MatMul', ['rd', 'C'], ['m']),
+             make_node('Add', ['m', 'one'], ['Y'])],
+            'g', [X], [Y],
+            [from_array(W, name='W'), from_array(B, name='B'),
+             from_array(shape, name='shape'), from_array(C, name='C')])
+        return make_model(graph)
+
+    def _check_mapped(self, oinf, names):
+        mapped = oinf._mmap_inits  # pylint: disable=W0212
+        for name in names:
+            value = oinf.inits_[name]['value']
+            self.assertIs(value, mapped[name])
+            self.assertFalse(value.flags['OWNDATA'])
+            self.assertFalse(value.flags['WRITEABLE'])
+
+    def test_raw_data_locations(self):
+        temp = get_temp_folder(__file__, "temp_raw_data_locations")
+        model = self._model()
+        name = os.path.join(temp, "model.onnx")
+        save_model(model, name)
+        locs = raw_data_locations(name)
+        self.assertEqual(set(locs), {'W', 'B', 'shape', 'C'})
+        with open(name, 'rb') as f:
+            content = f.read()
+        for init in model.graph.initializer:
+            off, length = locs[init.name]
+            self.assertEqual(content[off:off + length], init.raw_data)
+
+    def test_mmap_raw_data(self):
+        temp = get_temp_folder(__file__, "temp_mmap_raw_data")
+        name = os.path.join(temp, "model.onnx")
+        save_model(self._model(), name)
+        x = numpy.random.randn(4, 1, 5, 5).astype(numpy.float32)
+        expected = OnnxInference(name).run({'X': x})['Y']
+
+        oinf = OnnxInference(name, mmap_initializers=True)
+        # raw data is not aligned in the file, only W is mapped
+        mapped = set(oinf._mmap_inits)  # pylint: disable=W0212
+        self.assertIn('W', mapped)
+        self.assertNotIn('B', mapped)
+        self._check_mapped(oinf, mapped)
+        self.assertEqualArray(expected, oinf.run({'X': x})['Y'])
+        inits = {i.name: i for i in oinf.obj.graph.initializer}
+        self.assertEqual(inits['W'].data_location, TensorProto.EXTERNAL)
+        self.assertEqual(len(inits['W'].raw_data), 0)
+        self.assertEqual(inits['C'].data_location == TensorProto.EXTERNAL,
+                         'C' in mapped)
+
+        oinf2 = pickle.loads(pickle.dumps(oinf))
+        self._check_mapped(oinf2, mapped)
+        self.assertEqualArray(expected, oinf2.run({'X': x})['Y'])
+
+        oinf = OnnxInference(name, mmap_initializers=True,
+                             runtime='python_compiled')
+        self.assertEqualArray(expected, oinf.run({'X': x})['Y'])
+
+    def test_mmap_external_data(self):
+        temp = get_temp_folder(__file__, "temp_mmap_external_data")
+        name = os.path.join(temp, "model.onnx")
+        model = self._model()
+        values = {i.name: to_array(i) for i in model.graph.initializer}
+        save_model(model, name, save_as_external_data=True,
+                   all_tensors_to_one_file=True, location="model.data",
+                   size_threshold=0, convert_attribute=True)
+        self.assertExists(os.path.join(temp, "model.data"))
+        x = numpy.random.randn(4, 1, 5, 5).astype(numpy.float32)
+        expected = OnnxInference(name).run({'X': x})['Y']
+
+        oinf = OnnxInference(name, mmap_initializers=True)
+        self._check_mapped(oinf, ['W', 'B', 'shape', 'C'])
+        self.assertEqualArray(expected, oinf.run({'X': x})['Y'])
+        for k, v in values.items():
+            self.assertEqualArray(v, oinf.inits_[k]['value'])
+        # the attribute of node Constant is loaded
+        cst = oinf.obj.graph.node[2].attribute[0].t
+        self.assertEqual(cst.data_location, TensorProto.DEFAULT)
+        self.assertEqualArray(numpy.array([1.5]), to_array(cst))
+
+        # external data is not loaded by default
+        self.assertEqual(
+            load(name, load_external_data=False).graph.initializer[0]
+            .data_location, TensorProto.EXTERNAL)
+
+    def test_mmap_wrong_type(self):
+        self.assertRaise(
+            lambda: OnnxInference(self._model(), mmap_initializers=True),
+            TypeError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+@brief      test log(time=5s)
+"""
+import os
+import unittest
+import numpy
+from sklearn.datasets import load_iris
+from sklearn.linear_model import LogisticRegression
+from pyquickhelper.pycode import ExtTestCase, ignore_warnings, get_temp_folder
+from mlprodict.onnx_conv import to_onnx
+from mlprodict.onnxrt import OnnxInference
+from mlprodict.onnxrt.onnx_inference_process import ProcessPoolInference
+
+
+class TestOnnxrtProcess(ExtTestCase):
+
+    def setUp(self):
+        X, y = load_iris(return_X_y=True)
+        self.X = X.astype(numpy.float32)
+        self.model = LogisticRegression(max_iter=500).fit(self.X, y)
+
+    @ignore_warnings((DeprecationWarning, UserWarning))
+    def test_process_pool(self):
+        onx = to_onnx(self.model, self.X[:1])
+        oinf = OnnxInference(onx)
+        expected = oinf.run({'X': self.X})
+        with ProcessPoolInference(oinf, n_jobs=2, min_rows=20) as pool:
+            self.assertEqual(pool.n_jobs, 2)
+            self.assertEqual(pool._split(150),  # pylint: disable=W0212
+                             [(0, 75), (75, 150)])
+            self.assertEqual(pool._split(30),  # pylint: disable=W0212
+                             [(0, 30)])
+            for _ in range(2):
+                got = pool.run({'X': self.X})
+                self.assertEqualArray(expected['output_label'],
+                                      got['output_label'])
+                # ZipMap
+                self.assertIsInstance(got['output_probability'], list)
+                self.assertEqual(len(got['output_probability']), 150)
+                self.assertEqual(expected['output_probability'][120],
+                                 got['output_probability'][120])
+            # small batch computed in the main process
+            got = pool.run({'X': self.X[:10]})
+            self.assertEqualArray(expected['output_label'][:10],
+                                  got['output_label'])
+            self.assertRaise(
+                lambda: pool.run({'X': self.X, 'Y': self.X[:3]}), ValueError)
+
+    @ignore_warnings((DeprecationWarning, UserWarning))
+    def test_process_pool_snapshot(self):
+        temp = get_temp_folder(__file__, "temp_process_pool_snapshot")
+        onx = to_onnx(self.model, self.X[:1], options={'zipmap': False})
+        oinf = OnnxInference(onx)
+        expected = oinf.run({'X': self.X})
+        name = os.path.join(temp, "model.snap")
+        oinf.save_snapshot(name)
+        with ProcessPoolInference(name, n_jobs=3, min_rows=10) as pool:
+            got = pool.run({'X': self.X})
+        self.assertEqualArray(expected['label'], got['label'])
+        self.assertEqualArray(expected['probabilities'], got['probabilities'])
+
+
+if __name__ == "__main__":
+    unittest.main()
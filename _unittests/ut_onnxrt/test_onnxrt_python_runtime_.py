@@ -852,6 +852,46 @@ class TestOnnxrtPythonRuntime(ExtTestCase):  # pylint: disable=R0904
             self.assertEqual(exp, got['Y'])
         sparse_support.append(('BinOp', op_version, onnx_cl.__name__))
 
+    def common_test_onnxt_runtime_recurrent(self, onnx_cl, number_of_gates,
+                                            **kwargs):
+        # compares the python runtime to onnxruntime,
+        # sequences have different lengths
+        rnd = numpy.random.RandomState(0)
+        seq_length, batch_size, input_size, hidden_size = 4, 3, 2, 5
+        for direction in ['forward', 'reverse', 'bidirectional']:
+            num_directions = 2 if direction == 'bidirectional' else 1
+            gates = number_of_gates * hidden_size
+            inputs = {
+                'X': rnd.randn(seq_length, batch_size, input_size),
+                'W': rnd.randn(num_directions, gates, input_size) / 2,
+                'R': rnd.randn(num_directions, gates, hidden_size) / 2,
+                'B': rnd.randn(num_directions, 2 * gates),
+                'L': numpy.array([4, 2, 3], dtype=numpy.int32),
+                'H': rnd.randn(num_directions, batch_size, hidden_size)}
+            output_names = ['Y', 'Y_h']
+            if onnx_cl is OnnxLSTM:
+                inputs['C'] = rnd.randn(
+                    num_directions, batch_size, hidden_size)
+                inputs['P'] = rnd.randn(num_directions, 3 * hidden_size)
+                output_names.append('Y_c')
+            inputs = {k: v if v.dtype == numpy.int32 else v.astype(numpy.float32)
+                      for k, v in inputs.items()}
+            with self.subTest(op=onnx_cl.__name__, direction=direction,
+                              **kwargs):
+                onx = onnx_cl(*inputs, output_names=output_names,
+                              op_version=TARGET_OPSET, direction=direction,
+                              hidden_size=hidden_size, **kwargs)
+                model_def = onx.to_onnx(
+                    inputs, outputs=[(n, FloatTensorType())
+                                     for n in output_names],
+                    target_opset=TARGET_OPSET)
+                exp = OnnxInference(
+                    model_def, runtime='onnxruntime1').run(inputs)
+                got = OnnxInference(model_def).run(inputs)
+                for name in output_names:
+                    self.assertEqual(exp[name].shape, got[name].shape)
+                    self.assertEqualArray(exp[name], got[name], decimal=5)
+
     @wraplog()
     def test_onnxt_runtime_abs(self):
         self.common_test_onnxt_runtime_unary(OnnxAbs, numpy.abs)
@@ -2587,6 +2627,45 @@ class TestOnnxrtPythonRuntime(ExtTestCase):  # pylint: disable=R0904
         validate_python_inference(oinfpy, {'X': X.astype(numpy.float32),
                                            'Y': Y.astype(numpy.float32)})
 
+    @wraplog()
+    def test_onnxt_runtime_einsum_plans(self):
+        for equation, shapes in [
+                ('bij,bjk->bik', [(5, 2, 3), (5, 3, 4)]),
+                ('bsnh,btnh->bnts', [(2, 6, 3, 7), (2, 5, 3, 7)]),
+                ('ij,ij->i', [(10, 7), (10, 7)]),
+                ('ii,ij->j', [(4, 4), (4, 3)]),
+                ('bac,cd,def->ebc', [(2, 3, 4), (4, 5), (5, 2, 3)])]:
+            for dtype in [numpy.float32, numpy.float64]:
+                with self.subTest(equation=equation, dtype=dtype):
+                    names = ['X%d' % i for i in range(len(shapes))]
+                    onx = OnnxEinsum(
+                        *names, equation=equation, output_names=['Z'],
+                        op_version=TARGET_OPSET)
+                    inputs = {n: numpy.random.randn(*s).astype(dtype)
+                              for n, s in zip(names, shapes)}
+                    model_def = onx.to_onnx(inputs, target_opset=TARGET_OPSET)
+                    oinf = OnnxInference(model_def)
+                    exp = numpy.einsum(
+                        equation, *[inputs[n] for n in names])
+                    # the second call uses the cached plan
+                    # and returns the same result as the first one
+                    first = oinf.run(inputs)['Z']
+                    self.assertEqualArray(exp, first, decimal=4)
+                    got = oinf.run(inputs)
+                    self.assertEqualArray(first, got['Z'], rtol=0)
+                    op = oinf.sequence_[0].ops_
+                    self.assertEqual(len(op._plans), 1)  # pylint: disable=W0212
+
+                    # a new signature creates a new plan
+                    inputs = {n: numpy.random.randn(
+                        *[d * 2 for d in s]).astype(dtype)
+                        for n, s in zip(names, shapes)}
+                    exp = numpy.einsum(
+                        equation, *[inputs[n] for n in names])
+                    got = oinf.run(inputs)
+                    self.assertEqualArray(exp, got['Z'], decimal=4)
+                    self.assertEqual(len(op._plans), 2)  # pylint: disable=W0212
+
     @wraplog()
     def test_onnxt_runtime_elu(self):
         self.common_test_onnxt_runtime_unary(
@@ -3051,6 +3130,13 @@ class TestOnnxrtPythonRuntime(ExtTestCase):  # pylint: disable=R0904
         self.assertEqualArray(Y_h, got['Y_h'])
         python_tested.append(OnnxGRU)
 
+    @wraplog()
+    def test_onnxt_runtime_gru_bidirectional(self):
+        for linear_before_reset in [0, 1]:
+            self.common_test_onnxt_runtime_recurrent(
+                OnnxGRU, 3, linear_before_reset=linear_before_reset)
+        self.common_test_onnxt_runtime_recurrent(OnnxGRU, 3, clip=0.5)
+
     def test_onnxt_runtime_hard_sigmoid(self):
         self.common_test_onnxt_runtime_unary(
             OnnxHardSigmoid, lambda x: numpy.maximum(
@@ -3253,6 +3339,13 @@ class TestOnnxrtPythonRuntime(ExtTestCase):  # pylint: disable=R0904
         self.assertEqualArray(Y_h, got['Y_h'])
         python_tested.append(OnnxLSTM)
 
+    @wraplog()
+    def test_onnxt_runtime_lstm_bidirectional(self):
+        for input_forget in [0, 1]:
+            self.common_test_onnxt_runtime_recurrent(
+                OnnxLSTM, 4, input_forget=input_forget)
+        self.common_test_onnxt_runtime_recurrent(OnnxLSTM, 4, clip=0.5)
+
     @wraplog()
     def test_onnxt_runtime_matmul(self):
         self.common_test_onnxt_runtime_binary(OnnxMatMul, lambda x, y: x @ y)
@@ -4927,6 +5020,11 @@ class TestOnnxrtPythonRuntime(ExtTestCase):  # pylint: disable=R0904
         self.assertEqualArray(Y_h, got['Y_h'])
         python_tested.append(OnnxRNN)
 
+    @wraplog()
+    def test_onnxt_runtime_rnn_bidirectional(self):
+        self.common_test_onnxt_runtime_recurrent(OnnxRNN, 1)
+        self.common_test_onnxt_runtime_recurrent(OnnxRNN, 1, clip=0.5)
+
     @wraplog()
     def test_onnxt_runtime_rnn_batchwise(self):
         input_size = 2
@@ -5273,6 +5371,42 @@ class TestOnnxrtPythonRuntime(ExtTestCase):  # pylint: disable=R0904
                           dtype=numpy.int64)
         self.assertEqualArray(exp, got['Yi'])
 
+    @wraplog()
+    def test_onnxt_runtime_topk_ties(self):
+        rnd = numpy.random.RandomState(0)
+        for dtype in [numpy.float32, numpy.float64, numpy.int64, numpy.int32]:
+            for shape in [(7, ), (4, 9), (3, 5, 60)]:
+                # many ties
+                X = rnd.randint(0, 4, size=shape).astype(dtype)
+                for axis in range(-1, len(shape)):
+                    dim = shape[axis]
+                    for k, largest in [(0, 1), (1, 1), (3, 0), (3, 1),
+                                       (dim, 0), (dim, 1)]:
+                        with self.subTest(dtype=dtype, shape=shape, axis=axis,
+                                          k=k, largest=largest):
+                            onx = OnnxTopK(
+                                'X', numpy.array([k], dtype=numpy.int64),
+                                axis=axis, largest=largest,
+                                output_names=['Y', 'Yi'],
+                                op_version=TARGET_OPSET)
+                            model_def = onx.to_onnx(
+                                {'X': X}, target_opset=TARGET_OPSET)
+                            exp = OnnxInference(
+                                model_def, runtime='onnxruntime1').run(
+                                    {'X': X})
+                            got = OnnxInference(model_def).run({'X': X})
+                            self.assertEqual(exp['Y'].shape, got['Y'].shape)
+                            self.assertEqualArray(exp['Y'], got['Y'])
+                            self.assertEqualArray(exp['Yi'], got['Yi'])
+
+        X = numpy.array([[0, 1, 2]], dtype=numpy.float32)
+        onx = OnnxTopK('X', numpy.array([4], dtype=numpy.int64),
+                       axis=1, output_names=['Y', 'Yi'],
+                       op_version=TARGET_OPSET)
+        model_def = onx.to_onnx({'X': X}, target_opset=TARGET_OPSET)
+        oinf = OnnxInference(model_def)
+        self.assertRaise(lambda: oinf.run({'X': X}), RuntimeError)
+
     @wraplog()
     def test_onnxt_runtime_transpose(self):
         X = numpy.array([[0, 1, 2, 3, 4],
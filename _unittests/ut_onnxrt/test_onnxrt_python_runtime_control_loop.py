@@ -347,6 +347,45 @@ class TestOnnxrtPythonRuntimeControlLoop(ExtTestCase):
                             continue
                         self.assertIsInstance(v, SequenceType)
 
+    def test_loop_bound_iterations(self):
+        # the body adds the iteration number and the static input S
+        body = make_graph(
+            [make_node('Identity', ['cond_in'], ['cond_out']),
+             make_node('Cast', ['i'], ['fi'], to=TensorProto.FLOAT),
+             make_node('Add', ['x_in', 'fi'], ['x1']),
+             make_node('Add', ['x1', 'S'], ['x_out'])],
+            'body',
+            [make_tensor_value_info('i', TensorProto.INT64, []),
+             make_tensor_value_info('cond_in', TensorProto.BOOL, []),
+             make_tensor_value_info('x_in', TensorProto.FLOAT, None)],
+            [make_tensor_value_info('cond_out', TensorProto.BOOL, []),
+             make_tensor_value_info('x_out', TensorProto.FLOAT, None)])
+        graph = make_graph(
+            [make_node('Loop', ['M', 'cond', 'X'], ['Y'], body=body)],
+            'g',
+            [make_tensor_value_info('M', TensorProto.INT64, []),
+             make_tensor_value_info('cond', TensorProto.BOOL, []),
+             make_tensor_value_info('X', TensorProto.FLOAT, None),
+             make_tensor_value_info('S', TensorProto.FLOAT, None)],
+            [make_tensor_value_info('Y', TensorProto.FLOAT, None)])
+        model_def = make_model(
+            graph, opset_imports=[make_operatorsetid('', 15)])
+
+        X = numpy.array([1, 2], dtype=numpy.float32)
+        S = numpy.array([10, 20], dtype=numpy.float32)
+        oinf = OnnxInference(model_def)
+        body_rt = oinf.sequence_[0].ops_.body
+        self.assertIsNotNone(body_rt.bind_iterations(constants={'S': S}))
+        for m in [0, 1, 1000]:
+            with self.subTest(m=m):
+                got = oinf.run({'M': numpy.array(m, dtype=numpy.int64),
+                                'cond': numpy.array(True), 'X': X, 'S': S})
+                exp = X + S * m + m * (m - 1) / 2
+                self.assertEqualArray(exp, got['Y'])
+        got = oinf.run({'M': numpy.array(5, dtype=numpy.int64),
+                        'cond': numpy.array(False), 'X': X, 'S': S})
+        self.assertEqualArray(X, got['Y'])
+
     def sequence_insert_reference_implementation(
             self, sequence, tensor, position=None):
         seq = list(sequence)
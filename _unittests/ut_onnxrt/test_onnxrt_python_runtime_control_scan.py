@@ -4,6 +4,10 @@
 import unittest
 from logging import getLogger
 import numpy
+from onnx import TensorProto
+from onnx.helper import (
+    make_node, make_graph, make_model, make_tensor_value_info,
+    make_operatorsetid)
 from scipy.spatial.distance import squareform, pdist, cdist as scipy_cdist
 from pyquickhelper.pycode import ExtTestCase
 from sklearn.datasets import load_iris
@@ -12,6 +16,7 @@ from skl2onnx.algebra.onnx_ops import (  # pylint: disable=E0611
 from skl2onnx.common.data_types import FloatTensorType
 from skl2onnx import __version__ as skl2onnx_version
 from mlprodict.onnxrt import OnnxInference
+from mlprodict.onnxrt.ops_cpu.op_scan import Scan
 from mlprodict import __max_supported_opset__ as TARGET_OPSET
 
 
@@ -127,6 +132,144 @@ class TestOnnxrtPythonRuntimeControlScan(ExtTestCase):
         exp = scipy_cdist(X_test, X_train, metric="euclidean")
         self.assertEqualArray(exp, res, decimal=6)
 
+    def test_scan_bound_iterations(self):
+        # cumulated sum and maximum of the rows
+        body = make_graph(
+            [make_node('Add', ['sum_in', 'row'], ['sum_out']),
+             make_node('Max', ['max_in', 'row'], ['max_out']),
+             make_node('Identity', ['sum_out'], ['cum'])],
+            'body',
+            [make_tensor_value_info('sum_in', TensorProto.FLOAT, [3]),
+             make_tensor_value_info('max_in', TensorProto.FLOAT, [3]),
+             make_tensor_value_info('row', TensorProto.FLOAT, [3])],
+            [make_tensor_value_info('sum_out', TensorProto.FLOAT, [3]),
+             make_tensor_value_info('max_out', TensorProto.FLOAT, [3]),
+             make_tensor_value_info('cum', TensorProto.FLOAT, [3])])
+        graph = make_graph(
+            [make_node('Scan', ['init', 'init', 'X'], ['S', 'M', 'C'],
+                       num_scan_inputs=1, body=body)],
+            'g',
+            [make_tensor_value_info('init', TensorProto.FLOAT, [3]),
+             make_tensor_value_info('X', TensorProto.FLOAT, [None, 3])],
+            [make_tensor_value_info('S', TensorProto.FLOAT, [3]),
+             make_tensor_value_info('M', TensorProto.FLOAT, [3]),
+             make_tensor_value_info('C', TensorProto.FLOAT, [None, 3])])
+        model_def = make_model(
+            graph, opset_imports=[make_operatorsetid('', 15)])
+
+        X = numpy.random.randn(500, 3).astype(numpy.float32)
+        init = numpy.zeros((3, ), dtype=numpy.float32)
+        for rt in ['python', 'onnxruntime1']:
+            with self.subTest(rt=rt):
+                oinf = OnnxInference(model_def, runtime=rt)
+                got = oinf.run({'init': init, 'X': X})
+                self.assertEqualArray(X.sum(axis=0), got['S'], decimal=4)
+                self.assertEqualArray(
+                    numpy.maximum(X.max(axis=0), 0), got['M'])
+                self.assertEqualArray(numpy.cumsum(X, axis=0), got['C'],
+                                      decimal=4)
+                self.assertEqual(got['C'].dtype, numpy.float32)
+
+        oinf = OnnxInference(model_def)
+        body_rt = oinf.sequence_[0].ops_.body
+        self.assertIsNotNone(body_rt.bind_iterations())
+        body_rt = OnnxInference(body, memory_planning=True)
+        self.assertIsNone(body_rt.bind_iterations())
+        # states are modified, the body cannot be vectorized
+        self.assertFalse(oinf.sequence_[0].ops_.vectorizable_)
+        self.assertRaise(
+            lambda: OnnxInference(
+                model_def, runtime_options={'scan_vectorize': True}),
+            RuntimeError)
+
+    def test_scan_vectorized_cdist(self):
+        from skl2onnx.algebra.complex_functions import onnx_cdist
+        X_train = numpy.random.randn(20, 3).astype(numpy.float32)
+        X = numpy.random.randn(300, 3).astype(numpy.float32)
+        for metric, kwargs in [('euclidean', {}), ('minkowski', {'p': 3})]:
+            onx = OnnxIdentity(
+                onnx_cdist('X', X_train, metric=metric,
+                           dtype=numpy.float32, op_version=TARGET_OPSET,
+                           **kwargs),
+                output_names=['Y'], op_version=TARGET_OPSET)
+            model_def = onx.to_onnx(
+                inputs=[('X', FloatTensorType([None, None]))],
+                outputs=[('Y', FloatTensorType())],
+                target_opset=TARGET_OPSET)
+            exp = scipy_cdist(X, X_train, metric=metric, **kwargs)
+            for vect in [None, True, False]:
+                with self.subTest(metric=metric, vect=vect):
+                    oinf = OnnxInference(
+                        model_def, runtime_options={'scan_vectorize': vect})
+                    scan = [n.ops_ for n in oinf.sequence_
+                            if n.op_type == 'Scan'][0]
+                    self.assertTrue(scan.vectorizable_)
+                    got = oinf.run({'X': X})['Y']
+                    self.assertEqualArray(exp, got, decimal=4)
+
+    def test_scan_vectorized_reductions(self):
+        # one state, two scanned inputs of different ranks,
+        # reductions with positive and negative axes
+        body = make_graph(
+            [make_node('Identity', ['M_in'], ['M_out']),
+             make_node('Sub', ['M_in', 'row'], ['diff']),
+             make_node('Mul', ['diff', 'w'], ['wdiff']),
+             make_node('ReduceMax', ['wdiff'], ['mx'],
+                       axes=[-1], keepdims=1),
+             make_node('Sub', ['wdiff', 'mx'], ['shifted']),
+             make_node('ReduceSumSquare', ['shifted'], ['d2'],
+                       axes=[1], keepdims=0),
+             make_node('ArgMin', ['d2'], ['best'], axis=-1, keepdims=0),
+             make_node('Sqrt', ['d2'], ['dist'])],
+            'body',
+            [make_tensor_value_info('M_in', TensorProto.FLOAT, None),
+             make_tensor_value_info('row', TensorProto.FLOAT, None),
+             make_tensor_value_info('w', TensorProto.FLOAT, None)],
+            [make_tensor_value_info('M_out', TensorProto.FLOAT, None),
+             make_tensor_value_info('dist', TensorProto.FLOAT, None),
+             make_tensor_value_info('best', TensorProto.INT64, None)])
+        graph = make_graph(
+            [make_node('Scan', ['M', 'X', 'W'], ['M2', 'D', 'B'],
+                       num_scan_inputs=2, body=body)],
+            'g',
+            [make_tensor_value_info('M', TensorProto.FLOAT, None),
+             make_tensor_value_info('X', TensorProto.FLOAT, None),
+             make_tensor_value_info('W', TensorProto.FLOAT, None)],
+            [make_tensor_value_info('M2', TensorProto.FLOAT, None),
+             make_tensor_value_info('D', TensorProto.FLOAT, None),
+             make_tensor_value_info('B', TensorProto.INT64, None)])
+        model_def = make_model(
+            graph, opset_imports=[make_operatorsetid('', 12)])
+
+        M = numpy.random.randn(7, 4).astype(numpy.float32)
+        X = numpy.random.randn(50, 4).astype(numpy.float32)
+        W = numpy.random.rand(50, 1).astype(numpy.float32)
+        exp = OnnxInference(
+            model_def, runtime_options={'scan_vectorize': False}).run(
+                {'M': M, 'X': X, 'W': W})
+        wdiff = (M[numpy.newaxis, :, :] - X[:, numpy.newaxis, :]) * W[
+            :, numpy.newaxis, :]
+        shifted = wdiff - wdiff.max(axis=2, keepdims=True)
+        d2 = (shifted ** 2).sum(axis=2)
+        self.assertEqualArray(numpy.sqrt(d2), exp['D'], decimal=5)
+        self.assertEqualArray(d2.argmin(axis=1), exp['B'])
+        self.assertEqualArray(M, exp['M2'])
+
+        block_size = Scan.block_size
+        for bs in [block_size, 100]:
+            Scan.block_size = bs
+            try:
+                oinf = OnnxInference(
+                    model_def, runtime_options={'scan_vectorize': True})
+                got = oinf.run({'M': M, 'X': X, 'W': W})
+            finally:
+                Scan.block_size = block_size
+            self.assertEqual(set(exp), set(got))
+            for k, v in exp.items():
+                self.assertEqual(v.shape, got[k].shape)
+                self.assertEqual(v.dtype, got[k].dtype)
+                self.assertEqualArray(v, got[k], decimal=5)
+
 
 if __name__ == "__main__":
     unittest.main()
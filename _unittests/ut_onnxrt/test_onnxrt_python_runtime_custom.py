@@ -72,6 +72,33 @@ class TestOnnxrtPythonRuntimeCustom(ExtTestCase):
                     tolerance=1e-6)
         python_tested.append(OnnxCDist)
 
+    @ignore_warnings(DeprecationWarning)
+    def test_onnxt_runtime_cdist_cpp(self):
+        # big enough to be computed in parallel
+        rnd = numpy.random.RandomState(0)
+        X = rnd.randn(70, 19)
+        Y = rnd.randn(130, 19)
+        X[0, :] = 0
+        for dtype, decimal in [(numpy.float32, 4), (numpy.float64, 10)]:
+            for metric, kwargs in [('sqeuclidean', {}), ('euclidean', {}),
+                                   ('minkowski', dict(p=1.)),
+                                   ('minkowski', dict(p=3.)),
+                                   ('cosine', {})]:
+                with self.subTest(metric=metric, dtype=dtype, kwargs=kwargs):
+                    x, y = X.astype(dtype), Y.astype(dtype)
+                    Z = cdist(x, y, metric=metric, **kwargs)
+                    onx = OnnxCDist('X', 'Y', output_names=['Z'],
+                                    metric=metric, op_version=TARGET_OPSET,
+                                    **kwargs)
+                    model_def = onx.to_onnx({'X': x, 'Y': y},
+                                            outputs={'Z': Z.astype(dtype)},
+                                            target_opset=TARGET_OPSET)
+                    oinf = OnnxInference(model_def)
+                    got = oinf.run({'X': x, 'Y': y})['Z']
+                    self.assertEqual(got.dtype, dtype)
+                    self.assertEqualArray(Z.astype(dtype), got,
+                                          decimal=decimal)
+
     @unittest.skipIf(compare_module_version(skl2onnx.__version__, "1.9.1") <= 0,
                      reason="Missing complex support.")
     @ignore_warnings(DeprecationWarning)
@@ -6,6 +6,7 @@ import warnings
 from logging import getLogger
 import numpy
 import pandas
+from scipy.sparse import csr_matrix
 from sklearn.cluster import KMeans
 from sklearn.datasets import load_iris
 from sklearn.feature_extraction import DictVectorizer
@@ -13,7 +14,8 @@ from sklearn.impute import SimpleImputer
 from sklearn.linear_model import LogisticRegression, LinearRegression
 from sklearn.model_selection import train_test_split
 from sklearn.neighbors import KNeighborsRegressor, KNeighborsClassifier
-from sklearn.preprocessing import StandardScaler, Binarizer
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler, Binarizer, Normalizer
 from pyquickhelper.pycode import ExtTestCase, ignore_warnings
 from skl2onnx import convert_sklearn
 from skl2onnx.common.data_types import (
@@ -293,6 +295,37 @@ class TestOnnxrtPythonRuntimeMl(ExtTestCase):
         self.assertEqual(list(sorted(got)), ['variable'])
         self.assertEqualArray(exp.todense(), got['variable'].todense())
 
+    @ignore_warnings((DeprecationWarning, UserWarning))
+    def test_dict_vectorizer_sparse_pipeline(self):
+        rnd = numpy.random.RandomState(0)
+        data = [{'k%d' % rnd.randint(300): rnd.randn() for _ in range(5)}
+                for i in range(200)]
+        y = rnd.randint(0, 3, 200)
+        # unknown keys are ignored
+        data_test = data[:10] + [{'unknown': 1.}, {}]
+        for norm in ['l1', 'l2', 'max']:
+            for model in [make_pipeline(DictVectorizer(), LogisticRegression()),
+                          make_pipeline(DictVectorizer(), Normalizer(norm=norm),
+                                        LinearRegression())]:
+                with self.subTest(norm=norm, model=model.steps[-1][0]):
+                    model.fit(data, y)
+                    model_def = convert_sklearn(
+                        model, initial_types=[("input", DictionaryType(
+                            StringTensorType([1]), FloatTensorType([1])))],
+                        target_opset={'': 15, 'ai.onnx.ml': 2})
+                    oinf = OnnxInference(model_def, inplace=False)
+                    got = oinf.run({'input': numpy.array(data_test)},
+                                   intermediate=True)
+                    sparse = [v for v in got.values()
+                              if isinstance(v, csr_matrix)]
+                    self.assertNotEmpty(sparse)
+                    name = model_def.graph.output[0].name
+                    self.assertEqualArray(
+                        model.predict(data_test).ravel(),
+                        got[name].ravel(), decimal=5)
+                    got2 = oinf.run({'input': pandas.Series(data_test)})
+                    self.assertEqualArray(got[name], got2[name])
+
     @ignore_warnings(DeprecationWarning)
     def test_onnxrt_python_SimpleImputer(self):
         iris = load_iris()
@@ -19,7 +19,7 @@ from skl2onnx.common.data_types import (
     StringTensorType, FloatTensorType, Int64TensorType)
 from skl2onnx.algebra.onnx_ops import (  # pylint: disable=E0611
     OnnxStringNormalizer, OnnxTfIdfVectorizer, OnnxLabelEncoder,
-    OnnxCategoryMapper)
+    OnnxCategoryMapper, OnnxOneHotEncoder)
 from mlprodict.onnx_conv import to_onnx
 from mlprodict.onnx_conv.onnx_ops import OnnxTokenizer
 from mlprodict.onnxrt import OnnxInference
@@ -198,6 +198,63 @@ class TestOnnxrtPythonRuntimeMlText(ExtTestCase):
         res = oinf.run({'text': corpus})
         self.assertEqual(list(res['out']), list(corpus))
 
+    def test_onnxrt_string_normalizer_unicode(self):
+        # ASCII strings are processed in C++, the others in python,
+        # the corpus is big enough to be processed in parallel
+        corpus = numpy.array([
+            'This is the first document.', 'Été à la mer', 'IS this',
+            'ÉCOLE is this'] * 300)
+        exp = numpy.array([
+            'first document.', 'ete a la mer', '', 'ecole'] * 300)
+
+        op = OnnxStringNormalizer(
+            'text', op_version=TARGET_OPSET,
+            output_names=['out'], stopwords=['this', 'is', 'the'],
+            case_change_action='LOWER', is_case_sensitive=0)
+        onx = op.to_onnx(inputs=[('text', StringTensorType())])
+        oinf = OnnxInference(onx)
+        res = oinf.run({'text': corpus})
+        self.assertEqual(res['out'].tolist(), exp.tolist())
+        res = oinf.run({'text': corpus.reshape((-1, 2))})
+        self.assertEqual(res['out'].tolist(), exp.reshape((-1, 2)).tolist())
+
+    def test_onnxrt_tokenizer_unicode(self):
+        corpus = numpy.array(
+            ['été à la mer', 'abc, d', 'ab_1/日本 e', ''] * 300)
+        tokens = [['été', 'à', 'la', 'mer'], ['abc,', 'd'],
+                  ['ab_1/日本', 'e'], []]
+        words = [['t', 'la', 'mer'], ['abc', 'd'],
+                 ['ab_1', 'e'], []]
+        chars = [list('été à la mer'), list('abc, d'),
+                 list('ab_1/日本 e'), []]
+
+        def pad(rows, mark):
+            rows = [(['#'] if mark else []) + r for r in rows] * 300
+            n = max(map(len, rows)) + (1 if mark else 0)
+            return [r + ['#'] * (n - len(r)) for r in rows]
+
+        for mark in [0, 1]:
+            for kwargs, exp in [(dict(separators=[' ']), tokens),
+                                (dict(tokenexp='[a-z0-9_]+'), words),
+                                (dict(tokenexp='.'), chars),
+                                (dict(tokenexp='\\w+'),
+                                 [['été', 'à', 'la', 'mer'], ['abc', 'd'],
+                                  ['ab_1', '日本', 'e'], []])]:
+                with self.subTest(mark=mark, kwargs=kwargs):
+                    op = OnnxTokenizer(
+                        'text', op_version=TARGET_OPSET,
+                        output_names=['out'], mark=mark, **kwargs)
+                    onx = op.to_onnx(
+                        inputs=[('text', StringTensorType())],
+                        outputs=[('out', StringTensorType())])
+                    oinf = OnnxInference(onx)
+                    res = oinf.run({'text': corpus})
+                    self.assertEqual(res['out'].tolist(), pad(exp, mark))
+                    res = oinf.run({'text': corpus.reshape((-1, 2))})
+                    self.assertEqual(
+                        res['out'].reshape((corpus.shape[0], -1)).tolist(),
+                        pad(exp, mark))
+
     def test_onnxrt_tokenizer_char(self):
         corpus = numpy.array(['abc', 'abc d', 'abc  e'])
         exp = numpy.array(
@@ -503,6 +560,92 @@ class TestOnnxrtPythonRuntimeMlText(ExtTestCase):
         self.assertEqualArray(
             res['out'], numpy.array([1, 2, 1, -1], dtype=numpy.int64))
 
+    def test_onnxrt_category_mapper_many(self):
+        rnd = numpy.random.RandomState(0)
+        cats = rnd.choice(10000, 500, replace=False).astype(numpy.int64)
+        strs = ['c%d' % c for c in cats]
+        x = rnd.randint(0, 10000, size=(2000, 3)).astype(numpy.int64)
+        xs = numpy.array(['c%d' % c for c in x.ravel()]).reshape(x.shape)
+
+        op = OnnxCategoryMapper(
+            'cat', op_version=TARGET_OPSET, cats_int64s=cats,
+            cats_strings=strs, default_string='?', output_names=['out'])
+        onx = op.to_onnx(
+            inputs=[('cat', Int64TensorType())],
+            outputs=[('out', StringTensorType())])
+        res = OnnxInference(onx).run({'cat': x})
+        mapping = dict(zip(cats.tolist(), strs))
+        self.assertEqual(
+            res['out'].tolist(),
+            [[mapping.get(v, '?') for v in row] for row in x.tolist()])
+
+        onx = op.to_onnx(
+            inputs=[('cat', StringTensorType())],
+            outputs=[('out', Int64TensorType())])
+        oinf = OnnxInference(onx)
+        mapping = dict(zip(strs, cats.tolist()))
+        exp = numpy.array(
+            [[mapping.get(v, -1) for v in row] for row in xs.tolist()])
+        self.assertEqualArray(exp, oinf.run({'cat': xs})['out'])
+        self.assertEqualArray(
+            exp, oinf.run({'cat': xs.astype(numpy.object_)})['out'])
+
+    def test_onnxrt_label_encoder_many(self):
+        rnd = numpy.random.RandomState(0)
+        keys = rnd.choice(10000, 500, replace=False).astype(numpy.int64)
+        values = (keys / 7).astype(numpy.float32)
+        x = rnd.randint(0, 10000, size=2000).astype(numpy.int64)
+        op = OnnxLabelEncoder(
+            'x', op_version=TARGET_OPSET, keys_int64s=keys,
+            values_floats=values, output_names=['out'])
+        onx = op.to_onnx(inputs=[('x', Int64TensorType())],
+                         outputs=[('out', FloatTensorType())])
+        res = OnnxInference(onx).run({'x': x})
+        mapping = dict(zip(keys.tolist(), values.tolist()))
+        exp = numpy.array([mapping.get(v, -1) for v in x.tolist()],
+                          dtype=numpy.float32)
+        self.assertEqualArray(exp, res['out'])
+
+        # the last value is kept if a key is duplicated
+        op = OnnxLabelEncoder(
+            'text', op_version=TARGET_OPSET,
+            keys_strings=['AA', 'BB', 'AA'],
+            values_strings=['LEAA', 'LEBB', 'LEAA2'],
+            output_names=['out'])
+        onx = op.to_onnx(inputs=[('text', StringTensorType())])
+        res = OnnxInference(onx).run(
+            {'text': numpy.array(['AA', 'CC', 'BB'])})
+        self.assertEqual(res['out'].tolist(), ['LEAA2', '', 'LEBB'])
+
+    def test_onnxrt_one_hot_encoder(self):
+        rnd = numpy.random.RandomState(0)
+        cats = rnd.choice(10000, 50, replace=False).astype(numpy.int64)
+        x = rnd.choice(numpy.hstack([cats, [-1, -2]]), size=(200, 3))
+        for dim in [1, 2]:
+            xd = x[:, 0] if dim == 1 else x
+            with self.subTest(dim=dim):
+                op = OnnxOneHotEncoder(
+                    'x', op_version=TARGET_OPSET, cats_int64s=cats,
+                    output_names=['out'])
+                onx = op.to_onnx(inputs=[('x', Int64TensorType())],
+                                 outputs=[('out', FloatTensorType())])
+                res = OnnxInference(onx).run({'x': xd})
+                exp = (xd[..., numpy.newaxis] == cats).astype(numpy.float32)
+                self.assertEqualArray(exp, res['out'])
+
+        op = OnnxOneHotEncoder(
+            'x', op_version=TARGET_OPSET, cats_strings=['AA', 'BB', 'CC'],
+            zeros=0, output_names=['out'])
+        onx = op.to_onnx(inputs=[('x', StringTensorType())],
+                         outputs=[('out', FloatTensorType())])
+        oinf = OnnxInference(onx)
+        res = oinf.run({'x': numpy.array(['CC', 'AA'])})
+        self.assertEqualArray(
+            numpy.array([[0, 0, 1], [1, 0, 0]], dtype=numpy.float32),
+            res['out'])
+        self.assertRaise(
+            lambda: oinf.run({'x': numpy.array(['CC', 'DD'])}), RuntimeError)
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)
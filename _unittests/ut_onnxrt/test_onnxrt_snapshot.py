@@ -0,0 +1,178 @@
+"""
+@brief      test log(time=5s)
+"""
+import os
+import pickle
+from io import BytesIO
+import unittest
+import numpy
+from onnx import TensorProto
+from onnx.helper import (
+    make_model, make_node, make_graph, make_tensor_value_info)
+from onnx.numpy_helper import from_array
+from sklearn.datasets import load_iris
+from sklearn.ensemble import (
+    RandomForestClassifier, GradientBoostingRegressor)
+from sklearn.svm import SVR
+from pyquickhelper.pycode import (
+    ExtTestCase, ignore_warnings, get_temp_folder)
+from mlprodict.onnx_conv import to_onnx
+from mlprodict.onnxrt import OnnxInference
+from mlprodict.onnxrt.onnx_inference_snapshot import (
+    save_snapshot, load_snapshot)
+
+
+class TestOnnxrtSnapshot(ExtTestCase):
+
+    def setUp(self):
+        X, y = load_iris(return_X_y=True)
+        self.X = X.astype(numpy.float32)
+        self.y = y
+
+    def _check_outputs(self, expected, got):
+        self.assertEqual(list(sorted(expected)), list(sorted(got)))
+        for k, v in expected.items():
+            if hasattr(v, 'values'):
+                # ZipMap, python runtime
+                self.assertEqualArray(v.values, got[k].values)
+            elif isinstance(v, list):
+                # ZipMap, onnxruntime
+                self.assertEqual(v, got[k])
+            else:
+                self.assertEqualArray(v, got[k])
+
+    @ignore_warnings((DeprecationWarning, UserWarning))
+    def test_tree_ensemble_pickle(self):
+        models = [
+            RandomForestClassifier(n_estimators=3, max_depth=3),
+            GradientBoostingRegressor(n_estimators=3, max_depth=3)]
+        for model in models:
+            model.fit(self.X, self.y)
+            for dtype in [numpy.float32, numpy.float64]:
+                onx = to_onnx(model, self.X[:1].astype(dtype))
+                oinf = OnnxInference(onx)
+                ops = [node.ops_ for node in oinf.sequence_
+                       if hasattr(node.ops_, 'rt_')]
+                self.assertEqual(len(ops), 1)
+                op = ops[0]
+                x = self.X.astype(dtype)
+                for version in [1, 2, 3]:
+                    with self.subTest(model=model.__class__.__name__,
+                                      dtype=dtype, version=version):
+                        op._init(dtype, version)
+                        rt = pickle.loads(pickle.dumps(op.rt_))
+                        self.assertEqual(type(rt), type(op.rt_))
+                        self.assertEqual(rt.omp_tree_, op.rt_.omp_tree_)
+                        exp = op.rt_.compute(x)
+                        got = rt.compute(x)
+                        if isinstance(exp, tuple):
+                            self.assertEqualArray(exp[0], got[0])
+                            self.assertEqualArray(exp[1], got[1])
+                        else:
+                            self.assertEqualArray(exp, got)
+
+    @ignore_warnings((DeprecationWarning, UserWarning))
+    def test_tree_ensemble_corrupted_state(self):
+        model = GradientBoostingRegressor(n_estimators=3, max_depth=3)
+        model.fit(self.X, self.y)
+        oinf = OnnxInference(to_onnx(model, self.X[:1]))
+        op = [node.ops_ for node in oinf.sequence_
+              if hasattr(node.ops_, 'rt_')][0]
+
+        def load(cls, state):
+            rt = cls.__new__(cls)
+            rt.__setstate__(tuple(state))
+            return rt
+
+        for version in [1, 2, 3]:
+            with self.subTest(version=version):
+                op._init(numpy.float32, version)
+                cls = type(op.rt_)
+                state = op.rt_.__getstate__()
+                self.assertEqualArray(
+                    op.rt_.compute(self.X),
+                    load(cls, state).compute(self.X))
+                # children, offsets of the weights, roots
+                for i, pos, value in [(3, 4, 10000), (3, 5, -2),
+                                      (5, -1, 10000), (5, 0, 1),
+                                      (8, 0, -1), (8, 0, 10000)]:
+                    corrupted = list(state)
+                    corrupted[i] = corrupted[i].copy()
+                    corrupted[i][pos] = value
+                    self.assertRaise(
+                        lambda c=corrupted: load(cls, c), ValueError)
+
+    @ignore_warnings((DeprecationWarning, UserWarning))
+    def test_snapshot_trees(self):
+        temp = get_temp_folder(__file__, "temp_onnxrt_snapshot_trees")
+        models = [
+            RandomForestClassifier(n_estimators=5, max_depth=4),
+            GradientBoostingRegressor(n_estimators=5, max_depth=3)]
+        for model in models:
+            model.fit(self.X, self.y)
+            onx = to_onnx(model, self.X[:1])
+            for rt in ['python', 'python_compiled', 'onnxruntime1']:
+                for use_mmap in [True, False]:
+                    with self.subTest(model=model.__class__.__name__,
+                                      runtime=rt, use_mmap=use_mmap):
+                        oinf = OnnxInference(onx, runtime=rt)
+                        expected = oinf.run({'X': self.X})
+                        name = os.path.join(temp, "%s_%s.snap" % (
+                            model.__class__.__name__, rt))
+                        oinf.save_snapshot(name)
+                        oinf2 = OnnxInference.load_snapshot(
+                            name, use_mmap=use_mmap)
+                        self.assertEqual(oinf2.runtime, rt)
+                        self.assertEqual(
+                            oinf2.output_names, oinf.output_names)
+                        self._check_outputs(
+                            expected, oinf2.run({'X': self.X}))
+                        self.assertIn('X', oinf2.to_text())
+
+    @ignore_warnings((DeprecationWarning, UserWarning))
+    def test_snapshot_not_picklable_operator(self):
+        # the C++ runtime of SVM is created again
+        model = SVR().fit(self.X, self.y)
+        onx = to_onnx(model, self.X[:1])
+        oinf = OnnxInference(onx)
+        expected = oinf.run({'X': self.X})
+        self.assertRaise(lambda: pickle.dumps(oinf.sequence_[0].ops_.rt_),
+                         TypeError)
+        st = BytesIO()
+        save_snapshot(oinf, st)
+        data = st.getvalue()
+        oinf2 = load_snapshot(data)
+        self._check_outputs(expected, oinf2.run({'X': self.X}))
+
+    def test_snapshot_mmap(self):
+        temp = get_temp_folder(__file__, "temp_onnxrt_snapshot_mmap")
+        cst = numpy.random.randn(100, 1000).astype(numpy.float32)
+        X = make_tensor_value_info('X', TensorProto.FLOAT, None)
+        Y = make_tensor_value_info('Y', TensorProto.FLOAT, None)
+        graph = make_graph([make_node('Add', ['X', 'C'], ['Y'])],
+                           'g', [X], [Y], [from_array(cst, name='C')])
+        oinf = OnnxInference(make_model(graph), memory_planning=True)
+        x = numpy.random.randn(100, 1000).astype(numpy.float32)
+        expected = oinf.run({'X': x})
+        name = os.path.join(temp, "add.snap")
+        oinf.save_snapshot(name)
+
+        oinf2 = OnnxInference.load_snapshot(name)
+        init = oinf2.inits_['C']['value']
+        self.assertEqualArray(cst, init)
+        # a view on the file
+        self.assertFalse(init.flags['OWNDATA'])
+        self.assertEqual(init.ctypes.data % 64, 0)
+        self.assertEqualArray(expected['Y'], oinf2.run({'X': x})['Y'])
+        self.assertEqualArray(expected['Y'], oinf2.run({'X': x})['Y'])
+
+        oinf3 = OnnxInference.load_snapshot(name, use_mmap=False)
+        self.assertEqualArray(expected['Y'], oinf3.run({'X': x})['Y'])
+
+    def test_snapshot_wrong_format(self):
+        self.assertRaise(lambda: load_snapshot(b'not a snapshot'),
+                         ValueError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+@brief      test log(time=2s)
+"""
+import os
+import unittest
+import numpy
+import pandas
+from onnx import TensorProto
+from onnx.helper import (
+    make_model, make_node, make_graph, make_tensor_value_info,
+    make_opsetid)
+from onnx.numpy_helper import from_array
+from pyquickhelper.pycode import ExtTestCase, get_temp_folder
+from mlprodict.onnxrt import OnnxInference
+from mlprodict.onnxrt.onnx_inference_stream import enumerate_chunks
+
+
+class TestOnnxrtStream(ExtTestCase):
+
+    def _model(self):
+        X = make_tensor_value_info('X', TensorProto.FLOAT, None)
+        Y = make_tensor_value_info('Y', TensorProto.FLOAT, None)
+        Z = make_tensor_value_info('Z', TensorProto.INT64, None)
+        graph = make_graph(
+            [make_node('Add', ['X', 'C'], ['Y']),
+             make_node('ArgMax', ['Y'], ['Z'], axis=1, keepdims=0)],
+            'g', [X], [Y, Z],
+            [from_array(numpy.array([1.5], dtype=numpy.float32), name='C')])
+        return make_model(graph, opset_imports=[make_opsetid('', 15)])
+
+    def test_enumerate_chunks(self):
+        x = numpy.arange(10)
+        self.assertEqual(
+            [c.tolist() for c in enumerate_chunks(x, 4)],
+            [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]])
+        self.assertEqual(len(list(enumerate_chunks(x))), 1)
+        self.assertEqual(
+            [len(c['a']) for c in enumerate_chunks(
+                iter([{'a': x, 'b': x}, {'a': x[:3], 'b': x[:3]}]), 6)],
+            [6, 4, 3])
+        df = pandas.DataFrame({'a': x})
+        chunks = list(enumerate_chunks(df, 5))
+        self.assertEqual(len(chunks), 2)
+        self.assertIsInstance(chunks[1], pandas.DataFrame)
+        self.assertEqual(chunks[1]['a'].tolist(), [5, 6, 7, 8, 9])
+        self.assertRaise(lambda: list(enumerate_chunks(x, 0)), ValueError)
+        self.assertRaise(
+            lambda: list(enumerate_chunks({'a': x, 'b': x[:2]})), ValueError)
+        self.assertRaise(lambda: list(enumerate_chunks([5])), TypeError)
+
+    def test_run_stream(self):
+        oinf = OnnxInference(self._model())
+        x = numpy.random.randn(25, 3).astype(numpy.float32)
+        expected = oinf.run({'X': x})
+        for inputs in [x, {'X': x}, iter([x[:10], x[10:]])]:
+            res = list(oinf.run_stream(inputs, chunk_size=8))
+            self.assertEqualArray(
+                expected['Y'], numpy.vstack([r['Y'] for r in res]))
+            self.assertEqualArray(
+                expected['Z'], numpy.hstack([r['Z'] for r in res]))
+        res = list(oinf.run_stream(iter([x[:10], x[10:]]), chunk_size=8))
+        self.assertEqual([r['Y'].shape[0] for r in res], [8, 2, 8, 7])
+
+    def test_run_stream_memmap(self):
+        temp = get_temp_folder(__file__, "temp_run_stream_memmap")
+        oinf = OnnxInference(self._model())
+        x = numpy.random.randn(25, 3).astype(numpy.float32)
+        expected = oinf.run({'X': x})
+
+        name = os.path.join(temp, "X.bin")
+        mx = numpy.memmap(name, dtype=numpy.float32, mode='w+',
+                          shape=x.shape)
+        mx[:] = x
+        mx.flush()
+        del mx
+        mx = numpy.memmap(name, dtype=numpy.float32, mode='r', shape=x.shape)
+        my = numpy.memmap(os.path.join(temp, "Y.bin"), dtype=numpy.float32,
+                          mode='w+', shape=x.shape)
+        mz = numpy.empty((25, ), dtype=numpy.int64)
+        n = 0
+        for res in oinf.run_stream(mx, chunk_size=10,
+                                   output={'Y': my, 'Z': mz}):
+            self.assertIsNotNone(res['Y'].base)
+            n += 1
+        self.assertEqual(n, 3)
+        self.assertEqualArray(expected['Y'], my)
+        self.assertEqualArray(expected['Z'], mz)
+
+        # only the first output
+        my[:] = 0
+        for res in oinf.run_stream(mx, chunk_size=10, output=my):
+            self.assertEqual(res['Z'].shape[0], res['Y'].shape[0])
+        self.assertEqualArray(expected['Y'], my)
+
+        too_small = numpy.empty((20, 3), dtype=numpy.float32)
+        self.assertRaise(
+            lambda: list(oinf.run_stream(x, chunk_size=10, output=too_small)),
+            ValueError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 """
 @brief      test log(time=5s)
 """
+import asyncio
 from io import BytesIO
 import pickle
 import unittest
@@ -47,6 +48,25 @@ class TestOnnxSpeedupClassifier(ExtTestCase):
         spd.fit(X, y, w)
         spd.assert_almost_equal(X, decimal=5)
 
+    @ignore_warnings(ConvergenceWarning)
+    def test_speedup_classifier32_async(self):
+        data = load_iris()
+        X, y = data.data, data.target
+        for rt in ['python', 'numpy']:
+            with self.subTest(runtime=rt):
+                spd = OnnxSpeedupClassifier(
+                    LogisticRegression(), target_opset=self.opset(),
+                    runtime=rt)
+                spd.fit(X, y)
+
+                async def main():
+                    return await asyncio.gather(
+                        spd.predict_async(X), spd.predict_proba_async(X))
+
+                label, proba = asyncio.run(main())
+                self.assertEqualArray(spd.predict(X), label)
+                self.assertEqualArray(spd.predict_proba(X), proba)
+
     @ignore_warnings(ConvergenceWarning)
     def test_speedup_classifier32_onnxruntime(self):
         data = load_iris()
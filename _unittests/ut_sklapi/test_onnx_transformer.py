@@ -1,6 +1,7 @@
 """
 @brief      test log(time=4s)
 """
+import asyncio
 import unittest
 from logging import getLogger
 import numpy as np
@@ -42,6 +43,27 @@ class TestOnnxTransformer(ExtTestCase):
         self.assertStartsWith("OnnxTransformer(onnx_bytes=b'\\", rp)
         self.assertEndsWith("')", rp)
 
+    def test_transform_async(self):
+        x = np.array([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]], dtype=np.float32)
+        tr = OnnxTransformer(self.get_onnx_mul())
+        tr.fit()
+        res = asyncio.run(tr.transform_async(x))
+        self.assertEqualArray(tr.transform(x), res)
+
+    def test_transform_stream(self):
+        x = np.random.randn(10, 2).astype(np.float32)
+        tr = OnnxTransformer(self.get_onnx_mul())
+        tr.fit()
+        res = list(tr.transform_stream(x, chunk_size=4))
+        self.assertEqual([r.shape[0] for r in res], [4, 4, 2])
+        self.assertEqualArray(tr.transform(x), np.vstack(res))
+
+        out = np.empty((10, 2), dtype=np.float32)
+        for _ in tr.transform_stream(iter([x[:3], x[3:]]), chunk_size=5,
+                                     output=out):
+            pass
+        self.assertEqualArray(tr.transform(x), out)
+
     def test_transform_list(self):
         x = [[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]]
         content = self.get_onnx_mul()
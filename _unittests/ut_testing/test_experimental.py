@@ -290,6 +290,16 @@ class TestExperimental(ExtTestCase):
         self.assertEqual(ein.shape, ein2.shape)
         self.assertEqualArray(ein, ein2, decimal=5)
 
+    def test_experimental_einsum_c_unaligned(self):
+        # rows of 7 floats are not aligned on 16 bytes
+        eq = "ij,ij->i"
+        x = numpy.random.rand(10, 7).astype(numpy.float32)
+        y = numpy.random.rand(10, 7).astype(numpy.float32)
+        ein = numpy.einsum(eq, x, y)
+        ein2 = custom_einsum_float(eq, x, y)
+        self.assertEqual(ein.shape, ein2.shape)
+        self.assertEqualArray(ein, ein2, decimal=5)
+
     def test_code_optimisation(self):
         res = code_optimisation()
         self.assertIn("=", res)
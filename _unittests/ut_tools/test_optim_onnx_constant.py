@@ -0,0 +1,142 @@
+"""
+@brief      test log(time=2s)
+"""
+import unittest
+import numpy
+from onnx import TensorProto
+from onnx.helper import (
+    make_model, make_node, make_graph, make_tensor_value_info,
+    make_opsetid)
+from onnx.numpy_helper import from_array
+from pyquickhelper.pycode import ExtTestCase
+from sklearn.datasets import load_iris
+from sklearn.preprocessing import StandardScaler
+from mlprodict.onnx_tools.optim.onnx_helper import onnx_statistics
+from mlprodict.onnx_tools.optim import onnx_fold_constants
+from mlprodict.onnx_conv import to_onnx
+from mlprodict.onnxrt import OnnxInference
+
+
+class TestOptimOnnxConstant(ExtTestCase):
+
+    def _model(self, overwritable=False):
+        C = numpy.random.randn(3, 4).astype(numpy.float64)
+        inputs = [make_tensor_value_info('X', TensorProto.FLOAT, None)]
+        if overwritable:
+            inputs.append(make_tensor_value_info(
+                'C', TensorProto.DOUBLE, None))
+        nodes = [
+            # Shape -> Gather -> Concat -> Reshape
+            make_node('Shape', ['C'], ['sh']),
+            make_node('Gather', ['sh', 'zero'], ['d0']),
+            make_node('Concat', ['minus', 'd0'], ['newshape'], axis=0),
+            make_node('Reshape', ['X', 'newshape'], ['xr']),
+            # Cast -> Abs
+            make_node('Cast', ['C'], ['cf'], to=TensorProto.FLOAT),
+            make_node('Abs', ['cf'], ['ct']),
+            make_node('Constant', [], ['one'],
+                      value=from_array(numpy.array([1.5],
+                                                   dtype=numpy.float32))),
+            make_node('Add', ['ct', 'one'], ['ct1']),
+            make_node('MatMul', ['xr', 'ct1'], ['mm']),
+            make_node('RandomUniformLike', ['mm'], ['rnd'], high=0., low=0.),
+            make_node('Add', ['mm', 'rnd'], ['Y'])]
+        graph = make_graph(
+            nodes, 'g', inputs,
+            [make_tensor_value_info('Y', TensorProto.FLOAT, None)],
+            [from_array(C, name='C'),
+             from_array(numpy.array([0], dtype=numpy.int64), name='zero'),
+             from_array(numpy.array([-1], dtype=numpy.int64), name='minus')])
+        return make_model(graph, opset_imports=[make_opsetid('', 15)])
+
+    def test_fold_constants_runtime(self):
+        model = self._model()
+        x = numpy.random.randn(5, 3).astype(numpy.float32)
+        expected = OnnxInference(model).run({'X': x})['Y']
+        for rt in ['python', 'python_compiled']:
+            with self.subTest(runtime=rt):
+                oinf = OnnxInference(model, runtime=rt, fold_constants=True)
+                self.assertEqual(
+                    [n.op_type for n in oinf.folded_],
+                    ['Shape', 'Gather', 'Concat', 'Cast', 'Abs',
+                     'Constant', 'Add'])
+                self.assertEqual(
+                    [n.onnx_node.op_type for n in oinf.sequence_],
+                    ['Reshape', 'MatMul', 'RandomUniformLike', 'Add'])
+                self.assertEqual(set(oinf.inits_), {'newshape', 'ct1'})
+                self.assertEqualArray(expected, oinf.run({'X': x})['Y'])
+                self.assertEqualArray(expected, oinf.run({'X': x})['Y'])
+
+    def test_fold_constants_memory_planning(self):
+        model = self._model()
+        x = numpy.random.randn(5, 3).astype(numpy.float32)
+        expected = OnnxInference(model).run({'X': x})['Y']
+        oinf = OnnxInference(model, fold_constants=True,
+                             memory_planning=True)
+        self.assertEqual([n.order for n in oinf.sequence_], [0, 1, 2, 3])
+        self.assertEqualArray(expected, oinf.run({'X': x})['Y'])
+        self.assertEqualArray(expected, oinf.run({'X': x})['Y'])
+
+    def test_fold_constants_subgraph(self):
+        # If only depends on an initializer but has subgraphs
+        def branch(value):
+            return make_graph(
+                [make_node('Constant', [], ['r'], value=from_array(
+                    numpy.array([value], dtype=numpy.float32)))],
+                'b', [], [make_tensor_value_info(
+                    'r', TensorProto.FLOAT, None)])
+
+        nodes = [
+            make_node('If', ['cond'], ['c'], then_branch=branch(1.),
+                      else_branch=branch(2.)),
+            make_node('Add', ['X', 'c'], ['Y'])]
+        graph = make_graph(
+            nodes, 'g', [make_tensor_value_info('X', TensorProto.FLOAT, None)],
+            [make_tensor_value_info('Y', TensorProto.FLOAT, None)],
+            [from_array(numpy.array([True]), name='cond')])
+        model = make_model(graph, opset_imports=[make_opsetid('', 15)])
+        oinf = OnnxInference(model, fold_constants=True)
+        self.assertEqual(oinf.folded_, [])
+        x = numpy.random.randn(5, 3).astype(numpy.float32)
+        self.assertEqualArray(x + 1, oinf.run({'X': x})['Y'])
+
+    def test_fold_constants_overwritable(self):
+        model = self._model(True)
+        oinf = OnnxInference(model, fold_constants=True)
+        self.assertEqual([n.op_type for n in oinf.folded_], ['Constant'])
+        x = numpy.random.randn(5, 3).astype(numpy.float32)
+        c = numpy.random.randn(3, 4).astype(numpy.float64)
+        expected = OnnxInference(model).run({'X': x, 'C': c})['Y']
+        self.assertEqualArray(expected, oinf.run({'X': x, 'C': c})['Y'])
+
+    def test_onnx_fold_constants(self):
+        model = self._model()
+        new_model = onnx_fold_constants(model)
+        self.assertEqual([n.op_type for n in new_model.graph.node],
+                         ['Reshape', 'MatMul', 'RandomUniformLike', 'Add'])
+        self.assertEqual(set(i.name for i in new_model.graph.initializer),
+                         {'newshape', 'ct1'})
+        self.assertEqual(new_model.opset_import, model.opset_import)
+        x = numpy.random.randn(5, 3).astype(numpy.float32)
+        self.assertEqualArray(OnnxInference(model).run({'X': x})['Y'],
+                              OnnxInference(new_model).run({'X': x})['Y'])
+
+        stats = onnx_statistics(model, optim=True)
+        self.assertEqual(stats['nnodes_folded'], 7)
+        stats = onnx_statistics(new_model, optim=True)
+        self.assertEqual(stats['nnodes_folded'], 0)
+        self.assertIs(onnx_fold_constants(new_model), new_model)
+
+    def test_onnx_fold_constants_sklearn(self):
+        X, _ = load_iris(return_X_y=True)
+        X = X.astype(numpy.float32)
+        model = StandardScaler().fit(X)
+        onx = to_onnx(model, X[:1])
+        new_onx = onnx_fold_constants(onx)
+        self.assertEqualArray(model.transform(X),
+                              OnnxInference(new_onx).run({'X': X})['variable'],
+                              decimal=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
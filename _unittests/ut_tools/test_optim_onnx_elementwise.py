@@ -0,0 +1,188 @@
+"""
+@brief      test log(time=2s)
+"""
+import pickle
+import unittest
+import numpy
+from onnx import TensorProto
+from onnx.helper import (
+    make_model, make_node, make_graph, make_tensor_value_info,
+    make_opsetid)
+from onnx.numpy_helper import from_array
+from pyquickhelper.pycode import ExtTestCase
+from mlprodict.onnx_tools.optim import onnx_fuse_elementwise
+from mlprodict.onnxrt import OnnxInference
+from mlprodict.onnxrt.ops_cpu.op_fused_elementwise import FusedElementwise
+
+
+class TestOptimOnnxElementwise(ExtTestCase):
+
+    def _model(self, dtype=numpy.float32, shared=False):
+        elem = (TensorProto.FLOAT if dtype == numpy.float32
+                else TensorProto.INT64)
+        X = make_tensor_value_info('X', elem, None)
+        Y = make_tensor_value_info('Y', elem, None)
+        Z = make_tensor_value_info('Z', elem, None)
+        nodes = [
+            make_node('Sub', ['X', 'm'], ['a']),
+            make_node('Div', ['a', 's'], ['b']),
+            make_node('Mul', ['b', 'X'] if shared else ['b', 'w'], ['c']),
+            make_node('Add', ['c', 'bias'], ['d']),
+            make_node('Abs', ['d'], ['Y']),
+            # d is used twice
+            make_node('Neg', ['d'], ['e']),
+            make_node('Exp' if dtype == numpy.float32 else 'Abs',
+                      ['e'], ['f']),
+            make_node('Relu', ['f'], ['Z'])]
+        inits = [from_array((numpy.random.rand(3) + 1).astype(dtype), name=n)
+                 for n in ['m', 's', 'w', 'bias']]
+        graph = make_graph(nodes, 'g', [X], [Y, Z], inits)
+        return make_model(graph, opset_imports=[make_opsetid('', 15)])
+
+    def test_onnx_fuse_elementwise(self):
+        model = self._model()
+        fused = onnx_fuse_elementwise(model)
+        self.assertEqual([n.op_type for n in fused.graph.node],
+                         ['FusedElementwise', 'Abs', 'FusedElementwise'])
+        self.assertEqual(
+            [n.op_type for n in fused.graph.node[0].attribute[0].g.node],
+            ['Sub', 'Div', 'Mul', 'Add'])
+        self.assertEqual(list(fused.graph.node[0].input),
+                         ['X', 'm', 's', 'w', 'bias'])
+        self.assertEqual(
+            [n.op_type for n in fused.graph.node[2].attribute[0].g.node],
+            ['Neg', 'Exp', 'Relu'])
+        self.assertIn('mlprodict', set(op.domain for op in fused.opset_import))
+        self.assertIs(onnx_fuse_elementwise(model, min_length=5), model)
+
+        oinf = OnnxInference(model)
+        for rt in ['python', 'python_compiled']:
+            foinf = OnnxInference(fused, runtime=rt)
+            for shape in [(5, 3), (1, 3), (3, ), (10000, 3)]:
+                x = numpy.random.randn(*shape).astype(numpy.float32)
+                exp = oinf.run({'X': x})
+                got = foinf.run({'X': x})
+                self.assertEqualArray(exp['Y'], got['Y'])
+                self.assertEqualArray(exp['Z'], got['Z'])
+
+    def test_fused_blocks(self):
+        model = self._model()
+        oinf = OnnxInference(model)
+        fused = OnnxInference(model, fuse_elementwise=True)
+        self.assertEqual(fused.obj.graph.node[0].op_type, 'FusedElementwise')
+        op = fused.sequence_[0].ops_
+        self.assertIsInstance(op, FusedElementwise)
+        x = numpy.random.randn(1000, 3).astype(numpy.float32)
+        bs = FusedElementwise.block_size
+        try:
+            FusedElementwise.block_size = 100
+            got = fused.run({'X': x})
+        finally:
+            FusedElementwise.block_size = bs
+        exp = oinf.run({'X': x})
+        self.assertEqualArray(exp['Y'], got['Y'])
+        self.assertEqualArray(exp['Z'], got['Z'])
+        layout = list(op._layouts.values())[0]  # pylint: disable=W0212
+        self.assertEqual(layout[0], (1000, 3))
+        self.assertEqual(layout[1], [True, False, False, False, False])
+        self.assertEqual(layout[2], 33)
+
+        fused2 = pickle.loads(pickle.dumps(fused))
+        self.assertEqualArray(exp['Z'], fused2.run({'X': x})['Z'])
+
+    def test_fused_fallback(self):
+        # integers, broadcasting on the first node
+        model = self._model(numpy.int64)
+        fused = OnnxInference(model, fuse_elementwise=True)
+        self.assertEqual(fused.obj.graph.node[0].op_type, 'FusedElementwise')
+        x = numpy.random.randint(0, 10, (5, 3)).astype(numpy.int64)
+        exp = OnnxInference(model).run({'X': x})
+        got = fused.run({'X': x})
+        self.assertEqualArray(exp['Y'], got['Y'])
+
+        model = self._model()
+        fused = OnnxInference(model, fuse_elementwise=True)
+        x = numpy.random.randn(1, 1).astype(numpy.float32)
+        exp = OnnxInference(model).run({'X': x})
+        got = fused.run({'X': x})
+        self.assertEqual(got['Y'].shape, (1, 3))
+        self.assertEqualArray(exp['Y'], got['Y'])
+
+    def test_fused_inplace(self):
+        model = self._model()
+        x = numpy.random.randn(5, 3).astype(numpy.float32)
+        exp = OnnxInference(model).run({'X': x})
+        fused = OnnxInference(model, fuse_elementwise=True,
+                              input_inplace=True)
+        self.assertEqual(fused.sequence_[0].ops_.inplaces, {0: True})
+        xc = x.copy()
+        got = fused.run({'X': xc})
+        self.assertEqualArray(exp['Z'], got['Z'])
+        # X was overwritten by d, d by Z once Abs computed Y
+        self.assertEqual(fused.sequence_[2].ops_.inplaces, {0: True})
+        self.assertEqualArray(exp['Y'], got['Y'])
+        self.assertEqualArray(exp['Z'], xc)
+
+        # X is used twice by the chain
+        model = self._model(shared=True)
+        exp = OnnxInference(model).run({'X': x})
+        fused = OnnxInference(model, fuse_elementwise=True,
+                              input_inplace=True)
+        # only the inputs of the first node can be overwritten
+        self.assertEqual(fused.sequence_[0].ops_.overwritable_, [1])
+        xc = x.copy()
+        got = fused.run({'X': xc})
+        self.assertEqualArray(x, xc)
+        self.assertEqualArray(exp['Y'], got['Y'])
+
+    def test_fused_inplace_later_step(self):
+        # A is read by the second node of the chain,
+        # the first node must not write its result into A
+        X = make_tensor_value_info('X', TensorProto.FLOAT, None)
+        Z = make_tensor_value_info('Z', TensorProto.FLOAT, None)
+        nodes = [
+            make_node('MatMul', ['X', 'W'], ['A']),
+            make_node('Exp', ['X'], ['C']),
+            make_node('Add', ['C', 'A'], ['Z'])]
+        W = from_array(numpy.random.randn(3, 3).astype(numpy.float32),
+                       name='W')
+        model = make_model(make_graph(nodes, 'g', [X], [Z], [W]),
+                           opset_imports=[make_opsetid('', 15)])
+        x = numpy.random.randn(5, 3).astype(numpy.float32)
+        exp = OnnxInference(model).run({'X': x})
+        fused = OnnxInference(model, fuse_elementwise=True)
+        self.assertEqual(
+            [n.op_type for n in fused.sequence_],
+            ['MatMul', 'FusedElementwise'])
+        # X is read by the first node, A by the second one
+        self.assertEqual(fused.sequence_[1].ops_.overwritable_, [0])
+        got = fused.run({'X': x})
+        self.assertEqualArray(exp['Z'], got['Z'])
+
+    def test_fused_two_chains_same_node(self):
+        # two fusable nodes feed the same node,
+        # only one chain can end with it
+        X = make_tensor_value_info('X', TensorProto.FLOAT, None)
+        Y = make_tensor_value_info('Y', TensorProto.FLOAT, None)
+        Z = make_tensor_value_info('Z', TensorProto.FLOAT, None)
+        nodes = [
+            make_node('Exp', ['X'], ['A']),
+            make_node('Exp', ['Y'], ['B']),
+            make_node('Add', ['A', 'B'], ['Z'])]
+        model = make_model(make_graph(nodes, 'g', [X, Y], [Z]),
+                           opset_imports=[make_opsetid('', 15)])
+        new_model = onnx_fuse_elementwise(model)
+        self.assertEqual([n.op_type for n in new_model.graph.node],
+                         ['Exp', 'FusedElementwise'])
+        self.assertEqual(list(new_model.graph.node[0].output), ['B'])
+        self.assertEqual(list(new_model.graph.node[1].input), ['X', 'B'])
+        x = numpy.random.randn(5, 3).astype(numpy.float32)
+        y = numpy.random.randn(5, 3).astype(numpy.float32)
+        exp = OnnxInference(model).run({'X': x, 'Y': y})
+        got = OnnxInference(model, fuse_elementwise=True).run(
+            {'X': x, 'Y': y})
+        self.assertEqualArray(exp['Z'], got['Z'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,4 +7,6 @@ from .onnx_optimisation_identity import onnx_remove_node_identity
 from .onnx_optimisation_redundant import onnx_remove_node_redundant
 from .onnx_optimisation_unused import onnx_remove_node_unused
 from .onnx_optimisation import onnx_remove_node
+from .onnx_optimisation_constant import onnx_fold_constants
+from .onnx_optimisation_elementwise import onnx_fuse_elementwise
 from ._main_onnx_optim import onnx_optimisations
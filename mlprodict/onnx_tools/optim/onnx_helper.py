@@ -7,6 +7,7 @@ from onnx.helper import make_graph
 from ..onnx2py_helper import from_pb, make_value_info
 from ._onnx_optimisation_common import _apply_optimisation_on_graph
 from .onnx_optimisation import onnx_remove_node
+from .onnx_optimisation_constant import onnx_fold_constants
 
 
 def onnx_statistics(onnx_model, recursive=True, optim=True, node_type=False):
@@ -17,7 +18,9 @@ def onnx_statistics(onnx_model, recursive=True, optim=True, node_type=False):
 
     :param onnx_model: onnx model
     :param recursive: looks into subgraphs
-    :param optim: adds statistics because of optimisation
+    :param optim: adds statistics because of optimisation,
+        *nnodes_folded* is the number of nodes removed by
+        @see fn onnx_fold_constants
     :param node_type: add distribution of node types
     :return: dictionary
 
@@ -128,6 +131,15 @@ def onnx_statistics(onnx_model, recursive=True, optim=True, node_type=False):
                     "nnodes", "ninits"]:
             if key in st:
                 stats[key + "_optim"] = st[key]
+        if hasattr(onnx_model, 'graph'):
+            try:
+                folded = onnx_fold_constants(onnx_model)
+            except (RuntimeError, TypeError, ValueError, KeyError,
+                    IndexError, NotImplementedError):
+                # the python runtime cannot load the model
+                folded = None
+            if folded is not None:
+                stats["nnodes_folded"] = nnodes - len(folded.graph.node)
     return stats
 
 
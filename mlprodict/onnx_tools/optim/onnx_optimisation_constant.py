@@ -0,0 +1,68 @@
+"""
+@file
+@brief Optimisation of :epkg:`ONNX` graphs.
+
+.. versionadded:: 0.9
+"""
+from onnx.helper import make_graph
+from onnx.numpy_helper import from_array
+from ._onnx_optimisation_common import _apply_optimisation_on_graph
+
+
+def _fold_constants_graph(graph, oinf=None, debug_info=None):
+    """
+    Replaces the nodes folded by *oinf* by initializers.
+
+    :param graph: onnx graph
+    :param oinf: @see cl OnnxInference created with
+        `fold_constants=True`
+    :param debug_info: unused
+    :return: new graph
+    """
+    from ..onnx_manipulations import get_hidden_inputs
+    folded = set(tuple(n.output) for n in oinf.folded_)
+    nodes = [n for n in graph.node if tuple(n.output) not in folded]
+    used = get_hidden_inputs(nodes) | set(o.name for o in graph.output)
+    inits = [i for i in graph.initializer if i.name in used]
+    existing = set(i.name for i in inits)
+    for node in oinf.folded_:
+        for name in node.output:
+            if name in used and name not in existing:
+                inits.append(from_array(oinf.inits_[name]['value'], name))
+                existing.add(name)
+    new_graph = make_graph(nodes, graph.name, graph.input, graph.output,
+                           inits)
+    new_graph.value_info.extend(graph.value_info)  # pylint: disable=E1101
+    return new_graph
+
+
+def onnx_fold_constants(onnx_model, recursive=True, debug_info=None,
+                        **options):
+    """
+    Replaces every node whose inputs are all initializers by its
+    outputs computed once with the python runtime, such as a chain
+    *Shape*, *Gather*, *Concat* or a *Cast* or a *Reshape*
+    of coefficients, see :meth:`_fold_constants
+    <mlprodict.onnxrt.onnx_inference.OnnxInference._fold_constants>`.
+    Initializers no longer used are removed.
+
+    :param onnx_model: onnx model
+    :param recursive: unused, subgraphs are not modified
+    :param debug_info: debug information (private)
+    :param options: unused
+    :return: new onnx model, the same model if no node was folded
+
+    .. versionadded:: 0.9
+    """
+    if not hasattr(onnx_model, 'graph'):
+        raise TypeError(  # pragma: no cover
+            "This function only works on 'ModelProto' not on "
+            "{}.".format(type(onnx_model)))
+    from ...onnxrt import OnnxInference
+    oinf = OnnxInference(onnx_model, runtime='python', inplace=False,
+                         fold_constants=True)
+    if len(oinf.folded_) == 0:
+        return onnx_model
+    return _apply_optimisation_on_graph(
+        _fold_constants_graph, onnx_model, debug_info=debug_info,
+        oinf=oinf)
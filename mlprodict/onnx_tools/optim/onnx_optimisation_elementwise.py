@@ -0,0 +1,181 @@
+"""
+@file
+@brief Optimisation of :epkg:`ONNX` graphs.
+
+.. versionadded:: 0.9
+"""
+from onnx import AttributeProto, FunctionProto, TensorProto
+from onnx.helper import (
+    make_graph, make_node, make_tensor_value_info, make_opsetid)
+from ._onnx_optimisation_common import (  # pylint: disable=E0611
+    _apply_optimisation_on_graph, _apply_remove_node_fct_node)
+
+
+# candidates, the runtime must implement method _run_out
+_elementwise_ops = {
+    'Abs', 'Add', 'Div', 'Erf', 'Exp', 'Log', 'Mul', 'Neg', 'Relu',
+    'Sigmoid', 'Sqrt', 'Sub', 'Tanh'}
+
+fused_domain = 'mlprodict'
+
+
+def _is_fusable(node):
+    "Tells if a node is an elementwise operator which can be fused."
+    if (node.op_type not in _elementwise_ops or
+            node.domain not in ('', 'ai.onnx') or
+            len(node.output) != 1 or len(node.input) not in (1, 2) or
+            len(node.attribute) > 0):
+        return False
+    from ...onnxrt.ops_cpu._op import OpRunUnaryNum, OpRunBinaryNum
+    from ...onnxrt.ops_cpu._op_list import get_op_class
+    cl = get_op_class(node.op_type)
+    return (cl is not None and hasattr(cl, '_run_out') and
+            issubclass(cl, (OpRunUnaryNum, OpRunBinaryNum)))
+
+
+def _enumerate_chains(nodes, outputs):
+    """
+    Enumerates the chains of elementwise nodes, every intermediate
+    result is only used once by the next node of the chain.
+    A node receives at most one chain, if several fusable nodes
+    feed the same node, only the first one is linked to it,
+    the other chains end before it.
+
+    :param nodes: list of nodes
+    :param outputs: names of the graph outputs
+    :return: iterator on lists of node indices
+    """
+    from ..onnx_manipulations import get_hidden_inputs
+    consumers = {}
+    for i, node in enumerate(nodes):
+        names = (list(node.input) if len(node.attribute) == 0
+                 else list(node.input) + list(get_hidden_inputs([node])))
+        for name in names:
+            consumers.setdefault(name, []).append(i)
+
+    fusable = [_is_fusable(node) for node in nodes]
+    following = {}
+    linked = set()
+    for i, node in enumerate(nodes):
+        if not fusable[i]:
+            continue
+        name = node.output[0]
+        if name in outputs:
+            continue
+        cons = consumers.get(name, [])
+        if len(cons) == 1 and fusable[cons[0]] and cons[0] not in linked:
+            following[i] = cons[0]
+            linked.add(cons[0])
+
+    starts = set(following) - set(following.values())
+    for i in sorted(starts):
+        chain = [i]
+        while chain[-1] in following:
+            chain.append(following[chain[-1]])
+        yield chain
+
+
+def _fuse_chain(nodes, index):
+    "Creates the node replacing a chain of nodes."
+    inputs = []
+    inside = set()
+    for node in nodes:
+        for name in node.input:
+            if name not in inside and name not in inputs:
+                inputs.append(name)
+        inside |= set(node.output)
+    body = make_graph(
+        list(nodes), 'fused_%d' % index,
+        [make_tensor_value_info(name, TensorProto.UNDEFINED, None)
+         for name in inputs],
+        [make_tensor_value_info(
+            nodes[-1].output[0], TensorProto.UNDEFINED, None)])
+    return make_node(
+        'FusedElementwise', inputs, [nodes[-1].output[0]],
+        domain=fused_domain, body=body,
+        name='%s_fused' % (nodes[-1].name or nodes[-1].output[0]))
+
+
+def _has_fused_nodes(graph):
+    "Tells if a graph or one of its subgraphs contains a fused node."
+    for node in graph.node:
+        if node.domain == fused_domain and node.op_type == 'FusedElementwise':
+            return True
+        for att in node.attribute:
+            if att.type == AttributeProto.GRAPH and _has_fused_nodes(att.g):
+                return True
+    return False
+
+
+def onnx_fuse_elementwise(onnx_model, recursive=True, debug_info=None,
+                          min_length=2, **options):
+    """
+    Replaces every chain of elementwise operators
+    (such as *Sub*, *Div*, *Mul*, *Add*, *Sigmoid*) whose intermediate
+    results are only used by the next node of the chain by a single node
+    *FusedElementwise* (domain ``'mlprodict'``). Attribute *body* stores
+    the chain. The python runtime computes the chain by blocks of rows
+    small enough to stay in the cache and avoids the allocation of every
+    intermediate result, see @see cl FusedElementwise.
+
+    :param onnx_model: onnx model
+    :param recursive: looks into subgraphs
+    :param debug_info: debug information (private)
+    :param min_length: minimum number of nodes in a chain
+    :param options: unused
+    :return: new onnx model, the same model if nothing was fused
+
+    .. versionadded:: 0.9
+    """
+    if debug_info is None:
+        debug_info = [str(type(onnx_model)).rsplit(
+            '.', maxsplit=1)[-1].strip("'>")]
+    else:
+        debug_info = (debug_info +
+                      [str(type(onnx_model)).rsplit('.', maxsplit=1)[-1].strip("'>")])
+
+    if isinstance(onnx_model, FunctionProto):
+        return onnx_model
+    if hasattr(onnx_model, 'graph'):
+        new_model = _apply_optimisation_on_graph(
+            onnx_fuse_elementwise, onnx_model,
+            recursive=recursive, debug_info=debug_info,
+            min_length=min_length, **options)
+        if not _has_fused_nodes(new_model.graph):
+            return onnx_model
+        if all(op.domain != fused_domain for op in new_model.opset_import):
+            new_model.opset_import.append(  # pylint: disable=E1101
+                make_opsetid(fused_domain, 1))
+        return new_model
+
+    graph = onnx_model
+    nodes = list(graph.node)
+    if recursive:
+        nodes = [_apply_remove_node_fct_node(
+                    onnx_fuse_elementwise, node, recursive=True,
+                    debug_info=debug_info + [node.name])
+                 if len(node.attribute) > 0 and node.domain != fused_domain
+                 else node for node in nodes]
+
+    outputs = set(o.name for o in graph.output)
+    replaced = {}
+    removed = set()
+    for chain in _enumerate_chains(nodes, outputs):
+        if len(chain) < min_length:
+            continue
+        if chain[-1] in replaced:
+            raise RuntimeError(  # pragma: no cover
+                "Node %d ends two chains." % chain[-1])
+        replaced[chain[-1]] = _fuse_chain(
+            [nodes[i] for i in chain], len(replaced))
+        removed |= set(chain[:-1])
+
+    new_nodes = [replaced.get(i, node) for i, node in enumerate(nodes)
+                 if i not in removed]
+    known = set(o for node in new_nodes for o in node.output)
+    known |= set(i.name for i in graph.input)
+    new_graph = make_graph(new_nodes, graph.name, graph.input,
+                           graph.output, graph.initializer)
+    new_graph.value_info.extend(  # pylint: disable=E1101
+        v for v in graph.value_info if v.name in known)
+    return new_graph
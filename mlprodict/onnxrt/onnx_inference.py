@@ -5,17 +5,20 @@
 from on an :epkg:`ONNX` model.
 """
 from collections import OrderedDict
+from concurrent.futures import CancelledError
 from io import BytesIO
 from time import perf_counter
+import os
 import warnings
 import textwrap
 import pprint
+import threading
 from keyword import iskeyword
 import numpy
-from scipy.sparse import coo_matrix
+from scipy.sparse import issparse
 from onnx import (
     load, load_model, shape_inference,
-    ModelProto, GraphProto, FunctionProto)
+    ModelProto, GraphProto, FunctionProto, AttributeProto)
 from onnx.helper import make_model
 from ..tools.code_helper import make_callable, print_code
 from ..onnx_tools.model_checker import check_onnx
@@ -23,10 +26,19 @@ from ..onnx_tools.onnx2py_helper import (
     _var_as_dict, numpy_min, numpy_max, guess_numpy_type_from_string)
 from ..onnx_tools.onnx_manipulations import (
     select_model_inputs_outputs, enumerate_model_node_outputs,
-    overwrite_opset, insert_results_into_onnx)
-from ..onnx_tools.optim import onnx_remove_node_unused
+    overwrite_opset, insert_results_into_onnx, get_hidden_inputs)
+from ..onnx_tools.optim import (
+    onnx_remove_node_unused, onnx_fuse_elementwise)
 from .onnx_inference_node import OnnxInferenceNode
 from .onnx_inference_exports import OnnxInferenceExport
+from .onnx_inference_async import run_async
+from .onnx_inference_cache import CompiledCodeCache
+from .onnx_inference_memory import OnnxMemoryPlan
+from .onnx_inference_mmap import map_initializers
+from .onnx_inference_parallel import OnnxParallelScheduler
+from .onnx_inference_profiling import OnnxProfiler
+from .onnx_inference_snapshot import save_snapshot, load_snapshot
+from .onnx_inference_stream import enumerate_chunks, write_chunk
 from .shape_object import ShapeObject
 from .type_object import SequenceType
 
@@ -78,32 +90,111 @@ class OnnxInference:
     :param existing_functions: a model may contain several local functions,
         this parameter is used when a local function is calling another
         local function previously defined.
+    :param memory_planning: python runtime only, the first run for a given
+        input signature (shapes and types) records the shape of every
+        intermediate result, next runs store them into buffers allocated
+        once and shared by results with disjoint lifetimes,
+        see @see cl OnnxMemoryPlan, it disables *inplace*, two concurrent
+        calls to method *run* must not share the same instance
+    :param parallel: python runtime only, number of threads used to
+        execute independent nodes at the same time,
+        see @see cl OnnxParallelScheduler, None or 1 for a
+        sequential execution
+    :param compiled_cache: runtime ``'python_compiled'`` only,
+        directory or instance of @see cl CompiledCodeCache,
+        the generated code is stored in this cache and reused
+        by any instance loading the same graph
+    :param fold_constants: python runtimes only, every node whose
+        inputs are all initializers is computed once when the model
+        is loaded and its outputs become initializers,
+        see @see me _fold_constants
+    :param fast_plans: python runtime only, the first run for a given
+        input signature (shapes and types) checks every input and output
+        of every operator, next runs with the same signature skip these
+        checks and call the kernels directly, see @see me _run_sequence_fast
+    :param mmap_initializers: the model must be a filename, the
+        initializers of the main graph (stored in the file or as external
+        data) are not loaded but mapped in memory (see
+        @see fn map_initializers), they become read-only arrays,
+        processes loading the same model share the same memory pages
+    :param fuse_elementwise: python runtimes only, every chain of
+        elementwise operators is replaced by a single node computing
+        the chain by blocks of rows (see @see fn onnx_fuse_elementwise),
+        attribute *obj* holds the modified graph
 
     Among the possible runtime_options, there are:
     * *enable_profiling*: enables profiling for :epkg:`onnxruntime`
+        and for runtime ``'python'`` (see @see cl OnnxProfiler and
+        attribute `profiler_`)
     * *session_options*: an instance of *SessionOptions* from
         :epkg:`onnxruntime`
     * *ir_version*: change ir_version
+    * *scan_vectorize*: runtime ``'python'``, operator *Scan* computes
+        its body for many iterations at once when it is possible
+        (None, default), always (True) or never (False),
+        see @see cl Scan
 
     .. versionchanged:: 0.9
         Parameters *existing_functions* was added.
         Removes *device* parameter. See runtime.
         Runtime `onnxruntime1-cuda` was added.
+        Parameters *memory_planning*, *parallel*, *compiled_cache*,
+        *mmap_initializers*, *fold_constants*, *fast_plans*,
+        *fuse_elementwise* were added.
     """
 
+    # maximum number of input signatures with a memory plan
+    max_memory_plans = 8
+    # maximum number of input signatures with a plan without checks
+    max_fast_plans = 8
+    # maximum number of concurrent runs started by method run_async
+    max_async_runs = 4
+    # see _guess_inplace, operators only reading the shape of an input
+    _inplace_shape_ops = {'Shape', 'Size'}
+    # see _guess_inplace, operators always returning new results
+    # when they are not allowed to overwrite their inputs,
+    # another node can overwrite one input after them,
+    # reductions are excluded, they return their input
+    # with noop_with_empty_axes=1 and no axes
+    _inplace_fresh_ops = {
+        'Abs', 'Add', 'ArgMax', 'ArgMin', 'Clip', 'Concat',
+        'CumSum', 'Div', 'Equal', 'Erf', 'Exp', 'Gather', 'Gemm',
+        'Greater', 'Less', 'LinearClassifier', 'LinearRegressor', 'Log',
+        'MatMul', 'Mul', 'Neg', 'Normalizer', 'Pow', 'Relu', 'Scaler',
+        'Sigmoid', 'Softmax', 'Sqrt', 'Sub', 'Tanh', 'TopK',
+        'TreeEnsembleClassifier', 'TreeEnsembleRegressor', 'Where'}
+
     def __init__(self, onnx_or_bytes_or_stream, runtime=None,
                  skip_run=False, inplace=True,
                  input_inplace=False, ir_version=None,
                  target_opset=None, runtime_options=None,
                  session_options=None, inside_loop=False,
                  static_inputs=None, new_outputs=None, new_opset=None,
-                 existing_functions=None):
+                 existing_functions=None, memory_planning=False,
+                 parallel=None, compiled_cache=None,
+                 mmap_initializers=False, fold_constants=False,
+                 fast_plans=False, fuse_elementwise=False):
+        self.mmap_initializers = mmap_initializers
+        self._mmap_dir = None
+        self._mmap_inits = None
+        if mmap_initializers and not isinstance(onnx_or_bytes_or_stream, str):
+            raise TypeError(
+                "mmap_initializers=True requires a filename not %r."
+                "" % type(onnx_or_bytes_or_stream))
         if isinstance(onnx_or_bytes_or_stream, bytes):
             self.obj = load_model(BytesIO(onnx_or_bytes_or_stream))
         elif isinstance(onnx_or_bytes_or_stream, BytesIO):
             self.obj = load_model(onnx_or_bytes_or_stream)
         elif isinstance(onnx_or_bytes_or_stream, str):
-            self.obj = load(onnx_or_bytes_or_stream)
+            if mmap_initializers:
+                self.obj = load(onnx_or_bytes_or_stream,
+                                load_external_data=False)
+                self._mmap_dir = os.path.dirname(
+                    os.path.abspath(onnx_or_bytes_or_stream))
+                self._mmap_inits = map_initializers(
+                    self.obj, self._mmap_dir, onnx_or_bytes_or_stream)
+            else:
+                self.obj = load(onnx_or_bytes_or_stream)
         elif hasattr(onnx_or_bytes_or_stream, 'graph'):
             self.obj = onnx_or_bytes_or_stream
         elif isinstance(onnx_or_bytes_or_stream, GraphProto):
@@ -121,6 +212,10 @@ class OnnxInference:
                 self.obj, outputs=new_outputs, infer_shapes=True)
         if new_opset is not None:
             self.obj = overwrite_opset(self.obj, new_opset)
+        if (fuse_elementwise and not isinstance(self.obj, FunctionProto) and
+                runtime in (None, 'python', 'python_compiled',
+                            'python_compiled_debug')):
+            self.obj = onnx_fuse_elementwise(self.obj)
 
         self.runtime = runtime
         self.skip_run = skip_run
@@ -130,6 +225,12 @@ class OnnxInference:
         self.runtime_options = runtime_options
         self.inside_loop = inside_loop
         self.static_inputs = static_inputs
+        self.memory_planning = memory_planning
+        self.parallel = parallel
+        self.compiled_cache = compiled_cache
+        self.fold_constants = fold_constants
+        self.fast_plans = fast_plans
+        self.fuse_elementwise = fuse_elementwise
         self._init(existing_functions)
 
     def __getstate__(self):
@@ -144,7 +245,15 @@ class OnnxInference:
                 'inplace': self.inplace,
                 'force_target_opset': self.force_target_opset,
                 'static_inputs': self.static_inputs,
-                'inside_loop': self.inside_loop}
+                'inside_loop': self.inside_loop,
+                'memory_planning': self.memory_planning,
+                'parallel': self.parallel,
+                'compiled_cache': self.compiled_cache,
+                'mmap_initializers': self.mmap_initializers,
+                'mmap_dir': getattr(self, '_mmap_dir', None),
+                'fold_constants': self.fold_constants,
+                'fast_plans': self.fast_plans,
+                'fuse_elementwise': self.fuse_elementwise}
 
     def __setstate__(self, state):
         """
@@ -160,6 +269,18 @@ class OnnxInference:
         self.force_target_opset = state['force_target_opset']
         self.static_inputs = state['static_inputs']
         self.inside_loop = state['inside_loop']
+        self.memory_planning = state.get('memory_planning', False)
+        self.parallel = state.get('parallel', None)
+        self.compiled_cache = state.get('compiled_cache', None)
+        self.mmap_initializers = state.get('mmap_initializers', False)
+        # the initializers refer to files in this directory
+        self._mmap_dir = state.get('mmap_dir', None)
+        self._mmap_inits = (
+            map_initializers(self.obj, self._mmap_dir)
+            if self.mmap_initializers else None)
+        self.fold_constants = state.get('fold_constants', False)
+        self.fast_plans = state.get('fast_plans', False)
+        self.fuse_elementwise = state.get('fuse_elementwise', False)
         self._init()
 
     def _init(self, existing_functions=None):
@@ -257,15 +378,43 @@ class OnnxInference:
                         for k, v in node.ops_.typed_outputs_:
                             variables[k] = v
                 self._run = self._run_sequence_runtime
+                if (self.fold_constants and not is_function_proto and
+                        self.runtime in (None, 'python', 'python_compiled',
+                                         'python_compiled_debug')):
+                    self._fold_constants()
 
         if not self.skip_run and self.runtime in ('python', None):
             if is_function_proto:
                 self.shapes_ = None
             else:
                 self.shapes_ = self._set_shape_inference_runtime()
-            if self.inplace:
+            if self.inplace and not self.memory_planning:
                 self.inplaces_ = self._guess_inplace(self.input_inplace)
-
+            if self.memory_planning:
+                if self.parallel is not None and self.parallel > 1:
+                    raise RuntimeError(
+                        "memory_planning cannot be used with parallel=%r, "
+                        "buffers are shared by results computed "
+                        "sequentially." % self.parallel)
+                self._memory_plans = OrderedDict()
+            if self.parallel is not None and self.parallel > 1:
+                self._parallel_scheduler = OnnxParallelScheduler(
+                    self.sequence_, self.parallel)
+            if self.fast_plans:
+                self._fast_plans = OrderedDict()
+            if (self.runtime_options is not None and
+                    self.runtime_options.get('enable_profiling', False)):
+                self.profiler_ = OnnxProfiler(self.inits_)
+
+        self._init_methods()
+
+    def _init_methods(self):
+        """
+        Binds the exporters and compiles the runtime
+        ``'python_compiled'``. It is called by @see me _init
+        and when a snapshot is restored
+        (see @see fn load_snapshot).
+        """
         self.exporters_ = OnnxInferenceExport(self)
         self.to_json = self.exporters_.to_json
         self.to_dot = self.exporters_.to_dot
@@ -274,12 +423,85 @@ class OnnxInference:
         self.to_onnx_code = self.exporters_.to_onnx_code
 
         if self.runtime in ('python_compiled', 'python_compiled_debug'):
+            if isinstance(self.compiled_cache, str):
+                self._compiled_cache = CompiledCodeCache(self.compiled_cache)
+            else:
+                self._compiled_cache = self.compiled_cache
             # switch the inference method to the compiled one
             _, fct, code = self._build_compile_run('debug' in self.runtime)
             setattr(self, '_run_compiled', fct)
             setattr(self, '_run_compiled_code', code)
             self._run = self._run_sequence_runtime_compiled
 
+    # operators never folded, their outputs change at every run
+    _not_foldable = {
+        'Bernoulli', 'Multinomial', 'RandomNormal', 'RandomNormalLike',
+        'RandomUniform', 'RandomUniformLike', 'YieldOp'}
+
+    def _fold_constants(self):
+        """
+        Computes once every node whose inputs are all initializers
+        (or outputs of nodes already computed), such as a chain
+        *Shape*, *Gather*, *Concat* or a *Cast* or a *Reshape* of
+        coefficients. Their outputs are added to `inits_` and the nodes
+        are removed from `sequence_`. Initializers no longer used are
+        removed as well. Nodes with subgraphs, random nodes and nodes
+        producing something else than a dense tensor are not folded.
+        Initializers which are also inputs of the graph can be
+        overwritten and are not considered as constant.
+        The list of folded nodes is stored in attribute `folded_`.
+
+        .. versionadded:: 0.9
+        """
+        constants = set(self.inits_) - set(self.inputs_)
+        constants.add('')
+        values = [None] * len(self._global_index)
+        for k, v in self.inits_.items():
+            values[self._global_index[k]] = v['value']
+
+        sequence = []
+        self.folded_ = []
+        subgraphs = (AttributeProto.GRAPH, AttributeProto.GRAPHS)
+        for node in self.sequence_:
+            if (node.ops_ is None or node.ops_.need_context() or
+                    node.onnx_node.op_type in self._not_foldable or
+                    any(att.type in subgraphs
+                        for att in node.onnx_node.attribute) or
+                    any(i not in constants for i in node.inputs)):
+                sequence.append(node)
+                continue
+            try:
+                node.run(values)
+            except (RuntimeError, ValueError, TypeError,
+                    NotImplementedError):  # pragma: no cover
+                sequence.append(node)
+                continue
+            res = [values[i] for i in node.outputs_indices]
+            if not all(isinstance(r, numpy.ndarray) for r in res):
+                sequence.append(node)
+                continue
+            for name, value in zip(node.outputs, res):
+                if name == '':
+                    continue
+                self.inits_[name] = {'name': name, 'value': value}
+                constants.add(name)
+            self.folded_.append(node.onnx_node)
+
+        if len(self.folded_) == 0:
+            return
+        used = set(self.inputs_) | set(self.outputs_)
+        for node in sequence:
+            used |= get_hidden_inputs([node.onnx_node])
+        for name in list(self.inits_):
+            if name not in used:
+                del self.inits_[name]
+        # memory plans and the parallel scheduler rely on the order
+        for i, node in enumerate(sequence):
+            node.set_order(i)
+        self.sequence_ = sequence
+        self.graph_['sequence'] = sequence
+        self.graph_['inits'] = self.inits_
+
     def _run_sequence_runtime_compiled(
             self, inputs, clean_right_away=False, intermediate=False,
             verbose=0, node_time=False, yield_ops=None, fLOG=None,
@@ -566,8 +788,13 @@ class OnnxInference:
 
         # initializer
         if not is_function_proto:
+            mmap_inits = getattr(self, '_mmap_inits', None) or {}
             for obj in obj_graph.initializer:
-                init_obj = _var_as_dict(obj)
+                if obj.name in mmap_inits:
+                    init_obj = {'name': obj.name,
+                                'value': mmap_inits[obj.name]}
+                else:
+                    init_obj = _var_as_dict(obj)
                 if init_obj is None:
                     raise RuntimeError(  # pragma: no cover
                         "Unable to convert an initializer\n{}".format(obj))
@@ -695,13 +922,18 @@ class OnnxInference:
             node.set_order(len(sequence))
             sequence.append(node)
 
-        # defines where an intermediare output is not needed
+        # defines where an intermediate output is not needed anymore,
+        # a subgraph may use a result without declaring it as an input,
+        # a result never consumed is released after the node producing it
         last_used = {}
         for node in sequence:
-            for inp in node.inputs:
+            for out in node.outputs:
+                last_used[out] = node.order
+            for inp in get_hidden_inputs([node.onnx_node]):
                 last_used[inp] = node.order
         for k, ord in last_used.items():
-            sequence[ord].add_variable_to_clean(k)
+            if k in intermediate and k not in outputs:
+                sequence[ord].add_variable_to_clean(k)
 
         results = dict(inits=inits, inputs=variables, outputs=outputs,
                        attributes=attributes,
@@ -731,13 +963,15 @@ class OnnxInference:
     def run(self, inputs, clean_right_away=False,
             intermediate=False, verbose=0, node_time=False,
             overwrite_types=None, yield_ops=None, fLOG=None,
-            context=None, attributes=None):
+            context=None, attributes=None, cancel=None):
         """
         Computes the predictions for this :epkg:`onnx` graph.
 
         :param inputs: inputs as dictionary or a dataframe
         :param clean_right_away: clean the intermediate outputs
-                as soon as they are not needed
+                as soon as they are not needed, every intermediate result
+                is released after the last node using it (python runtime),
+                it reduces the peak memory
         :param intermediate: returns a dictionary of intermediate
             variables instead of the results only
         :param verbose: display information while predicting
@@ -751,6 +985,10 @@ class OnnxInference:
         :param context: local variables, needed when this object is a subgraph
         :param attributes: this uses when this class runs a :epkg:`FunctionProto`
             to store the values of the attributes of the function
+        :param cancel: :class:`threading.Event`, the python runtime
+            checks it before every node and raises
+            :class:`concurrent.futures.CancelledError` if it is set,
+            other runtimes only check it before starting
         :return: outputs as dictionary
             and a second dictionary of the time spent
             in each node if *node_time* is True
@@ -797,6 +1035,8 @@ class OnnxInference:
 
         .. versionchanged:: 0.9
             Parameter *attributes* was added.
+            Parameter *clean_right_away* is implemented for the python runtime.
+            Parameter *cancel* was added.
         """
         def retype(col_array):
             if (hasattr(col_array, 'categories') and
@@ -815,6 +1055,10 @@ class OnnxInference:
                 raise RuntimeError(  # pragma: no cover
                     "inplace must be False if intermediate is True, a container "
                     "might be used by several nodes.")
+            if clean_right_away:
+                raise RuntimeError(  # pragma: no cover
+                    "clean_right_away must be False if intermediate is True, "
+                    "intermediate results would be released.")
             return self._run(inputs, clean_right_away=False,  # pylint: disable=E1123
                              intermediate=intermediate,
                              verbose=verbose, node_time=node_time,
@@ -824,12 +1068,187 @@ class OnnxInference:
         if overwrite_types is not None:
             raise RuntimeError(  # pragma: no cover
                 "overwrite_types is not used if intermediate is False.")
-        return self._run(inputs, clean_right_away=False,  # pylint: disable=E1123
+        if cancel is not None:
+            if self._run == self._run_sequence_runtime:  # pylint: disable=W0143
+                return self._run_sequence_runtime(
+                    inputs, clean_right_away=clean_right_away,
+                    verbose=verbose, node_time=node_time,
+                    yield_ops=yield_ops, fLOG=fLOG, context=context,
+                    attributes=attributes, cancel=cancel)
+            if cancel.is_set():
+                raise CancelledError("The run was cancelled.")
+        return self._run(inputs, clean_right_away=clean_right_away,  # pylint: disable=E1123
                          intermediate=intermediate,
                          verbose=verbose, node_time=node_time,
                          yield_ops=yield_ops, fLOG=fLOG,
                          context=context, attributes=attributes)
 
+    async def run_async(self, inputs, executor=None, **kwargs):
+        """
+        Coroutine computing the predictions in an executor
+        (see @see me run) without blocking the event loop.
+        The number of concurrent runs started by this method is bounded
+        by attribute *max_async_runs* (1 if *memory_planning* is True),
+        next calls wait. If the coroutine is cancelled, the python
+        runtime stops before the next node.
+
+        :param inputs: inputs as dictionary or a dataframe
+        :param executor: :class:`concurrent.futures.Executor`,
+            None for the default executor of the event loop
+        :param kwargs: additional parameters for method @see me run
+        :return: outputs as dictionary
+
+        ::
+
+            oinf = OnnxInference(onx)
+            res = await oinf.run_async({'X': x})
+
+        .. versionadded:: 0.9
+        """
+        cancel = threading.Event()
+        max_runs = 1 if self.memory_planning else self.max_async_runs
+        return await run_async(
+            self, lambda: self.run(inputs, cancel=cancel, **kwargs),
+            executor=executor, max_runs=max_runs, cancel=cancel)
+
+    def run_stream(self, inputs, chunk_size=None, output=None, **kwargs):
+        """
+        Computes the predictions chunk by chunk (see @see me run)
+        and yields the outputs of every chunk, only one chunk is
+        held in memory at a time.
+
+        :param inputs: an array or a :class:`numpy.memmap` (first input),
+            a dataframe, a dictionary of arrays or an iterator on any of
+            them, see @see fn enumerate_chunks
+        :param chunk_size: maximum number of rows in a chunk,
+            None to keep the chunks produced by the iterator
+        :param output: None, an array (first output) or a dictionary
+            ``{output name: array}`` of preallocated arrays or
+            :class:`numpy.memmap`, the results are written at the
+            position of the chunk and the yielded outputs are views
+            on these arrays
+        :param kwargs: additional parameters for method @see me run
+        :return: iterator on outputs as dictionary
+
+        ::
+
+            X = numpy.memmap('X.bin', dtype=numpy.float32, mode='r',
+                             shape=(10000000, 10))
+            Y = numpy.memmap('Y.bin', dtype=numpy.float32, mode='w+',
+                             shape=(10000000, ))
+            for _ in oinf.run_stream(X, chunk_size=65536,
+                                     output={'variable': Y}):
+                pass
+            Y.flush()
+
+        .. versionadded:: 0.9
+        """
+        if output is not None and not isinstance(output, dict):
+            output = {self.output_names[0]: output}
+        input_name = self.input_names[0]
+        begin = 0
+        for chunk in enumerate_chunks(inputs, chunk_size):
+            if isinstance(chunk, numpy.ndarray):
+                chunk = {input_name: chunk}
+            res = self.run(chunk, **kwargs)
+            if output is not None:
+                end = None
+                for name, out in output.items():
+                    res[name] = write_chunk(out, begin, res[name], name=name)
+                    end = begin + res[name].shape[0]
+                begin = end
+            yield res
+
+    def bind_iterations(self, constants=None, attributes=None):
+        """
+        Prepares the graph to be run many times in a row,
+        operators *Loop* and *Scan* call it before running their body.
+        The table of values holding the initializers and the constants
+        is built once, every iteration only replaces the inputs in
+        that table and runs the nodes, no dictionary is created.
+
+        :param constants: dictionary `{name: value}`, values which
+            do not change from one iteration to the next one
+            (static inputs of a *Loop*)
+        :param attributes: see @see me run
+        :return: function `run_iteration(*inputs)` taking the inputs
+            in the order of *input_names* and returning the list of
+            outputs in the order of *output_names*, None if the runtime
+            cannot run the nodes one after another (only the python
+            runtime can, without *memory_planning*, *parallel* or a
+            profiler)
+
+        ::
+
+            run_iteration = body.bind_iterations()
+            for i in range(n):
+                state, out = run_iteration(state, X[i])
+
+        Returned outputs stay valid after the next iteration
+        as the runtime does not overwrite outputs.
+
+        .. versionadded:: 0.9
+        """
+        if (self.runtime not in ('python', None) or
+                not hasattr(self, 'sequence_') or
+                hasattr(self, '_memory_plans') or
+                hasattr(self, '_parallel_scheduler') or
+                hasattr(self, 'profiler_')):
+            return None
+        if hasattr(self, "_values_init"):
+            values = self._values_init.copy()
+        else:
+            values = [None] * len(self._global_index)
+            for k, v in self.inits_.items():
+                values[self._global_index[k]] = v['value']
+        if constants is not None:
+            for k, v in constants.items():
+                values[self._global_index[k]] = v
+        input_indices = [self._global_index[k] for k in self.input_names]
+        output_indices = [self._global_index[k] for k in self.output_names]
+        sequence = self.sequence_
+
+        def run_iteration(*inputs):
+            for i, v in zip(input_indices, inputs):
+                values[i] = v
+            for node in sequence:
+                node.run(values, attributes=attributes)
+            return [values[i] for i in output_indices]
+
+        return run_iteration
+
+    def save_snapshot(self, filename):
+        """
+        Saves the instance and every structure built to compute
+        the predictions, see @see fn save_snapshot.
+        Static method @see me load_snapshot restores it much faster
+        than loading the ONNX graph again.
+
+        :param filename: filename or bytes stream
+
+        ::
+
+            oinf.save_snapshot('model.snap')
+            oinf2 = OnnxInference.load_snapshot('model.snap')
+
+        .. versionadded:: 0.9
+        """
+        save_snapshot(self, filename)
+
+    @staticmethod
+    def load_snapshot(filename, use_mmap=True):
+        """
+        Restores an instance saved with method @see me save_snapshot,
+        see @see fn load_snapshot.
+
+        :param filename: filename or bytes
+        :param use_mmap: maps the file in memory
+        :return: @see cl OnnxInference
+
+        .. versionadded:: 0.9
+        """
+        return load_snapshot(filename, use_mmap=use_mmap)
+
     def run2onnx(self, inputs, verbose=0, fLOG=None,
                  as_parameter=True, suffix='_DBG',
                  param_name=None, node_type='DEBUG',
@@ -908,13 +1327,14 @@ class OnnxInference:
     def _run_sequence_runtime(self, inputs, clean_right_away=False,
                               intermediate=False, verbose=0, node_time=False,
                               overwrite_types=None, yield_ops=None,
-                              fLOG=None, context=None, attributes=None):
+                              fLOG=None, context=None, attributes=None,
+                              cancel=None):
         if overwrite_types is not None:
             raise NotImplementedError(  # pragma: no cover
                 "overwrite_types != None not implemented.")
-        if clean_right_away:
-            raise NotImplementedError(  # pragma: no cover
-                "clean_right_away=true not implemented.")
+        if clean_right_away and intermediate:
+            raise RuntimeError(  # pragma: no cover
+                "clean_right_away=True is incompatible with intermediate=True.")
 
         if node_time:
             mtime = []
@@ -969,7 +1389,26 @@ class OnnxInference:
         for name, value in inputs.items():
             values[self._global_index[name]] = value
 
-        if verbose == 0 or fLOG is None:
+        if (hasattr(self, 'profiler_') and not node_time and
+                yield_ops is None and (verbose == 0 or fLOG is None)):
+            self._run_sequence_profiled(
+                values, clean_right_away, attributes, cancel)
+        elif (hasattr(self, '_memory_plans') and not node_time and
+                not intermediate and context is None and yield_ops is None and
+                (verbose == 0 or fLOG is None)):
+            self._run_sequence_planned(
+                inputs, values, clean_right_away, attributes, cancel)
+        elif (hasattr(self, '_parallel_scheduler') and not node_time and
+                not intermediate and yield_ops is None and
+                (verbose == 0 or fLOG is None)):
+            self._parallel_scheduler.run(
+                values, attributes=attributes,
+                clean_right_away=clean_right_away, cancel=cancel)
+        elif (hasattr(self, '_fast_plans') and not node_time and
+                yield_ops is None and (verbose == 0 or fLOG is None)):
+            self._run_sequence_fast(
+                inputs, values, clean_right_away, attributes, cancel)
+        elif verbose == 0 or fLOG is None:
             if node_time:
                 for i, node in enumerate(self.sequence_):
                     if yield_ops is not None and node.onnx_node.op_type == 'YieldOp':
@@ -981,12 +1420,29 @@ class OnnxInference:
                             "YieldOp output %r could not be found in "
                             "yield_ops: %r (node=%r)." % (
                                 out, list(sorted(yield_ops)), node.onnx_node))
+                    if cancel is not None and cancel.is_set():
+                        raise CancelledError("The run was cancelled.")
                     t = perf_counter()
                     node.run(values, attributes=attributes)
                     t2 = perf_counter()
                     mtime.append(dict(i=i, name=node.onnx_node.name,
                                       op_type=node.onnx_node.op_type,
                                       time=t2 - t))
+                    if clean_right_away:
+                        for k in node.variable_to_clean_indices:
+                            values[k] = None
+            elif clean_right_away:
+                for node in self.sequence_:
+                    if cancel is not None and cancel.is_set():
+                        raise CancelledError("The run was cancelled.")
+                    node.run(values, attributes=attributes)
+                    for k in node.variable_to_clean_indices:
+                        values[k] = None
+            elif cancel is not None:
+                for node in self.sequence_:
+                    if cancel.is_set():
+                        raise CancelledError("The run was cancelled.")
+                    node.run(values, attributes=attributes)
             else:
                 for node in self.sequence_:
                     node.run(values, attributes=attributes)
@@ -1023,7 +1479,7 @@ class OnnxInference:
                             fLOG("-kv='{}' shape={} dtype={} min={} max={}{}".format(
                                 k, obj.shape, obj.dtype, numpy_min(obj),
                                 numpy_max(obj),
-                                ' (sparse)' if isinstance(obj, coo_matrix) else ''))
+                                ' (sparse)' if issparse(obj) else ''))
                         elif (isinstance(obj, list) and len(obj) > 0 and
                                 not isinstance(obj[0], dict)):  # pragma: no cover
                             fLOG("-kv='{}' list len={}".format(k, len(obj)))
@@ -1038,6 +1494,8 @@ class OnnxInference:
                 fLOG("-- OnnxInference: run {} nodes with {} inputs".format(
                     len(self.sequence_), len(inputs)))
             for i, node in enumerate(self.sequence_):
+                if cancel is not None and cancel.is_set():
+                    raise CancelledError("The run was cancelled.")
                 if verbose >= 1:
                     fLOG(node)
                 if yield_ops is not None and node.onnx_node.op_type == 'YieldOp':
@@ -1071,7 +1529,7 @@ class OnnxInference:
                             name for name in self._global_index  # pylint: disable=C0206
                             if self._global_index[name] == k)
                         if verbose >= 1:
-                            if isinstance(values[k], (numpy.ndarray, coo_matrix)):
+                            if isinstance(values[k], numpy.ndarray) or issparse(values[k]):
                                 name = name[0]
                                 mini = numpy_min(values[k])
                                 maxi = numpy_max(values[k])
@@ -1080,7 +1538,7 @@ class OnnxInference:
                                         values[k].shape) > 0 else "*",
                                     name, values[k].shape, values[k].dtype,
                                     mini, maxi,
-                                    ' sparse' if isinstance(values[k], coo_matrix) else ''))
+                                    ' sparse' if issparse(values[k]) else ''))
                                 if verbose >= 3:
                                     dispsimple(values[k])
                             else:
@@ -1090,6 +1548,9 @@ class OnnxInference:
                                     dispsimple(values[k])
                 if added == 0 and verbose >= 1:
                     fLOG("? no new result")  # pragma: no cover
+                if clean_right_away:
+                    for k in node.variable_to_clean_indices:
+                        values[k] = None
 
         if intermediate:
             values = [(v, k, values[v]) for k, v in self._global_index.items()]
@@ -1108,6 +1569,134 @@ class OnnxInference:
             self._validate_outputs(res, verbose=verbose, fLOG=fLOG)
         return (res, mtime) if node_time else res
 
+    def _run_sequence_planned(self, inputs, values, clean_right_away,
+                              attributes, cancel=None):
+        """
+        Executes the sequence of nodes with the plan associated to
+        the input signature (see @see cl OnnxMemoryPlan),
+        builds the plan if it does not exist. If *cancel* is set,
+        the execution stops before the next node.
+        """
+        key = OnnxMemoryPlan.signature(inputs)
+        if key is None:
+            for node in self.sequence_:
+                if cancel is not None and cancel.is_set():
+                    raise CancelledError("The run was cancelled.")
+                node.run(values, attributes=attributes)
+            return
+        if key not in self._memory_plans:
+            plan = OnnxMemoryPlan.build(
+                self, values, attributes=attributes, cancel=cancel)
+            if len(self._memory_plans) >= self.max_memory_plans:
+                self._memory_plans.popitem(last=False)
+            self._memory_plans[key] = plan
+            return
+        outs = self._memory_plans[key].outs
+        for node, out in zip(self.sequence_, outs):
+            if cancel is not None and cancel.is_set():
+                raise CancelledError("The run was cancelled.")
+            if out is None:
+                node.run(values, attributes=attributes)
+            else:
+                node.run_out(values, out, attributes=attributes)
+            if clean_right_away:
+                for k in node.variable_to_clean_indices:
+                    values[k] = None
+
+    def _run_sequence_profiled(self, values, clean_right_away, attributes,
+                               cancel=None):
+        """
+        Executes the sequence of nodes and records the execution
+        of every node in `profiler_` (see @see cl OnnxProfiler).
+        Memory plans and plans without checks are not used,
+        the nodes are executed in parallel if *parallel* > 1.
+        If *cancel* is set, the execution stops before the next node.
+        """
+        begin = perf_counter()
+        if hasattr(self, '_parallel_scheduler'):
+            self._parallel_scheduler.run(
+                values, attributes=attributes,
+                clean_right_away=clean_right_away, profiler=self.profiler_,
+                cancel=cancel)
+        else:
+            for i, node in enumerate(self.sequence_):
+                if cancel is not None and cancel.is_set():
+                    raise CancelledError("The run was cancelled.")
+                self.profiler_.run_node(i, node, values, attributes=attributes)
+                if clean_right_away:
+                    for k in node.variable_to_clean_indices:
+                        values[k] = None
+        self.profiler_.add_run(begin, perf_counter())
+
+    def _build_fast_plan(self):
+        """
+        Returns the list of functions called by @see me _run_sequence_fast,
+        one tuple `(kernel, node, input indices, output indices)`
+        per node, *kernel* is None if the node must be run the usual way
+        (subgraphs, functions).
+        """
+        plan = []
+        for node in self.sequence_:
+            if (node.ops_ is None or node.ops_.need_context() or
+                    not hasattr(node.ops_, 'run_kernel')):
+                plan.append((None, node, None, None))
+            else:
+                plan.append((node.ops_.run_kernel(), node,
+                             node.inputs_indices, node.outputs_indices))
+        return plan
+
+    def _run_sequence_fast(self, inputs, values, clean_right_away,
+                           attributes, cancel=None):
+        """
+        Executes the sequence of nodes with the plan associated to
+        the input signature. The first run with a signature goes
+        through method *run* of every operator which checks the
+        inputs and the outputs. Next runs call the kernels returned by
+        :meth:`run_kernel <mlprodict.onnxrt.ops_cpu._op.OpRun.run_kernel>`
+        without any check. The number of signatures
+        is limited to `max_fast_plans`, the least recently used
+        is removed first. If *cancel* is set, the execution stops
+        before the next node.
+        """
+        key = OnnxMemoryPlan.signature(inputs)
+        plan = None if key is None else self._fast_plans.get(key, None)
+        if plan is None:
+            for node in self.sequence_:
+                if cancel is not None and cancel.is_set():
+                    raise CancelledError("The run was cancelled.")
+                node.run(values, attributes=attributes)
+                if clean_right_away:
+                    for k in node.variable_to_clean_indices:
+                        values[k] = None
+            if key is not None:
+                self._fast_plans[key] = self._build_fast_plan()
+                while len(self._fast_plans) > self.max_fast_plans:
+                    try:
+                        self._fast_plans.popitem(last=False)
+                    except KeyError:  # pragma: no cover
+                        # removed by another thread
+                        break
+            return
+
+        try:
+            self._fast_plans.move_to_end(key)
+        except KeyError:  # pragma: no cover
+            # removed by another thread
+            pass
+        for kernel, node, ins, outs in plan:
+            if cancel is not None and cancel.is_set():
+                raise CancelledError("The run was cancelled.")
+            if kernel is None:
+                node.run(values, attributes=attributes)
+            else:
+                res = kernel(*[values[i] for i in ins],
+                             attributes=attributes)
+                for i, r in zip(outs, res):
+                    values[i] = r
+            if clean_right_away:
+                for k in node.variable_to_clean_indices:
+                    values[k] = None
+
     def _validate_outputs(self, res, verbose=0, fLOG=None):
         """
         Checks the output have the expected type.
@@ -1247,8 +1836,9 @@ class OnnxInference:
                            intermediate=False, verbose=0, node_time=False,
                            overwrite_types=None, yield_ops=None, fLOG=None,
                            context=None, attributes=None):
-        # node_time is unused, context is unused
-        if clean_right_away:
+        # node_time is unused, context is unused,
+        # onnxruntime already releases intermediate results
+        if clean_right_away and intermediate:
             raise RuntimeError(  # pragma: no cover
                 "clean_right_away=true does not work with this runtime.")
         if intermediate:
@@ -1372,6 +1962,10 @@ class OnnxInference:
 
         if hasattr(self, '_values_init'):
             del self._values_init
+        if hasattr(self, '_memory_plans'):
+            self._memory_plans.clear()
+        if hasattr(self, '_fast_plans'):
+            self._fast_plans.clear()
 
         # first pass: simple cast
         done = []
@@ -1623,55 +2217,96 @@ class OnnxInference:
                      B -> D;
             }
 
-        It does not handle specific case such node `B` being
-        overwritten by node `C` but without changing its shape
-        and node `D` only needs the shape of `B`. Then `B` could
-        be overwritten as well.
-        """
-        forbid = {}
+        However, if the nodes are executed sequentially (no *parallel*),
+        `B` is overwritten by the last node reading it if every other
+        node reading it was executed before and does not keep a reference
+        on it (see attribute *_inplace_fresh_ops*). Nodes only reading
+        the shape of a result (*Shape*, *Size*) are ignored. Nodes
+        whose output may share the memory of their first input
+        (*Reshape*, *Squeeze*, *Identity*, ...,
+        see attribute *view_ops* of @see cl OnnxInferenceNode)
+        do not read it,
+        their outputs and their inputs are considered as a single buffer.
+
+        .. versionchanged:: 0.9
+            The function takes into account the execution order,
+            shape-only consumers, views and the inputs of subgraphs.
+        """
+        ordered = self.parallel is None or self.parallel <= 1
+        order = {id(node): i for i, node in enumerate(self.sequence_)}
+        # results which cannot be overwritten (readonly)
+        readonly = set(self.statics_) | set(self.inits_)
+        if not input_inplace:
+            readonly |= set(self.inputs_)
         values = OrderedDict()
-        for k in self.statics_:
-            values[k] = dict(inplace=False, to=[], fr=[])
-        for k in self.inputs_:
-            values[k] = dict(inplace=input_inplace, to=[], fr=[])
-        for k in self.inits_:
-            values[k] = dict(inplace=False, to=[], fr=[])
+        for k in list(self.statics_) + list(self.inputs_) + list(self.inits_):
+            values[k] = []
+        buffers = {}
         for node in self.sequence_:
-            for n in node.inputs:
-                if n == '':
+            local = (node.get_local_inputs()
+                     if len(node.onnx_node.attribute) > 0 else set())
+            for n in list(node.inputs) + list(local):
+                if n == '' or n not in values:
                     continue
-                values[n]['to'].append(node)
+                values[n].append(node)
+            view = (node.op_type in OnnxInferenceNode.view_ops and
+                    len(node.inputs) > 0 and node.inputs[0] in values)
             for n in node.outputs:
                 if node.op_type == 'Constant':
                     # We cannot modify constant.
-                    forbid[n] = node
+                    readonly.add(n)
                 if n not in values:
-                    values[n] = dict(inplace=None, to=[], fr=[])
-                values[n]['fr'].append(node)
-
-        # checks the number of outputs
+                    values[n] = []
+                buffers[n] = (buffers.get(node.inputs[0], node.inputs[0])
+                              if view else n)
+        groups = {}
+        for n in values:
+            groups.setdefault(buffers.get(n, n), []).append(n)
+
+        # outputs can share memory with an intermediate result
+        # but cannot be overwritten
         outputs = set(self.output_names)
-        modif = 1
-        while modif > 0:
-            modif = 0
-            for n, v in values.items():
-                if v['inplace'] is not None:
-                    continue
-                if n in forbid:
-                    continue
-                if len(v['to']) == 1:
-                    v['inplace'] = True
-                    modif += 1
-
-        # convey the information to every node
         inplaces = {}
-        for n, v in values.items():
-            if v['inplace']:
-                inplaces[n] = v
-                for node in v['to']:
-                    if n in outputs:
+        for group in groups.values():
+            if readonly & set(group):
+                continue
+            readers = []
+            views = []
+            for n in group:
+                for node in values[n]:
+                    if node.op_type in self._inplace_shape_ops:
+                        continue
+                    if (node.op_type in OnnxInferenceNode.view_ops and
+                            node.inputs[0] == n):
+                        views.append((node, n))
                         continue
+                    readers.append((order[id(node)], node, n))
+            # a view avoids a copy (Identity)
+            for node, n in views:
+                if n not in outputs and n not in node.inplaces:
                     node.enable_inplace_compute(n)
+                inplaces[n] = values[n]
+            if len(readers) == 0 or outputs & set(group):
+                continue
+            last = max(r[0] for r in readers)
+            lasts = [r for r in readers if r[0] == last]
+            others = [r for r in readers if r[0] != last]
+            if len(lasts) != 1:
+                # the last node reads the buffer more than once
+                continue
+            if len(others) > 0 and (
+                    not ordered or
+                    any(r[1].op_type not in self._inplace_fresh_ops
+                        for r in others)):
+                continue
+            if any(order[id(node)] > last for node, _ in views):
+                continue
+            _, node, n = lasts[0]
+            if (len(node.onnx_node.attribute) > 0 and
+                    n in node.get_local_inputs()):
+                continue
+            node.enable_inplace_compute(n)
+            inplaces[n] = values[n]
 
         return inplaces
 
@@ -1730,7 +2365,66 @@ class OnnxInference:
                 res += '_'
             return res
 
-        # inits
+        # context
+        inputs = self.input_names
+        context = {}
+        for k, v in sorted(self.inits_.items()):
+            if k.startswith("_OPT_"):
+                raise RuntimeError(  # pragma: no cover
+                    "The runtime cannot handle any constant name "
+                    "starting with '_OPT_': '{}'.".format(k))
+            if k in inputs:
+                context["_OPT_" + clean_name(k)] = v['value']
+            else:
+                context[clean_name(k)] = v['value']
+        for i, node in enumerate(self.sequence_):
+            name = "n{}_{}".format(i, node.ops_.__class__.__name__.lower())
+            if node.ops_ is None:
+                context[name] = node.function_
+                # The code of the function should be added but only once.
+                raise NotImplementedError(
+                    "Not implemented for models including functions.")
+            context[name] = node.ops_._run
+        context['self'] = self
+
+        cache = getattr(self, '_compiled_cache', None)
+        cached = None
+        if cache is not None:
+            key = cache.key(self, debug)
+            cached = cache.get(key)
+        if cached is None:
+            final_code = self._build_compile_code(context, debug, clean_name)
+            try:
+                obj = compile(final_code, "<string>", 'exec')
+            except SyntaxError as e:  # pragma: no cover
+                raise SyntaxError(
+                    "Unable to compile\n#####\n{}".format(final_code)) from e
+            if cache is not None:
+                cache.set(key, final_code, obj)
+        else:
+            final_code, obj = cached
+
+        fcts_obj = [_ for _ in obj.co_consts
+                    if _ is not None and not isinstance(_, (bool, str, int))]
+        fct = make_callable(
+            "compiled_run", fcts_obj[0], final_code, context, debug)
+
+        # end
+        return "compiled_run", fct, final_code
+
+    def _build_compile_code(self, context, debug, clean_name):
+        """
+        Generates the code compiled by @see me _build_compile_run.
+
+        :param context: names available to the code
+            (initializers, operators)
+        :param debug: insert debugging code
+        :param clean_name: function converting a result name
+            into a variable name
+        :return: code (string)
+
+        .. versionadded:: 0.9
+        """
         inputs = self.input_names
         code = [
             'def compiled_run(dict_inputs, yield_ops=None, context=None, attributes=None):']
@@ -1740,8 +2434,6 @@ class OnnxInference:
         if debug:
             code.append("    printed = {}")
 
-        context = {}
-
         # static variables
         for k in sorted(self.statics_):
             code.append("    # static: {0}".format(k))
@@ -1753,13 +2445,8 @@ class OnnxInference:
                         clean_name(k), k))
 
         # initializers
-        for k, v in sorted(self.inits_.items()):
-            if k.startswith("_OPT_"):
-                raise RuntimeError(  # pragma: no cover
-                    "The runtime cannot handle any constant name "
-                    "starting with '_OPT_': '{}'.".format(k))
+        for k in sorted(self.inits_):
             if k in inputs:
-                context["_OPT_" + clean_name(k)] = v['value']
                 code.append("    # init: _OPT_{0} ({1})".format(
                     clean_name(k), k))
                 if debug:
@@ -1767,7 +2454,6 @@ class OnnxInference:
                         "    debug_print('c.[_OPT_{0}]', _OPT_{1}, printed)".format(
                             clean_name(k), k))
             else:
-                context[clean_name(k)] = v['value']
                 code.append("    # init: {0} ({1})".format(
                     clean_name(k), k))
                 if debug:
@@ -1794,33 +2480,26 @@ class OnnxInference:
         # code
         for i, node in enumerate(self.sequence_):
             name = "n{}_{}".format(i, node.ops_.__class__.__name__.lower())
-            if node.ops_ is None:
-                context[name] = node.function_
-                # The code of the function should be added but only once.
-                raise NotImplementedError(
-                    "Not implemented for models including functions.")
+            if (node.ops_.__class__.__name__ == 'Loop' and
+                    node.ops_.need_context()):
+                # Adding context.
+                ctx = "{%s}" % ", ".join(
+                    "'%s': %s" % (n, n) for n in node.ops_.additional_inputs)
+                code.append('    ({1}, ) = {2}({0}, context={3})'.format(
+                    ', '.join(map(clean_name, node.inputs)),
+                    ', '.join(map(clean_name, node.outputs)),
+                    name, ctx))
             else:
-                context[name] = node.ops_._run
-                if (node.ops_.__class__.__name__ == 'Loop' and
-                        node.ops_.need_context()):
-                    # Adding context.
-                    ctx = "{%s}" % ", ".join(
-                        "'%s': %s" % (n, n) for n in node.ops_.additional_inputs)
-                    code.append('    ({1}, ) = {2}({0}, context={3})'.format(
-                        ', '.join(map(clean_name, node.inputs)),
-                        ', '.join(map(clean_name, node.outputs)),
-                        name, ctx))
-                else:
-                    code.append('    ({1}, ) = {2}({0})'.format(
-                        ', '.join(map(clean_name, node.inputs)),
-                        ', '.join(map(clean_name, node.outputs)),
-                        name))
-                if debug:
-                    code.append("    print('''# {}''')".format(code[-1][4:]))
-                    for o in node.outputs:
-                        code.append(
-                            "    debug_print('o.{0}', {1}, printed)".format(
-                                clean_name(o), o))
+                code.append('    ({1}, ) = {2}({0})'.format(
+                    ', '.join(map(clean_name, node.inputs)),
+                    ', '.join(map(clean_name, node.outputs)),
+                    name))
+            if debug:
+                code.append("    print('''# {}''')".format(code[-1][4:]))
+                for o in node.outputs:
+                    code.append(
+                        "    debug_print('o.{0}', {1}, printed)".format(
+                            clean_name(o), o))
 
         # return
         code.append('    return {')
@@ -1828,22 +2507,7 @@ class OnnxInference:
             code.append("        '{1}': {0},".format(
                 clean_name(out), out))
         code.append('    }')
-        final_code = '\n'.join(code)
-
-        # compile the outcome
-        context['self'] = self
-        try:
-            obj = compile(final_code, "<string>", 'exec')
-        except SyntaxError as e:  # pragma: no cover
-            raise SyntaxError(
-                "Unable to compile\n#####\n{}".format(final_code)) from e
-        fcts_obj = [_ for _ in obj.co_consts
-                    if _ is not None and not isinstance(_, (bool, str, int))]
-        fct = make_callable(
-            "compiled_run", fcts_obj[0], final_code, context, debug)
-
-        # end
-        return "compiled_run", fct, final_code
+        return '\n'.join(code)
 
     def reduce_size(self, pickable=False):
         """
@@ -1867,18 +2531,25 @@ class OnnxInference:
         :return: dataframe or list of dictionaries
 
         .. versionadded:: 0.6
+
+        .. versionchanged:: 0.9
+            Runtime ``'python'`` is supported, the profiling
+            accumulates all runs (see @see cl OnnxProfiler).
         """
         if (self.runtime_options is None or
                 not self.runtime_options.get('enable_profiling', False)):
             raise RuntimeError(
                 "Profiling is available if options 'enable_profiling' "
                 "is set to true in 'runtime_options' but is %r." % self.runtime_options)
+        if hasattr(self, 'profiler_'):
+            return self.profiler_.get_profiling(as_df=as_df)
         prof = None
         if hasattr(self, '_whole'):
             prof = self._whole.get_profiling()
         if prof is None:
             raise NotImplementedError(  # pragma: no cover
-                "profiling is only implemented for runtime 'onnxruntime1'.")
+                "profiling is only implemented for runtimes 'python' and "
+                "'onnxruntime1'.")
         if as_df:
             import pandas
             return pandas.DataFrame(prof)
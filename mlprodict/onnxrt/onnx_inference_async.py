@@ -0,0 +1,67 @@
+"""
+@file
+@brief Helpers for the asynchronous API,
+see @see fn run_async.
+
+.. versionadded:: 0.9
+"""
+import asyncio
+import weakref
+
+
+# semaphores bounding the number of concurrent runs,
+# one per object and per event loop
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def _get_semaphore(obj, limit):
+    "Returns the semaphore bounding the concurrent runs of *obj*."
+    if limit is None:
+        return None
+    loop = asyncio.get_running_loop()
+    if obj not in _semaphores:
+        _semaphores[obj] = weakref.WeakKeyDictionary()
+    per_loop = _semaphores[obj]
+    if loop not in per_loop:
+        per_loop[loop] = asyncio.Semaphore(limit)
+    return per_loop[loop]
+
+
+async def run_async(obj, fct, executor=None, max_runs=None, cancel=None):
+    """
+    Calls ``fct()`` in an executor and waits for the result
+    without blocking the event loop.
+
+    :param obj: object running the computation, the number of
+        concurrent calls is bounded for every object
+    :param fct: function without any argument
+    :param executor: :class:`concurrent.futures.Executor`,
+        None for the default executor of the event loop
+    :param max_runs: maximum number of concurrent calls for *obj*,
+        next calls wait until one of them is finished,
+        None for no limit
+    :param cancel: :class:`threading.Event` set when the coroutine
+        is cancelled, *fct* is expected to check it regularly
+        and to stop as soon as possible
+    :return: result of *fct*
+
+    If the coroutine is cancelled, the function waits for *fct* to
+    stop before raising :class:`asyncio.CancelledError` so that
+    the number of running calls never exceeds *max_runs*.
+    """
+    loop = asyncio.get_running_loop()
+    sem = _get_semaphore(obj, max_runs)
+    if sem is not None:
+        await sem.acquire()
+    try:
+        future = loop.run_in_executor(executor, fct)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if cancel is not None:
+                cancel.set()
+            await asyncio.wait([future])
+            raise
+    finally:
+        if sem is not None:
+            sem.release()
@@ -0,0 +1,213 @@
+"""
+@file
+@brief Gathers concurrent requests into a single batch,
+see @see cl BatchingSession.
+
+.. versionadded:: 0.9
+"""
+import threading
+import queue
+from concurrent.futures import Future
+from time import perf_counter
+import numpy
+
+
+class BatchingSession:
+    """
+    Wraps an instance of @see cl OnnxInference or
+    @see cl OnnxWholeSession and merges concurrent calls to method
+    @see me run into a single call. Many handlers calling the model
+    with one row at a time spend most of the time in the overhead of
+    every call, models such as tree ensembles or linear models scale
+    almost linearly with the batch size.
+    A thread collects the requests until *max_batch* rows
+    are available or *max_wait_ms* milliseconds have passed since
+    the first request of the batch was received, concatenates
+    the inputs along the first axis, runs the model once and
+    splits the outputs back. Outputs must have one row per input row,
+    it includes the list of dictionaries produced by *ZipMap*.
+    Only requests with the same input names, types and dimensions
+    (except the first one) are merged, a batch never exceeds *max_batch*
+    rows unless it contains a single bigger request. An invalid request
+    only fails its own future.
+
+    :param sess: @see cl OnnxInference or @see cl OnnxWholeSession
+    :param max_batch: maximum number of rows in a batch
+    :param max_wait_ms: maximum waiting time in milliseconds
+
+    ::
+
+        sess = BatchingSession(OnnxInference(onx), max_batch=64)
+        # called from many threads
+        res = sess.run({'X': x})
+        ...
+        sess.close()
+    """
+
+    def __init__(self, sess, max_batch=64, max_wait_ms=2.):
+        if max_batch < 1:
+            raise ValueError(  # pragma: no cover
+                "max_batch must be >= 1 not %r." % max_batch)
+        self.sess = sess
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._closed = False
+        self._thread.start()
+
+    def __enter__(self):
+        "usual"
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        "usual"
+        self.close()
+
+    def close(self):
+        """
+        Stops the thread gathering the requests.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            # no request can be queued after this one
+            self._queue.put(None)
+        self._thread.join()
+
+    def run(self, inputs):
+        """
+        Computes the predictions for one request, the call is blocking
+        until the batch including the request is processed.
+
+        :param inputs: dictionary `{name: array}`,
+            every array has the same first dimension
+        :return: dictionary of outputs
+        """
+        return self.submit(inputs).result()
+
+    def submit(self, inputs):
+        """
+        Adds a request and returns a :class:`concurrent.futures.Future`
+        receiving the outputs.
+
+        :param inputs: dictionary `{name: array}`,
+            every array has the same first dimension
+        :return: future
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The session is closed.")
+            self._queue.put((inputs, future, perf_counter()))
+        return future
+
+    @staticmethod
+    def _key(inputs):
+        return tuple((k, v.dtype, v.shape[1:])
+                     for k, v in sorted(inputs.items()))
+
+    @staticmethod
+    def _nrows(inputs):
+        return next(iter(inputs.values())).shape[0]
+
+    def _prepare(self, item):
+        """
+        Returns the request as a tuple
+        `(inputs, future, received, key, nrows)` or None
+        if it is invalid, the error is then set on its future.
+        """
+        inputs, future, received = item
+        try:
+            return (inputs, future, received,
+                    self._key(inputs), self._nrows(inputs))
+        except Exception as e:  # pylint: disable=W0703
+            future.set_exception(e)
+            return None
+
+    def _run_batch(self, batch):
+        "Runs a batch of requests and sets the results."
+        try:
+            names = list(batch[0][0])
+            if len(batch) == 1:
+                feeds = batch[0][0]
+            else:
+                feeds = {name: numpy.concatenate([b[0][name] for b in batch])
+                         for name in names}
+            res = self.sess.run(feeds)
+            if isinstance(res, list):
+                # OnnxWholeSession
+                res = dict(zip(self.sess.output_names, res))
+            if len(batch) == 1:
+                batch[0][1].set_result(res)
+                return
+            total = sum(b[4] for b in batch)
+            for k, v in res.items():
+                if len(v) != total:
+                    raise RuntimeError(
+                        "Output %r has %d rows and cannot be split into "
+                        "%d requests with %d rows." % (
+                            k, len(v), len(batch), total))
+            begin = 0
+            for _, future, _, _, nrows in batch:
+                end = begin + nrows
+                future.set_result({k: v[begin:end] for k, v in res.items()})
+                begin = end
+        except Exception as e:  # pylint: disable=W0703
+            for b in batch:
+                if not b[1].done():
+                    b[1].set_exception(e)
+
+    def _loop(self):
+        "Gathers requests and runs them."
+        pending = []
+        stop = False
+        while not stop or pending:
+            if not pending:
+                item = self._queue.get()
+                if item is None:
+                    break
+                item = self._prepare(item)
+                if item is None:
+                    continue
+                pending.append(item)
+            key = pending[0][3]
+            batch, rest, nrows, full = [], [], 0, False
+            for p in pending:
+                if p[3] != key or full:
+                    rest.append(p)
+                elif batch and nrows + p[4] > self.max_batch:
+                    # keeps the order of the requests
+                    full = True
+                    rest.append(p)
+                else:
+                    batch.append(p)
+                    nrows += p[4]
+            pending = rest
+            # since the first request of the batch was received
+            deadline = batch[0][2] + self.max_wait_ms / 1000.
+            while not stop and not full and nrows < self.max_batch:
+                timeout = deadline - perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    continue
+                item = self._prepare(item)
+                if item is None:
+                    continue
+                if item[3] != key:
+                    pending.append(item)
+                elif nrows + item[4] > self.max_batch:
+                    full = True
+                    pending.append(item)
+                else:
+                    batch.append(item)
+                    nrows += item[4]
+            self._run_batch(batch)
@@ -0,0 +1,142 @@
+"""
+@file
+@brief On-disk cache for the code generated by runtime
+``'python_compiled'``, see @see cl CompiledCodeCache.
+
+.. versionadded:: 0.9
+"""
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+
+
+class CompiledCodeCache:
+    """
+    Stores the python code generated by
+    :meth:`_build_compile_run
+    <mlprodict.onnxrt.onnx_inference.OnnxInference._build_compile_run>`
+    and its compiled version in a directory, one file per model.
+    The key is a hash of the graph, the opsets, the version of
+    :epkg:`mlprodict` and the version of python (see @see me key).
+    The least recently used files are removed when the total size
+    of the directory exceeds *max_size*.
+
+    :param directory: cache directory, created if it does not exist
+    :param max_size: maximum size of the directory in bytes
+
+    ::
+
+        cache = CompiledCodeCache('/tmp/mlprodict_cache')
+        oinf = OnnxInference(onx, runtime='python_compiled',
+                             compiled_cache=cache)
+    """
+
+    extension = '.mlpc'
+
+    def __init__(self, directory, max_size=2 ** 27):
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    def __repr__(self):
+        "usual"
+        return "%s(%r, max_size=%r)" % (
+            self.__class__.__name__, self.directory, self.max_size)
+
+    @staticmethod
+    def key(oinf, debug=False):
+        """
+        Returns the key identifying the code generated for a model.
+        Initializers are only identified by their name as
+        their values are not part of the code.
+
+        :param oinf: @see cl OnnxInference
+        :param debug: debug version of the code
+        :return: string
+        """
+        from .. import __version__
+        m = hashlib.sha256()
+        m.update(("%s|%s|%d" % (
+            __version__, sys.implementation.cache_tag, int(debug))).encode())
+        m.update(repr(sorted(oinf.target_opset_.items())
+                      if isinstance(oinf.target_opset_, dict)
+                      else oinf.target_opset_).encode())
+        m.update(repr(oinf.input_names).encode())
+        m.update(repr(oinf.output_names).encode())
+        m.update(repr(sorted(oinf.inits_)).encode())
+        m.update(repr(sorted(oinf.statics_)).encode())
+        for node in oinf.sequence_:
+            m.update(node.ops_.__class__.__name__.encode())
+            m.update(node.onnx_node.SerializeToString())
+        return m.hexdigest()
+
+    def _filename(self, key):
+        return os.path.join(self.directory, key + self.extension)
+
+    def get(self, key):
+        """
+        Returns the code and the compiled code stored for *key*.
+
+        :param key: key (see @see me key)
+        :return: `(code, compiled code)` or None if not found
+        """
+        name = self._filename(key)
+        try:
+            with open(name, 'rb') as f:
+                res = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        try:
+            # last access time for the eviction
+            os.utime(name)
+        except OSError:  # pragma: no cover
+            pass
+        return res
+
+    def set(self, key, code, compiled):
+        """
+        Stores the code and the compiled code for *key*
+        and removes the oldest files if the cache is too big.
+
+        :param key: key (see @see me key)
+        :param code: python code (string)
+        :param compiled: output of function *compile*
+        """
+        data = marshal.dumps((code, compiled))
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, self._filename(key))
+        except OSError:  # pragma: no cover
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used files until the size
+        of the cache is below *max_size*.
+        """
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.extension):
+                continue
+            full = os.path.join(self.directory, name)
+            try:
+                st = os.stat(full)
+            except OSError:  # pragma: no cover
+                continue
+            files.append((st.st_mtime, st.st_size, full))
+        total = sum(f[1] for f in files)
+        for _, size, full in sorted(files):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(full)
+            except OSError:  # pragma: no cover
+                continue
+            total -= size
@@ -0,0 +1,176 @@
+"""
+@file
+@brief Static memory planning for the python runtime,
+see @see cl OnnxMemoryPlan.
+
+.. versionadded:: 0.9
+"""
+from concurrent.futures import CancelledError
+import numpy
+from ..onnx_tools.onnx_manipulations import get_hidden_inputs
+
+
+class OnnxMemoryPlan:
+    """
+    Assigns the intermediate results of a graph to a small set of
+    buffers allocated once and reused by every run sharing the same
+    input signature (shapes and types of the inputs).
+    The plan is built by @see me build after a first execution of the
+    graph which gives the shape of every intermediate result.
+    Only the first output of operators implementing method
+    ``_run_out`` (they accept a preallocated output) is stored in
+    a buffer. Two results share the same buffer if their lifetimes
+    do not overlap. The lifetime of a result starts with the node
+    producing it and ends with the last node using it or any result
+    which may share its memory (a view produced by *Reshape* or
+    *Identity*, or an output of a subgraph).
+
+    :param outs: list of preallocated buffers or None, one per node
+        in the sequence
+    :param buffers: list of buffers (one dimension, type *uint8*)
+    :param planned: names of the results stored in buffers
+
+    A plan is not thread safe, two concurrent runs with the same
+    signature would share the same buffers.
+    """
+
+    def __init__(self, outs, buffers, planned):
+        self.outs = outs
+        self.buffers = buffers
+        self.planned = planned
+
+    def __repr__(self):
+        "usual"
+        return "%s(%d buffers, %d planned results, %d bytes)" % (
+            self.__class__.__name__, len(self.buffers), len(self.planned),
+            self.nbytes)
+
+    @property
+    def nbytes(self):
+        "Returns the total size of the buffers."
+        return sum(b.nbytes for b in self.buffers)
+
+    @staticmethod
+    def signature(inputs):
+        """
+        Returns a key identifying the shapes and the types of the inputs.
+
+        :param inputs: dictionary of inputs
+        :return: tuple or None if one input is not a tensor
+        """
+        key = []
+        for name in sorted(inputs):
+            value = inputs[name]
+            if not isinstance(value, numpy.ndarray):
+                return None
+            key.append((name, value.shape, value.dtype))
+        return tuple(key)
+
+    @staticmethod
+    def build(oinf, values, attributes=None, cancel=None):
+        """
+        Executes every node of the graph, records the shape of
+        every intermediate result and builds the plan.
+
+        :param oinf: instance of @see cl OnnxInference
+            (runtime ``'python'``)
+        :param values: list of values (see *_run_sequence_runtime*),
+            inputs and initializers are already filled, this list is
+            updated by the execution of every node
+        :param attributes: attributes if the graph is a function
+        :param cancel: :class:`threading.Event`, the execution stops
+            before the next node and raises
+            :class:`concurrent.futures.CancelledError` if it is set
+        :return: instance of @see cl OnnxMemoryPlan
+        """
+        sequence = oinf.sequence_
+        gi = oinf._global_index  # pylint: disable=W0212
+        outputs = set(oinf.outputs_)
+
+        # execution and aliasing
+        alias = {}
+
+        def find(name):
+            while alias.get(name, name) != name:
+                name = alias[name]
+            return name
+
+        def union(a, b):
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                alias[ra] = rb
+
+        candidates = {}
+        last = {}
+        for node in sequence:
+            if cancel is not None and cancel.is_set():
+                raise CancelledError("The run was cancelled.")
+            node.run(values, attributes=attributes)
+            inputs = [i for i in get_hidden_inputs([node.onnx_node])
+                      if i != '']
+            for name in node.outputs:
+                last[name] = node.order
+            for name in inputs:
+                last[name] = node.order
+            ops = node.ops_
+            if ops is not None and hasattr(ops, '_run_out'):
+                if len(node.outputs) == 1:
+                    value = values[gi[node.outputs[0]]]
+                    if isinstance(value, numpy.ndarray):
+                        candidates[node.outputs[0]] = (node.order, value)
+                continue
+            if ops is None or any(
+                    att.HasField('g') for att in node.onnx_node.attribute):
+                # A function or a subgraph may return any of its inputs.
+                for o in node.outputs:
+                    for i in inputs:
+                        union(o, i)
+                continue
+            for o in node.outputs:
+                vo = values[gi[o]]
+                if not isinstance(vo, numpy.ndarray):
+                    continue
+                for i in inputs:
+                    vi = values[gi[i]]
+                    if (isinstance(vi, numpy.ndarray) and
+                            numpy.may_share_memory(vi, vo)):
+                        union(o, i)
+
+        # lifetime of every group of results sharing the same memory
+        death = {}
+        forbidden = set()
+        for name, order in last.items():
+            root = find(name)
+            death[root] = max(death.get(root, -1), order)
+            if name in outputs:
+                forbidden.add(root)
+
+        # assignment, buffers are [size, busy_until]
+        buffers = []
+        assign = {}
+        for name, (birth, value) in sorted(
+                candidates.items(), key=lambda c: c[1][0]):
+            root = find(name)
+            if root in forbidden:
+                continue
+            nbytes = max(value.nbytes, 1)
+            free = [i for i, b in enumerate(buffers) if b[1] < birth]
+            fit = [i for i in free if buffers[i][0] >= nbytes]
+            if fit:
+                index = min(fit, key=lambda i: buffers[i][0])
+            elif free:
+                index = max(free, key=lambda i: buffers[i][0])
+                buffers[index][0] = nbytes
+            else:
+                index = len(buffers)
+                buffers.append([nbytes, -1])
+            buffers[index][1] = death[root]
+            assign[name] = (index, value.shape, value.dtype)
+
+        arenas = [numpy.empty(b[0], dtype=numpy.uint8) for b in buffers]
+        outs = [None] * len(sequence)
+        for name, (index, shape, dtype) in assign.items():
+            size = int(numpy.prod(shape)) * numpy.dtype(dtype).itemsize
+            view = arenas[index][:size].view(dtype).reshape(shape)
+            outs[candidates[name][0]] = view
+        return OnnxMemoryPlan(outs, arenas, list(sorted(assign)))
@@ -0,0 +1,214 @@
+"""
+@file
+@brief Maps the initializers of a model stored on disk in memory,
+see @see fn map_initializers.
+
+.. versionadded:: 0.9
+"""
+import mmap
+import os
+import sys
+import numpy
+from onnx import TensorProto
+from onnx.external_data_helper import (
+    ExternalDataInfo, load_external_data_for_tensor,
+    set_external_data, uses_external_data)
+
+
+# tensor types stored in raw_data with the numpy layout (little endian)
+_mapped_types = {
+    TensorProto.FLOAT: numpy.float32,
+    TensorProto.UINT8: numpy.uint8,
+    TensorProto.INT8: numpy.int8,
+    TensorProto.UINT16: numpy.uint16,
+    TensorProto.INT16: numpy.int16,
+    TensorProto.INT32: numpy.int32,
+    TensorProto.INT64: numpy.int64,
+    TensorProto.BOOL: numpy.bool_,
+    TensorProto.FLOAT16: numpy.float16,
+    TensorProto.DOUBLE: numpy.float64,
+    TensorProto.UINT32: numpy.uint32,
+    TensorProto.UINT64: numpy.uint64}
+
+# field numbers in onnx.proto
+_model_graph = 7
+_graph_initializer = 5
+_tensor_name = 8
+_tensor_raw_data = 9
+
+
+def _read_varint(buf, pos):
+    "Reads a varint in a protobuf buffer, returns the value and the position."
+    res = 0
+    shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        res |= (b & 0x7f) << shift
+        if b < 0x80:
+            return res, pos
+        shift += 7
+
+
+def _enumerate_fields(buf, begin, end):
+    """
+    Enumerates the fields of a serialized protobuf message
+    without parsing it, yields `(field number, begin, end)`
+    for every length-delimited field.
+    """
+    pos = begin
+    while pos < end:
+        key, pos = _read_varint(buf, pos)
+        wire = key & 7
+        if wire == 0:
+            _, pos = _read_varint(buf, pos)
+        elif wire == 1:
+            pos += 8
+        elif wire == 5:
+            pos += 4
+        elif wire == 2:
+            size, pos = _read_varint(buf, pos)
+            yield key >> 3, pos, pos + size
+            pos += size
+        else:
+            raise ValueError(  # pragma: no cover
+                "Unexpected wire type %d at position %d." % (wire, pos))
+
+
+def raw_data_locations(filename):
+    """
+    Returns the position in an :epkg:`ONNX` file of the raw data
+    of every initializer of the main graph. The file is scanned
+    without being parsed, only the headers of the fields are read.
+
+    :param filename: filename
+    :return: dictionary `{name: (offset, length)}`
+    """
+    res = {}
+    with open(filename, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return res
+        with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as buf:
+            for field, gb, ge in _enumerate_fields(buf, 0, size):
+                if field != _model_graph:
+                    continue
+                for field, tb, te in _enumerate_fields(buf, gb, ge):
+                    if field != _graph_initializer:
+                        continue
+                    name = None
+                    raw = None
+                    for field, b, e in _enumerate_fields(buf, tb, te):
+                        if field == _tensor_name:
+                            name = bytes(buf[b:e]).decode('utf-8')
+                        elif field == _tensor_raw_data:
+                            raw = (b, e - b)
+                    if name is not None and raw is not None:
+                        res[name] = raw
+    return res
+
+
+def _mapped_dtype(tensor, offset, length):
+    """
+    Returns the numpy type if the tensor can be mapped in memory
+    (a numerical type, at least one element, aligned in the file),
+    None otherwise.
+    """
+    if sys.byteorder != 'little':
+        return None  # pragma: no cover
+    dtype = _mapped_types.get(tensor.data_type, None)
+    if dtype is None:
+        return None
+    dtype = numpy.dtype(dtype)
+    count = int(numpy.prod(tensor.dims, dtype=numpy.int64))
+    if count <= 0 or (length is not None and
+                      length != count * dtype.itemsize):
+        return None
+    if offset % dtype.itemsize != 0:
+        # C++ kernels expect aligned pointers
+        return None
+    return dtype
+
+
+def _enumerate_external_tensors(graph, top=True):
+    """
+    Enumerates all tensors stored as external data in a graph
+    (initializers, attributes, subgraphs), yields `(top, tensor)`,
+    *top* is True for the initializers of the main graph.
+    """
+    for init in graph.initializer:
+        if uses_external_data(init):
+            yield top, init
+    for node in graph.node:
+        for att in node.attribute:
+            if uses_external_data(att.t):
+                yield False, att.t
+            for t in att.tensors:
+                if uses_external_data(t):
+                    yield False, t
+            if att.HasField('g'):
+                for r in _enumerate_external_tensors(att.g, False):
+                    yield r
+            for g in att.graphs:
+                for r in _enumerate_external_tensors(g, False):
+                    yield r
+
+
+def map_initializers(model, base_dir, filename=None):
+    """
+    Maps the initializers of the main graph in memory instead of
+    loading them. The arrays are read-only views on the files,
+    every process mapping the same file shares the same memory
+    pages (page cache), the data is read from the disk when it is
+    used for the first time.
+
+    :param model: ModelProto loaded with ``load_external_data=False``
+    :param base_dir: directory of the external data
+    :param filename: file the model was loaded from, the initializers
+        stored in the file itself (field *raw_data*) are mapped as well,
+        their data is removed from *model* and replaced by a reference
+        to the file, *model* remains a valid model in *base_dir*
+    :return: dictionary `{name: array}`
+
+    Tensors which cannot be mapped (strings, empty tensors,
+    data not aligned in the file...) and external data
+    used by attributes or subgraphs are loaded into *model*
+    as :epkg:`onnx` usually does.
+    """
+    graph = model.graph
+    if filename is not None:
+        location = os.path.basename(filename)
+        raw = raw_data_locations(filename)
+        for init in graph.initializer:
+            if (init.name not in raw or uses_external_data(init) or
+                    raw[init.name][1] != len(init.raw_data)):
+                continue
+            offset, length = raw[init.name]
+            if _mapped_dtype(init, offset, length) is None:
+                continue
+            set_external_data(init, location, offset, length)
+            init.ClearField('raw_data')
+
+    # one mapping per file, the arrays keep a reference on it
+    maps = {}
+    res = {}
+    for top, tensor in _enumerate_external_tensors(graph):
+        info = ExternalDataInfo(tensor)
+        offset = info.offset or 0
+        dtype = (_mapped_dtype(tensor, offset, info.length)
+                 if top else None)
+        if dtype is None:
+            load_external_data_for_tensor(tensor, base_dir)
+            tensor.data_location = TensorProto.DEFAULT
+            del tensor.external_data[:]
+            continue
+        path = os.path.join(base_dir, info.location)
+        if path not in maps:
+            with open(path, 'rb') as f:
+                maps[path] = mmap.mmap(
+                    f.fileno(), 0, access=mmap.ACCESS_READ)
+        count = int(numpy.prod(tensor.dims, dtype=numpy.int64))
+        res[tensor.name] = numpy.frombuffer(
+            maps[path], dtype=dtype, count=count,
+            offset=offset).reshape(tuple(tensor.dims))
+    return res
@@ -21,6 +21,12 @@ class OnnxInferenceNode:
     :param global_index: it is a function which returns a unique index
         for the output this operator generates
     """
+    # operators whose output may share the memory of the first input,
+    # see OnnxInference._guess_inplace and OnnxParallelScheduler
+    view_ops = frozenset({
+        'Cast', 'Dropout', 'Expand', 'Flatten', 'Identity', 'Reshape',
+        'Slice', 'Split', 'Squeeze', 'Transpose', 'Unsqueeze'})
+
     class OnnxInferenceWrapper:
         """
         Wraps @see cl OnnxInference in a wrapper and exposes
@@ -131,6 +137,7 @@ class OnnxInferenceNode:
         self.op_type = self.onnx_node.op_type
         self.order = -1
         self.variable_to_clean = []
+        self.variable_to_clean_indices = []
         self.inputs = list(self.onnx_node.input)
         self.outputs = list(self.onnx_node.output)
         self.inplaces = []
@@ -150,6 +157,7 @@ class OnnxInferenceNode:
         execution.
         """
         self.variable_to_clean.append(name)
+        self.variable_to_clean_indices.append(self._global_index(name))
 
     def __str__(self):
         "usual"
@@ -481,6 +489,23 @@ class OnnxInferenceNode:
             for i, r in enumerate(res):
                 values[self.outputs_indices[i]] = r
 
+    def run_out(self, values, out, attributes=None):
+        """
+        Runs the node and stores its only output into the
+        preallocated buffer *out* (see @see cl OnnxMemoryPlan).
+        The node runs the usual way if the operator cannot use *out*.
+
+        :param values: list of existing values
+        :param out: preallocated buffer
+        :param attributes: attributes known at function level
+        """
+        args = list(values[k] for k in self.inputs_indices)
+        res = self.ops_._run_out(out, *args)  # pylint: disable=W0212
+        if res is None:
+            self.run(values, attributes=attributes)
+        else:
+            values[self.outputs_indices[0]] = res[0]
+
     def switch_initializers_dtype(self, dtype_in=numpy.float32,
                                   dtype_out=numpy.float64):
         """
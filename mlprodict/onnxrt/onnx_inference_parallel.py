@@ -0,0 +1,178 @@
+"""
+@file
+@brief Parallel execution of the python runtime,
+see @see cl OnnxParallelScheduler.
+
+.. versionadded:: 0.9
+"""
+from concurrent.futures import (
+    CancelledError, ThreadPoolExecutor, wait, FIRST_COMPLETED)
+from functools import partial
+from ..onnx_tools.onnx_manipulations import get_hidden_inputs
+from .onnx_inference_node import OnnxInferenceNode
+
+
+class OnnxParallelScheduler:
+    """
+    Executes the nodes of a graph with a pool of threads.
+    A node is dispatched as soon as all the nodes it depends on
+    are done. Most of the heavy kernels (:epkg:`numpy` BLAS functions,
+    tree ensembles or SVM implemented in C++) release the GIL,
+    independent branches of a graph can run at the same time.
+
+    :param sequence: list of @see cl OnnxInferenceNode
+        (topological order)
+    :param n_jobs: number of threads
+
+    A node depends on the nodes producing its inputs, including
+    the hidden inputs of its subgraphs. A node computing inplace
+    overwrites one of its inputs, it is executed in the same order
+    as the sequential runtime relatively to every node reading
+    this input or any result it is a view of. The results are
+    the same as the sequential execution.
+    """
+
+    def __init__(self, sequence, n_jobs):
+        if n_jobs <= 1:
+            raise ValueError(  # pragma: no cover
+                "n_jobs must be > 1 not %r." % n_jobs)
+        self.sequence = sequence
+        self.n_jobs = n_jobs
+        self._executor = None
+        self._build()
+
+    def __getstate__(self):
+        "The pool of threads is not pickled."
+        state = self.__dict__.copy()
+        state['_executor'] = None
+        return state
+
+    def __del__(self):
+        if getattr(self, '_executor', None) is not None:
+            self._executor.shutdown(wait=False)
+
+    def _build(self):
+        "Builds the dependencies between nodes."
+        inputs = [
+            [i for i in get_hidden_inputs([node.onnx_node]) if i != '']
+            for node in self.sequence]
+        producer = {}
+        readers = {}
+        for i, node in enumerate(self.sequence):
+            for name in inputs[i]:
+                readers.setdefault(name, []).append(i)
+            for name in node.outputs:
+                producer[name] = i
+
+        edges = set()
+        for i, names in enumerate(inputs):
+            for name in names:
+                if name in producer:
+                    edges.add((producer[name], i))
+
+        # inplace computation
+        for i, node in enumerate(self.sequence):
+            for name in node.inplaces:
+                aliases = [name]
+                while name in producer:
+                    prod = self.sequence[producer[name]]
+                    if prod.op_type not in OnnxInferenceNode.view_ops:
+                        break
+                    name = prod.inputs[0]
+                    aliases.append(name)
+                for name in aliases:
+                    for r in readers.get(name, []):
+                        if r < i:
+                            edges.add((r, i))
+                        elif r > i:
+                            edges.add((i, r))
+
+        self.successors = [[] for node in self.sequence]
+        self.npred = [0 for node in self.sequence]
+        for a, b in sorted(edges):
+            self.successors[a].append(b)
+            self.npred[b] += 1
+        self.roots = [i for i, n in enumerate(self.npred) if n == 0]
+
+        # intermediate results released when clean_right_away is True
+        self.inputs_indices = [
+            [node._global_index(name) for name in names]  # pylint: disable=W0212
+            for node, names in zip(self.sequence, inputs)]
+        releasable = set()
+        for node in self.sequence:
+            releasable |= set(node.variable_to_clean_indices)
+        self.nreaders = {}
+        for i, indices in enumerate(self.inputs_indices):
+            for k in indices:
+                if k in releasable:
+                    self.nreaders[k] = self.nreaders.get(k, 0) + 1
+        self.unused = [
+            [k for k in node.outputs_indices
+             if k in releasable and k not in self.nreaders]
+            for node in self.sequence]
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.n_jobs)
+        return self._executor
+
+    def run(self, values, attributes=None, clean_right_away=False,
+            profiler=None, cancel=None):
+        """
+        Executes the graph.
+
+        :param values: list of values, updated by every node
+        :param attributes: attributes if the graph is a function
+        :param clean_right_away: releases intermediate results
+            once every node using them is done
+        :param profiler: @see cl OnnxProfiler recording every node or None
+        :param cancel: :class:`threading.Event`, no node is started
+            once it is set, the method waits for the running nodes and
+            raises :class:`concurrent.futures.CancelledError`
+        """
+        if profiler is None:
+            runs = [node.run for node in self.sequence]
+        else:
+            runs = [partial(profiler.run_node, i, node)
+                    for i, node in enumerate(self.sequence)]
+        npred = list(self.npred)
+        nreaders = dict(self.nreaders) if clean_right_away else None
+        ready = list(self.roots)
+        running = {}
+        executor = self._get_executor()
+        try:
+            while ready or running:
+                if cancel is not None and cancel.is_set():
+                    raise CancelledError("The run was cancelled.")
+                if len(ready) == 1 and len(running) == 0:
+                    # no need to use a thread
+                    done = ready
+                    runs[done[0]](values, attributes=attributes)
+                else:
+                    for i in ready:
+                        future = executor.submit(
+                            runs[i], values, attributes=attributes)
+                        running[future] = i
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    done = []
+                    for future in finished:
+                        done.append(running.pop(future))
+                        future.result()
+                ready = []
+                for i in done:
+                    for j in self.successors[i]:
+                        npred[j] -= 1
+                        if npred[j] == 0:
+                            ready.append(j)
+                    if nreaders is not None:
+                        for k in self.unused[i]:
+                            values[k] = None
+                        for k in self.inputs_indices[i]:
+                            if k not in nreaders:
+                                continue
+                            nreaders[k] -= 1
+                            if nreaders[k] == 0:
+                                values[k] = None
+        finally:
+            if running:
+                wait(running)
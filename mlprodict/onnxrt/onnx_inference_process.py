@@ -0,0 +1,194 @@
+"""
+@file
+@brief Splits large batches across processes,
+see @see cl ProcessPoolInference.
+
+.. versionadded:: 0.9
+"""
+import io
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+import numpy
+from .onnx_inference_snapshot import save_snapshot, load_snapshot
+
+
+# model loaded once in every worker
+_worker = {}
+
+
+def _init_worker(snapshot):
+    "Restores the model in a worker, see @see fn load_snapshot."
+    _worker['oinf'] = load_snapshot(snapshot)
+
+
+def _run_shard(specs, begin, end, kwargs):
+    """
+    Computes the predictions for rows *begin* to *end*
+    in a worker.
+
+    :param specs: dictionary `{name: ('shm', block name, shape, dtype)}`
+        for inputs stored in shared memory or `{name: ('value', value)}`
+        for the others (already sliced)
+    :param begin: first row
+    :param end: last row (excluded)
+    :param kwargs: additional parameters for method *run*
+    :return: dictionary of outputs
+    """
+    blocks = []
+    try:
+        feeds = {}
+        for name, spec in specs.items():
+            if spec[0] == 'shm':
+                shm = SharedMemory(name=spec[1])
+                blocks.append(shm)
+                feeds[name] = numpy.ndarray(
+                    spec[2], dtype=spec[3], buffer=shm.buf)[begin:end]
+            else:
+                feeds[name] = spec[1]
+        res = _worker['oinf'].run(feeds, **kwargs)
+        # an output may be a view on the shared memory
+        res = {k: (v.copy() if isinstance(v, numpy.ndarray) and
+                   v.base is not None else v)
+               for k, v in res.items()}
+        del feeds
+        return res
+    finally:
+        for shm in blocks:
+            shm.close()
+
+
+def _concat(name, values):
+    "Concatenates the outputs of every shard."
+    if isinstance(values[0], numpy.ndarray):
+        if any(len(v.shape) == 0 for v in values):
+            raise RuntimeError(
+                "Output %r has no first dimension and cannot be "
+                "concatenated." % name)
+        return numpy.concatenate(values, axis=0)
+    if isinstance(values[0], list):
+        res = []
+        for v in values:
+            res.extend(v)
+        return res
+    raise TypeError(  # pragma: no cover
+        "Unable to concatenate output %r of type %r." % (
+            name, type(values[0])))
+
+
+class ProcessPoolInference:
+    """
+    Computes the predictions of large batches with several processes.
+    Every worker restores the model once from a snapshot
+    (see @see fn save_snapshot) and keeps it until the pool is closed.
+    Method @see me run copies every numerical input once into
+    :class:`multiprocessing.shared_memory.SharedMemory`, every worker
+    computes a contiguous range of rows on a view of this memory,
+    the outputs are concatenated in the original order.
+    Inputs which are not numerical arrays (strings, lists) are pickled.
+    Outputs must have one row per input row, it includes the list of
+    dictionaries produced by *ZipMap*. It avoids the global interpreter
+    lock in operators implemented in python (*ZipMap*, *LabelEncoder*,
+    string operators).
+
+    :param oinf: @see cl OnnxInference or the filename of a snapshot,
+        a file is mapped in memory by every worker and the initializers
+        are shared between processes
+    :param n_jobs: number of processes, None for all cores
+    :param min_rows: minimum number of rows per worker, smaller batches
+        use less workers, a batch smaller than *2 min_rows* is computed
+        in the main process
+    :param mp_context: see :class:`concurrent.futures.ProcessPoolExecutor`
+
+    ::
+
+        with ProcessPoolInference(OnnxInference(onx), n_jobs=8) as pool:
+            res = pool.run({'X': X})
+    """
+
+    def __init__(self, oinf, n_jobs=None, min_rows=1024, mp_context=None):
+        if min_rows < 1:
+            raise ValueError(  # pragma: no cover
+                "min_rows must be >= 1 not %r." % min_rows)
+        if isinstance(oinf, str):
+            snapshot = oinf
+            oinf = load_snapshot(snapshot)
+        else:
+            st = io.BytesIO()
+            save_snapshot(oinf, st)
+            snapshot = st.getvalue()
+        self.oinf = oinf
+        self.min_rows = min_rows
+        self._executor = ProcessPoolExecutor(
+            max_workers=n_jobs, mp_context=mp_context,
+            initializer=_init_worker, initargs=(snapshot, ))
+        self.n_jobs = self._executor._max_workers  # pylint: disable=W0212
+
+    def __enter__(self):
+        "usual"
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        "usual"
+        self.close()
+
+    def close(self):
+        """
+        Stops the workers.
+        """
+        self._executor.shutdown(wait=True)
+
+    def _split(self, n_rows):
+        "Returns the ranges of rows computed by every worker."
+        n_shards = min(self.n_jobs, n_rows // self.min_rows)
+        bounds = numpy.linspace(0, n_rows, n_shards + 1).astype(numpy.int64)
+        return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+    def run(self, inputs, **kwargs):
+        """
+        Computes the predictions.
+
+        :param inputs: dictionary `{name: array}`,
+            every input has the same first dimension
+        :param kwargs: additional parameters for method
+            :meth:`OnnxInference.run
+            <mlprodict.onnxrt.onnx_inference.OnnxInference.run>`
+        :return: dictionary of outputs
+        """
+        n_rows = set(len(v) for v in inputs.values())
+        if len(n_rows) != 1:
+            raise ValueError(
+                "Every input must have the same number of rows, got %r."
+                "" % {k: len(v) for k, v in inputs.items()})
+        shards = self._split(n_rows.pop())
+        if len(shards) <= 1:
+            return self.oinf.run(inputs, **kwargs)
+
+        blocks = []
+        try:
+            specs = {}
+            for name, value in inputs.items():
+                if (isinstance(value, numpy.ndarray) and
+                        value.dtype != numpy.object_ and value.nbytes > 0):
+                    shm = SharedMemory(create=True, size=value.nbytes)
+                    blocks.append(shm)
+                    numpy.ndarray(value.shape, dtype=value.dtype,
+                                  buffer=shm.buf)[...] = value
+                    specs[name] = ('shm', shm.name, value.shape, value.dtype)
+                else:
+                    specs[name] = None
+
+            futures = []
+            for begin, end in shards:
+                shard_specs = {
+                    k: (v if v is not None
+                        else ('value', inputs[k][begin:end]))
+                    for k, v in specs.items()}
+                futures.append(self._executor.submit(
+                    _run_shard, shard_specs, begin, end, kwargs))
+            results = [f.result() for f in futures]
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+        return {k: _concat(k, [r[k] for r in results]) for k in results[0]}
@@ -0,0 +1,205 @@
+"""
+@file
+@brief Profiling of the python runtime, see @see cl OnnxProfiler.
+
+.. versionadded:: 0.9
+"""
+import json
+import os
+import threading
+from collections import deque
+from time import perf_counter
+import numpy
+from .ops_whole.session import OnnxWholeSession
+
+
+_type_names = {
+    numpy.float32: 'float', numpy.float64: 'double',
+    numpy.float16: 'float16', numpy.bool_: 'bool',
+    numpy.object_: 'string', numpy.str_: 'string'}
+
+
+def _type_shape(value):
+    "Returns the type and the shape of a result as :epkg:`onnxruntime` does."
+    if value is None:
+        return {}
+    if hasattr(value, 'dtype') and hasattr(value, 'shape'):
+        name = _type_names.get(value.dtype.type, value.dtype.name)
+        return {name: list(value.shape)}
+    return {type(value).__name__: []}
+
+
+def _nbytes(value):
+    "Returns the size of a result in bytes, 0 if unknown."
+    return getattr(value, 'nbytes', 0) if value is not None else 0
+
+
+class OnnxProfiler:
+    """
+    Records the execution of every node of the python runtime
+    over many runs. Every event follows the format used by
+    :epkg:`onnxruntime` (Chrome trace), the node events store
+    the operator type, the type and shape of the inputs and outputs,
+    the size of the outputs, the size of the initializers (parameters)
+    and of the other inputs (activations) and the thread which ran
+    the node. The profiler is enabled with
+    ``runtime_options={'enable_profiling': True}``.
+
+    :param inits: names of the initializers
+    :param max_events: maximum number of stored events,
+        the oldest ones are removed first
+
+    ::
+
+        oinf = OnnxInference(onx, runtime_options={'enable_profiling': True})
+        for i in range(100):
+            oinf.run({'X': X})
+        df = oinf.get_profiling(as_df=True)
+        oinf.profiler_.to_chrome_trace("profile.json")
+    """
+
+    def __init__(self, inits=None, max_events=1000000):
+        self.inits = set(inits or [])
+        self.max_events = max_events
+        self.reset()
+
+    def __repr__(self):
+        "usual"
+        return "%s(%d events)" % (self.__class__.__name__, len(self.events))
+
+    def reset(self):
+        "Removes every recorded event."
+        self.events = deque(maxlen=self.max_events)
+        self._start = perf_counter()
+        self._pid = os.getpid()
+
+    def _ts(self, t):
+        "Converts a time into microseconds since the profiler started."
+        return int((t - self._start) * 1e6)
+
+    def run_node(self, index, node, values, attributes=None):
+        """
+        Runs a node and records its execution.
+
+        :param index: index of the node in the sequence
+        :param node: @see cl OnnxInferenceNode
+        :param values: list of values, updated by the node
+        :param attributes: attributes if the graph is a function
+        """
+        begin = perf_counter()
+        node.run(values, attributes=attributes)
+        end = perf_counter()
+
+        inputs = [values[i] for i in node.inputs_indices]
+        outputs = [values[i] for i in node.outputs_indices]
+        params = sum(_nbytes(v) for n, v in zip(node.inputs, inputs)
+                     if n in self.inits)
+        activations = sum(_nbytes(v) for n, v in zip(node.inputs, inputs)
+                          if n not in self.inits)
+        name = node.onnx_node.name or "%s_%d" % (node.op_type, index)
+        self.events.append({
+            'cat': 'Node', 'pid': self._pid,
+            'tid': threading.get_native_id(),
+            'dur': self._ts(end) - self._ts(begin), 'ts': self._ts(begin),
+            'ph': 'X', 'name': name + '_kernel_time',
+            'args': {
+                'op_name': node.op_type,
+                'node_index': str(index),
+                'provider': 'python',
+                'output_size': str(sum(_nbytes(v) for v in outputs)),
+                'parameter_size': str(params),
+                'activation_size': str(activations),
+                'input_type_shape': [_type_shape(v) for v in inputs],
+                'output_type_shape': [_type_shape(v) for v in outputs],
+                'thread_scheduling_stats': ''}})
+
+    def add_run(self, begin, end):
+        """
+        Records a call to method *run*.
+
+        :param begin: time returned by `perf_counter` before the run
+        :param end: time returned by `perf_counter` after the run
+        """
+        self.events.append({
+            'cat': 'Session', 'pid': self._pid,
+            'tid': threading.get_native_id(),
+            'dur': self._ts(end) - self._ts(begin), 'ts': self._ts(begin),
+            'ph': 'X', 'name': 'model_run'})
+
+    def to_chrome_trace(self, filename=None):
+        """
+        Exports the events in Chrome trace format
+        (``chrome://tracing``), the same format as :epkg:`onnxruntime`.
+
+        :param filename: file to write or None
+        :return: list of events
+        """
+        events = list(self.events)
+        if filename is not None:
+            with open(filename, 'w') as f:
+                json.dump(events, f)
+        return events
+
+    def get_profiling(self, as_df=False):
+        """
+        Returns the events with the same columns as
+        :meth:`OnnxWholeSession.process_profiling
+        <mlprodict.onnxrt.ops_whole.session.OnnxWholeSession.process_profiling>`.
+
+        :param as_df: returns a dataframe
+        :return: list of dictionaries or dataframe
+        """
+        rows = OnnxWholeSession.process_profiling(
+            [dict(e, args=dict(e['args'])) if 'args' in e else dict(e)
+             for e in self.events])
+        if as_df:
+            import pandas
+            return pandas.DataFrame(rows)
+        return rows
+
+    def _node_events(self):
+        "Groups the node events by node."
+        nodes = {}
+        for e in self.events:
+            if e['cat'] != 'Node':
+                continue
+            key = int(e['args']['node_index']), e['name'][:-12]
+            nodes.setdefault(key, []).append(e)
+        return nodes
+
+    def histograms(self, bins=10):
+        """
+        Returns the histogram of the duration of every node.
+
+        :param bins: see :epkg:`numpy:histogram`
+        :return: dictionary `{(node index, node name): (counts, edges)}`,
+            durations are in microseconds
+        """
+        res = {}
+        for key, events in sorted(self._node_events().items()):
+            res[key] = numpy.histogram(
+                numpy.array([e['dur'] for e in events]), bins=bins)
+        return res
+
+    def summary(self):
+        """
+        Aggregates the events by node.
+
+        :return: dataframe, one row per node, durations are in
+            microseconds, sizes in bytes
+        """
+        import pandas
+        rows = []
+        for (index, name), events in sorted(self._node_events().items()):
+            durs = numpy.array([e['dur'] for e in events], dtype=numpy.float64)
+            sizes = numpy.array([int(e['args']['output_size'])
+                                 for e in events], dtype=numpy.int64)
+            rows.append({
+                'node_index': index, 'name': name,
+                'op_name': events[0]['args']['op_name'],
+                'count': len(events), 'total': durs.sum(),
+                'mean': durs.mean(), 'min': durs.min(),
+                'median': numpy.median(durs), 'max': durs.max(),
+                'output_size': sizes.mean(),
+                'threads': len(set(e['tid'] for e in events))})
+        return pandas.DataFrame(rows)
@@ -0,0 +1,234 @@
+"""
+@file
+@brief Saves and restores a fully initialized @see cl OnnxInference,
+see @see fn save_snapshot, @see fn load_snapshot.
+
+.. versionadded:: 0.9
+"""
+import io
+import mmap
+import os
+import pickle
+import struct
+from collections import OrderedDict
+from onnx.defs import OpSchema, get_schema
+from .ops_cpu._op import OpRun
+
+
+_magic = b'MLPSNAP1'
+# offset of every buffer stored out of the pickle stream
+_alignment = 64
+# smaller buffers remain in the pickle stream
+_min_buffer_size = 4096
+# attributes rebuilt when the snapshot is loaded,
+# inferred shapes may hold local functions
+_skipped_attributes = {
+    '_run', '_run_compiled', '_memory_plans', '_fast_plans', 'exporters_',
+    'shapes_', 'to_json', 'to_dot', 'to_python', 'to_text',
+    'to_onnx_code'}
+
+
+def _restore_schema(name, domain, version):
+    "Returns the schema of an operator."
+    return get_schema(name, version, domain)
+
+
+def _restore_node(model, index):
+    "Returns a node of a graph."
+    graph = model.graph if hasattr(model, 'graph') else model
+    return graph.node[index]
+
+
+def _restore_op(cl, onnx_node, desc, options, inplaces):
+    "Creates again an operator which cannot be pickled."
+    op = cl(onnx_node, desc=desc, **options)
+    op.inplaces = inplaces
+    return op
+
+
+def _new_inference(cl):
+    "Creates an empty instance of @see cl OnnxInference."
+    return cl.__new__(cl)
+
+
+def _restore_inference(oinf, state):
+    "Restores the state saved by @see cl _SnapshotPickler."
+    state = state.copy()
+    run = state.pop('_run', None)
+    shapes = state.pop('shapes_', None)
+    fast_plans = state.pop('_fast_plans', False)
+    oinf.__dict__.update(state)
+    if shapes is not None:
+        oinf.shapes_ = (oinf._set_shape_inference_runtime()
+                        if shapes else None)
+    if oinf.memory_planning and hasattr(oinf, 'sequence_'):
+        oinf._memory_plans = OrderedDict()
+    if fast_plans:
+        oinf._fast_plans = OrderedDict()
+    oinf._init_methods()
+    if run is not None:
+        oinf._run = getattr(oinf, run)
+
+
+def _is_picklable_op(op):
+    """
+    Tells if an operator can be pickled with all its attributes.
+    :epkg:`pybind11` classes must implement ``__setstate__``,
+    functions must be defined at module level.
+    """
+    for v in op.__dict__.values():
+        tv = type(v)
+        if type(tv).__name__ == 'pybind11_type':
+            if not hasattr(tv, '__setstate__'):
+                return False
+        elif callable(v) and '<' in getattr(v, '__qualname__', '<'):
+            return False
+    return True
+
+
+class _SnapshotPickler(pickle.Pickler):
+    """
+    Pickles every attribute of @see cl OnnxInference
+    (including the initialized operators) instead of
+    the ONNX graph returned by method ``__getstate__``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        pickle.Pickler.__init__(self, *args, **kwargs)
+        self._nodes = {}
+
+    def reducer_override(self, obj):  # pylint: disable=R0911
+        "Overwrites the way some objects are pickled."
+        if isinstance(obj, OpSchema):
+            return _restore_schema, (obj.name, obj.domain, obj.since_version)
+        if id(obj) in self._nodes:
+            return _restore_node, self._nodes[id(obj)]
+        if isinstance(obj, OpRun):
+            if _is_picklable_op(obj):
+                return NotImplemented
+            options = getattr(obj, '_load_options', None)
+            if options is None:
+                raise RuntimeError(  # pragma: no cover
+                    "Operator %r cannot be pickled and was not created by "
+                    "function load_op." % type(obj))
+            return _restore_op, (obj.__class__, obj.onnx_node, obj.desc,
+                                 options, obj.inplaces)
+        from .onnx_inference import OnnxInference
+        if isinstance(obj, OnnxInference):
+            if (obj.runtime is not None and
+                    obj.runtime.startswith('onnxruntime')):
+                # onnxruntime owns the initialized structures,
+                # only the ONNX graph is saved
+                return NotImplemented
+            graph = obj.obj.graph if hasattr(obj.obj, 'graph') else obj.obj
+            for i, node in enumerate(graph.node):
+                self._nodes[id(node)] = (obj.obj, i)
+            state = {k: v for k, v in obj.__dict__.items()
+                     if k not in _skipped_attributes}
+            if '_run' in obj.__dict__:
+                state['_run'] = obj._run.__name__
+            if 'shapes_' in obj.__dict__:
+                state['shapes_'] = obj.shapes_ is not None
+            if '_fast_plans' in obj.__dict__:
+                state['_fast_plans'] = True
+            return (_new_inference, (obj.__class__, ), state,
+                    None, None, _restore_inference)
+        return NotImplemented
+
+
+def save_snapshot(oinf, filename):
+    """
+    Saves an instance of @see cl OnnxInference with every
+    structure built when the model was loaded (operators,
+    C++ runtimes of tree ensembles...). Function @see fn load_snapshot
+    restores it without going through the ONNX graph again.
+    Pickle protocol 5 stores every large array out of the
+    pickle stream, aligned in the file, @see fn load_snapshot
+    maps the file in memory and the arrays become views.
+
+    :param oinf: @see cl OnnxInference
+    :param filename: filename or bytes stream
+
+    The snapshot is only meant to be restored with the same versions
+    of :epkg:`mlprodict`, :epkg:`onnx` and :epkg:`python`.
+    Runtimes based on :epkg:`onnxruntime` only save the ONNX graph.
+    C++ operators implementing pickle (tree ensembles for runtime
+    version > 0) are restored with a copy of their arrays, other
+    C++ operators are created again from their ONNX node.
+    """
+    buffers = []
+
+    def buffer_callback(buf):
+        if buf.raw().nbytes < _min_buffer_size:
+            return True
+        buffers.append(buf)
+        return False
+
+    st = io.BytesIO()
+    _SnapshotPickler(st, protocol=5,
+                     buffer_callback=buffer_callback).dump(oinf)
+    data = st.getvalue()
+
+    raws = [buf.raw() for buf in buffers]
+    header = len(_magic) + 8 * (2 + 2 * len(raws))
+    offset = header + len(data)
+    table = []
+    for raw in raws:
+        offset += (- offset) % _alignment
+        table.append((offset, raw.nbytes))
+        offset += raw.nbytes
+
+    def _write(f):
+        f.write(_magic)
+        f.write(struct.pack('<QQ', len(data), len(raws)))
+        for off, size in table:
+            f.write(struct.pack('<QQ', off, size))
+        f.write(data)
+        pos = header + len(data)
+        for (off, _), raw in zip(table, raws):
+            f.write(b'\0' * (off - pos))
+            f.write(raw)
+            pos = off + raw.nbytes
+
+    if isinstance(filename, str):
+        with open(filename, 'wb') as f:
+            _write(f)
+    else:
+        _write(filename)
+
+
+def load_snapshot(filename, use_mmap=True):
+    """
+    Restores an instance of @see cl OnnxInference
+    saved by @see fn save_snapshot.
+
+    :param filename: filename or bytes (copied)
+    :param use_mmap: maps the file in memory (copy-on-write),
+        the large arrays are not copied but read from the
+        file when they are used, processes loading the same
+        file share the same memory pages until they modify them
+    :return: @see cl OnnxInference
+    """
+    if isinstance(filename, bytes):
+        content = memoryview(bytearray(filename))
+    elif use_mmap:
+        with open(filename, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            content = memoryview(
+                mmap.mmap(f.fileno(), size, access=mmap.ACCESS_COPY)
+                if size > 0 else b'')
+    else:
+        with open(filename, 'rb') as f:
+            content = memoryview(f.read())
+
+    if bytes(content[:len(_magic)]) != _magic:
+        raise ValueError("Unexpected format, not a snapshot.")
+    pos = len(_magic)
+    size, nbuf = struct.unpack('<QQ', content[pos:pos + 16])
+    pos += 16
+    buffers = []
+    for _ in range(nbuf):
+        off, length = struct.unpack('<QQ', content[pos:pos + 16])
+        buffers.append(content[off:off + length])
+        pos += 16
+    return pickle.loads(content[pos:pos + size], buffers=buffers)
@@ -0,0 +1,113 @@
+"""
+@file
+@brief Helpers to compute predictions chunk by chunk,
+see @see fn enumerate_chunks, @see fn write_chunk.
+
+.. versionadded:: 0.9
+"""
+import numpy
+
+
+def _is_dataframe(data):
+    "Tells if *data* is a dataframe without importing :epkg:`pandas`."
+    return hasattr(data, 'columns') and hasattr(data, 'iloc')
+
+
+def _split_chunk(data, chunk_size):
+    "Splits one array, dataframe or dictionary into chunks of rows."
+    if isinstance(data, dict):
+        if len(data) == 0:
+            raise ValueError(  # pragma: no cover
+                "Inputs cannot be an empty dictionary.")
+        n_rows = set(len(v) for v in data.values())
+        if len(n_rows) != 1:
+            raise ValueError(
+                "Every input must have the same number of rows, got %r."
+                "" % {k: len(v) for k, v in data.items()})
+        n_rows = n_rows.pop()
+    elif _is_dataframe(data) or isinstance(data, numpy.ndarray):
+        n_rows = data.shape[0]
+    else:
+        raise TypeError(
+            "Unexpected type %r, a chunk must be an array, a dataframe "
+            "or a dictionary of arrays." % type(data))
+
+    if chunk_size is None or n_rows <= chunk_size:
+        steps = [(0, n_rows)]
+    else:
+        steps = [(i, min(i + chunk_size, n_rows))
+                 for i in range(0, n_rows, chunk_size)]
+
+    for begin, end in steps:
+        if isinstance(data, dict):
+            yield {k: _slice(v, begin, end, n_rows)
+                   for k, v in data.items()}
+        elif _is_dataframe(data):
+            yield data if end - begin == n_rows else data.iloc[begin:end]
+        else:
+            yield _slice(data, begin, end, n_rows)
+
+
+def _slice(value, begin, end, n_rows):
+    """
+    Returns rows *begin* to *end* of *value*. A :class:`numpy.memmap`
+    becomes a regular array viewing the mapped memory, only the pages
+    of the chunk are read.
+    """
+    if isinstance(value, numpy.ndarray):
+        value = numpy.asarray(value)
+    return value if end - begin == n_rows else value[begin:end]
+
+
+def enumerate_chunks(inputs, chunk_size=None):
+    """
+    Splits inputs into chunks of at most *chunk_size* rows.
+
+    :param inputs: an array, a :class:`numpy.memmap`, a dataframe,
+        a dictionary of arrays sharing the same number of rows or
+        an iterator on any of them
+    :param chunk_size: maximum number of rows in a chunk,
+        None to keep the chunks as they are
+    :return: iterator on chunks of the same type as the inputs,
+        chunks produced by an iterator are split but never merged
+
+    ::
+
+        X = numpy.memmap('data.bin', dtype=numpy.float32,
+                         shape=(10000000, 10))
+        for chunk in enumerate_chunks(X, 65536):
+            ...
+    """
+    if chunk_size is not None and chunk_size <= 0:
+        raise ValueError(
+            "chunk_size must be positive not %r." % chunk_size)
+    if (isinstance(inputs, (dict, numpy.ndarray)) or
+            _is_dataframe(inputs)):
+        inputs = [inputs]
+    for data in inputs:
+        for chunk in _split_chunk(data, chunk_size):
+            yield chunk
+
+
+def write_chunk(output, begin, value, name=None):
+    """
+    Copies one chunk of results into a preallocated array.
+
+    :param output: preallocated array (or :class:`numpy.memmap`)
+    :param begin: first row to write
+    :param value: results for the chunk
+    :param name: output name, only used in error messages
+    :return: the view of *output* receiving the chunk
+    """
+    if not hasattr(value, 'shape'):
+        raise TypeError(
+            "Output %r cannot be written in an array, type is %r."
+            "" % (name, type(value)))
+    end = begin + value.shape[0]
+    if end > output.shape[0]:
+        raise ValueError(
+            "Output %r is too small, it has %d rows but %d are needed."
+            "" % (name, output.shape[0], end))
+    view = output[begin:end]
+    view[...] = value
+    return view
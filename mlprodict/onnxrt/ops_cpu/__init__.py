@@ -6,7 +6,7 @@
 import textwrap
 from ..excs import MissingOperatorError
 from ._op import OpRunCustom
-from ._op_list import __dict__ as d_op_list
+from ._op_list import _op_modules, get_op_class
 
 
 _additional_ops = {}
@@ -58,7 +58,7 @@ def load_op(onnx_node, desc=None, options=None, runtime=None):
         name_opset = name + "_" + str(opset)
         for op in range(opset, 0, -1):
             nop = name + "_" + str(op)
-            if nop in d_op_list:
+            if nop in _op_modules:
                 name_opset = nop
                 chosen_opset = op
                 break
@@ -69,10 +69,10 @@ def load_op(onnx_node, desc=None, options=None, runtime=None):
         cl = _additional_ops[name_opset]
     elif name in _additional_ops:
         cl = _additional_ops[name]
-    elif name_opset in d_op_list:
-        cl = d_op_list[name_opset]
-    elif name in d_op_list:
-        cl = d_op_list[name]
+    elif name_opset in _op_modules:
+        cl = get_op_class(name_opset)
+    elif name in _op_modules:
+        cl = get_op_class(name)
     else:
         raise MissingOperatorError(  # pragma no cover
             "Operator '{}' from domain '{}' has no runtime yet. "
@@ -82,8 +82,7 @@ def load_op(onnx_node, desc=None, options=None, runtime=None):
                 "\n".join(sorted(_additional_ops)),
                 "\n".join(textwrap.wrap(
                     " ".join(
-                        _ for _ in sorted(d_op_list)
-                        if "_" not in _ and _ not in {'cl', 'clo', 'name'})))))
+                        _ for _ in sorted(_op_modules) if "_" not in _)))))
 
     if hasattr(cl, 'version_higher_than'):
         opv = min(current_opset, chosen_opset)
@@ -99,12 +98,16 @@ def load_op(onnx_node, desc=None, options=None, runtime=None):
                         cl.version_higher_than, opv, opset,
                         options['target_opset'], cl.__name__, onnx_node,
                         "\n".join(
-                            _ for _ in sorted(d_op_list)
-                            if "_" not in _ and _ not in {'cl', 'clo', 'name'})))
+                            _ for _ in sorted(_op_modules) if "_" not in _)))
             options = options.copy()
             options['target_opset'] = current_opset
             return load_op(onnx_node, desc=desc, options=options)
 
     if options is None:
         options = {}  # pragma: no cover
-    return cl(onnx_node, desc=desc, runtime=runtime, **options)
+    op = cl(onnx_node, desc=desc, runtime=runtime, **options)
+    # used to create the operator again if it cannot be pickled,
+    # see function save_snapshot
+    op._load_options = dict(  # pylint: disable=W0212
+        runtime=runtime, **options)
+    return op
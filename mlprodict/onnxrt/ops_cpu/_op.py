@@ -11,6 +11,7 @@ from onnx import GraphProto
 from ..shape_object import ShapeObject
 from ..type_object import SequenceType
 from ._new_ops import OperatorSchema
+from ._op_numpy_helper import numpy_ufunc_out
 
 
 def _build_schemas():
@@ -176,6 +177,24 @@ class OpRun:
         """
         return False
 
+    def run_kernel(self):
+        """
+        Returns the function computing the outputs once the inputs
+        are known to be valid, it skips every check done by method
+        ``run`` (see :meth:`_run_sequence_fast
+        <mlprodict.onnxrt.onnx_inference.OnnxInference._run_sequence_fast>`).
+        It is method ``_run`` if method ``run`` only checks the types
+        of the inputs and outputs, method ``run`` otherwise.
+
+        .. versionadded:: 0.9
+        """
+        if 'run' in self.__dict__:
+            # replaced by method switch_initializers_dtype
+            return self.run
+        if getattr(type(self), 'run', None) in _checking_run_methods:
+            return self._run
+        return self.run
+
     def _find_custom_operator_schema(self, op_name):
         raise NotImplementedError(  # pragma: no cover
             "This method should be overwritten for operator "
@@ -796,6 +815,17 @@ class OpRunBinaryNumpy(OpRunBinaryNum):
                 return (self.numpy_fct(a, b), )
         return (self.numpy_fct(a, b), )
 
+    def _run_out(self, out, *args):
+        """
+        Stores the result into the preallocated buffer *out*,
+        returns None if it is not possible.
+        """
+        if len(args) != 2 or (
+                self._cannot_inplace_int and
+                numpy.issubdtype(args[0].dtype, numpy.integer)):
+            return None
+        return numpy_ufunc_out(self.numpy_fct, out, *args)
+
     def to_python(self, inputs):
         """
         Returns a python code equivalent to this operator.
@@ -877,3 +907,9 @@ class OpRunCustom(OpRun):
             return OpRunCustom.OpRunCustomSchema(self.__class__)
         raise RuntimeError(  # pragma: no cover
             "Unable to find a schema for operator '{}'.".format(op_name))
+
+
+# methods run only checking the inputs and outputs of method _run
+_checking_run_methods = {
+    OpRun.run, OpRunUnary.run, OpRunArg.run, OpRunUnaryNum.run,
+    OpRunClassifierProb.run, OpRunBinary.run, OpRunBinaryNum.run}
@@ -64,3 +64,51 @@ def dtype_name(dtype):
         return "bool"
     raise ValueError(
         "Unexpected dtype {}.".format(dtype))
+
+
+def sort_keys(keys, values=None):
+    """
+    Sorts the keys of a mapping to look them up with
+    @see fn lookup_sorted_keys. If a key appears twice,
+    the last value is kept as a dictionary would do.
+
+    :param keys: keys (array or list)
+    :param values: values associated to every key or None
+        to get the positions of the keys
+    :return: sorted keys, values (or positions) in the same order
+
+    .. versionadded:: 0.9
+    """
+    keys = numpy.asarray(keys)
+    if keys.dtype.kind == 'S':
+        keys = numpy.array([k.decode('utf-8') for k in keys], dtype=numpy.str_)
+    order = numpy.argsort(keys, kind='stable')
+    if values is None:
+        return keys[order], order
+    return keys[order], numpy.asarray(values)[order]
+
+
+def lookup_sorted_keys(sorted_keys, x):
+    """
+    Looks up every element of *x* in keys sorted by
+    @see fn sort_keys with a binary search (:epkg:`numpy:searchsorted`).
+
+    :param sorted_keys: sorted keys
+    :param x: array
+    :return: positions in *sorted_keys*, boolean mask of the
+        elements found, both have the same shape as *x*
+
+    .. versionadded:: 0.9
+    """
+    strings = sorted_keys.dtype.kind == 'U'
+    if x.dtype == numpy.object_:
+        x = x.astype(numpy.str_ if strings else sorted_keys.dtype)
+    if sorted_keys.shape[0] == 0 or strings != (x.dtype.kind == 'U'):
+        return (numpy.zeros(x.shape, dtype=numpy.int64),
+                numpy.zeros(x.shape, dtype=numpy.bool_))
+    # the last equal key is chosen (side='right')
+    pos = numpy.asarray(
+        numpy.searchsorted(sorted_keys, x, side='right') - 1)
+    numpy.maximum(pos, 0, out=pos)
+    found = numpy.asarray(sorted_keys[pos] == x)
+    return pos, found
@@ -3,14 +3,17 @@
 @brief numpy redundant functions.
 """
 import numpy
-from scipy.sparse.coo import coo_matrix
+from scipy.sparse import issparse
 
 
 def numpy_dot_inplace(inplaces, a, b):
     """
     Implements a dot product, deals with inplace information.
-    See :epkg:`numpy:dot`.
+    See :epkg:`numpy:dot`. A sparse matrix is multiplied without
+    being converted into a dense matrix.
     """
+    if issparse(a) or issparse(b):
+        return a @ b
     if inplaces.get(0, False) and hasattr(a, 'flags'):
         return _numpy_dot_inplace_left(a, b)
     if inplaces.get(1, False) and hasattr(b, 'flags'):
@@ -63,11 +66,44 @@ def numpy_matmul_inplace(inplaces, a, b):
     improves.
     """
     try:
-        if isinstance(a, coo_matrix) or isinstance(b, coo_matrix):
-            return numpy.dot(a, b)
+        if issparse(a) or issparse(b):
+            return a @ b
         if len(a.shape) <= 2 and len(b.shape) <= 2:
             return numpy_dot_inplace(inplaces, a, b)
         return numpy.matmul(a, b)
     except ValueError as e:  # pragma: no cover
         raise ValueError(
             "Unable to multiply shapes %r, %r." % (a.shape, b.shape)) from e
+
+
+def numpy_ufunc_out(fct, out, *args):
+    """
+    Calls a numpy ufunc and stores the result into the preallocated
+    buffer *out*. The function returns None if *out* does not have
+    the expected shape or type, the caller must then call the
+    function without *out*. Parameter *out* is only used
+    if the result has the same type as the first input.
+
+    :param fct: numpy function with a parameter *out*
+    :param out: preallocated buffer
+    :param args: inputs
+    :return: tuple or None
+    """
+    if not isinstance(args[0], numpy.ndarray):
+        return None
+    dtype = args[0].dtype
+    for a in args:
+        if not isinstance(a, numpy.ndarray) or a.dtype != dtype:
+            return None
+    if out.dtype != dtype:
+        return None
+    if len(args) == 1:
+        shape = args[0].shape
+    else:
+        try:
+            shape = numpy.broadcast(*args).shape
+        except ValueError:  # pragma: no cover
+            return None
+    if out.shape != shape:
+        return None
+    return (fct(*args, out=out), )
@@ -11,6 +11,9 @@
 #include <queue>
 #include <iostream>
 #include <algorithm>
+#include <stdexcept>
+#include <string>
+#include <cmath>
 
 #ifndef SKIP_PYTHON
 //#include <pybind11/iostream.h>
@@ -160,17 +163,13 @@ void _heapify_up_position(const typename HeapCmp::DataType* ens, int64_t* pos,
         left = 2 * i + 1;
         right = left + 1;
         if (right < k) {
-            if (heap_cmp.cmp(left, i, ens, pos) && !heap_cmp.cmp1(ens[pos[left]], ens[pos[right]])) {
+            // the worst child goes up, equal values are ordered by index
+            size_t worst = heap_cmp.cmp(right, left, ens, pos) ? right : left;
+            if (heap_cmp.cmp(worst, i, ens, pos)) {
                 ch = pos[i];
-                pos[i] = pos[left];
-                pos[left] = ch;
-                i = left;
-            }
-            else if (heap_cmp.cmp(right, i, ens, pos)) {
-                ch = pos[i];
-                pos[i] = pos[right];
-                pos[right] = ch;
-                i = right;
+                pos[i] = pos[worst];
+                pos[worst] = ch;
+                i = worst;
             }
             else
                 break;
@@ -243,11 +242,12 @@ void _topk_element_ptr(int64_t* pos, size_t k, const typename HeapCmp::DataType*
     else {
         auto vdim = shape[shape.size() - 1];
         auto ptr = pos;
+        // every dimension but the last one is a row
+        int64_t n_rows = vdim == 0 ? 0 : flattened_dimension(shape) / vdim;
 
-        if (shape[0] <= th_parallel) {
-            auto tdim = flattened_dimension(shape);
+        if (n_rows <= th_parallel) {
             const typename HeapCmp::DataType* data = values;
-            const typename HeapCmp::DataType* end = data + tdim;
+            const typename HeapCmp::DataType* end = data + n_rows * vdim;
             for (; data != end; data += vdim, ptr += k)
                 _topk_element(data, k, vdim, ptr, sorted, heap_cmp);
         } 
@@ -257,7 +257,7 @@ void _topk_element_ptr(int64_t* pos, size_t k, const typename HeapCmp::DataType*
             #ifdef USE_OPENMP
             #pragma omp parallel for
             #endif
-            for (int64_t nr = 0; nr < shape[0]; ++nr)
+            for (int64_t nr = 0; nr < n_rows; ++nr)
                 _topk_element(data + nr * vdim, k, vdim, ptr + nr * k, sorted, heap_cmp);
         }
     }
@@ -275,14 +275,13 @@ py::array_t<int64_t> topk_element(
     std::vector<int64_t> shape_val;
     arrayshape2vector(shape_val, values);
 
-    std::vector<int64_t> shape_ind(shape_val.size());
-    if (shape_ind.size() == 2) {
-        shape_ind[0] = shape_val[0];
-        shape_ind[1] = k;
-    }
-    else {
-        shape_ind[0] = k;
-    }
+    if (shape_val.size() == 0 || k > shape_val[shape_val.size() - 1])
+        throw std::invalid_argument(
+            "k must not be greater than the last dimension.");
+
+    // same shape as values except the last dimension
+    std::vector<int64_t> shape_ind(shape_val);
+    shape_ind[shape_ind.size() - 1] = k;
 
     std::vector<int64_t> strides;
     shape2strides(shape_ind, strides, (int64_t)0);
@@ -397,6 +396,191 @@ py::array_t<int64_t> topk_element_fetch_int64(
 /////////////////////////////////////////////
 
 
+/////////////////////////////////////////////
+// begin: cdist
+/////////////////////////////////////////////
+
+
+enum CDistMetric {
+    kSqEuclidean = 0,
+    kEuclidean = 1,
+    kMinkowski = 2,
+    kCosine = 3
+};
+
+
+CDistMetric to_cdist_metric(const std::string& metric) {
+    if (metric == "sqeuclidean")
+        return kSqEuclidean;
+    if (metric == "euclidean")
+        return kEuclidean;
+    if (metric == "minkowski")
+        return kMinkowski;
+    if (metric == "cosine")
+        return kCosine;
+    throw std::invalid_argument(MakeString("Unsupported metric '", metric, "'."));
+}
+
+
+// Distance between two rows, the result is accumulated with type NTYPE.
+// Eight partial sums let the compiler vectorize the loop.
+template<typename NTYPE>
+NTYPE cdist_sqeuclidean(const NTYPE* a, const NTYPE* b, int64_t dim) {
+    NTYPE d, acc[8] = {0, 0, 0, 0, 0, 0, 0, 0};
+    int64_t k = 0;
+    for (; k + 8 <= dim; k += 8) {
+        for (int l = 0; l < 8; ++l) {
+            d = a[k + l] - b[k + l];
+            acc[l] += d * d;
+        }
+    }
+    for (; k < dim; ++k) {
+        d = a[k] - b[k];
+        acc[0] += d * d;
+    }
+    return ((acc[0] + acc[4]) + (acc[1] + acc[5])) + ((acc[2] + acc[6]) + (acc[3] + acc[7]));
+}
+
+
+template<typename NTYPE>
+NTYPE cdist_minkowski(const NTYPE* a, const NTYPE* b, int64_t dim, NTYPE p) {
+    NTYPE s = 0;
+    if (p == 1) {
+        for (int64_t k = 0; k < dim; ++k)
+            s += std::abs(a[k] - b[k]);
+        return s;
+    }
+    if (p == 2)
+        return std::sqrt(cdist_sqeuclidean(a, b, dim));
+    for (int64_t k = 0; k < dim; ++k)
+        s += std::pow(std::abs(a[k] - b[k]), p);
+    return std::pow(s, (NTYPE)1 / p);
+}
+
+
+template<typename NTYPE>
+NTYPE cdist_dot(const NTYPE* a, const NTYPE* b, int64_t dim) {
+    NTYPE acc[8] = {0, 0, 0, 0, 0, 0, 0, 0};
+    int64_t k = 0;
+    for (; k + 8 <= dim; k += 8) {
+        for (int l = 0; l < 8; ++l)
+            acc[l] += a[k + l] * b[k + l];
+    }
+    for (; k < dim; ++k)
+        acc[0] += a[k] * b[k];
+    return ((acc[0] + acc[4]) + (acc[1] + acc[5])) + ((acc[2] + acc[6]) + (acc[3] + acc[7]));
+}
+
+
+// Computes the distances between rows [begin_a, end_a[ of a and all rows of b.
+// Rows of b are processed by blocks small enough to stay in the cache
+// while every row of a is compared to them.
+template<typename NTYPE>
+void cdist_block(const NTYPE* a, const NTYPE* b, NTYPE* out,
+                 int64_t begin_a, int64_t end_a, int64_t nb, int64_t dim,
+                 CDistMetric metric, NTYPE p, const NTYPE* norm_a, const NTYPE* norm_b) {
+    int64_t block_b = std::max((int64_t)1, (int64_t)(16384 / sizeof(NTYPE)) / std::max(dim, (int64_t)1));
+    for (int64_t jb = 0; jb < nb; jb += block_b) {
+        int64_t end_b = std::min(jb + block_b, nb);
+        for (int64_t i = begin_a; i < end_a; ++i) {
+            const NTYPE* pa = a + i * dim;
+            NTYPE* po = out + i * nb;
+            switch (metric) {
+                case kSqEuclidean:
+                    for (int64_t j = jb; j < end_b; ++j)
+                        po[j] = cdist_sqeuclidean(pa, b + j * dim, dim);
+                    break;
+                case kEuclidean:
+                    for (int64_t j = jb; j < end_b; ++j)
+                        po[j] = std::sqrt(cdist_sqeuclidean(pa, b + j * dim, dim));
+                    break;
+                case kMinkowski:
+                    for (int64_t j = jb; j < end_b; ++j)
+                        po[j] = cdist_minkowski(pa, b + j * dim, dim, p);
+                    break;
+                case kCosine:
+                    // same as scipy, 1 - a.b / (|a| |b|) clipped into [0, 2]
+                    for (int64_t j = jb; j < end_b; ++j) {
+                        NTYPE d = (NTYPE)1 - cdist_dot(pa, b + j * dim, dim) / (norm_a[i] * norm_b[j]);
+                        po[j] = d < 0 ? 0 : (d > 2 ? 2 : d);
+                    }
+                    break;
+            }
+        }
+    }
+}
+
+
+template<typename NTYPE>
+py::array_t<NTYPE> cdist(py::array_t<NTYPE, py::array::c_style | py::array::forcecast> xa,
+                         py::array_t<NTYPE, py::array::c_style | py::array::forcecast> xb,
+                         const std::string& smetric, NTYPE p, int64_t th_para) {
+    if (xa.ndim() != 2 || xb.ndim() != 2)
+        throw std::invalid_argument("xa and xb must be matrices.");
+    int64_t na = xa.shape(0), nb = xb.shape(0), dim = xa.shape(1);
+    if (xb.shape(1) != dim)
+        throw std::invalid_argument(MakeString(
+            "xa and xb must have the same number of columns ", dim, " != ", xb.shape(1), "."));
+    CDistMetric metric = to_cdist_metric(smetric);
+
+    py::array_t<NTYPE> result({na, nb});
+    const NTYPE* a = xa.data();
+    const NTYPE* b = xb.data();
+    NTYPE* out = (NTYPE*)result.mutable_data();
+
+    {
+        py::gil_scoped_release release;
+        std::vector<NTYPE> norm_a, norm_b;
+        if (metric == kCosine) {
+            norm_a.resize(na);
+            norm_b.resize(nb);
+            for (int64_t i = 0; i < na; ++i)
+                norm_a[i] = std::sqrt(cdist_dot(a + i * dim, a + i * dim, dim));
+            for (int64_t i = 0; i < nb; ++i)
+                norm_b[i] = std::sqrt(cdist_dot(b + i * dim, b + i * dim, dim));
+        }
+
+        // blocks of rows of xa are distributed among threads
+        int64_t block_a = 16;
+        int64_t n_blocks = (na + block_a - 1) / block_a;
+        if (na * nb * dim <= th_para || n_blocks <= 1) {
+            cdist_block(a, b, out, 0, na, nb, dim, metric, p,
+                        norm_a.data(), norm_b.data());
+        }
+        else {
+            #ifdef USE_OPENMP
+            #pragma omp parallel for
+            #endif
+            for (int64_t ib = 0; ib < n_blocks; ++ib)
+                cdist_block(a, b, out, ib * block_a, std::min(ib * block_a + block_a, na),
+                            nb, dim, metric, p, norm_a.data(), norm_b.data());
+        }
+    }
+    return result;
+}
+
+
+py::array_t<float> cdist_float(
+        py::array_t<float, py::array::c_style | py::array::forcecast> xa,
+        py::array_t<float, py::array::c_style | py::array::forcecast> xb,
+        const std::string& metric, float p, int64_t th_para) {
+    return cdist<float>(xa, xb, metric, p, th_para);
+}
+
+
+py::array_t<double> cdist_double(
+        py::array_t<double, py::array::c_style | py::array::forcecast> xa,
+        py::array_t<double, py::array::c_style | py::array::forcecast> xb,
+        const std::string& metric, double p, int64_t th_para) {
+    return cdist<double>(xa, xb, metric, p, th_para);
+}
+
+
+/////////////////////////////////////////////
+// end: cdist
+/////////////////////////////////////////////
+
+
 #ifndef SKIP_PYTHON
 
 PYBIND11_MODULE(_op_onnx_numpy, m) {
@@ -459,6 +643,22 @@ on each row (= last dimension for a multi dimension array).)pbdoc");
     m.def("topk_element_fetch_int64", &topk_element_fetch_int64,
             R"pbdoc(Fetches the top k element knowing their indices
 on each row (= last dimension for a multi dimension array).)pbdoc");
+
+    m.def("cdist_float", &cdist_float,
+            R"pbdoc(C++ implementation of operator CDist for float32,
+metrics *sqeuclidean*, *euclidean*, *minkowski*, *cosine*.
+Distances are accumulated in float32.
+The function is parallelized if *xa.shape[0] * xb.shape[0] * xa.shape[1]*
+is greater than *th_para*.)pbdoc",
+            py::arg("xa"), py::arg("xb"), py::arg("metric"),
+            py::arg("p"), py::arg("th_para"));
+    m.def("cdist_double", &cdist_double,
+            R"pbdoc(C++ implementation of operator CDist for float64,
+metrics *sqeuclidean*, *euclidean*, *minkowski*, *cosine*.
+The function is parallelized if *xa.shape[0] * xb.shape[0] * xa.shape[1]*
+is greater than *th_para*.)pbdoc",
+            py::arg("xa"), py::arg("xb"), py::arg("metric"),
+            py::arg("p"), py::arg("th_para"));
 }
 
 #endif
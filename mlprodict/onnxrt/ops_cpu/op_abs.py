@@ -6,6 +6,7 @@
 """
 import numpy
 from ._op import OpRunUnaryNum
+from ._op_numpy_helper import numpy_ufunc_out
 
 
 class Abs(OpRunUnaryNum):
@@ -22,5 +23,8 @@ class Abs(OpRunUnaryNum):
     def _run_inplace(self, x):
         return (numpy.absolute(x, out=x), )
 
+    def _run_out(self, out, x):
+        return numpy_ufunc_out(numpy.absolute, out, x)
+
     def to_python(self, inputs):
         return self._to_python_numpy(inputs, 'absolute')
@@ -6,9 +6,16 @@
 """
 import numpy
 from ._op import OpRun
+from ._op_helper import sort_keys, lookup_sorted_keys
 
 
 class CategoryMapper(OpRun):
+    """
+    Maps integers to strings and strings to integers.
+    Both mappings are stored as sorted arrays, every element
+    of the input is looked up with a binary search,
+    see @see fn lookup_sorted_keys.
+    """
 
     atts = {'cats_int64s': numpy.empty(0, dtype=numpy.int64),
             'cats_strings': numpy.empty(0, dtype=numpy.str_),
@@ -25,25 +32,28 @@ class CategoryMapper(OpRun):
                 "Lengths mismatch between cats_int64s (%d) and "
                 "cats_strings (%d)." % (
                     len(self.cats_int64s), len(self.cats_strings)))
-        self.int2str_ = {}
-        self.str2int_ = {}
-        for a, b in zip(self.cats_int64s, self.cats_strings):
-            be = b.decode('utf-8')
-            self.int2str_[a] = be
-            self.str2int_[be] = a
+        cats_strings = numpy.array(
+            [b.decode('utf-8') for b in self.cats_strings], dtype=numpy.str_)
+        self.int2str_ = sort_keys(self.cats_int64s, cats_strings)
+        self.str2int_ = sort_keys(cats_strings, self.cats_int64s)
+        self.default_str_ = (
+            self.default_string.decode('utf-8')
+            if isinstance(self.default_string, bytes)
+            else self.default_string)
 
     def _run(self, x, attributes=None, verbose=0, fLOG=None):  # pylint: disable=W0221
         if x.dtype == numpy.int64:
-            xf = x.ravel()
-            res = [self.int2str_.get(xf[i], self.default_string)
-                   for i in range(0, xf.shape[0])]
-            return (numpy.array(res).reshape(x.shape), )
-
-        xf = x.ravel()
-        res = numpy.empty((xf.shape[0], ), dtype=numpy.int64)
-        for i in range(0, res.shape[0]):
-            res[i] = self.str2int_.get(xf[i], self.default_int64)
-        return (res.reshape(x.shape), )
+            keys, values = self.int2str_
+            default = self.default_str_
+        else:
+            keys, values = self.str2int_
+            default = self.default_int64
+        pos, found = lookup_sorted_keys(keys, x)
+        if values.shape[0] == 0:
+            res = numpy.full(x.shape, default)
+        else:
+            res = numpy.where(found, values[pos], default)
+        return (res, )
 
     def _infer_shapes(self, x):  # pylint: disable=W0221
         if x.dtype == numpy.int64:
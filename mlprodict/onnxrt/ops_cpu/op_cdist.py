@@ -4,16 +4,32 @@
 @file
 @brief Runtime operator.
 """
+import numpy
 from scipy.spatial.distance import cdist
 from ._op import OpRunBinaryNum
+from ._op_onnx_numpy import (  # pylint: disable=E0611,E0401
+    cdist_float, cdist_double)
 from ._new_ops import OperatorSchema
 from ..shape_object import ShapeObject
 
 
 class CDist(OpRunBinaryNum):
+    """
+    Computes the distances between the rows of two matrices
+    with :epkg:`cdist`. Metrics *sqeuclidean*, *euclidean*,
+    *minkowski* and *cosine* are computed with a C++ implementation
+    in the input type (no conversion into float64) by blocks of rows,
+    in parallel if ``a.shape[0] * b.shape[0] * a.shape[1]``
+    is greater than *th_parallel*.
+    """
 
     atts = {'metric': 'sqeuclidean', 'p': 2.}
 
+    # the computation is parallelized above this threshold
+    th_parallel = 1 << 16
+
+    cpp_metrics = {'sqeuclidean', 'euclidean', 'minkowski', 'cosine'}
+
     def __init__(self, onnx_node, desc=None, **options):
         OpRunBinaryNum.__init__(self, onnx_node, desc=desc,
                                 expected_attributes=CDist.atts,
@@ -21,6 +37,12 @@ class CDist(OpRunBinaryNum):
 
     def _run(self, a, b, attributes=None, verbose=0, fLOG=None):  # pylint: disable=W0221
         metric = self.metric.decode('ascii')
+        if (metric in CDist.cpp_metrics and len(a.shape) == 2 and
+                a.dtype == b.dtype and
+                a.dtype in (numpy.float32, numpy.float64) and
+                (metric != 'minkowski' or 0 < self.p < numpy.inf)):
+            fct = cdist_float if a.dtype == numpy.float32 else cdist_double
+            return (fct(a, b, metric, self.p, self.th_parallel), )
         if metric == 'minkowski':
             res = cdist(a, b, metric=metric, p=self.p)
         else:
@@ -4,13 +4,22 @@
 @file
 @brief Runtime operator.
 """
+from itertools import chain, repeat
 import numpy
-from scipy.sparse import coo_matrix
+from scipy.sparse import csr_matrix
 from ._op import OpRun, RuntimeTypeError
 from ..shape_object import ShapeObject
 
 
 class DictVectorizer(OpRun):
+    """
+    The input is a list, an array or a :epkg:`pandas` series
+    of dictionaries. The output is a :epkg:`csr_matrix` built
+    at once from the keys and the values of all rows,
+    unknown keys are ignored. Operators *MatMul*, *Gemm*, *Normalizer*,
+    *LinearClassifier*, *LinearRegressor* multiply or normalize
+    it without converting it into a dense matrix.
+    """
 
     atts = {'int64_vocabulary': numpy.empty(0, dtype=numpy.int64),
             'string_vocabulary': numpy.empty(0, dtype=numpy.str_)}
@@ -33,21 +42,33 @@ class DictVectorizer(OpRun):
                 "int64_vocabulary and string_vocabulary cannot be both empty.")
 
     def _run(self, x, attributes=None, verbose=0, fLOG=None):  # pylint: disable=W0221
+        if hasattr(x, 'to_numpy'):
+            # pandas.Series
+            x = x.to_numpy()
         if not isinstance(x, (numpy.ndarray, list)):
             raise RuntimeTypeError(  # pragma: no cover
                 "x must be iterable not {}.".format(type(x)))
-        values = []
-        rows = []
-        cols = []
-        for i, row in enumerate(x):
-            for k, v in row.items():
-                values.append(v)
-                rows.append(i)
-                cols.append(self.dict_labels[k])
-        values = numpy.array(values)
-        rows = numpy.array(rows)
-        cols = numpy.array(cols)
-        return (coo_matrix((values, (rows, cols)), shape=(len(x), len(self.dict_labels))), )
+        n_rows = len(x)
+        lengths = numpy.fromiter(
+            map(len, x), dtype=numpy.int64, count=n_rows)
+        n_values = int(lengths.sum())
+        # the keys are hashed, it is faster than a binary search on strings
+        cols = numpy.fromiter(
+            map(self.dict_labels.get,
+                chain.from_iterable(row.keys() for row in x), repeat(-1)),
+            dtype=numpy.int64, count=n_values)
+        values = numpy.array(list(chain.from_iterable(
+            row.values() for row in x)))
+        found = cols >= 0
+        if not found.all():
+            rows = numpy.repeat(numpy.arange(n_rows), lengths)
+            lengths = numpy.bincount(rows[found], minlength=n_rows)
+            values = values[found]
+            cols = cols[found]
+        indptr = numpy.zeros((n_rows + 1, ), dtype=numpy.int64)
+        numpy.cumsum(lengths, out=indptr[1:])
+        return (csr_matrix((values, cols, indptr),
+                           shape=(n_rows, len(self.dict_labels))), )
 
     def _infer_shapes(self, x):  # pylint: disable=W0221
         pref = str(hex(id(self))[2:])
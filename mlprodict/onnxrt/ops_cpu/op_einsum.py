@@ -4,16 +4,50 @@
 @file
 @brief Runtime operator.
 """
+import time
 import numpy
 from ._op import OpRun
 from ..shape_object import ShapeObject
 
 
 class Einsum(OpRun):
+    """
+    See :epkg:`numpy:einsum`. The operator builds a plan
+    the first time it sees a new signature (equation, input
+    shapes and types) and stores it in attribute *_plans*.
+    It runs every available implementation on the first inputs,
+    measures them over *plan_repeat* warm repetitions and keeps
+    the fastest:
+
+    * :epkg:`numpy:einsum` with a contraction path computed once,
+    * the decomposition into transpositions and matrix
+      multiplications returned by
+      :func:`decompose_einsum_equation
+      <mlprodict.testing.einsum.einsum_impl.decompose_einsum_equation>`
+      with strategy ``'numpy'``,
+    * the C++ implementation :func:`custom_einsum
+      <mlprodict.testing.experimental.custom_einsum>` for
+      two float matrices.
+
+    Implementations other than :epkg:`numpy:einsum` are kept
+    only if they return the same results within a tolerance
+    depending on the type (*plan_rtol*), an implementation replaces
+    the previous ones only if it is faster by more than *plan_margin*.
+    The first call returns the result of the selected implementation.
+    """
 
     atts = {'equation': ''}
     python_inputs = ['*inputs']
 
+    # maximum number of cached plans
+    max_plans = 16
+    # number of warm measures of every implementation
+    plan_repeat = 5
+    # relative gain required to replace a previous implementation
+    plan_margin = 0.1
+    # tolerance relative to the greatest absolute value of the result
+    plan_rtol = {numpy.float32: 1e-4, numpy.float64: 1e-10}
+
     def __init__(self, onnx_node, desc=None, **options):
         OpRun.__init__(self, onnx_node, desc=desc,
                        expected_attributes=Einsum.atts,
@@ -24,12 +58,107 @@ class Einsum(OpRun):
         self.equation = self.equation.strip()
         if len(self.equation) == 0:
             raise TypeError("equation is empty.")  # pragma: no cover
+        self.equation_ = (self.equation.decode('ascii')
+                          if isinstance(self.equation, bytes)
+                          else self.equation)
+        self._plans = {}
 
     def _run(self, *args, attributes=None, verbose=0, fLOG=None):  # pylint: disable=W0221
+        key = tuple((a.dtype, a.shape) for a in args)
+        plan = self._plans.get(key, None)
+        if plan is not None:
+            return (plan(*args), )
+        plan, res = self._build_plan(args)
+        if len(self._plans) >= self.max_plans:
+            self._plans.clear()
+        self._plans[key] = plan
+        return (res, )
+
+    def _build_plan(self, args):
+        """
+        Returns the fastest implementation for these inputs
+        and its result.
+        """
+        equation = self.equation_
         try:
-            return (numpy.einsum(self.equation, *args, optimize=True), )
-        except TypeError:
-            return (numpy.einsum(self.equation, *args), )
+            path = numpy.einsum_path(
+                equation, *args,
+                optimize='optimal' if len(args) <= 4 else 'greedy')[0]
+        except (TypeError, ValueError):
+            path = False
+
+        def plan_numpy(*inputs):
+            return numpy.einsum(equation, *inputs, optimize=path)
+
+        res = plan_numpy(*args)
+        plans = [(plan_numpy, res)]
+        for candidate in self._plan_candidates(args):
+            try:
+                got = candidate(*args)
+            except (RuntimeError, ValueError, TypeError):  # pragma: no cover
+                continue
+            if got.shape != res.shape or got.dtype != res.dtype:
+                continue  # pragma: no cover
+            rtol = self.plan_rtol[res.dtype.type]
+            atol = rtol * float(numpy.abs(res).max()) if res.size > 0 else 0.
+            if not numpy.allclose(got, res, rtol=rtol, atol=atol):
+                continue  # pragma: no cover
+            plans.append((candidate, got))
+        if len(plans) == 1:
+            return plans[0]
+
+        # every implementation ran once, the measures are done
+        # on warm implementations and alternate between them
+        durations = [float('inf')] * len(plans)
+        for _ in range(self.plan_repeat):
+            for i, (plan, _) in enumerate(plans):
+                begin = time.perf_counter()
+                plan(*args)
+                durations[i] = min(durations[i], time.perf_counter() - begin)
+        best = 0
+        for i in range(1, len(plans)):
+            if durations[i] < durations[best] * (1 - self.plan_margin):
+                best = i
+        return plans[best]
+
+    def _plan_candidates(self, args):
+        """
+        Enumerates the implementations other than :epkg:`numpy:einsum`
+        which can compute the equation for these inputs.
+        """
+        dtype = args[0].dtype
+        if (len(args) < 2 or '...' in self.equation_ or
+                '->' not in self.equation_ or
+                dtype not in (numpy.float32, numpy.float64) or
+                any(a.dtype != dtype for a in args)):
+            return []
+        # delayed import to avoid a circular import
+        from ...testing.einsum.einsum_impl import (
+            decompose_einsum_equation, apply_einsum_sequence)
+        from ...testing.experimental_c_impl.experimental_c import (  # pylint: disable=E0611
+            custom_einsum_float, custom_einsum_double)
+
+        candidates = []
+        try:
+            graph = decompose_einsum_equation(
+                self.equation_, *[a.shape for a in args],
+                strategy='numpy', clean=True)
+        except (NotImplementedError, RuntimeError, ValueError):
+            graph = None
+        if graph is not None:
+            candidates.append(
+                lambda *inputs: apply_einsum_sequence(graph, *inputs))
+
+        # the C++ implementation does not handle a letter
+        # repeated in the same term (diagonal)
+        terms = self.equation_.replace('->', ',').split(',')
+        if len(args) == 2 and all(len(set(t)) == len(t) for t in terms):
+            custom = (custom_einsum_float if dtype == numpy.float32
+                      else custom_einsum_double)
+            equation = self.equation_
+            candidates.append(
+                lambda x, y: custom(equation, x, y))
+        return candidates
 
     def _infer_shapes(self, *args):  # pylint: disable=W0221
         try:
@@ -6,6 +6,7 @@
 """
 from scipy.special import erf  # pylint: disable=E0611
 from ._op import OpRunUnaryNum
+from ._op_numpy_helper import numpy_ufunc_out
 
 
 class Erf(OpRunUnaryNum):
@@ -22,6 +23,9 @@ class Erf(OpRunUnaryNum):
     def _run_inplace(self, x):
         return (erf(x, out=x), )
 
+    def _run_out(self, out, x):
+        return numpy_ufunc_out(erf, out, x)
+
     def to_python(self, inputs):
         return ('from scipy.special import erf',
                 "return erf(%s)" % inputs[0])
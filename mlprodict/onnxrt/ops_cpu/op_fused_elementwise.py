@@ -0,0 +1,159 @@
+# -*- encoding: utf-8 -*-
+# pylint: disable=E0203,E1101,C0111
+"""
+@file
+@brief Runtime operator.
+
+.. versionadded:: 0.9
+"""
+from collections import Counter
+import numpy
+from ._op import OpRun
+from ._new_ops import OperatorSchema
+
+
+class FusedElementwise(OpRun):
+    """
+    Computes a chain of elementwise operators created by
+    @see fn onnx_fuse_elementwise. The chain is computed by blocks of
+    rows, every operator of the chain writes its result into the
+    same block of the output (method ``_run_out``), no intermediate
+    result is allocated. The output overwrites one input if the runtime
+    allows it (see :meth:`_guess_inplace
+    <mlprodict.onnxrt.onnx_inference.OnnxInference._guess_inplace>`)
+    and the chain uses it only once in its first node. Attribute *body* is the chain
+    (a graph). It falls back to a sequential execution of the chain
+    if the inputs are not floats of the same type or if the first
+    node of the chain does not produce a result of the final shape.
+    """
+
+    atts = {'body': None}
+
+    # number of elements in a block, a block should fit in the cache
+    block_size = 1 << 15
+
+    def __init__(self, onnx_node, desc=None, **options):
+        OpRun.__init__(self, onnx_node, desc=desc,
+                       expected_attributes=FusedElementwise.atts,
+                       **options)
+        if not hasattr(self.body, 'run'):
+            raise RuntimeError(  # pragma: no cover
+                "Parameter 'body' must have a method 'run', "
+                "type {}.".format(type(self.body)))
+        index = {n: i for i, n in enumerate(self.body.input_names)}
+        self.steps_ = []
+        previous = None
+        for node in self.body.sequence_:
+            self.steps_.append(
+                (node.ops_, [None if n == previous else index[n]
+                             for n in node.inputs]))
+            previous = node.outputs[0]
+        counts = Counter(i for _, ins in self.steps_ for i in ins
+                         if i is not None)
+        # the first step writes the output, an input can be
+        # overwritten if no other step reads it
+        self.overwritable_ = [i for i, c in sorted(counts.items())
+                              if c == 1 and i in self.steps_[0][1]]
+        # binary operators implemented with a numpy function are
+        # called directly, inputs are checked once for all blocks
+        self.kernels_ = [
+            getattr(op, 'numpy_fct', None) if len(ins) == 2 else None
+            for op, ins in self.steps_]
+        self._layouts = {}
+
+    def _find_custom_operator_schema(self, op_name):
+        if op_name == "FusedElementwise":
+            return FusedElementwiseSchema()
+        raise RuntimeError(  # pragma: no cover
+            "Unable to find a schema for operator '{}'.".format(op_name))
+
+    def _layout(self, args):
+        """
+        Returns the output shape, the inputs to split and the number
+        of rows in a block, None if the blocks cannot be computed.
+        The result is cached for every input signature.
+        """
+        if any(not isinstance(a, numpy.ndarray) for a in args):
+            return None
+        key = tuple((a.dtype, a.shape) for a in args)
+        if key in self._layouts:
+            return self._layouts[key]
+        dtype = args[0].dtype
+        layout = None
+        if dtype.kind == 'f' and all(a.dtype == dtype for a in args):
+            try:
+                shape = numpy.broadcast_shapes(*[a.shape for a in args])
+                first = numpy.broadcast_shapes(
+                    *[args[i].shape for i in self.steps_[0][1]])
+            except ValueError:
+                shape = None
+            if shape is not None and len(shape) > 0 and first == shape:
+                n_rows = shape[0]
+                row_size = int(numpy.prod(shape[1:]))
+                layout = (
+                    shape,
+                    [len(a.shape) == len(shape) and a.shape[0] == n_rows > 1
+                     for a in args],
+                    max(1, self.block_size // max(row_size, 1)))
+        if len(self._layouts) >= 16:
+            self._layouts.clear()
+        self._layouts[key] = layout
+        return layout
+
+    def _run(self, *args, attributes=None, verbose=0, fLOG=None):  # pylint: disable=W0221
+        layout = self._layout(args)
+        if layout is None:
+            res = self.body.run(dict(zip(self.body.input_names, args)),
+                                attributes=attributes)
+            return (res[self.body.output_names[0]], )
+        shape, split, step = layout
+
+        out = None
+        for i in self.overwritable_:
+            if (self.inplaces.get(i, False) and args[i].shape == shape and
+                    args[i].flags['WRITEABLE']):
+                out = args[i]
+                break
+        if out is None:
+            out = numpy.empty(shape, dtype=args[0].dtype)
+
+        n_rows = shape[0]
+        for begin in range(0, n_rows, step):
+            end = min(begin + step, n_rows)
+            block = out[begin:end] if step < n_rows else out
+            bargs = ([a[begin:end] if s else a for a, s in zip(args, split)]
+                     if step < n_rows else args)
+            for (op, ins), kernel in zip(self.steps_, self.kernels_):
+                inputs = [block if i is None else bargs[i] for i in ins]
+                if kernel is not None:
+                    kernel(*inputs, out=block)
+                elif op._run_out(block, *inputs) is None:  # pylint: disable=W0212
+                    block[...] = op._run(*inputs)[0]  # pylint: disable=W0212
+        return (out, )
+
+    def _infer_shapes(self, *args):  # pylint: disable=W0221
+        res = args[0]
+        for a in args[1:]:
+            try:
+                res = res.broadcast(a)
+            except RuntimeError:  # pragma: no cover
+                pass
+        return (res.copy(name=self.__class__.__name__), )
+
+    def _infer_types(self, *args):  # pylint: disable=W0221
+        return (args[0], )
+
+    def _infer_sizes(self, *args, **kwargs):
+        res = self.run(*args, **kwargs)
+        return (dict(temp=0), ) + res
+
+
+class FusedElementwiseSchema(OperatorSchema):
+    """
+    Defines a schema for operators added in this package
+    such as @see cl FusedElementwise.
+    """
+
+    def __init__(self):
+        OperatorSchema.__init__(self, 'FusedElementwise')
+        self.attributes = FusedElementwise.atts
@@ -9,6 +9,11 @@ from ._op import OpRun
 
 
 class Gemm(OpRun):
+    """
+    Operator *Gemm*, the first input may be a sparse matrix
+    produced by @see cl DictVectorizer, it is multiplied
+    without being converted into a dense matrix.
+    """
 
     atts = {'alpha': 1., 'beta': 1., 'transA': 0, 'transB': 0}
 
@@ -26,28 +31,28 @@ class Gemm(OpRun):
 
     @staticmethod
     def _gemm00(a, b, c, alpha, beta):
-        o = numpy.dot(a, b) * alpha
+        o = (a @ b) * alpha
         if c is not None and beta != 0:
             o += c * beta
         return o
 
     @staticmethod
     def _gemm01(a, b, c, alpha, beta):
-        o = numpy.dot(a, b.T) * alpha
+        o = (a @ b.T) * alpha
         if c is not None and beta != 0:
             o += c * beta
         return o
 
     @staticmethod
     def _gemm10(a, b, c, alpha, beta):
-        o = numpy.dot(a.T, b) * alpha
+        o = (a.T @ b) * alpha
         if c is not None and beta != 0:
             o += c * beta
         return o
 
     @staticmethod
     def _gemm11(a, b, c, alpha, beta):
-        o = numpy.dot(a.T, b.T) * alpha
+        o = (a.T @ b.T) * alpha
         if c is not None and beta != 0:
             o += c * beta
         return o
@@ -55,6 +60,26 @@ class Gemm(OpRun):
     def _run(self, a, b, c=None, attributes=None, verbose=0, fLOG=None):  # pylint: disable=W0221
         return (self._meth(a, b, c), )
 
+    def _run_out(self, out, a, b, c=None):
+        if (not isinstance(a, numpy.ndarray) or
+                not isinstance(b, numpy.ndarray) or
+                len(a.shape) != 2 or len(b.shape) != 2 or
+                a.dtype != b.dtype or out.dtype != a.dtype):
+            return None
+        ta = a.T if self.transA else a
+        tb = b.T if self.transB else b
+        if out.shape != (ta.shape[0], tb.shape[1]):
+            return None
+        numpy.dot(ta, tb, out=out)
+        if self.alpha != 1:
+            out *= self.alpha
+        if c is not None and self.beta != 0:
+            if self.beta == 1:
+                out += c
+            else:
+                out += c * self.beta
+        return (out, )
+
     def _infer_shapes(self, a, b, c=None):  # pylint: disable=W0221
         return (a, )
 
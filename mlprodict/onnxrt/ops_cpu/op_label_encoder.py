@@ -7,9 +7,15 @@
 import numpy
 from ..shape_object import ShapeObject
 from ._op import OpRun
+from ._op_helper import sort_keys, lookup_sorted_keys
 
 
 class LabelEncoder(OpRun):
+    """
+    The mapping is stored as sorted arrays, every element
+    of the input is looked up with a binary search,
+    see @see fn lookup_sorted_keys.
+    """
 
     atts = {'default_float': 0., 'default_int64': -1,
             'default_string': b'',
@@ -82,13 +88,19 @@ class LabelEncoder(OpRun):
             raise RuntimeError(  # pragma: no cover
                 "Empty classes for LabelEncoder, (onnx_node='{}')\n{}.".format(
                     self.onnx_node.name, onnx_node))
+        if isinstance(self.default_, bytes):
+            self.default_ = self.default_.decode('utf-8')
+        self.keys_, self.values_ = sort_keys(
+            list(self.classes_),
+            numpy.array(list(self.classes_.values()), dtype=self.dtype_))
 
     def _run(self, x, attributes=None, verbose=0, fLOG=None):  # pylint: disable=W0221
         if len(x.shape) > 1:
             x = numpy.squeeze(x)
-        res = numpy.empty((x.shape[0], ), dtype=self.dtype_)
-        for i in range(0, res.shape[0]):
-            res[i] = self.classes_.get(x[i], self.default_)
+        pos, found = lookup_sorted_keys(self.keys_, x)
+        res = numpy.where(found, self.values_[pos], self.default_)
+        if res.dtype != self.dtype_:
+            res = res.astype(self.dtype_)
         return (res, )
 
     def _infer_shapes(self, x):  # pylint: disable=W0221
@@ -62,6 +62,14 @@ class Loop(OpRun):
                         "Additional inputs %r not found in context\n%s." % (
                             a, "\n".join(sorted(map(str, context)))))
 
+        if callback is None and hasattr(self.body, 'bind_iterations'):
+            constants = {a: inputs[a] for a in self.additional_inputs}
+            run_iteration = self.body.bind_iterations(constants=constants)
+            if run_iteration is not None:
+                return self._run_bound(
+                    run_iteration, M, cond,
+                    [inputs[name] for name in loop_inputs[2:]])
+
         it = 0
         while cond and it < M:
             inputs[self.body.input_names[0]] = numpy.array(it, dtype=M.dtype)
@@ -93,6 +101,38 @@ class Loop(OpRun):
                 "Operator Loop produces a None value.")
         return res
 
+    def _run_bound(self, run_iteration, M, cond, states):
+        """
+        Runs the loop with a function returned by :meth:`bind_iterations
+        <mlprodict.onnxrt.onnx_inference.OnnxInference.bind_iterations>`,
+        the body keeps the same table of values for all iterations.
+        """
+        n_states = len(states)
+        n_outputs = len(self.body.output_names) - 1
+        outputs = None
+        it = 0
+        while cond and it < M:
+            outputs = run_iteration(
+                numpy.array(it, dtype=M.dtype), cond, *states)
+            cond = outputs[0]
+            if cond is None:
+                raise RuntimeError(
+                    "condition %r returned by the subgraph cannot be None."
+                    "" % self.body.output_names[0])
+            states = outputs[1:1 + n_states]
+            it += 1
+
+        if outputs is None:
+            res = list(states[:n_outputs])
+            res.extend(numpy.empty(shape=tuple())
+                       for _ in range(n_outputs - len(res)))
+        else:
+            res = outputs[1:]
+        if any(r is None for r in res):
+            raise TypeError(  # pragma: no cover
+                "Operator Loop produces a None value.")
+        return tuple(res)
+
     def _infer_shapes(self, M, cond, v_initial, *args):  # pylint: disable=W0221
         res = self.body._set_shape_inference_runtime()
         outputs = {k[0]: k[1:] for k in self.body.output_names_shapes_types}
@@ -4,6 +4,7 @@
 @file
 @brief Runtime operator.
 """
+import numpy
 from ._op import OpRunBinaryNum
 from ._op_numpy_helper import numpy_matmul_inplace
 
@@ -16,5 +17,14 @@ class MatMul(OpRunBinaryNum):
     def _run(self, a, b, attributes=None, verbose=0, fLOG=None):  # pylint: disable=W0221
         return (numpy_matmul_inplace(self.inplaces, a, b), )
 
+    def _run_out(self, out, a, b):
+        if (not isinstance(a, numpy.ndarray) or
+                not isinstance(b, numpy.ndarray) or
+                len(a.shape) != 2 or len(b.shape) != 2 or
+                out.shape != (a.shape[0], b.shape[1]) or
+                a.dtype != b.dtype or out.dtype != a.dtype):
+            return None
+        return (numpy.matmul(a, b, out=out), )
+
     def to_python(self, inputs):
         return "import numpy", "return %s @ %s" % tuple(inputs)
@@ -6,6 +6,7 @@
 """
 import numpy
 from ._op import OpRunUnaryNum
+from ._op_numpy_helper import numpy_ufunc_out
 
 
 class Neg(OpRunUnaryNum):
@@ -22,6 +23,9 @@ class Neg(OpRunUnaryNum):
             data = numpy.negative(data)
         return (data, )
 
+    def _run_out(self, out, x):
+        return numpy_ufunc_out(numpy.negative, out, x)
+
     def to_python(self, inputs):
         return ("import numpy",
                 "return -%s" % inputs[0])
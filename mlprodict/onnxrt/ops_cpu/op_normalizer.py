@@ -5,10 +5,16 @@
 @brief Runtime operator.
 """
 import numpy
+from scipy.sparse import issparse
 from ._op import OpRunUnaryNum
 
 
 class Normalizer(OpRunUnaryNum):
+    """
+    A sparse matrix (see @see cl DictVectorizer) is normalized
+    without being converted into a dense matrix, the output is
+    a :epkg:`csr_matrix`.
+    """
 
     atts = {'norm': 'MAX'}
 
@@ -63,6 +69,21 @@ class Normalizer(OpRunUnaryNum):
             return x
         return x / norm
 
+    def _norm_sparse(self, x):
+        "normalization of a sparse matrix"
+        x = x.tocsr(copy=True)
+        if self.norm == b'MAX':  # pylint: disable=E1101
+            norm = abs(x).max(axis=1).toarray().ravel()
+        elif self.norm == b'L1':  # pylint: disable=E1101
+            norm = numpy.asarray(abs(x).sum(axis=1)).ravel()
+        else:
+            norm = numpy.sqrt(numpy.asarray(x.multiply(x).sum(axis=1)).ravel())
+        # every stored value is divided by the norm of its row
+        x.data /= numpy.repeat(norm, numpy.diff(x.indptr))
+        return x
+
     def _run(self, x, attributes=None, verbose=0, fLOG=None):  # pylint: disable=W0221
+        if issparse(x):
+            return (self._norm_sparse(x), )
         return (self._norm(
             x, inplace=self.inplaces.get(0, False) and x.flags['WRITEABLE']), )
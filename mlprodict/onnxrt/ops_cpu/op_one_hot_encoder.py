@@ -6,6 +6,7 @@
 """
 import numpy
 from ._op import OpRun
+from ._op_helper import sort_keys, lookup_sorted_keys
 from ..shape_object import DimensionObject
 
 
@@ -14,6 +15,10 @@ class OneHotEncoder(OpRun):
     :epkg:`ONNX` specifications does not mention
     the possibility to change the output type,
     sparse, dense, float, double.
+    The categories are stored as a sorted array, every element
+    of the input is looked up with a binary search
+    (see @see fn lookup_sorted_keys) and the ones are
+    written in the preallocated output.
     """
 
     atts = {'cats_int64s': numpy.empty(0, dtype=numpy.int64),
@@ -32,27 +37,23 @@ class OneHotEncoder(OpRun):
                              v in enumerate(self.cats_strings)}
         else:
             raise RuntimeError("No encoding was defined.")  # pragma: no cover
+        self.keys_, self.positions_ = sort_keys(
+            list(self.classes_), list(self.classes_.values()))
 
     def _run(self, x, attributes=None, verbose=0, fLOG=None):  # pylint: disable=W0221
         shape = x.shape
         new_shape = shape + (len(self.classes_), )
-        res = numpy.zeros(new_shape, dtype=numpy.float32)
-        if len(x.shape) == 1:
-            for i, v in enumerate(x):
-                j = self.classes_.get(v, -1)
-                if j >= 0:
-                    res[i, j] = 1.
-        elif len(x.shape) == 2:
-            for a, row in enumerate(x):
-                for i, v in enumerate(row):
-                    j = self.classes_.get(v, -1)
-                    if j >= 0:
-                        res[a, i, j] = 1.
-        else:
+        if len(x.shape) not in (1, 2):
             raise RuntimeError(  # pragma: no cover
                 "This operator is not implemented for shape {}.".format(x.shape))
+        res = numpy.zeros(new_shape, dtype=numpy.float32)
+        pos, found = lookup_sorted_keys(self.keys_, x)
+        found = found.ravel()
+        flat = res.reshape((-1, len(self.classes_)))
+        flat[numpy.arange(flat.shape[0])[found],
+             self.positions_[pos.ravel()[found]]] = 1.
 
-        if not self.zeros:
+        if not self.zeros and not found.all():
             red = res.sum(axis=len(res.shape) - 1)
             if numpy.min(red) == 0:
                 rows = []
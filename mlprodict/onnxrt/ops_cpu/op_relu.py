@@ -22,6 +22,11 @@ class Relu(OpRunUnaryNum):
     def _run_inplace(self, x):
         return (numpy.maximum(x, 0, out=x), )
 
+    def _run_out(self, out, x):
+        if out.shape != x.shape or out.dtype != x.dtype:
+            return None
+        return (numpy.maximum(x, 0, out=out), )
+
     def to_python(self, inputs):
         return ("import numpy", "return numpy.maximum(%s, 0)" % inputs[0])
 
@@ -8,123 +8,199 @@ import numpy
 from onnx.defs import onnx_opset_version
 from ._op import OpRun
 from ..shape_object import ShapeObject
+from .op_rnn_ import (  # pylint: disable=E0611,E0401
+    rnn_float, rnn_double)
+
+
+def recurrent_direction(direction):
+    """
+    Returns the number of directions and tells if
+    the first direction is processed in reverse order.
+
+    :param direction: attribute *direction*
+    :return: *(num_directions, reverse)*
+    """
+    if isinstance(direction, bytes):
+        direction = direction.decode('ascii')
+    if direction == 'forward':
+        return 1, False
+    if direction == 'reverse':
+        return 1, True
+    if direction == 'bidirectional':
+        return 2, False
+    raise RuntimeError(  # pragma: no cover
+        "Unknown direction '{}'.".format(direction))
+
+
+def recurrent_clip(clip):
+    """
+    Returns the value of attribute *clip*, 0 if it is not defined.
+    """
+    if isinstance(clip, (list, numpy.ndarray)):
+        return float(clip[0]) if len(clip) > 0 else 0.
+    return float(clip) if clip else 0.
+
+
+def recurrent_inputs(X, W, R, B, sequence_lens, initial_states, layout):
+    """
+    Prepares the inputs of operators RNN, GRU, LSTM for the
+    recurrence implemented in C++. The input projection
+    ``X W^T + Wb`` does not depend on the hidden state,
+    it is computed for every time step and every direction
+    with a single matrix multiplication.
+
+    :param X: inputs
+    :param W: input weights *(num_directions, n_gates * hidden_size, input_size)*
+    :param R: recurrence weights *(num_directions, n_gates * hidden_size, hidden_size)*
+    :param B: biases *(num_directions, 2 * n_gates * hidden_size)* or None
+    :param sequence_lens: length of every sequence or None
+    :param initial_states: list of initial states (*initial_h*, *initial_c*),
+        every of them can be None
+    :param layout: attribute *layout*, 1 if *X* is *(batch_size, seq_length, input_size)*
+    :return: *xw, R, rb, seq_lens, states*, *xw* is
+        *(seq_length, batch_size, num_directions, n_gates * hidden_size)*,
+        every state is *(num_directions, batch_size, hidden_size)*
+    """
+    if layout != 0:
+        X = numpy.swapaxes(X, 0, 1)
+        initial_states = [None if s is None else numpy.swapaxes(s, 0, 1)
+                          for s in initial_states]
+    dtype = X.dtype
+    seq_length, batch_size, input_size = X.shape
+    num_directions, gate_size = W.shape[:2]
+    hidden_size = R.shape[-1]
+
+    xw = numpy.dot(X.reshape((-1, input_size)),
+                   W.reshape((-1, input_size)).astype(dtype, copy=False).T)
+    if B is None:
+        rb = numpy.zeros((num_directions, gate_size), dtype=dtype)
+    else:
+        B = B.astype(dtype, copy=False)
+        xw += B[:, :gate_size].reshape((1, -1))
+        rb = numpy.ascontiguousarray(B[:, gate_size:])
+    xw = xw.reshape((seq_length, batch_size, num_directions, gate_size))
+
+    if sequence_lens is None:
+        seq_lens = numpy.full((batch_size, ), seq_length, dtype=numpy.int64)
+    else:
+        seq_lens = sequence_lens.astype(numpy.int64, copy=False)
+    states = [
+        numpy.zeros((num_directions, batch_size, hidden_size), dtype=dtype)
+        if s is None else numpy.ascontiguousarray(s, dtype=dtype)
+        for s in initial_states]
+    return xw, R.astype(dtype, copy=False), rb, seq_lens, states
+
+
+def recurrent_outputs(Y, states, layout, nb_outputs, dtype):
+    """
+    Converts the outputs of the recurrence into the outputs of
+    operators RNN, GRU, LSTM.
+
+    :param Y: *(seq_length, num_directions, batch_size, hidden_size)*
+    :param states: final states, every of them is
+        *(num_directions, batch_size, hidden_size)*
+    :param layout: attribute *layout*
+    :param nb_outputs: number of outputs of the node
+    :param dtype: expected type
+    :return: tuple
+    """
+    if layout != 0:
+        Y = numpy.transpose(Y, (2, 0, 1, 3))
+        states = [numpy.swapaxes(s, 0, 1) for s in states]
+    res = [Y] + list(states)
+    return tuple(r.astype(dtype, copy=False) for r in res[:nb_outputs])
+
+
+def recurrent_infer_shapes(op, X, W, R):
+    """
+    Infers the output shapes of operators RNN, GRU, LSTM.
+    """
+    num_directions = W[0]
+    hidden_size = R[-1]
+    if getattr(op, 'layout', 0) == 0:
+        y_shape = (X[0], num_directions, X[1], hidden_size)
+        state_shape = (num_directions, X[1], hidden_size)
+    else:
+        y_shape = (X[0], X[1], num_directions, hidden_size)
+        state_shape = (X[0], num_directions, hidden_size)
+    res = [ShapeObject(y_shape, dtype=X.dtype)]
+    while len(res) < op.nb_outputs:
+        res.append(ShapeObject(state_shape, dtype=X.dtype))
+    return tuple(res)
 
 
 class CommonRNN(OpRun):
 
+    # below this number of multiplications (batch_size * n_gates * hidden_size ** 2),
+    # the product by the recurrence weights is not parallelized
+    th_parallel = 1 << 16
+
     def __init__(self, onnx_node, expected_attributes=None, desc=None,
                  **options):
         OpRun.__init__(self, onnx_node, desc=desc,
                        expected_attributes=expected_attributes,
                        **options)
 
-        if self.direction in (b"forward", b"reverse"):
-            self.num_directions = 1
-        elif self.direction == "bidirectional":
-            self.num_directions = 2
-        else:
-            raise RuntimeError(  # pragma: no cover
-                "Unknown direction '{}'.".format(self.direction))
-
-        if len(self.activation_alpha) != self.num_directions:
-            raise RuntimeError(  # pragma: no cover
-                "activation_alpha must have the same size as num_directions={}".format(
-                    self.num_directions))
-        if len(self.activation_beta) != self.num_directions:
-            raise RuntimeError(  # pragma: no cover
-                "activation_beta must have the same size as num_directions={}".format(
-                    self.num_directions))
-
-        self.f1 = self.choose_act(
-            self.activations[0],
-            self.activation_alpha[0] if len(
-                self.activation_alpha) > 0 else None,
-            self.activation_beta[0] if len(self.activation_beta) > 0 else None)
-        if len(self.activations) > 1:
-            self.f2 = self.choose_act(
-                self.activations[1],
-                self.activation_alpha[1] if len(
-                    self.activation_alpha) > 1 else None,
-                self.activation_beta[1] if len(self.activation_beta) > 1 else None)
+        self.num_directions, self.reverse_ = recurrent_direction(
+            self.direction)
+        self.clip_ = recurrent_clip(self.clip)
+
+        # one activation per direction
+        self.activations_ = []
+        for i in range(self.num_directions):
+            name = self.activations[i]
+            alpha = (self.activation_alpha[i]
+                     if len(self.activation_alpha) > i else None)
+            beta = (self.activation_beta[i]
+                    if len(self.activation_beta) > i else None)
+            self.activations_.append(self.choose_act(name, alpha, beta))
         self.nb_outputs = len(onnx_node.output)
 
     def choose_act(self, name, alpha, beta):
-        if name in (b"Tanh", b'tanh', 'tanh', 'Tanh'):
-            return self._f_tanh
-        if name in (b"Affine", b"affine", 'Affine', 'affine'):
-            return lambda x: x * alpha + beta
+        """
+        Returns the activation as expected by the C++ implementation,
+        *(kind, alpha, beta)*.
+        """
+        if isinstance(name, bytes):
+            name = name.decode('ascii')
+        name = name.lower()
+        if name == 'tanh':
+            return 0, 0., 0.
+        if name == 'affine':
+            return 1, alpha, beta
+        if name == 'relu':
+            return 2, 0., 0.
+        if name == 'sigmoid':
+            return 3, 0., 0.
         raise RuntimeError(  # pragma: no cover
             "Unknown activation function '{}'.".format(name))
 
-    def _f_tanh(self, x):
-        return numpy.tanh(x)
-
-    def _step(self, X, R, B, W, H_0):
-        h_list = []
-        H_t = H_0
-        for x in numpy.split(X, X.shape[0], axis=0):
-            H = self.f1(numpy.dot(x, numpy.transpose(W)) +
-                        numpy.dot(H_t, numpy.transpose(R)) +
-                        numpy.add(*numpy.split(B, 2)))
-            h_list.append(H)
-            H_t = H
-        concatenated = numpy.concatenate(h_list)
-        if self.num_directions == 1:
-            output = numpy.expand_dims(concatenated, 1)
-        return output, h_list[-1]
-
     def _run(self, X, W, R, B=None, sequence_lens=None, initial_h=None, attributes=None, verbose=0, fLOG=None):  # pylint: disable=W0221
-        self.num_directions = W.shape[0]
-
-        if self.num_directions == 1:
-            R = numpy.squeeze(R, axis=0)
-            W = numpy.squeeze(W, axis=0)
-            if B is not None:
-                B = numpy.squeeze(B, axis=0)
-            if sequence_lens is not None:
-                sequence_lens = numpy.squeeze(sequence_lens, axis=0)
-            if initial_h is not None:
-                initial_h = numpy.squeeze(initial_h, axis=0)
-
-            hidden_size = R.shape[-1]
-            batch_size = X.shape[1]
-
-            b = (B if B is not None else
-                 numpy.zeros(2 * hidden_size, dtype=X.dtype))
-            h_0 = (initial_h if initial_h is not None else
-                   numpy.zeros((batch_size, hidden_size), dtype=X.dtype))
-
-            B = b
-            H_0 = h_0
+        if W.shape[0] != self.num_directions:
+            raise RuntimeError(  # pragma: no cover
+                "W.shape[0]=%d != num_directions=%d for operator %r." % (
+                    W.shape[0], self.num_directions, self.__class__.__name__))
+        layout = getattr(self, 'layout', 0)
+        xw, R, rb, seq_lens, (initial_h, ) = recurrent_inputs(
+            X, W, R, B, sequence_lens, [initial_h], layout)
+
+        kinds = [a[0] for a in self.activations_]
+        alphas = [a[1] for a in self.activations_]
+        betas = [a[2] for a in self.activations_]
+        if xw.dtype == numpy.float64:
+            fct = rnn_double
         else:
-            raise NotImplementedError(  # pragma: no cover
-                "Unsupported value %r for num_directions and operator %r." % (
-                    self.num_directions, self.__class__.__name__))
-
-        Y, Y_h = self._step(X, R, B, W, H_0)
-        # if self.layout == 1:
-        #    #Y = numpy.transpose(Y, [2, 0, 1, 3])
-        #    Y_h = Y[:, :, -1, :]
-
-        return (Y, ) if self.nb_outputs == 1 else (Y, Y_h)
+            fct = rnn_float
+        Y, Y_h = fct(xw, R, rb, seq_lens, initial_h, self.reverse_,
+                     kinds, alphas, betas, self.clip_, self.th_parallel)
+        return recurrent_outputs(
+            Y, [Y_h], layout, self.nb_outputs, X.dtype)
 
     def _infer_shapes(self, X, W, R, B=None, sequence_lens=None, initial_h=None):  # pylint: disable=W0221
-        num_directions = W.shape[0]
-        hidden_size = R[-1]
-        batch_size = X[1]
-        if num_directions == 1:
-            y_shape = ShapeObject(
-                (X[0], num_directions, batch_size, hidden_size), dtype=X.dtype)
-        else:
-            y_shape = ShapeObject(None, dtype=X.dtype)
-        if self.nb_outputs == 1:
-            return (y_shape, )
-        y_h_shape = ShapeObject(
-            (num_directions, batch_size, hidden_size), dtype=X.dtype)
-        return (y_shape, y_h_shape)
+        return recurrent_infer_shapes(self, X, W, R)
 
     def _infer_types(self, X, W, R, B=None, sequence_lens=None, initial_h=None):  # pylint: disable=W0221
-        return (X, X)
+        return (X, ) * self.nb_outputs
 
 
 class RNN_7(CommonRNN):
@@ -0,0 +1,492 @@
+// Inspired from
+// https://github.com/microsoft/onnxruntime/tree/master/onnxruntime/core/providers/cpu/rnn.
+
+#if !defined(_CRT_SECURE_NO_WARNINGS)
+#define _CRT_SECURE_NO_WARNINGS
+#endif
+
+#ifndef SKIP_PYTHON
+//#include <pybind11/iostream.h>
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+#include <pybind11/numpy.h>
+//#include <numpy/arrayobject.h>
+
+#if USE_OPENMP
+#include <omp.h>
+#endif
+
+#include <cmath>
+#include <cstring>
+#include <string>
+#include <vector>
+#include <stdexcept>
+
+namespace py = pybind11;
+#endif
+
+
+enum RnnActivation {
+    kTanh = 0,
+    kAffine = 1,
+    kRelu = 2,
+    kSigmoid = 3
+};
+
+
+// out[i * ldo + j] = bias[j] + sum_k a[i * dim + k] rt[k * ldr + j] for j < n_cols,
+// rt is the transposed recurrence weights, the innermost loop is
+// over contiguous columns and is vectorized, every row of rt is
+// used for four rows of a at a time. Blocks of columns are computed
+// in parallel if parallel is true.
+template <typename T>
+void rnn_matmul(const T* a, int64_t n_rows, int64_t dim, const T* rt, int64_t ldr,
+                const T* bias, int64_t n_cols, T* out, int64_t ldo, bool parallel) {
+    const int64_t block = 64;
+    auto columns = [&](int64_t begin, int64_t end) {
+        int64_t n = end - begin;
+        const T* pb = bias + begin;
+        int64_t i = 0;
+        for (; i + 4 <= n_rows; i += 4) {
+            T* o0 = out + i * ldo + begin;
+            T* o1 = o0 + ldo;
+            T* o2 = o1 + ldo;
+            T* o3 = o2 + ldo;
+            const T* a0 = a + i * dim;
+            memcpy(o0, pb, n * sizeof(T));
+            memcpy(o1, pb, n * sizeof(T));
+            memcpy(o2, pb, n * sizeof(T));
+            memcpy(o3, pb, n * sizeof(T));
+            for (int64_t k = 0; k < dim; ++k) {
+                const T* rk = rt + k * ldr + begin;
+                T v0 = a0[k], v1 = a0[dim + k], v2 = a0[2 * dim + k], v3 = a0[3 * dim + k];
+                for (int64_t j = 0; j < n; ++j) {
+                    T r = rk[j];
+                    o0[j] += v0 * r;
+                    o1[j] += v1 * r;
+                    o2[j] += v2 * r;
+                    o3[j] += v3 * r;
+                }
+            }
+        }
+        for (; i < n_rows; ++i) {
+            T* o0 = out + i * ldo + begin;
+            const T* a0 = a + i * dim;
+            memcpy(o0, pb, n * sizeof(T));
+            for (int64_t k = 0; k < dim; ++k) {
+                const T* rk = rt + k * ldr + begin;
+                T v0 = a0[k];
+                for (int64_t j = 0; j < n; ++j)
+                    o0[j] += v0 * rk[j];
+            }
+        }
+    };
+    int64_t n_blocks = (n_cols + block - 1) / block;
+    if (parallel && n_blocks > 1) {
+        #ifdef USE_OPENMP
+        #pragma omp parallel for
+        #endif
+        for (int64_t jb = 0; jb < n_blocks; ++jb)
+            columns(jb * block, jb * block + block < n_cols ? jb * block + block : n_cols);
+    }
+    else
+        columns(0, n_cols);
+}
+
+
+// Transposes the recurrence weights of every direction,
+// (num_directions, gate_size, hidden_size) -> (num_directions, hidden_size, gate_size).
+template <typename T>
+std::vector<T> rnn_transpose(const T* r, int64_t num_directions, int64_t gate_size, int64_t hidden_size) {
+    std::vector<T> rt(num_directions * gate_size * hidden_size);
+    for (int64_t d = 0; d < num_directions; ++d) {
+        const T* rd = r + d * gate_size * hidden_size;
+        T* rtd = rt.data() + d * gate_size * hidden_size;
+        for (int64_t j = 0; j < gate_size; ++j)
+            for (int64_t k = 0; k < hidden_size; ++k)
+                rtd[k * gate_size + j] = rd[j * hidden_size + k];
+    }
+    return rt;
+}
+
+
+template <typename T>
+inline T rnn_clip(T x, T clip) {
+    return clip > 0 ? (x < -clip ? -clip : (x > clip ? clip : x)) : x;
+}
+
+
+template <typename T>
+inline T rnn_sigmoid(T x) {
+    return (T)1 / ((T)1 + std::exp(-x));
+}
+
+
+template <typename T>
+inline T rnn_activation(T x, RnnActivation kind, T alpha, T beta) {
+    switch (kind) {
+        case kAffine:
+            return x * alpha + beta;
+        case kRelu:
+            return x > 0 ? x : 0;
+        case kSigmoid:
+            return rnn_sigmoid(x);
+        default:
+            return std::tanh(x);
+    }
+}
+
+
+// Shapes shared by every recurrent operator.
+// xw is the input projection X W^T + Wb (seq_length, batch_size, num_directions, gate_size),
+// r the recurrence weights (num_directions, gate_size, hidden_size),
+// rb the recurrence bias (num_directions, gate_size),
+// initial states are (num_directions, batch_size, hidden_size).
+struct RnnShape {
+    int64_t seq_length;
+    int64_t batch_size;
+    int64_t num_directions;
+    int64_t gate_size;
+    int64_t hidden_size;
+};
+
+
+template <typename T>
+RnnShape rnn_check(const py::array_t<T, py::array::c_style | py::array::forcecast>& xw,
+                   const py::array_t<T, py::array::c_style | py::array::forcecast>& r,
+                   const py::array_t<T, py::array::c_style | py::array::forcecast>& rb,
+                   const py::array_t<int64_t, py::array::c_style | py::array::forcecast>& seq_lens,
+                   const py::array_t<T, py::array::c_style | py::array::forcecast>& initial_h,
+                   int64_t n_gates) {
+    if (xw.ndim() != 4 || r.ndim() != 3 || rb.ndim() != 2 ||
+            seq_lens.ndim() != 1 || initial_h.ndim() != 3)
+        throw std::invalid_argument("Unexpected number of dimensions for xw, r, rb, seq_lens, initial_h.");
+    RnnShape sh;
+    sh.seq_length = xw.shape(0);
+    sh.batch_size = xw.shape(1);
+    sh.num_directions = xw.shape(2);
+    sh.gate_size = xw.shape(3);
+    sh.hidden_size = r.shape(2);
+    if (sh.gate_size != n_gates * sh.hidden_size || r.shape(0) != sh.num_directions ||
+            r.shape(1) != sh.gate_size || rb.shape(0) != sh.num_directions ||
+            rb.shape(1) != sh.gate_size || seq_lens.shape(0) != sh.batch_size ||
+            initial_h.shape(0) != sh.num_directions || initial_h.shape(1) != sh.batch_size ||
+            initial_h.shape(2) != sh.hidden_size)
+        throw std::invalid_argument("Shape mismatch between xw, r, rb, seq_lens, initial_h.");
+    const int64_t* lens = seq_lens.data();
+    for (int64_t b = 0; b < sh.batch_size; ++b)
+        if (lens[b] < 0 || lens[b] > sh.seq_length)
+            throw std::invalid_argument("sequence_lens must be in [0, seq_length].");
+    return sh;
+}
+
+
+// Runs the recurrence for every direction. At every step,
+// xs[b] points to the input projection of batch item b or is null
+// if the sequence is over, step(d, xs, h, c) updates the hidden
+// states h (and the cell states c) of every active batch item.
+// y (seq_length, num_directions, batch_size, hidden_size) must be filled with zeros,
+// y_h, y_c (num_directions, batch_size, hidden_size) must contain the initial states.
+template <typename T, typename STEP>
+void rnn_loop(const RnnShape& sh, const T* xw, const int64_t* lens, bool reverse,
+              T* y, T* y_h, T* y_c, STEP step) {
+    int64_t max_len = 0;
+    for (int64_t b = 0; b < sh.batch_size; ++b)
+        max_len = lens[b] > max_len ? lens[b] : max_len;
+    std::vector<const T*> xs(sh.batch_size);
+    std::vector<int64_t> ts(sh.batch_size);
+    int64_t state_size = sh.batch_size * sh.hidden_size;
+    for (int64_t d = 0; d < sh.num_directions; ++d) {
+        // the second direction is always reverse
+        bool backward = reverse || d == 1;
+        T* h = y_h + d * state_size;
+        T* c = y_c == nullptr ? nullptr : y_c + d * state_size;
+        for (int64_t i = 0; i < max_len; ++i) {
+            for (int64_t b = 0; b < sh.batch_size; ++b) {
+                if (i < lens[b]) {
+                    ts[b] = backward ? lens[b] - 1 - i : i;
+                    xs[b] = xw + ((ts[b] * sh.batch_size + b) * sh.num_directions + d) * sh.gate_size;
+                }
+                else
+                    xs[b] = nullptr;
+            }
+            step(d, xs.data(), h, c);
+            for (int64_t b = 0; b < sh.batch_size; ++b) {
+                if (xs[b] != nullptr)
+                    memcpy(y + ((ts[b] * sh.num_directions + d) * sh.batch_size + b) * sh.hidden_size,
+                           h + b * sh.hidden_size, sh.hidden_size * sizeof(T));
+            }
+        }
+    }
+}
+
+
+template <typename T>
+py::array_t<T> rnn_new_output(const RnnShape& sh) {
+    py::array_t<T> y({sh.seq_length, sh.num_directions, sh.batch_size, sh.hidden_size});
+    memset(y.mutable_data(), 0, sizeof(T) * y.size());
+    return y;
+}
+
+
+template <typename T>
+py::array_t<T> rnn_new_state(const py::array_t<T, py::array::c_style | py::array::forcecast>& initial) {
+    py::array_t<T> state({initial.shape(0), initial.shape(1), initial.shape(2)});
+    memcpy(state.mutable_data(), initial.data(), sizeof(T) * initial.size());
+    return state;
+}
+
+
+template <typename T>
+py::tuple rnn_compute(
+        py::array_t<T, py::array::c_style | py::array::forcecast> xw,
+        py::array_t<T, py::array::c_style | py::array::forcecast> r,
+        py::array_t<T, py::array::c_style | py::array::forcecast> rb,
+        py::array_t<int64_t, py::array::c_style | py::array::forcecast> seq_lens,
+        py::array_t<T, py::array::c_style | py::array::forcecast> initial_h,
+        bool reverse, const std::vector<int64_t>& activations,
+        const std::vector<T>& alphas, const std::vector<T>& betas,
+        T clip, int64_t th_parallel) {
+    RnnShape sh = rnn_check(xw, r, rb, seq_lens, initial_h, 1);
+    if ((int64_t)activations.size() != sh.num_directions ||
+            (int64_t)alphas.size() != sh.num_directions ||
+            (int64_t)betas.size() != sh.num_directions)
+        throw std::invalid_argument("One activation is expected per direction.");
+    py::array_t<T> y = rnn_new_output<T>(sh);
+    py::array_t<T> y_h = rnn_new_state(initial_h);
+    const T* prb = rb.data();
+    int64_t hs = sh.hidden_size;
+    bool parallel = sh.batch_size * sh.gate_size * hs > th_parallel;
+    {
+        py::gil_scoped_release release;
+        std::vector<T> rt = rnn_transpose(r.data(), sh.num_directions, sh.gate_size, hs);
+        std::vector<T> buffer(sh.batch_size * hs);
+        T* gates = buffer.data();
+        rnn_loop(sh, xw.data(), seq_lens.data(), reverse,
+                 y.mutable_data(), y_h.mutable_data(), (T*)nullptr,
+                 [&](int64_t d, const T* const* xs, T* h, T*) {
+            rnn_matmul(h, sh.batch_size, hs, rt.data() + d * hs * hs, hs,
+                       prb + d * hs, hs, gates, hs, parallel);
+            RnnActivation kind = (RnnActivation)activations[d];
+            for (int64_t b = 0; b < sh.batch_size; ++b) {
+                const T* x = xs[b];
+                if (x == nullptr)
+                    continue;
+                T* hb = h + b * hs;
+                const T* gb = gates + b * hs;
+                for (int64_t j = 0; j < hs; ++j)
+                    hb[j] = rnn_activation(rnn_clip(x[j] + gb[j], clip), kind, alphas[d], betas[d]);
+            }
+        });
+    }
+    return py::make_tuple(y, y_h);
+}
+
+
+template <typename T>
+py::tuple gru_compute(
+        py::array_t<T, py::array::c_style | py::array::forcecast> xw,
+        py::array_t<T, py::array::c_style | py::array::forcecast> r,
+        py::array_t<T, py::array::c_style | py::array::forcecast> rb,
+        py::array_t<int64_t, py::array::c_style | py::array::forcecast> seq_lens,
+        py::array_t<T, py::array::c_style | py::array::forcecast> initial_h,
+        bool reverse, bool linear_before_reset, T clip, int64_t th_parallel) {
+    RnnShape sh = rnn_check(xw, r, rb, seq_lens, initial_h, 3);
+    py::array_t<T> y = rnn_new_output<T>(sh);
+    py::array_t<T> y_h = rnn_new_state(initial_h);
+    const T* prb = rb.data();
+    int64_t hs = sh.hidden_size;
+    int64_t gs = sh.gate_size;
+    bool parallel = sh.batch_size * gs * hs > th_parallel;
+    {
+        py::gil_scoped_release release;
+        std::vector<T> rt = rnn_transpose(r.data(), sh.num_directions, gs, hs);
+        // gates z, r, h for every batch item and r (.) H
+        std::vector<T> buffer(sh.batch_size * (gs + hs));
+        T* gates = buffer.data();
+        T* rh_state = gates + sh.batch_size * gs;
+        rnn_loop(sh, xw.data(), seq_lens.data(), reverse,
+                 y.mutable_data(), y_h.mutable_data(), (T*)nullptr,
+                 [&](int64_t d, const T* const* xs, T* h, T*) {
+            const T* rtd = rt.data() + d * gs * hs;
+            const T* rbd = prb + d * gs;
+            // z, r
+            rnn_matmul(h, sh.batch_size, hs, rtd, gs, rbd, 2 * hs, gates, gs, parallel);
+            for (int64_t b = 0; b < sh.batch_size; ++b) {
+                const T* x = xs[b];
+                T* gb = gates + b * gs;
+                if (x == nullptr)
+                    continue;
+                for (int64_t j = 0; j < 2 * hs; ++j)
+                    gb[j] = rnn_sigmoid(rnn_clip(x[j] + gb[j], clip));
+            }
+            // h
+            if (linear_before_reset)
+                rnn_matmul(h, sh.batch_size, hs, rtd + 2 * hs, gs, rbd + 2 * hs,
+                           hs, gates + 2 * hs, gs, parallel);
+            else {
+                for (int64_t b = 0; b < sh.batch_size; ++b) {
+                    const T* gr = gates + b * gs + hs;
+                    const T* hb = h + b * hs;
+                    T* rhb = rh_state + b * hs;
+                    for (int64_t j = 0; j < hs; ++j)
+                        rhb[j] = gr[j] * hb[j];
+                }
+                rnn_matmul((const T*)rh_state, sh.batch_size, hs, rtd + 2 * hs, gs,
+                           rbd + 2 * hs, hs, gates + 2 * hs, gs, parallel);
+            }
+            for (int64_t b = 0; b < sh.batch_size; ++b) {
+                const T* x = xs[b];
+                if (x == nullptr)
+                    continue;
+                const T* gz = gates + b * gs;
+                const T* gr = gz + hs;
+                const T* gh = gr + hs;
+                const T* xh = x + 2 * hs;
+                T* hb = h + b * hs;
+                for (int64_t j = 0; j < hs; ++j)
+                    hb[j] = ((T)1 - gz[j]) * std::tanh(rnn_clip(
+                        linear_before_reset ? xh[j] + gr[j] * gh[j] : xh[j] + gh[j], clip)) +
+                        gz[j] * hb[j];
+            }
+        });
+    }
+    return py::make_tuple(y, y_h);
+}
+
+
+template <typename T>
+py::tuple lstm_compute(
+        py::array_t<T, py::array::c_style | py::array::forcecast> xw,
+        py::array_t<T, py::array::c_style | py::array::forcecast> r,
+        py::array_t<T, py::array::c_style | py::array::forcecast> rb,
+        py::array_t<int64_t, py::array::c_style | py::array::forcecast> seq_lens,
+        py::array_t<T, py::array::c_style | py::array::forcecast> initial_h,
+        py::array_t<T, py::array::c_style | py::array::forcecast> initial_c,
+        py::array_t<T, py::array::c_style | py::array::forcecast> p,
+        bool reverse, bool input_forget, T clip, int64_t th_parallel) {
+    RnnShape sh = rnn_check(xw, r, rb, seq_lens, initial_h, 4);
+    if (initial_c.ndim() != 3 || initial_c.shape(0) != sh.num_directions ||
+            initial_c.shape(1) != sh.batch_size || initial_c.shape(2) != sh.hidden_size)
+        throw std::invalid_argument("Shape mismatch for initial_c.");
+    if (p.ndim() != 2 || p.shape(0) != sh.num_directions || p.shape(1) != 3 * sh.hidden_size)
+        throw std::invalid_argument("Shape mismatch for p.");
+    py::array_t<T> y = rnn_new_output<T>(sh);
+    py::array_t<T> y_h = rnn_new_state(initial_h);
+    py::array_t<T> y_c = rnn_new_state(initial_c);
+    const T* prb = rb.data();
+    const T* pp = p.data();
+    int64_t hs = sh.hidden_size;
+    int64_t gs = sh.gate_size;
+    bool parallel = sh.batch_size * gs * hs > th_parallel;
+    {
+        py::gil_scoped_release release;
+        std::vector<T> rt = rnn_transpose(r.data(), sh.num_directions, gs, hs);
+        // gates i, o, f, c for every batch item
+        std::vector<T> buffer(sh.batch_size * gs);
+        T* gates = buffer.data();
+        rnn_loop(sh, xw.data(), seq_lens.data(), reverse,
+                 y.mutable_data(), y_h.mutable_data(), y_c.mutable_data(),
+                 [&](int64_t d, const T* const* xs, T* h, T* c) {
+            const T* pi = pp + d * 3 * hs;
+            const T* po = pi + hs;
+            const T* pf = po + hs;
+            rnn_matmul(h, sh.batch_size, hs, rt.data() + d * gs * hs, gs,
+                       prb + d * gs, gs, gates, gs, parallel);
+            T gi, go, gf, gc;
+            for (int64_t b = 0; b < sh.batch_size; ++b) {
+                const T* x = xs[b];
+                if (x == nullptr)
+                    continue;
+                const T* gb = gates + b * gs;
+                T* hb = h + b * hs;
+                T* cb = c + b * hs;
+                for (int64_t j = 0; j < hs; ++j) {
+                    gi = rnn_sigmoid(rnn_clip(x[j] + gb[j] + pi[j] * cb[j], clip));
+                    gf = input_forget
+                        ? (T)1 - gi
+                        : rnn_sigmoid(rnn_clip(x[2 * hs + j] + gb[2 * hs + j] + pf[j] * cb[j], clip));
+                    gc = std::tanh(rnn_clip(x[3 * hs + j] + gb[3 * hs + j], clip));
+                    cb[j] = gf * cb[j] + gi * gc;
+                    go = rnn_sigmoid(rnn_clip(x[hs + j] + gb[hs + j] + po[j] * cb[j], clip));
+                    hb[j] = go * std::tanh(cb[j]);
+                }
+            }
+        });
+    }
+    return py::make_tuple(y, y_h, y_c);
+}
+
+
+#ifndef SKIP_PYTHON
+
+PYBIND11_MODULE(op_rnn_, m) {
+	m.doc() =
+    #if defined(__APPLE__)
+    "Implements the recurrence of operators RNN, GRU, LSTM."
+    #else
+    R"pbdoc(Implements the recurrence of operators RNN, GRU, LSTM.
+The code is inspired from
+`rnn <https://github.com/microsoft/onnxruntime/tree/master/onnxruntime/core/providers/cpu/rnn>`_
+in :epkg:`onnxruntime`. The input projection ``X W^T + Wb`` is computed
+before calling these functions, *xw* has shape
+*(seq_length, batch_size, num_directions, n_gates * hidden_size)*,
+*r* is *(num_directions, n_gates * hidden_size, hidden_size)*,
+*rb* is the recurrence bias *(num_directions, n_gates * hidden_size)*,
+*seq_lens* contains the length of every sequence,
+the initial states are *(num_directions, batch_size, hidden_size)*.
+The second direction is always processed in reverse order,
+the first one if *reverse* is True. The product of the hidden states
+by the recurrence weights is computed in parallel if its cost
+(*batch_size * n_gates * hidden_size * hidden_size*) is greater
+than *th_parallel*.)pbdoc"
+    #endif
+    ;
+
+    m.def("rnn_float", &rnn_compute<float>,
+          R"pbdoc(Computes the recurrence of operator RNN for float32.
+*activations* contains one activation per direction
+(0: Tanh, 1: Affine, 2: Relu, 3: Sigmoid), *alphas*, *betas* their
+coefficients. Returns *Y, Y_h*.)pbdoc",
+          py::arg("xw"), py::arg("r"), py::arg("rb"), py::arg("seq_lens"),
+          py::arg("initial_h"), py::arg("reverse"), py::arg("activations"),
+          py::arg("alphas"), py::arg("betas"), py::arg("clip"), py::arg("th_parallel"));
+    m.def("rnn_double", &rnn_compute<double>,
+          R"pbdoc(Computes the recurrence of operator RNN for float64.
+*activations* contains one activation per direction
+(0: Tanh, 1: Affine, 2: Relu, 3: Sigmoid), *alphas*, *betas* their
+coefficients. Returns *Y, Y_h*.)pbdoc",
+          py::arg("xw"), py::arg("r"), py::arg("rb"), py::arg("seq_lens"),
+          py::arg("initial_h"), py::arg("reverse"), py::arg("activations"),
+          py::arg("alphas"), py::arg("betas"), py::arg("clip"), py::arg("th_parallel"));
+
+    m.def("gru_float", &gru_compute<float>,
+          R"pbdoc(Computes the recurrence of operator GRU for float32
+with the default activations. Returns *Y, Y_h*.)pbdoc",
+          py::arg("xw"), py::arg("r"), py::arg("rb"), py::arg("seq_lens"),
+          py::arg("initial_h"), py::arg("reverse"), py::arg("linear_before_reset"),
+          py::arg("clip"), py::arg("th_parallel"));
+    m.def("gru_double", &gru_compute<double>,
+          R"pbdoc(Computes the recurrence of operator GRU for float64
+with the default activations. Returns *Y, Y_h*.)pbdoc",
+          py::arg("xw"), py::arg("r"), py::arg("rb"), py::arg("seq_lens"),
+          py::arg("initial_h"), py::arg("reverse"), py::arg("linear_before_reset"),
+          py::arg("clip"), py::arg("th_parallel"));
+
+    m.def("lstm_float", &lstm_compute<float>,
+          R"pbdoc(Computes the recurrence of operator LSTM for float32
+with the default activations. Returns *Y, Y_h, Y_c*.)pbdoc",
+          py::arg("xw"), py::arg("r"), py::arg("rb"), py::arg("seq_lens"),
+          py::arg("initial_h"), py::arg("initial_c"), py::arg("p"),
+          py::arg("reverse"), py::arg("input_forget"),
+          py::arg("clip"), py::arg("th_parallel"));
+    m.def("lstm_double", &lstm_compute<double>,
+          R"pbdoc(Computes the recurrence of operator LSTM for float64
+with the default activations. Returns *Y, Y_h, Y_c*.)pbdoc",
+          py::arg("xw"), py::arg("r"), py::arg("rb"), py::arg("seq_lens"),
+          py::arg("initial_h"), py::arg("initial_c"), py::arg("p"),
+          py::arg("reverse"), py::arg("input_forget"),
+          py::arg("clip"), py::arg("th_parallel"));
+}
+
+#endif
@@ -4,6 +4,7 @@
 @file
 @brief Runtime operator.
 """
+import numpy
 from ._op import OpRunUnary
 
 
@@ -29,3 +30,10 @@ class Scaler(OpRunUnary):
         x -= self.offset
         x *= self.scale
         return (x, )
+
+    def _run_out(self, out, x):
+        if out.shape != x.shape or out.dtype != x.dtype:
+            return None
+        numpy.subtract(x, self.offset, out=out)
+        out *= self.scale
+        return (out, )
@@ -9,7 +9,52 @@ from ._op import OpRun
 from ..shape_object import ShapeObject
 
 
+# the body of a Scan can be computed for all iterations at once
+# if it only contains elementwise operators and reductions
+_scan_elementwise_ops = {
+    'Abs', 'Add', 'And', 'Cast', 'Ceil', 'Clip', 'Div', 'Equal', 'Erf',
+    'Exp', 'Floor', 'Greater', 'GreaterOrEqual', 'Identity', 'IsNaN',
+    'Less', 'LessOrEqual', 'Log', 'Max', 'Min', 'Mul', 'Neg', 'Not', 'Or',
+    'Pow', 'Reciprocal', 'Relu', 'Sigmoid', 'Sign', 'Sqrt', 'Sub', 'Tanh',
+    'Where', 'Xor'}
+
+# reductions on axes *axes*, dimensions are kept
+_scan_reduce_ops = {
+    'ArgMax': lambda x, axes: numpy.expand_dims(
+        numpy.argmax(x, axis=axes[0]), axes[0]),
+    'ArgMin': lambda x, axes: numpy.expand_dims(
+        numpy.argmin(x, axis=axes[0]), axes[0]),
+    'ReduceL1': lambda x, axes: numpy.sum(
+        numpy.abs(x), axis=axes, keepdims=True),
+    'ReduceL2': lambda x, axes: numpy.sqrt(numpy.sum(
+        numpy.square(x), axis=axes, keepdims=True)),
+    'ReduceMax': lambda x, axes: numpy.max(x, axis=axes, keepdims=True),
+    'ReduceMean': lambda x, axes: numpy.mean(x, axis=axes, keepdims=True),
+    'ReduceMin': lambda x, axes: numpy.min(x, axis=axes, keepdims=True),
+    'ReduceProd': lambda x, axes: numpy.prod(
+        x, axis=axes, keepdims=True, dtype=x.dtype),
+    'ReduceSum': lambda x, axes: numpy.sum(
+        x, axis=axes, keepdims=True, dtype=x.dtype),
+    'ReduceSumSquare': lambda x, axes: numpy.sum(
+        numpy.square(x), axis=axes, keepdims=True),
+}
+
+
 class Scan(OpRun):
+    """
+    Runtime for operator *Scan*. If the states are not modified by the
+    body (the body returns them with an *Identity* node) and the body
+    only contains elementwise operators and reductions, the body is
+    computed once for a block of iterations (see @see me _run_vectorized)
+    instead of once per iteration. The runtime option *scan_vectorize*
+    (``OnnxInference(..., runtime_options={'scan_vectorize': False})``)
+    changes that behaviour, None to vectorize when possible, True to
+    always do it (an exception is raised if it is not possible), False
+    to always iterate.
+
+    .. versionchanged:: 0.9
+        The body may be computed on all iterations at once.
+    """
 
     atts = {
         'body': None,
@@ -20,6 +65,13 @@ class Scan(OpRun):
         'scan_output_directions': []
     }
 
+    # see _run_vectorized, maximum number of elements of an intermediate
+    # result when the body is computed on a block of iterations
+    block_size = 1 << 16
+
+    # see runtime option scan_vectorize
+    scan_vectorize = None
+
     def __init__(self, onnx_node, desc=None, **options):
         OpRun.__init__(self, onnx_node, desc=desc,
                        expected_attributes=Scan.atts,
@@ -45,6 +97,44 @@ class Scan(OpRun):
         self._run_meth = (self.body.run_in_scan
                           if hasattr(self.body, 'run_in_scan')
                           else self.body.run)
+        self.vectorizable_ = self._is_vectorizable()
+        if self.scan_vectorize and not self.vectorizable_:
+            raise RuntimeError(
+                "scan_vectorize is True but the body of Scan cannot be "
+                "computed for all iterations at once, the states must be "
+                "returned unchanged and the body must only contain "
+                "elementwise operators and reductions.")
+
+    def _is_vectorizable(self):
+        """
+        Tells if the body can be computed for all iterations at once,
+        see @see me _run_vectorized.
+        """
+        body = self.body
+        if not hasattr(body, 'sequence_') or body.static_inputs:
+            return False
+        n_states = len(self.input_names) - self.num_scan_inputs
+        producers = {o: node for node in body.sequence_
+                     for o in node.outputs}
+        for name_in, name_out in zip(self.input_names[:n_states],
+                                     self.output_names[:n_states]):
+            node = producers.get(name_out, None)
+            if (node is None or node.op_type != 'Identity' or
+                    node.inputs[0] != name_in):
+                return False
+        for node in body.sequence_:
+            if node.onnx_node.domain not in ('', 'ai.onnx'):
+                return False
+            if node.op_type in _scan_elementwise_ops:
+                continue
+            if node.op_type not in _scan_reduce_ops:
+                return False
+            if getattr(node.ops_, 'select_last_index', 0):
+                return False
+            if len(node.inputs) > 1 and node.inputs[1] not in body.inits_:
+                # axes must not depend on the iteration
+                return False
+        return True
 
     def _common_run_shape(self, *args):
         num_loop_state_vars = len(args) - self.num_scan_inputs
@@ -83,30 +173,178 @@ class Scan(OpRun):
          scan_values, states) = self._common_run_shape(*args)  # pylint: disable=W0612
 
         max_iter = args[num_loop_state_vars].shape[self.input_axes_[0]]
-        results = [[] for _ in scan_names_out]
+        vectorize = (self.vectorizable_ if self.scan_vectorize is None
+                     else self.scan_vectorize)
+        if vectorize and max_iter > 0:
+            results = self._run_vectorized(states, scan_values, max_iter)
+            return tuple([s.copy() for s in states] + results)
+
+        run_iteration = self._bind_iterations()
+        # scan outputs are written into a buffer allocated
+        # once the shape of the first iteration is known
+        results = [None for _ in scan_names_out]
 
         for iter in range(max_iter):
-            inputs = {}
-            for name, value in zip(state_names_in, states):
-                inputs[name] = value
+            outputs = run_iteration(
+                *states, *[value[iter] for value in scan_values])
+            states = outputs[:num_loop_state_vars]
+            for i, value in enumerate(outputs[num_loop_state_vars:]):
+                if results[i] is None:
+                    results[i] = numpy.empty(
+                        (max_iter, ) + value.shape, dtype=value.dtype)
+                elif results[i].shape[1:] != value.shape:
+                    raise RuntimeError(  # pragma: no cover
+                        "Scan output %r has shape %r at iteration %d, "
+                        "it was %r before." % (
+                            scan_names_out[i], value.shape, iter,
+                            results[i].shape[1:]))
+                results[i][iter] = value
+
+        states = list(states)
+        for res in results:
+            if res is None:
+                raise RuntimeError(  # pragma: no cover
+                    "Scan cannot infer the shape of an output "
+                    "without any iteration.")
+            states.append(res)
+        return tuple(states)
+
+    def _run_vectorized(self, states, scan_values, max_iter):
+        """
+        Computes the body for a block of iterations at once.
+        Every scanned input gets a leading axis for the iterations,
+        every result depending on it keeps it, the others are computed
+        once for the block. Every result of rank *r* depending on the
+        iterations is stored with shape ``(n, 1, ..., 1) + shape``,
+        all these results have the same rank, the broadcasting rules
+        still apply and the reductions are computed on the last axes.
+        The first block contains one iteration, the following ones
+        are as big as possible while the biggest intermediate result
+        has less than *block_size* elements.
+
+        :param states: initial states, returned unchanged by the body
+        :param scan_values: scanned inputs
+        :param max_iter: number of iterations
+        :return: list of scan outputs
+        """
+        body = self.body
+        n_states = len(states)
+        consts = {k: v['value'] for k, v in body.inits_.items()}
+        consts.update(zip(self.input_names[:n_states], states))
+        rank = max([len(v.shape) for v in consts.values()] +
+                   [len(v.shape) - 1 for v in scan_values])
+        scan_names_in = self.input_names[n_states:]
+        scan_names_out = self.output_names[n_states:]
+
+        results = [None for _ in scan_names_out]
+        begin, step = 0, 1
+        while begin < max_iter:
+            end = min(begin + step, max_iter)
+            n = end - begin
+            values = consts.copy()
+            # original rank of results depending on the iterations
+            ranks = {}
             for name, value in zip(scan_names_in, scan_values):
-                inputs[name] = value[iter]
+                ranks[name] = len(value.shape) - 1
+                values[name] = value[begin:end].reshape(
+                    (n, ) + (1, ) * (rank - ranks[name]) + value.shape[1:])
+            for node in body.sequence_:
+                self._run_node_vectorized(node, values, ranks, rank)
+
+            for i, name in enumerate(scan_names_out):
+                value = values[name]
+                if name in ranks:
+                    value = value.reshape(
+                        (n, ) + value.shape[len(value.shape) - ranks[name]:])
+                else:
+                    value = numpy.broadcast_to(value, (n, ) + value.shape)
+                if results[i] is None:
+                    results[i] = numpy.empty(
+                        (max_iter, ) + value.shape[1:], dtype=value.dtype)
+                results[i][begin:end] = value
+            if begin == 0:
+                biggest = max(values[k].size for k in ranks)
+                step = max(1, self.block_size // max(biggest, 1))
+            begin = end
+        return results
+
+    @staticmethod
+    def _run_node_vectorized(node, values, ranks, rank):
+        """
+        Computes one node of the body for a block of iterations,
+        see @see me _run_vectorized.
+        """
+        args = [values[k] if k else None for k in node.inputs]
+        batched = [k for k in node.inputs if k in ranks]
+        if len(batched) == 0:
+            res = node.ops_.run(*args)
+            for k, v in zip(node.outputs, res):
+                values[k] = v
+            return
+
+        if node.op_type in _scan_elementwise_ops:
+            res = node.ops_.run(*args)
+            r = max(ranks[k] if k in ranks else len(values[k].shape)
+                    for k in node.inputs if k)
+            for k, v in zip(node.outputs, res):
+                values[k] = v
+                ranks[k] = r
+            return
+
+        # reduction
+        x = args[0]
+        r = ranks[node.inputs[0]]
+        ops = node.ops_
+        if node.op_type in ('ArgMax', 'ArgMin'):
+            axes = (ops.axis, )
+        elif len(args) > 1 and args[1] is not None and args[1].size > 0:
+            axes = tuple(args[1].ravel().tolist())
+        else:
+            axes = ops.axes
+        if axes is None or len(axes) == 0:
+            if getattr(ops, 'noop_with_empty_axes', 0):
+                values[node.outputs[0]] = x
+                ranks[node.outputs[0]] = r
+                return
+            axes = tuple(range(r))
+        axes = tuple(sorted(set(a + r if a < 0 else a for a in axes)))
+        offset = len(x.shape) - r
+        res = _scan_reduce_ops[node.op_type](
+            x, tuple(a + offset for a in axes))
+        if node.op_type not in ('ArgMax', 'ArgMin'):
+            res = res.astype(x.dtype, copy=False)
+        if not ops.keepdims:
+            shape = tuple(d for i, d in enumerate(res.shape[offset:])
+                          if i not in axes)
+            r -= len(axes)
+            res = res.reshape(
+                (res.shape[0], ) + (1, ) * (rank - r) + shape)
+        values[node.outputs[0]] = res
+        ranks[node.outputs[0]] = r
+
+    def _bind_iterations(self):
+        """
+        Returns a function running one iteration of the body,
+        it takes the states and the slices of the scanned inputs
+        and returns the states and the scan outputs,
+        see :meth:`bind_iterations
+        <mlprodict.onnxrt.onnx_inference.OnnxInference.bind_iterations>`.
+        """
+        if hasattr(self.body, 'bind_iterations'):
+            run_iteration = self.body.bind_iterations()
+            if run_iteration is not None:
+                return run_iteration
 
+        def run_iteration(*inputs):
             try:
-                outputs = self._run_meth(inputs)
+                outputs = self._run_meth(dict(zip(self.input_names, inputs)))
             except TypeError as e:  # pragma: no cover
                 raise TypeError(
                     "Unable to call 'run' for type '{}'.".format(
                         type(self.body))) from e
+            return [outputs[name] for name in self.output_names]
 
-            states = [outputs[name] for name in state_names_out]
-            for i, name in enumerate(scan_names_out):
-                results[i].append(numpy.expand_dims(outputs[name], axis=0))
-
-        for res in results:
-            conc = numpy.vstack(res)
-            states.append(conc)
-        return tuple(states)
+        return run_iteration
 
     def _infer_shapes(self, *args):  # pylint: disable=W0221
         (num_loop_state_vars, num_scan_outputs, output_directions,  # pylint: disable=W0612
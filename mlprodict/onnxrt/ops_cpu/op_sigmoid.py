@@ -6,6 +6,7 @@
 """
 from scipy.special import expit as logistic_sigmoid  # pylint: disable=E0611
 from ._op import OpRunUnaryNum
+from ._op_numpy_helper import numpy_ufunc_out
 
 
 class Sigmoid(OpRunUnaryNum):
@@ -15,9 +16,17 @@ class Sigmoid(OpRunUnaryNum):
                                **options)
 
     def _run(self, x, attributes=None, verbose=0, fLOG=None):  # pylint: disable=W0221
+        if self.inplaces.get(0, False) and x.flags['WRITEABLE']:
+            return self._run_inplace(x)
         y = logistic_sigmoid(x)
         return (y, )
 
+    def _run_inplace(self, x):
+        return (logistic_sigmoid(x, out=x), )
+
+    def _run_out(self, out, x):
+        return numpy_ufunc_out(logistic_sigmoid, out, x)
+
     def to_python(self, inputs):
         return ("from scipy.special import expit",
                 "return expit(%s)" % inputs[0])
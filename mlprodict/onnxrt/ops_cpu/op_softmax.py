@@ -32,6 +32,14 @@ class Softmax(OpRunUnaryNum):
         X /= X.sum(axis=self.axis, keepdims=1)
         return (X, )
 
+    def _run_out(self, out, X):
+        if out.shape != X.shape or out.dtype != X.dtype:
+            return None
+        numpy.subtract(X, X.max(axis=self.axis, keepdims=1), out=out)
+        numpy.exp(out, out=out)
+        out /= out.sum(axis=self.axis, keepdims=1)
+        return (out, )
+
     def to_python(self, inputs):
         lines = ["tmp = {0} - {0}.max(axis=axis)[:, numpy.newaxis]".format(
             inputs[0]),
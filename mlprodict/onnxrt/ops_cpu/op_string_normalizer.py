@@ -9,6 +9,7 @@ import locale
 import warnings
 import numpy
 from ._op import OpRunUnary, RuntimeTypeError
+from .op_string_normalizer_ import RuntimeStringNormalizer  # pylint: disable=E0611,E0401
 
 
 class StringNormalizer(OpRunUnary):
@@ -17,8 +18,15 @@ class StringNormalizer(OpRunUnary):
     play with two locales at the same time. stop words
     should not be implemented here as the tokenization
     usually happens after this steps.
+    ASCII strings are normalized by a C++ implementation,
+    in parallel if there are more than *th_parallel* strings,
+    the others (accents, unicode case mapping) by
+    method @see me _normalize.
     """
 
+    # the strings are processed in parallel above this threshold
+    th_parallel = 1024
+
     atts = {'case_change_action': b'NONE',  # LOWER UPPER NONE
             'is_case_sensitive': 1,
             'locale': b'',
@@ -30,63 +38,67 @@ class StringNormalizer(OpRunUnary):
                             **options)
         self.slocale = self.locale.decode('ascii')
         self.stops = set(self.stopwords)
+        self.str_stops_ = set(_.decode() for _ in self.stops)
+        self.rt_ = RuntimeStringNormalizer()
+        try:
+            self.rt_.init(self.case_change_action.decode('ascii'),
+                          bool(self.is_case_sensitive),
+                          list(self.str_stops_), self.th_parallel)
+        except ValueError:
+            # the error is raised by method _run
+            self.rt_ = None
 
     def _run(self, x, attributes=None, verbose=0, fLOG=None):  # pylint: disable=W0221
         """
         Normalizes strings.
         """
-        res = numpy.empty(x.shape, dtype=x.dtype)
-        if len(x.shape) == 2:
-            for i in range(0, x.shape[1]):
-                self._run_column(x[:, i], res[:, i])
-        elif len(x.shape) == 1:
-            self._run_column(x, res)
-        else:
+        if len(x.shape) not in (1, 2):
             raise RuntimeTypeError(  # pragma: no cover
                 "x must be a matrix or a vector.")
-        return (res, )
+        if self.rt_ is None:
+            raise RuntimeError(
+                "Unknown option for case_change_action: {}.".format(
+                    self.case_change_action))
+        self._set_locale()
+        texts = x.ravel().tolist()
+        res, fallback = self.rt_.compute(texts)
+        for i in fallback:
+            res[i] = self._normalize(texts[i])
+        return (numpy.array(res, dtype=x.dtype).reshape(x.shape), )
 
-    def _run_column(self, cin, cout):
+    def _set_locale(self):
         """
-        Normalizes string in a columns.
+        Changes the locale if it is different from attribute *locale*.
         """
-        if locale.getlocale() != self.slocale:
+        if locale.setlocale(locale.LC_ALL) != self.slocale:
             try:
                 locale.setlocale(locale.LC_ALL, self.slocale)
             except locale.Error as e:
                 warnings.warn(
                     "Unknown local setting '{}' (current: '{}') - {}."
                     "".format(self.slocale, locale.getlocale(), e))
-        stops = set(_.decode() for _ in self.stops)
-        cout[:] = cin[:]
 
-        for i in range(0, cin.shape[0]):
-            if isinstance(cout[i], float):
-                # nan
-                cout[i] = ''  # pragma: no cover
-            else:
-                cout[i] = self.strip_accents_unicode(cout[i])
+    def _normalize(self, text):
+        """
+        Normalizes one string (python implementation).
+        """
+        if isinstance(text, float):
+            # nan
+            return ''
+        stops = self.str_stops_
+        text = self.strip_accents_unicode(text)
 
         if self.is_case_sensitive and len(stops) > 0:
-            for i in range(0, cin.shape[0]):
-                cout[i] = self._remove_stopwords(cout[i], stops)
+            text = self._remove_stopwords(text, stops)
 
         if self.case_change_action == b'LOWER':
-            for i in range(0, cin.shape[0]):
-                cout[i] = cout[i].lower()
+            text = text.lower()
         elif self.case_change_action == b'UPPER':
-            for i in range(0, cin.shape[0]):
-                cout[i] = cout[i].upper()
-        elif self.case_change_action != b'NONE':
-            raise RuntimeError(
-                "Unknown option for case_change_action: {}.".format(
-                    self.case_change_action))
+            text = text.upper()
 
         if not self.is_case_sensitive and len(stops) > 0:
-            for i in range(0, cin.shape[0]):
-                cout[i] = self._remove_stopwords(cout[i], stops)
-
-        return cout
+            text = self._remove_stopwords(text, stops)
+        return text
 
     def _remove_stopwords(self, text, stops):
         spl = text.split(' ')
@@ -0,0 +1,214 @@
+// Inspired from
+// https://github.com/microsoft/onnxruntime/blob/master/onnxruntime/core/providers/cpu/nn/string_normalizer.cc.
+
+#if !defined(_CRT_SECURE_NO_WARNINGS)
+#define _CRT_SECURE_NO_WARNINGS
+#endif
+
+#ifndef SKIP_PYTHON
+//#include <pybind11/iostream.h>
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+//#include <numpy/arrayobject.h>
+
+#if USE_OPENMP
+#include <omp.h>
+#endif
+
+#include <string>
+#include <vector>
+#include <unordered_set>
+#include <stdexcept>
+
+namespace py = pybind11;
+#endif
+
+
+// Applies the same transformation as the python implementation
+// on ASCII strings, other strings are left to the python implementation
+// (accents, unicode case mapping).
+class RuntimeStringNormalizer {
+    private:
+        int case_change_action_;  // 0: NONE, 1: LOWER, 2: UPPER
+        bool is_case_sensitive_;
+        std::unordered_set<std::string> stopwords_;
+        std::vector<bool> stop_lengths_;  // stop_lengths_[l] is true if a stopword has l characters
+        int64_t th_parallel_;
+
+    public:
+        RuntimeStringNormalizer() : case_change_action_(0), is_case_sensitive_(true),
+                                    th_parallel_(1024) { }
+
+        void Init(const std::string& case_change_action, bool is_case_sensitive,
+                  const std::vector<std::string>& stopwords, int64_t th_parallel) {
+            if (case_change_action == "NONE")
+                case_change_action_ = 0;
+            else if (case_change_action == "LOWER")
+                case_change_action_ = 1;
+            else if (case_change_action == "UPPER")
+                case_change_action_ = 2;
+            else
+                throw std::invalid_argument(
+                    "Unknown option for case_change_action: '" + case_change_action + "'.");
+            is_case_sensitive_ = is_case_sensitive;
+            stopwords_ = std::unordered_set<std::string>(stopwords.begin(), stopwords.end());
+            stop_lengths_.clear();
+            for (auto it = stopwords.begin(); it != stopwords.end(); ++it) {
+                if (it->size() >= stop_lengths_.size())
+                    stop_lengths_.resize(it->size() + 1, false);
+                stop_lengths_[it->size()] = true;
+            }
+            th_parallel_ = th_parallel;
+        }
+
+        // Returns the normalized strings and the positions of the strings
+        // the function did not process (not ASCII, not a string).
+        py::tuple Compute(py::list texts) const {
+            size_t n = (size_t)PyList_GET_SIZE(texts.ptr());
+            std::vector<const char*> data(n, nullptr);
+            std::vector<size_t> sizes(n, 0);
+            std::vector<int64_t> fallback;
+            for (size_t i = 0; i < n; ++i) {
+                PyObject* obj = PyList_GET_ITEM(texts.ptr(), i);
+                if (PyUnicode_Check(obj) && PyUnicode_IS_ASCII(obj)) {
+                    data[i] = (const char*)PyUnicode_DATA(obj);
+                    sizes[i] = (size_t)PyUnicode_GET_LENGTH(obj);
+                }
+                else
+                    fallback.push_back((int64_t)i);
+            }
+
+            std::vector<std::string> res(n);
+            std::vector<char> changed(n, 0);
+            {
+                // the list keeps the strings alive
+                py::gil_scoped_release release;
+                if ((int64_t)n <= th_parallel_) {
+                    for (size_t i = 0; i < n; ++i) {
+                        if (data[i] != nullptr)
+                            changed[i] = Normalize(data[i], sizes[i], res[i]) ? 1 : 0;
+                    }
+                }
+                else {
+                    #ifdef USE_OPENMP
+                    #pragma omp parallel for
+                    #endif
+                    for (int64_t i = 0; i < (int64_t)n; ++i) {
+                        if (data[i] != nullptr)
+                            changed[i] = Normalize(data[i], sizes[i], res[i]) ? 1 : 0;
+                    }
+                }
+            }
+
+            py::list out(n);
+            for (size_t i = 0; i < n; ++i) {
+                PyObject* obj = PyList_GET_ITEM(texts.ptr(), i);
+                if (!changed[i]) {
+                    // unchanged
+                    Py_INCREF(obj);
+                    PyList_SET_ITEM(out.ptr(), i, obj);
+                }
+                else {
+                    PyObject* str = PyUnicode_FromStringAndSize(res[i].data(), (Py_ssize_t)res[i].size());
+                    if (str == nullptr)
+                        throw py::error_already_set();
+                    PyList_SET_ITEM(out.ptr(), i, str);
+                }
+            }
+            return py::make_tuple(out, fallback);
+        }
+
+    private:
+
+        bool IsStopword(const std::string& text, size_t begin, size_t size, std::string& word) const {
+            if (size >= stop_lengths_.size() || !stop_lengths_[size])
+                return false;
+            word.assign(text, begin, size);
+            return stopwords_.find(word) != stopwords_.end();
+        }
+
+        // same as ' '.join(w for w in text.split(' ') if w not in stops),
+        // returns true if a word was removed
+        bool RemoveStopwords(std::string& text) const {
+            std::string res;
+            res.reserve(text.size());
+            std::string word;
+            bool first = true, removed = false;
+            size_t begin = 0;
+            for (size_t pos = 0; pos <= text.size(); ++pos) {
+                if (pos == text.size() || text[pos] == ' ') {
+                    if (IsStopword(text, begin, pos - begin, word))
+                        removed = true;
+                    else {
+                        if (!first)
+                            res.push_back(' ');
+                        res.append(text, begin, pos - begin);
+                        first = false;
+                    }
+                    begin = pos + 1;
+                }
+            }
+            if (removed)
+                text.swap(res);
+            return removed;
+        }
+
+        // returns true if the normalized string is different
+        bool Normalize(const char* data, size_t size, std::string& text) const {
+            bool stops = !stopwords_.empty();
+            if (case_change_action_ == 0 && !stops)
+                return false;
+            text.assign(data, size);
+            bool changed = false;
+            if (is_case_sensitive_ && stops)
+                changed |= RemoveStopwords(text);
+            if (case_change_action_ == 1) {
+                for (auto it = text.begin(); it != text.end(); ++it)
+                    if (*it >= 'A' && *it <= 'Z') {
+                        *it = *it + ('a' - 'A');
+                        changed = true;
+                    }
+            }
+            else if (case_change_action_ == 2) {
+                for (auto it = text.begin(); it != text.end(); ++it)
+                    if (*it >= 'a' && *it <= 'z') {
+                        *it = *it - ('a' - 'A');
+                        changed = true;
+                    }
+            }
+            if (!is_case_sensitive_ && stops)
+                changed |= RemoveStopwords(text);
+            return changed;
+        }
+};
+
+
+#ifndef SKIP_PYTHON
+
+PYBIND11_MODULE(op_string_normalizer_, m) {
+	m.doc() =
+    #if defined(__APPLE__)
+    "Implements runtime for operator StringNormalizer."
+    #else
+    R"pbdoc(Implements runtime for operator StringNormalizer. The code is inspired from
+`string_normalizer.cc <https://github.com/microsoft/onnxruntime/blob/master/onnxruntime/core/providers/cpu/nn/string_normalizer.cc>`_
+in :epkg:`onnxruntime`.)pbdoc"
+    #endif
+    ;
+
+    py::class_<RuntimeStringNormalizer> cli (m, "RuntimeStringNormalizer",
+        R"pbdoc(Implements runtime for operator StringNormalizer on ASCII strings.
+The strings are processed in parallel if there are more than *th_parallel* strings.
+Method *compute* returns the normalized strings and the positions
+of the strings it did not process (not ASCII or not a string).)pbdoc");
+
+    cli.def(py::init<>());
+    cli.def("init", &RuntimeStringNormalizer::Init,
+            "Initializes StringNormalizer.",
+            py::arg("case_change_action"), py::arg("is_case_sensitive"),
+            py::arg("stopwords"), py::arg("th_parallel"));
+    cli.def("compute", &RuntimeStringNormalizer::Compute,
+            "Normalizes a list of strings.", py::arg("texts"));
+}
+
+#endif
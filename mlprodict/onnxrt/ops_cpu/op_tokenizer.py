@@ -9,13 +9,52 @@ import numpy
 from ._op import OpRunUnary, RuntimeTypeError
 from ._new_ops import OperatorSchema
 from ..shape_object import ShapeObject
+from .op_tokenizer_ import RuntimeTokenizer  # pylint: disable=E0611,E0401
+
+
+def _parse_char_class(exp):
+    """
+    Returns the characters of a regular expression
+    such as ``[a-zA-Z0-9_]+`` if it only contains ASCII
+    characters and ranges, None otherwise.
+
+    :param exp: regular expression (str)
+    :return: string or None
+    """
+    if (len(exp) < 4 or exp[0] != '[' or exp[-2:] != ']+' or
+            exp[1] == '^'):
+        return None
+    content = exp[1:-2]
+    if any(c in '[]\\' or ord(c) >= 128 for c in content):
+        return None
+    chars = []
+    i = 0
+    while i < len(content):
+        if i + 2 < len(content) and content[i + 1] == '-':
+            if content[i] > content[i + 2]:
+                return None
+            chars.extend(chr(c) for c in range(
+                ord(content[i]), ord(content[i + 2]) + 1))
+            i += 3
+        else:
+            chars.append(content[i])
+            i += 1
+    return "".join(chars)
 
 
 class Tokenizer(OpRunUnary):
     """
-    See :epkg:`Tokenizer`.
+    See :epkg:`Tokenizer`. A C++ implementation splits
+    the strings in parallel if there are more than *th_parallel*
+    strings, it handles a tokenization by characters, by separators
+    or with a regular expression matching a class of ASCII characters
+    such as ``[a-zA-Z0-9_]+``. Other regular expressions are processed
+    with module :mod:`re`.
     """
 
+    # the strings are processed in parallel above this threshold
+    th_parallel = 1024
+
     atts = {'mark': 0,
             'mincharnum': 1,
             'pad_value': b'#',
@@ -39,6 +78,33 @@ class Tokenizer(OpRunUnary):
                 "Unable to interpret separators {}.".format(self.separators)) from e
         if self.tokenexp not in (None, b''):
             self.tokenexp_ = re.compile(self.tokenexp.decode('utf-8'))
+        self.rt_ = self._init_runtime()
+
+    def _init_runtime(self):
+        """
+        Returns the C++ implementation if it supports
+        the tokenization, None otherwise.
+        """
+        chars = ''
+        if self.char_tokenization_:
+            mode = 0
+        elif len(self.str_separators_) > 0:
+            if '' in self.str_separators_:
+                return None
+            mode = 1
+        elif self.tokenexp not in (None, b''):
+            chars = _parse_char_class(self.tokenexp.decode('utf-8'))
+            if chars is None:
+                return None
+            mode = 3 if self.tokenexpsplit else 2
+        else:
+            return None  # pragma: no cover
+        rt = RuntimeTokenizer()
+        # the separators are tried in the same order as
+        # method _run_sep_tokenization
+        rt.init(mode, list(self.str_separators_), chars,
+                list(self.stops_), self.th_parallel)
+        return rt
 
     def _find_custom_operator_schema(self, op_name):
         if op_name == "Tokenizer":
@@ -47,6 +113,15 @@ class Tokenizer(OpRunUnary):
             "Unable to find a schema for operator '{}'.".format(op_name))
 
     def _run(self, text, attributes=None, verbose=0, fLOG=None):  # pylint: disable=W0221
+        if (self.rt_ is not None and len(text.shape) in (1, 2) and
+                text.size > 0):
+            try:
+                tokens, counts = self.rt_.compute(text.ravel().tolist())
+            except (TypeError, ValueError):
+                # not a string or not a valid unicode string
+                tokens = None
+            if tokens is not None:
+                return self._run_pad(text, tokens, counts)
         if self.char_tokenization_:
             return self._run_char_tokenization(text, self.stops_)
         if self.str_separators_ is not None and len(self.str_separators_) > 0:
@@ -59,6 +134,22 @@ class Tokenizer(OpRunUnary):
             "Unable to guess which tokenization to use, sep={}, "
             "tokenexp='{}'.".format(self.separators, self.tokenexp))
 
+    def _run_pad(self, text, tokens, counts):
+        """
+        Builds the output from the tokens returned by the C++
+        implementation, *counts* is the number of tokens in every string.
+        """
+        counts = numpy.array(counts, dtype=numpy.int64)
+        begin = 1 if self.mark else 0
+        max_pos = int(counts.max()) + (2 if self.mark else 0)
+        res = numpy.empty((counts.shape[0], max_pos), dtype=text.dtype)
+        res[:] = self.pad_value
+        starts = numpy.cumsum(counts) - counts
+        rows = numpy.repeat(numpy.arange(counts.shape[0]), counts)
+        cols = numpy.arange(rows.shape[0]) - starts[rows] + begin
+        res[rows, cols] = numpy.array(tokens, dtype=text.dtype)
+        return (res.reshape(text.shape + (max_pos, )), )
+
     def _run_tokenization(self, text, stops, split):
         """
         Tokenizes a char level.
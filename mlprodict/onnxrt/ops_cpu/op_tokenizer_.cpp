@@ -0,0 +1,227 @@
+// Inspired from
+// https://github.com/microsoft/onnxruntime/blob/master/onnxruntime/contrib_ops/cpu/tokenizer.cc.
+
+#if !defined(_CRT_SECURE_NO_WARNINGS)
+#define _CRT_SECURE_NO_WARNINGS
+#endif
+
+#ifndef SKIP_PYTHON
+//#include <pybind11/iostream.h>
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+//#include <numpy/arrayobject.h>
+
+#if USE_OPENMP
+#include <omp.h>
+#endif
+
+#include <cstring>
+#include <string>
+#include <vector>
+#include <unordered_set>
+#include <stdexcept>
+
+namespace py = pybind11;
+#endif
+
+
+enum TokenizerMode {
+    kChars = 0,         // every character is a token
+    kSeparators = 1,    // tokens are separated by separators
+    kClass = 2,         // tokens are runs of characters in a class ([a-z]+)
+    kClassSplit = 3     // tokens are runs of characters not in a class
+};
+
+
+// A token is a position and a length (bytes) in a string encoded in UTF-8.
+typedef std::pair<size_t, size_t> Token;
+
+
+// Splits strings encoded in UTF-8, the results are the same
+// as the python implementation because the separators and
+// the characters of the class are valid UTF-8 sequences.
+class RuntimeTokenizer {
+    private:
+        TokenizerMode mode_;
+        std::vector<std::string> separators_;
+        bool char_class_[256];
+        std::unordered_set<std::string> stopwords_;
+        int64_t th_parallel_;
+
+    public:
+        RuntimeTokenizer() : mode_(kChars), th_parallel_(1024) {
+            memset(char_class_, 0, sizeof(char_class_));
+        }
+
+        void Init(int mode, const std::vector<std::string>& separators,
+                  const std::string& char_class,
+                  const std::vector<std::string>& stopwords, int64_t th_parallel) {
+            if (mode < 0 || mode > 3)
+                throw std::invalid_argument("Unexpected mode.");
+            mode_ = (TokenizerMode)mode;
+            separators_ = separators;
+            for (auto it = separators_.begin(); it != separators_.end(); ++it)
+                if (it->empty())
+                    throw std::invalid_argument("A separator cannot be empty.");
+            memset(char_class_, 0, sizeof(char_class_));
+            for (auto it = char_class.begin(); it != char_class.end(); ++it) {
+                if ((unsigned char)*it >= 128)
+                    throw std::invalid_argument("The class must only contain ASCII characters.");
+                char_class_[(unsigned char)*it] = true;
+            }
+            stopwords_ = std::unordered_set<std::string>(stopwords.begin(), stopwords.end());
+            th_parallel_ = th_parallel;
+        }
+
+        // Returns the list of all tokens and the number of tokens in every string.
+        py::tuple Compute(py::list texts) const {
+            size_t n = (size_t)PyList_GET_SIZE(texts.ptr());
+            std::vector<const char*> data(n);
+            std::vector<size_t> sizes(n);
+            for (size_t i = 0; i < n; ++i) {
+                PyObject* obj = PyList_GET_ITEM(texts.ptr(), i);
+                if (!PyUnicode_Check(obj))
+                    throw py::type_error("Every element must be a string.");
+                Py_ssize_t size;
+                // the encoded string is cached by the python object
+                data[i] = PyUnicode_AsUTF8AndSize(obj, &size);
+                if (data[i] == nullptr)
+                    throw py::error_already_set();
+                sizes[i] = (size_t)size;
+            }
+
+            std::vector<std::vector<Token>> tokens(n);
+            {
+                // the list keeps the strings alive
+                py::gil_scoped_release release;
+                if ((int64_t)n <= th_parallel_) {
+                    for (size_t i = 0; i < n; ++i)
+                        Tokenize(data[i], sizes[i], tokens[i]);
+                }
+                else {
+                    #ifdef USE_OPENMP
+                    #pragma omp parallel for
+                    #endif
+                    for (int64_t i = 0; i < (int64_t)n; ++i)
+                        Tokenize(data[i], sizes[i], tokens[i]);
+                }
+            }
+
+            std::vector<int64_t> counts(n);
+            size_t total = 0;
+            for (size_t i = 0; i < n; ++i) {
+                counts[i] = (int64_t)tokens[i].size();
+                total += tokens[i].size();
+            }
+            py::list out(total);
+            size_t k = 0;
+            for (size_t i = 0; i < n; ++i) {
+                for (auto it = tokens[i].begin(); it != tokens[i].end(); ++it, ++k) {
+                    PyObject* str = PyUnicode_DecodeUTF8(
+                        data[i] + it->first, (Py_ssize_t)it->second, "strict");
+                    if (str == nullptr)
+                        throw py::error_already_set();
+                    PyList_SET_ITEM(out.ptr(), k, str);
+                }
+            }
+            return py::make_tuple(out, counts);
+        }
+
+    private:
+
+        void AddToken(const char* text, size_t begin, size_t size,
+                      std::vector<Token>& tokens, std::string& word) const {
+            if (!stopwords_.empty()) {
+                word.assign(text + begin, size);
+                if (stopwords_.find(word) != stopwords_.end())
+                    return;
+            }
+            tokens.push_back(Token(begin, size));
+        }
+
+        void Tokenize(const char* text, size_t size, std::vector<Token>& tokens) const {
+            std::string word;
+            switch (mode_) {
+                case kChars:
+                    for (size_t pos = 0; pos < size;) {
+                        // length of the UTF-8 sequence
+                        unsigned char c = (unsigned char)text[pos];
+                        size_t len = c < 0x80 ? 1 : ((c & 0xE0) == 0xC0 ? 2 : ((c & 0xF0) == 0xE0 ? 3 : 4));
+                        if (pos + len > size)
+                            len = size - pos;
+                        AddToken(text, pos, len, tokens, word);
+                        pos += len;
+                    }
+                    break;
+                case kSeparators: {
+                    // same loop as the python implementation, a separator
+                    // cannot start in the middle of a UTF-8 sequence
+                    size_t begin = 0, pos = 0;
+                    for (; pos < size; ++pos) {
+                        for (auto it = separators_.begin(); it != separators_.end(); ++it) {
+                            if (pos + it->size() <= size &&
+                                    memcmp(text + pos, it->data(), it->size()) == 0) {
+                                AddToken(text, begin, pos > begin ? pos - begin : 0, tokens, word);
+                                begin = pos + it->size();
+                                break;
+                            }
+                        }
+                    }
+                    if (begin < pos)
+                        AddToken(text, begin, pos - begin, tokens, word);
+                    break;
+                }
+                case kClass:
+                case kClassSplit: {
+                    bool inside = mode_ == kClass;
+                    size_t begin = 0;
+                    bool in_token = false;
+                    for (size_t pos = 0; pos <= size; ++pos) {
+                        bool keep = pos < size && char_class_[(unsigned char)text[pos]] == inside;
+                        if (keep && !in_token) {
+                            begin = pos;
+                            in_token = true;
+                        }
+                        else if (!keep && in_token) {
+                            AddToken(text, begin, pos - begin, tokens, word);
+                            in_token = false;
+                        }
+                    }
+                    break;
+                }
+            }
+        }
+};
+
+
+#ifndef SKIP_PYTHON
+
+PYBIND11_MODULE(op_tokenizer_, m) {
+	m.doc() =
+    #if defined(__APPLE__)
+    "Implements runtime for operator Tokenizer."
+    #else
+    R"pbdoc(Implements runtime for operator Tokenizer. The code is inspired from
+`tokenizer.cc <https://github.com/microsoft/onnxruntime/blob/master/onnxruntime/contrib_ops/cpu/tokenizer.cc>`_
+in :epkg:`onnxruntime`.)pbdoc"
+    #endif
+    ;
+
+    py::class_<RuntimeTokenizer> cli (m, "RuntimeTokenizer",
+        R"pbdoc(Implements runtime for operator Tokenizer on strings encoded in UTF-8.
+*mode* is 0 to split into characters, 1 to split with separators,
+2 to find runs of characters in a class (regular expression ``[a-z]+``),
+3 to find runs of characters not in a class (the same expression with *tokenexpsplit*).
+The strings are processed in parallel if there are more than *th_parallel* strings.
+Method *compute* returns all tokens and the number of tokens of every string.)pbdoc");
+
+    cli.def(py::init<>());
+    cli.def("init", &RuntimeTokenizer::Init,
+            "Initializes Tokenizer.",
+            py::arg("mode"), py::arg("separators"), py::arg("char_class"),
+            py::arg("stopwords"), py::arg("th_parallel"));
+    cli.def("compute", &RuntimeTokenizer::Compute,
+            "Tokenizes a list of strings.", py::arg("texts"));
+}
+
+#endif
@@ -13,6 +13,18 @@ from ._op_onnx_numpy import (  # pylint: disable=E0611,E0401
     topk_element_min_int64, topk_element_max_int64, topk_element_fetch_int64)
 
 
+def _topk_key(X, largest):
+    """
+    Returns an array whose smallest values are the top-k
+    elements of *X*.
+    """
+    if not largest:
+        return X
+    if X.dtype.kind in 'fi':
+        return -X
+    return -X.astype(numpy.int64)
+
+
 def topk_sorted_implementation(X, k, axis, largest):
     """
     Retrieves the top-k elements.
@@ -23,94 +35,95 @@ def topk_sorted_implementation(X, k, axis, largest):
     @param      largest     largest (1) or smallest (0)
     @return                 top-k values, top-k indices
 
-    See function `_kneighbors_reduce_func
-    <https://github.com/scikit-learn/scikit-learn/tree/master/
-    sklearn/neighbors/base.py#L304>`_.
+    The function calls :epkg:`numpy:partition` to select the
+    top-k elements and only sorts them. Equal elements are
+    sorted by increasing index as :epkg:`onnxruntime` does.
     """
     if isinstance(k, numpy.ndarray):
         if k.size != 1:
             raise RuntimeError(  # pragma: no cover
                 "k must be an integer not %r." % k)
         k = k[0]
-    if len(X.shape) == 2 and axis == 1:
-        sample_range = numpy.arange(X.shape[0])[:, None]
-        if largest == 0:
-            sorted_indices = numpy.argpartition(X, axis=axis, kth=k - 1)
-            sorted_indices = sorted_indices[:, :k]
-            # argpartition doesn't guarantee sorted order, so we sort again
-            sorted_indices = sorted_indices[
-                sample_range, numpy.argsort(X[sample_range, sorted_indices])]
-        else:
-            sorted_indices = numpy.argpartition(-X, axis=axis, kth=k - 1)
-            sorted_indices = sorted_indices[:, :k]
-            # argpartition doesn't guarantee sorted order, so we sort again
-            sorted_indices = sorted_indices[
-                sample_range, numpy.argsort(-X[sample_range, sorted_indices])]
-        sorted_distances = X[sample_range, sorted_indices]
-        return sorted_distances, sorted_indices
-
-    sorted_indices = numpy.argsort(X, axis=axis)
-    sorted_values = numpy.sort(X, axis=axis)
-    if largest:
-        sorted_indices = numpy.flip(sorted_indices, axis=axis)
-        sorted_values = numpy.flip(sorted_values, axis=axis)
-    ark = numpy.arange(k)
-    topk_sorted_indices = numpy.take(sorted_indices, ark, axis=axis)
-    topk_sorted_values = numpy.take(sorted_values, ark, axis=axis)
-    return topk_sorted_values, topk_sorted_indices
+    k = int(k)
+    Xm = numpy.moveaxis(X, axis, -1)
+    n = Xm.shape[-1]
+    flat = Xm.reshape((-1, n))
+    key = _topk_key(flat, largest)
+
+    indices = None
+    if 0 < k < n:
+        threshold = numpy.partition(key, k - 1, axis=1)[:, k - 1:k]
+        better = key < threshold
+        equal = key == threshold
+        # equal elements with the lowest indices complete the selection
+        missing = k - better.sum(axis=1, keepdims=True)
+        selected = better | (equal & (numpy.cumsum(equal, axis=1) <= missing))
+        rows, cols = numpy.nonzero(selected)
+        if rows.shape[0] == flat.shape[0] * k:
+            indices = cols.reshape((-1, k))
+    if indices is None:
+        # k == n or nan values
+        indices = numpy.argsort(key, axis=1, kind='stable')[:, :k]
+    else:
+        order = numpy.argsort(
+            numpy.take_along_axis(key, indices, axis=1), axis=1,
+            kind='stable')
+        indices = numpy.take_along_axis(indices, order, axis=1)
+    values = numpy.take_along_axis(flat, indices, axis=1)
+
+    shape = Xm.shape[:-1] + (k, )
+    return (numpy.moveaxis(values.reshape(shape), -1, axis),
+            numpy.moveaxis(indices.reshape(shape), -1, axis))
 
 
 def topk_sorted_implementation_cpp(X, k, axis, largest, th_para=50):
     """
     Retrieves the top-k elements using a C++
-    implementation when the axis is the last dimension,
+    implementation (float32, float64, int64), the selected axis
+    is moved to the last position before calling it,
     otherwise, it falls back to
-    @see fn topk_sorted_implementation.
+    @see fn topk_sorted_implementation. The C++ implementation
+    keeps a heap of *k* elements for every row and
+    sorts it at the end.
 
     @param      X           data
     @param      k           k in top-k
     @param      axis        axis chosen to select the top-k elements
     @param      largest     largest (1) or smallest (0)
-    @param      th_para     threshold for parallelisation
+    @param      th_para     threshold for parallelisation, the rows
+                            are processed in parallel if there are more
+                            than *th_para* rows
     @return                 top-k values, top-k indices
     """
     if isinstance(k, numpy.ndarray):
         if k.size != 1:
             raise RuntimeError(  # pragma: no cover
                 "k must be an integer not %r." % k)
-    if axis != len(X.shape) - 1:
-        if k == 0:
-            return numpy.empty((0,), dtype=numpy.int64)
+        k = k[0]
+    k = int(k)
+    if k == 0 or len(X.shape) == 0:
         return topk_sorted_implementation(X, k, axis, largest)
     if X.dtype == numpy.float64:
-        if k == 0:
-            return numpy.empty((0,), dtype=X.dtype), numpy.empty((0,), dtype=numpy.int64)
-        if largest:
-            topk_sorted_indices = topk_element_max_double(X, k, True, th_para)
-        else:
-            topk_sorted_indices = topk_element_min_double(X, k, True, th_para)
-        topk_sorted_values = topk_element_fetch_double(X, topk_sorted_indices)
+        fcts = (topk_element_max_double, topk_element_min_double,
+                topk_element_fetch_double)
     elif X.dtype == numpy.float32:
-        if k == 0:
-            return numpy.empty((0,), dtype=X.dtype), numpy.empty((0,), dtype=numpy.int64)
-        if largest:
-            topk_sorted_indices = topk_element_max_float(X, k, True, th_para)
-        else:
-            topk_sorted_indices = topk_element_min_float(X, k, True, th_para)
-        topk_sorted_values = topk_element_fetch_float(X, topk_sorted_indices)
+        fcts = (topk_element_max_float, topk_element_min_float,
+                topk_element_fetch_float)
     elif X.dtype == numpy.int64:
-        if k == 0:
-            return numpy.empty((0,), dtype=X.dtype), numpy.empty((0,), dtype=numpy.int64)
-        if largest:
-            topk_sorted_indices = topk_element_max_int64(X, k, True, th_para)
-        else:
-            topk_sorted_indices = topk_element_min_int64(X, k, True, th_para)
-        topk_sorted_values = topk_element_fetch_int64(X, topk_sorted_indices)
+        fcts = (topk_element_max_int64, topk_element_min_int64,
+                topk_element_fetch_int64)
     else:
-        if k == 0:
-            return numpy.empty((0,), dtype=numpy.int64)
         return topk_sorted_implementation(X, k, axis, largest)
-    return topk_sorted_values, topk_sorted_indices
+
+    last = axis == len(X.shape) - 1
+    Xm = X if last else numpy.ascontiguousarray(numpy.moveaxis(X, axis, -1))
+    topk_sorted_indices = (fcts[0] if largest else fcts[1])(
+        Xm, k, True, th_para)
+    topk_sorted_values = fcts[2](Xm, topk_sorted_indices)
+    if last:
+        return topk_sorted_values, topk_sorted_indices
+    return (numpy.moveaxis(topk_sorted_values, -1, axis),
+            numpy.moveaxis(topk_sorted_indices, -1, axis))
 
 
 class _CommonTopK(OpRun):
@@ -127,10 +140,8 @@ class _CommonTopK(OpRun):
 
     def _common_run(self, data, ink, largest=1):  # pylint: disable=W0221
         """
-        Runtime for operator *TopK*.
-        The implementation is not the most efficient
-        as it sorts everything then extracts the top *k*
-        values.
+        Runtime for operator *TopK*, see
+        @see fn topk_sorted_implementation_cpp.
 
         .. warning::
             ONNX specifications may be imprecise in case of negative value
@@ -140,6 +151,10 @@ class _CommonTopK(OpRun):
         """
         k = ink[0]
         axis = self.axis if self.axis >= 0 else (self.axis + len(data.shape))
+        if k > data.shape[axis]:
+            raise RuntimeError(
+                "k=%r must not be greater than dimension %r of shape %r."
+                "" % (k, axis, data.shape))
         sort, sorti = topk_sorted_implementation_cpp(
             data, k, axis, largest, self.th_para)
         return (sort, sorti.astype(numpy.int64))
@@ -167,10 +182,8 @@ class TopK_1(_CommonTopK):
 
     def _run(self, data, attributes=None, verbose=0, fLOG=None):  # pylint: disable=W0221
         """
-        Runtime for operator *TopK*.
-        The implementation is not the most efficient
-        as it sorts everything then extracts the top *k*
-        values.
+        Runtime for operator *TopK*, see
+        @see fn topk_sorted_implementation_cpp.
 
         .. warning::
             ONNX specifications may be imprecise in case of negative value
@@ -203,10 +216,8 @@ class TopK_10(_CommonTopK):
 
     def _run(self, data, ink, attributes=None, verbose=0, fLOG=None):  # pylint: disable=W0221
         """
-        Runtime for operator *TopK*.
-        The implementation is not the most efficient
-        as it sorts everything then extracts the top *k*
-        values.
+        Runtime for operator *TopK*, see
+        @see fn topk_sorted_implementation_cpp.
 
         .. warning::
             ONNX specifications may be imprecise in case of negative value
@@ -235,10 +246,8 @@ class TopK_11(_CommonTopK):
 
     def _run(self, data, ink, attributes=None, verbose=0, fLOG=None):  # pylint: disable=W0221
         """
-        Runtime for operator *TopK*.
-        The implementation is not the most efficient
-        as it sorts everything then extracts the top *k*
-        values.
+        Runtime for operator *TopK*, see
+        @see fn topk_sorted_implementation_cpp.
 
         .. warning::
             ONNX specifications may be imprecise in case of negative value
@@ -40,6 +40,9 @@ class RuntimeTreeEnsembleClassifierP : public RuntimeTreeEnsembleCommonP<NTYPE>
 
         py::tuple compute_cl(py::array_t<NTYPE, py::array::c_style | py::array::forcecast> X);
         py::array_t<NTYPE> compute_tree_outputs(py::array_t<NTYPE, py::array::c_style | py::array::forcecast> X);
+
+        py::tuple get_state() const;
+        void set_state(py::tuple state);
 };
 
 
@@ -118,6 +121,31 @@ py::array_t<NTYPE> RuntimeTreeEnsembleClassifierP<NTYPE>::compute_tree_outputs(p
 }
 
 
+template<typename NTYPE>
+py::tuple RuntimeTreeEnsembleClassifierP<NTYPE>::get_state() const {
+    py::array_t<int64_t> classlabels(classlabels_int64s_.size());
+    if (classlabels_int64s_.size() > 0)
+        memcpy(classlabels.mutable_data(), classlabels_int64s_.data(),
+               sizeof(int64_t) * classlabels_int64s_.size());
+    return py::make_tuple(RuntimeTreeEnsembleCommonP<NTYPE>::get_state(),
+                          classlabels, binary_case_, weights_are_all_positive_);
+}
+
+
+template<typename NTYPE>
+void RuntimeTreeEnsembleClassifierP<NTYPE>::set_state(py::tuple state) {
+    if (state.size() != 4)
+        throw std::invalid_argument(MakeString(
+            "Unexpected state size ", state.size(), " != 4."));
+    RuntimeTreeEnsembleCommonP<NTYPE>::set_state(state[0].cast<py::tuple>());
+    auto classlabels = state[1].cast<py::array_t<int64_t, py::array::c_style | py::array::forcecast>>();
+    classlabels_int64s_.clear();
+    array2vector(classlabels_int64s_, classlabels, int64_t);
+    binary_case_ = state[2].cast<bool>();
+    weights_are_all_positive_ = state[3].cast<bool>();
+}
+
+
 class RuntimeTreeEnsembleClassifierPFloat : public RuntimeTreeEnsembleClassifierP<float> {
     public:
         RuntimeTreeEnsembleClassifierPFloat(int omp_tree, int omp_N, bool array_structure, bool para_tree) :
@@ -191,6 +219,15 @@ in :epkg:`onnxruntime`. Supports float only.
         "Returns the mode for every node.");
     clf.def("__sizeof__", &RuntimeTreeEnsembleClassifierPFloat::get_sizeof,
         "Returns the size of the object.");
+    clf.def(py::pickle(
+        [](const RuntimeTreeEnsembleClassifierPFloat &self) {
+            return self.get_state();
+        },
+        [](py::tuple state) {
+            auto res = new_tree_ensemble_from_state<RuntimeTreeEnsembleClassifierPFloat>(state[0].cast<py::tuple>());
+            res->set_state(state);
+            return res;
+        }));
 
     py::class_<RuntimeTreeEnsembleClassifierPDouble> cld (m, "RuntimeTreeEnsembleClassifierPDouble",
         R"pbdoc(Implements double runtime for operator TreeEnsembleClassifier. The code is inspired from
@@ -238,6 +275,15 @@ in :epkg:`onnxruntime`. Supports double only.
         "Returns the mode for every node.");
     cld.def("__sizeof__", &RuntimeTreeEnsembleClassifierPDouble::get_sizeof,
         "Returns the size of the object.");
+    cld.def(py::pickle(
+        [](const RuntimeTreeEnsembleClassifierPDouble &self) {
+            return self.get_state();
+        },
+        [](py::tuple state) {
+            auto res = new_tree_ensemble_from_state<RuntimeTreeEnsembleClassifierPDouble>(state[0].cast<py::tuple>());
+            res->set_state(state);
+            return res;
+        }));
 }
 
 #endif
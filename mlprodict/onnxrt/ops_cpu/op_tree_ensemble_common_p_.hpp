@@ -108,6 +108,9 @@ class RuntimeTreeEnsembleCommonP {
         int omp_get_max_threads();
         int64_t get_sizeof();
 
+        py::tuple get_state() const;
+        void set_state(py::tuple state);
+
         template<typename AGG>
         py::array_t<NTYPE> compute_tree_outputs_agg(py::array_t<NTYPE, py::array::c_style | py::array::forcecast> X, const AGG &agg) const;
         
@@ -149,6 +152,9 @@ RuntimeTreeEnsembleCommonP<NTYPE>::RuntimeTreeEnsembleCommonP(
     omp_tree_ = omp_tree;
     omp_N_ = omp_N;
     nodes_ = nullptr;
+    n_nodes_ = 0;
+    n_trees_ = 0;
+    sizeof_ = 0;
     para_tree_ = para_tree;
     array_structure_ = array_structure;
 }
@@ -485,6 +491,288 @@ void RuntimeTreeEnsembleCommonP<NTYPE>::switch_to_array_structure() {
 }
 
 
+#define TREE_STATE_VERSION 1
+#define TREE_STATE_HEADER 13
+#define TREE_STATE_INODE 9
+#define TREE_STATE_FNODE 3
+
+
+/**
+* Returns the initialized structure as a tuple of arrays,
+* pointers are replaced by indices, -1 means a leaf.
+* The state can be restored with set_state
+* without going through the ONNX attributes again.
+*/
+template<typename NTYPE>
+py::tuple RuntimeTreeEnsembleCommonP<NTYPE>::get_state() const {
+    py::array_t<int64_t> header(TREE_STATE_HEADER);
+    auto h = header.mutable_unchecked<1>();
+    h(0) = n_targets_or_classes_;
+    h(1) = static_cast<int64_t>(post_transform_);
+    h(2) = static_cast<int64_t>(aggregate_function_);
+    h(3) = n_nodes_;
+    h(4) = max_tree_depth_;
+    h(5) = n_trees_;
+    h(6) = same_mode_ ? 1 : 0;
+    h(7) = has_missing_tracks_ ? 1 : 0;
+    h(8) = omp_tree_;
+    h(9) = omp_N_;
+    h(10) = sizeof_;
+    h(11) = array_structure_ ? 1 : 0;
+    h(12) = para_tree_ ? 1 : 0;
+
+    py::array_t<NTYPE> base_values(base_values_.size());
+    if (base_values_.size() > 0)
+        memcpy(base_values.mutable_data(), base_values_.data(), sizeof(NTYPE) * base_values_.size());
+
+    // tree_id, node_id, feature_id, mode, truenode, falsenode,
+    // missing_tracks, is_missing_track_true, weights0.i
+    py::array_t<int64_t> inodes(n_nodes_ * TREE_STATE_INODE);
+    // value, hitrates, weights0.value
+    py::array_t<NTYPE> fnodes(n_nodes_ * TREE_STATE_FNODE);
+    py::array_t<int64_t> offsets(n_nodes_ + 1);
+    int64_t* pi = inodes.mutable_data();
+    NTYPE* pf = fnodes.mutable_data();
+    int64_t* po = offsets.mutable_data();
+    std::vector<int64_t> w_i;
+    std::vector<NTYPE> w_value;
+    py::array_t<int64_t> roots(n_trees_);
+    int64_t* pr = roots.mutable_data();
+
+    po[0] = 0;
+    if (array_structure_) {
+        for (int64_t i = 0; i < n_nodes_; ++i, pi += TREE_STATE_INODE, pf += TREE_STATE_FNODE) {
+            pi[0] = array_nodes_.id[i].tree_id;
+            pi[1] = array_nodes_.id[i].node_id;
+            pi[2] = (int64_t)array_nodes_.feature_id[i];
+            pi[3] = static_cast<int64_t>(array_nodes_.mode[i]);
+            pi[4] = array_nodes_.truenode[i] == ID_LEAF_TRUE_NODE ? -1 : (int64_t)array_nodes_.truenode[i];
+            pi[5] = array_nodes_.falsenode[i] == ID_LEAF_TRUE_NODE ? -1 : (int64_t)array_nodes_.falsenode[i];
+            pi[6] = static_cast<int64_t>(array_nodes_.missing_tracks[i]);
+            pi[7] = array_nodes_.is_missing_track_true[i] ? 1 : 0;
+            pi[8] = array_nodes_.weights0[i].i;
+            pf[0] = array_nodes_.value[i];
+            pf[1] = array_nodes_.hitrates[i];
+            pf[2] = array_nodes_.weights0[i].value;
+            for (auto it = array_nodes_.weights[i].cbegin(); it != array_nodes_.weights[i].cend(); ++it) {
+                w_i.push_back(it->i);
+                w_value.push_back(it->value);
+            }
+            po[i + 1] = (int64_t)w_i.size();
+        }
+        for (int64_t i = 0; i < n_trees_; ++i)
+            pr[i] = (int64_t)array_nodes_.root_id[i];
+    }
+    else {
+        for (int64_t i = 0; i < n_nodes_; ++i, pi += TREE_STATE_INODE, pf += TREE_STATE_FNODE) {
+            const TreeNodeElement<NTYPE>& node = nodes_[i];
+            pi[0] = node.id.tree_id;
+            pi[1] = node.id.node_id;
+            pi[2] = (int64_t)node.feature_id;
+            pi[3] = static_cast<int64_t>(node.mode);
+            pi[4] = node.truenode == nullptr ? -1 : (int64_t)(node.truenode - nodes_);
+            pi[5] = node.falsenode == nullptr ? -1 : (int64_t)(node.falsenode - nodes_);
+            pi[6] = static_cast<int64_t>(node.missing_tracks);
+            pi[7] = node.is_missing_track_true ? 1 : 0;
+            pi[8] = node.weights0.i;
+            pf[0] = node.value;
+            pf[1] = node.hitrates;
+            pf[2] = node.weights0.value;
+            for (auto it = node.weights_vect.cbegin(); it != node.weights_vect.cend(); ++it) {
+                w_i.push_back(it->i);
+                w_value.push_back(it->value);
+            }
+            po[i + 1] = (int64_t)w_i.size();
+        }
+        for (int64_t i = 0; i < n_trees_; ++i)
+            pr[i] = (int64_t)(roots_[i] - nodes_);
+    }
+
+    py::array_t<int64_t> weights_i(w_i.size());
+    py::array_t<NTYPE> weights_value(w_value.size());
+    if (w_i.size() > 0) {
+        memcpy(weights_i.mutable_data(), w_i.data(), sizeof(int64_t) * w_i.size());
+        memcpy(weights_value.mutable_data(), w_value.data(), sizeof(NTYPE) * w_value.size());
+    }
+    return py::make_tuple(
+        TREE_STATE_VERSION, header, base_values, inodes, fnodes,
+        offsets, weights_i, weights_value, roots);
+}
+
+
+/**
+* Restores the state returned by get_state.
+*/
+template<typename NTYPE>
+void RuntimeTreeEnsembleCommonP<NTYPE>::set_state(py::tuple state) {
+    if (state.size() != 9)
+        throw std::invalid_argument(MakeString(
+            "Unexpected state size ", state.size(), " != 9."));
+    if (state[0].cast<int>() != TREE_STATE_VERSION)
+        throw std::invalid_argument(MakeString(
+            "Unexpected state version ", state[0].cast<int>(), " != ",
+            TREE_STATE_VERSION, "."));
+    auto header = state[1].cast<py::array_t<int64_t, py::array::c_style | py::array::forcecast>>();
+    auto base_values = state[2].cast<py::array_t<NTYPE, py::array::c_style | py::array::forcecast>>();
+    auto inodes = state[3].cast<py::array_t<int64_t, py::array::c_style | py::array::forcecast>>();
+    auto fnodes = state[4].cast<py::array_t<NTYPE, py::array::c_style | py::array::forcecast>>();
+    auto offsets = state[5].cast<py::array_t<int64_t, py::array::c_style | py::array::forcecast>>();
+    auto weights_i = state[6].cast<py::array_t<int64_t, py::array::c_style | py::array::forcecast>>();
+    auto weights_value = state[7].cast<py::array_t<NTYPE, py::array::c_style | py::array::forcecast>>();
+    auto roots = state[8].cast<py::array_t<int64_t, py::array::c_style | py::array::forcecast>>();
+
+    if (header.size() != TREE_STATE_HEADER)
+        throw std::invalid_argument("Unexpected header size in state.");
+    const int64_t* h = header.data();
+    const int64_t n_nodes = h[3];
+    const int64_t n_trees = h[5];
+    if (n_nodes < 0 || n_trees < 0)
+        throw std::invalid_argument(MakeString(
+            "Unexpected number of nodes ", n_nodes, " or trees ", n_trees, " in state."));
+    if (inodes.size() != n_nodes * TREE_STATE_INODE ||
+            fnodes.size() != n_nodes * TREE_STATE_FNODE ||
+            offsets.size() != n_nodes + 1 || roots.size() != n_trees ||
+            weights_i.size() != weights_value.size())
+        throw std::invalid_argument("Inconsistent dimensions in state.");
+
+    // indices are checked before the current structure is modified
+    const int64_t* pi = inodes.data();
+    const int64_t* po = offsets.data();
+    const int64_t* pr = roots.data();
+    if (po[0] != 0 || po[n_nodes] != (int64_t)weights_i.size())
+        throw std::invalid_argument(MakeString(
+            "Unexpected offsets ", po[0], ", ", po[n_nodes], " for ",
+            weights_i.size(), " weights in state."));
+    for (int64_t i = 0; i < n_nodes; ++i) {
+        const int64_t* pn = pi + i * TREE_STATE_INODE;
+        if (pn[4] < -1 || pn[4] >= n_nodes || pn[5] < -1 || pn[5] >= n_nodes)
+            throw std::invalid_argument(MakeString(
+                "Node ", i, " has children (", pn[4], ", ", pn[5],
+                ") outside [-1, ", n_nodes, "[ in state."));
+        if (po[i + 1] < po[i])
+            throw std::invalid_argument(MakeString(
+                "Offsets are not sorted at node ", i, " in state."));
+    }
+    for (int64_t i = 0; i < n_trees; ++i) {
+        if (pr[i] < 0 || pr[i] >= n_nodes)
+            throw std::invalid_argument(MakeString(
+                "Root ", i, " is ", pr[i], " outside [0, ", n_nodes, "[ in state."));
+    }
+
+    n_targets_or_classes_ = h[0];
+    post_transform_ = static_cast<POST_EVAL_TRANSFORM>(h[1]);
+    aggregate_function_ = static_cast<AGGREGATE_FUNCTION>(h[2]);
+    n_nodes_ = h[3];
+    max_tree_depth_ = h[4];
+    n_trees_ = h[5];
+    same_mode_ = h[6] != 0;
+    has_missing_tracks_ = h[7] != 0;
+    omp_tree_ = (int)h[8];
+    omp_N_ = (int)h[9];
+    sizeof_ = h[10];
+    array_structure_ = h[11] != 0;
+    para_tree_ = h[12] != 0;
+
+
+    base_values_.clear();
+    array2vector(base_values_, base_values, NTYPE);
+
+    const NTYPE* pf = fnodes.data();
+    const int64_t* pwi = weights_i.data();
+    const NTYPE* pwv = weights_value.data();
+    SparseValue<NTYPE> w;
+
+    if (nodes_ != nullptr) {
+        delete [] nodes_;
+        nodes_ = nullptr;
+    }
+    roots_.clear();
+
+    if (array_structure_) {
+        array_nodes_.id.resize(n_nodes_);
+        array_nodes_.feature_id.resize(n_nodes_);
+        array_nodes_.value.resize(n_nodes_);
+        array_nodes_.hitrates.resize(n_nodes_);
+        array_nodes_.mode.resize(n_nodes_);
+        array_nodes_.truenode.resize(n_nodes_);
+        array_nodes_.falsenode.resize(n_nodes_);
+        array_nodes_.missing_tracks.resize(n_nodes_);
+        array_nodes_.is_missing_track_true.resize(n_nodes_);
+        array_nodes_.weights0.resize(n_nodes_);
+        array_nodes_.weights.resize(n_nodes_);
+        for (int64_t i = 0; i < n_nodes_; ++i, pi += TREE_STATE_INODE, pf += TREE_STATE_FNODE) {
+            array_nodes_.id[i].tree_id = (int)pi[0];
+            array_nodes_.id[i].node_id = (int)pi[1];
+            array_nodes_.feature_id[i] = (size_t)pi[2];
+            array_nodes_.mode[i] = static_cast<NODE_MODE>(pi[3]);
+            array_nodes_.truenode[i] = pi[4] == -1 ? ID_LEAF_TRUE_NODE : (size_t)pi[4];
+            array_nodes_.falsenode[i] = pi[5] == -1 ? ID_LEAF_TRUE_NODE : (size_t)pi[5];
+            array_nodes_.missing_tracks[i] = static_cast<MissingTrack>(pi[6]);
+            array_nodes_.is_missing_track_true[i] = pi[7] != 0;
+            array_nodes_.weights0[i].i = pi[8];
+            array_nodes_.value[i] = pf[0];
+            array_nodes_.hitrates[i] = pf[1];
+            array_nodes_.weights0[i].value = pf[2];
+            array_nodes_.weights[i].clear();
+            for (int64_t k = po[i]; k < po[i + 1]; ++k) {
+                w.i = pwi[k];
+                w.value = pwv[k];
+                array_nodes_.weights[i].push_back(w);
+            }
+        }
+        array_nodes_.root_id.resize(n_trees_);
+        for (int64_t i = 0; i < n_trees_; ++i)
+            array_nodes_.root_id[i] = (size_t)pr[i];
+        // only the number of roots is used with this structure
+        roots_.resize(n_trees_, nullptr);
+    }
+    else {
+        nodes_ = new TreeNodeElement<NTYPE>[(int)n_nodes_];
+        for (int64_t i = 0; i < n_nodes_; ++i, pi += TREE_STATE_INODE, pf += TREE_STATE_FNODE) {
+            TreeNodeElement<NTYPE>& node = nodes_[i];
+            node.id.tree_id = (int)pi[0];
+            node.id.node_id = (int)pi[1];
+            node.feature_id = (size_t)pi[2];
+            node.mode = static_cast<NODE_MODE>(pi[3]);
+            node.truenode = pi[4] == -1 ? nullptr : nodes_ + pi[4];
+            node.falsenode = pi[5] == -1 ? nullptr : nodes_ + pi[5];
+            node.missing_tracks = static_cast<MissingTrack>(pi[6]);
+            node.is_missing_track_true = pi[7] != 0;
+            node.weights0.i = pi[8];
+            node.value = pf[0];
+            node.hitrates = pf[1];
+            node.weights0.value = pf[2];
+            node.weights_vect.clear();
+            for (int64_t k = po[i]; k < po[i + 1]; ++k) {
+                w.i = pwi[k];
+                w.value = pwv[k];
+                node.weights_vect.push_back(w);
+            }
+        }
+        for (int64_t i = 0; i < n_trees_; ++i)
+            roots_.push_back(nodes_ + pr[i]);
+    }
+}
+
+
+/**
+* Creates a new instance of a class deriving from
+* RuntimeTreeEnsembleCommonP with the options stored
+* in a state returned by get_state. The state itself
+* must be restored with set_state.
+*/
+template<typename T>
+std::unique_ptr<T> new_tree_ensemble_from_state(py::tuple state) {
+    if (state.size() < 2)
+        throw std::invalid_argument("Unexpected state.");
+    auto header = state[1].cast<py::array_t<int64_t, py::array::c_style | py::array::forcecast>>();
+    if (header.size() != TREE_STATE_HEADER)
+        throw std::invalid_argument("Unexpected header size in state.");
+    const int64_t* h = header.data();
+    return std::unique_ptr<T>(new T((int)h[8], (int)h[9], h[11] != 0, h[12] != 0));
+}
+
+
 template<typename NTYPE>
 std::vector<std::string> RuntimeTreeEnsembleCommonP<NTYPE>::get_nodes_modes() const {
     std::vector<std::string> res;
@@ -359,6 +359,15 @@ in :epkg:`onnxruntime`. Supports float only.
         "Returns the mode for every node.");
     clf.def("__sizeof__", &RuntimeTreeEnsembleRegressorPFloat::get_sizeof,
         "Returns the size of the object.");
+    clf.def(py::pickle(
+        [](const RuntimeTreeEnsembleRegressorPFloat &self) {
+            return self.get_state();
+        },
+        [](py::tuple state) {
+            auto res = new_tree_ensemble_from_state<RuntimeTreeEnsembleRegressorPFloat>(state);
+            res->set_state(state);
+            return res;
+        }));
 
     py::class_<RuntimeTreeEnsembleRegressorPDouble> cld (m, "RuntimeTreeEnsembleRegressorPDouble",
         R"pbdoc(Implements double runtime for operator TreeEnsembleRegressor. The code is inspired from
@@ -406,6 +415,15 @@ in :epkg:`onnxruntime`. Supports double only.
         "Returns the mode for every node.");
     cld.def("__sizeof__", &RuntimeTreeEnsembleRegressorPDouble::get_sizeof,
         "Returns the size of the object.");
+    cld.def(py::pickle(
+        [](const RuntimeTreeEnsembleRegressorPDouble &self) {
+            return self.get_state();
+        },
+        [](py::tuple state) {
+            auto res = new_tree_ensemble_from_state<RuntimeTreeEnsembleRegressorPDouble>(state);
+            res->set_state(state);
+            return res;
+        }));
 }
 
 #endif
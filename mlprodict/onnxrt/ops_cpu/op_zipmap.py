@@ -157,6 +157,8 @@ class ArrayZipMapDictionary(list):
             yield self[i]
 
     def __getitem__(self, i):
+        if isinstance(i, slice):
+            return ArrayZipMapDictionary(self._rev_keys, self._mat[i])
         return ZipMapDictionary(self._rev_keys, i, self._mat)
 
     def __setitem__(self, pos, value):
@@ -3,6 +3,7 @@
 @file
 @brief Shape object.
 """
+import operator
 import numpy
 
 
@@ -212,7 +213,7 @@ class ShapeOperatorAdd(ShapeBinaryOperator):
 
     def __init__(self, x, y):
         ShapeBinaryOperator.__init__(
-            self, '+', lambda a, b: a + b, 'lambda a, b: a + b', x, y)
+            self, '+', operator.add, 'lambda a, b: a + b', x, y)
 
     def __repr__(self):
         """
@@ -231,7 +232,7 @@ class ShapeOperatorMul(ShapeBinaryOperator):
 
     def __init__(self, x, y):
         ShapeBinaryOperator.__init__(
-            self, '*', lambda a, b: a * b, 'lambda a, b: a * b', x, y)
+            self, '*', operator.mul, 'lambda a, b: a * b', x, y)
 
     def __repr__(self):
         """
@@ -250,7 +251,7 @@ class ShapeOperatorGreater(ShapeBinaryOperator):
 
     def __init__(self, x, y):
         ShapeBinaryOperator.__init__(
-            self, '>', lambda a, b: a > b, 'lambda a, b: a > b', x, y)
+            self, '>', operator.gt, 'lambda a, b: a > b', x, y)
 
     def __repr__(self):
         """
@@ -269,7 +270,7 @@ class ShapeOperatorMax(ShapeBinaryFctOperator):
 
     def __init__(self, x, y):
         ShapeBinaryFctOperator.__init__(
-            self, 'max', lambda a, b: max(a, b), 'max(a, b)', x, y)
+            self, 'max', max, 'max(a, b)', x, y)
 
     def __repr__(self):
         """
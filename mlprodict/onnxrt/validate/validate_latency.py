@@ -152,7 +152,7 @@ def latency(model, law='normal', size=1, number=10, repeat=10, max_time=0,
     else:
         if profiling in ('name', 'type'):
             runtime_options = {"enable_profiling": True}
-            if runtime != 'onnxruntime1':
+            if runtime not in ('onnxruntime1', 'python'):
                 raise NotImplementedError(  # pragma: no cover
                     "Profiling is not implemented for runtime=%r." % runtime)
         else:
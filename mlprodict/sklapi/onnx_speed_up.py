@@ -32,6 +32,8 @@ from ..onnx_tools.exports.numpy_helper import (
     make_slice)
 from ..onnx_tools.exports.skl2onnx_helper import add_onnx_graph
 from ..onnx_conv import to_onnx
+from ..onnxrt import OnnxInference
+from ..onnxrt.onnx_inference_async import run_async
 from .onnx_transformer import OnnxTransformer
 
 
@@ -80,6 +82,22 @@ class _OnnxPipelineStepSpeedup(BaseEstimator, OnnxOperatorMixin):
             raise AttributeError(  # pragma: no cover
                 "Object must be be fit.")
 
+    async def _transform_async(self, X, executor=None):
+        """
+        Calls method *transform* of the runtime from a coroutine,
+        see :meth:`OnnxInference.run_async
+        <mlprodict.onnxrt.onnx_inference.OnnxInference.run_async>`.
+        Runtimes `'numpy'` and `'numba'` cannot be cancelled once started.
+
+        .. versionadded:: 0.9
+        """
+        self._check_fitted_()
+        if hasattr(self.onnxrt_, 'transform_async'):
+            return await self.onnxrt_.transform_async(X, executor=executor)
+        return await run_async(
+            self, lambda: self.onnxrt_.transform(X), executor=executor,
+            max_runs=OnnxInference.max_async_runs)
+
     def _to_onnx(self, fitted_estimator, inputs):
         """
         Converts an estimator inference into :epkg:`ONNX`.
@@ -364,6 +382,20 @@ class OnnxSpeedupTransformer(TransformerMixin,
         """
         return self.onnxrt_.transform(X)
 
+    async def transform_async(self, X, executor=None):
+        """
+        Coroutine transforming with *ONNX* without blocking
+        the event loop.
+
+        :param X: features
+        :param executor: :class:`concurrent.futures.Executor`,
+            None for the default executor of the event loop
+        :return: transformed features
+
+        .. versionadded:: 0.9
+        """
+        return await self._transform_async(X, executor=executor)
+
     def raw_transform(self, X):
         """
         Transforms with *scikit-learn*.
@@ -440,6 +472,20 @@ class OnnxSpeedupRegressor(RegressorMixin,
         """
         return self.onnxrt_.transform(X)
 
+    async def predict_async(self, X, executor=None):
+        """
+        Coroutine predicting with *ONNX* without blocking
+        the event loop.
+
+        :param X: features
+        :param executor: :class:`concurrent.futures.Executor`,
+            None for the default executor of the event loop
+        :return: predictions
+
+        .. versionadded:: 0.9
+        """
+        return await self._transform_async(X, executor=executor)
+
     def raw_predict(self, X):
         """
         Transforms with *scikit-learn*.
@@ -521,6 +567,23 @@ class OnnxSpeedupClassifier(ClassifierMixin,
             return pred[0]
         return pred.iloc[:, 0].values
 
+    async def predict_async(self, X, executor=None):
+        """
+        Coroutine predicting with *ONNX* without blocking
+        the event loop.
+
+        :param X: features
+        :param executor: :class:`concurrent.futures.Executor`,
+            None for the default executor of the event loop
+        :return: predictions
+
+        .. versionadded:: 0.9
+        """
+        pred = await self._transform_async(X, executor=executor)
+        if isinstance(pred, tuple):
+            return pred[0]
+        return pred.iloc[:, 0].values
+
     def predict_proba(self, X):
         """
         Transforms with *ONNX*.
@@ -533,6 +596,23 @@ class OnnxSpeedupClassifier(ClassifierMixin,
             return pred[1]
         return pred.iloc[:, 1:].values
 
+    async def predict_proba_async(self, X, executor=None):
+        """
+        Coroutine predicting with *ONNX* without blocking
+        the event loop.
+
+        :param X: features
+        :param executor: :class:`concurrent.futures.Executor`,
+            None for the default executor of the event loop
+        :return: probabilities
+
+        .. versionadded:: 0.9
+        """
+        pred = await self._transform_async(X, executor=executor)
+        if isinstance(pred, tuple):
+            return pred[1]
+        return pred.iloc[:, 1:].values
+
     def raw_predict(self, X):
         """
         Transforms with *scikit-learn*.
@@ -624,6 +704,23 @@ class OnnxSpeedupCluster(ClusterMixin,
             return pred[0]
         return pred.iloc[:, 0].values
 
+    async def predict_async(self, X, executor=None):
+        """
+        Coroutine predicting with *ONNX* without blocking
+        the event loop.
+
+        :param X: features
+        :param executor: :class:`concurrent.futures.Executor`,
+            None for the default executor of the event loop
+        :return: predictions
+
+        .. versionadded:: 0.9
+        """
+        pred = await self._transform_async(X, executor=executor)
+        if isinstance(pred, tuple):
+            return pred[0]
+        return pred.iloc[:, 0].values
+
     def transform(self, X):
         """
         Transforms with *ONNX*.
@@ -636,6 +733,23 @@ class OnnxSpeedupCluster(ClusterMixin,
             return pred[1]
         return pred.iloc[:, 1:].values
 
+    async def transform_async(self, X, executor=None):
+        """
+        Coroutine transforming with *ONNX* without blocking
+        the event loop.
+
+        :param X: features
+        :param executor: :class:`concurrent.futures.Executor`,
+            None for the default executor of the event loop
+        :return: transformed features
+
+        .. versionadded:: 0.9
+        """
+        pred = await self._transform_async(X, executor=executor)
+        if isinstance(pred, tuple):
+            return pred[1]
+        return pred.iloc[:, 1:].values
+
     def raw_predict(self, X):
         """
         Transforms with *scikit-learn*.
@@ -14,6 +14,7 @@ from mlprodict.onnx_tools.onnx_manipulations import (
 from ..onnx_tools.onnx2py_helper import _var_as_dict, onnx_model_opsets
 from ..onnx_tools.exports.skl2onnx_helper import add_onnx_graph
 from ..onnxrt import OnnxInference
+from ..onnxrt.onnx_inference_stream import enumerate_chunks, write_chunk
 
 
 class OnnxTransformer(BaseEstimator, TransformerMixin, OnnxOperatorMixin):
@@ -153,6 +154,60 @@ class OnnxTransformer(BaseEstimator, TransformerMixin, OnnxOperatorMixin):
             and *inputs* can be used to specify the other ones
         :return: :epkg:`DataFrame`
         """
+        rt_inputs = self._transform_inputs(X, inputs)
+        doutputs = self.onnxrt_.run(rt_inputs)
+        return self._transform_outputs(doutputs)
+
+    async def transform_async(self, X, y=None, executor=None, **inputs):
+        """
+        Coroutine running the predictions in an executor
+        without blocking the event loop, see @see me transform.
+        The number of concurrent runs and the cancellation are
+        handled by :meth:`OnnxInference.run_async
+        <mlprodict.onnxrt.onnx_inference.OnnxInference.run_async>`.
+
+        :param X: iterable, data to process
+            (or first input if several expected)
+        :param y: unused
+        :param executor: :class:`concurrent.futures.Executor`,
+            None for the default executor of the event loop
+        :param inputs: additional inputs, see @see me transform
+        :return: :epkg:`DataFrame`
+
+        .. versionadded:: 0.9
+        """
+        rt_inputs = self._transform_inputs(X, inputs)
+        doutputs = await self.onnxrt_.run_async(rt_inputs, executor=executor)
+        return self._transform_outputs(doutputs)
+
+    def transform_stream(self, X, chunk_size=None, output=None):
+        """
+        Runs the predictions chunk by chunk and yields the
+        results of every chunk, see @see me transform and
+        :meth:`OnnxInference.run_stream
+        <mlprodict.onnxrt.onnx_inference.OnnxInference.run_stream>`.
+
+        :param X: an array, a :class:`numpy.memmap`, a dataframe,
+            a dictionary of arrays or an iterator on any of them
+        :param chunk_size: maximum number of rows in a chunk,
+            None to keep the chunks produced by the iterator
+        :param output: None or a preallocated array
+            (or :class:`numpy.memmap`) receiving the results,
+            the yielded results are views on this array
+        :return: iterator on arrays or :epkg:`DataFrame`
+
+        .. versionadded:: 0.9
+        """
+        begin = 0
+        for chunk in enumerate_chunks(X, chunk_size):
+            res = self.transform(chunk)
+            if output is not None:
+                res = write_chunk(output, begin, res)
+                begin += res.shape[0]
+            yield res
+
+    def _transform_inputs(self, X, inputs):
+        "Builds the inputs of the runtime, see @see me transform."
         if not hasattr(self, "onnxrt_"):
             raise AttributeError(  # pragma: no cover
                 "Transform OnnxTransformer must be fit first.")
@@ -175,10 +230,13 @@ class OnnxTransformer(BaseEstimator, TransformerMixin, OnnxOperatorMixin):
         for k, v in inputs.items():
             rt_inputs[k] = v
 
+        self._check_arrays(rt_inputs)
+        return rt_inputs
+
+    def _transform_outputs(self, doutputs):
+        "Formats the outputs of the runtime, see @see me transform."
         names = ([self.output_name]
                  if self.output_name else self.onnxrt_.output_names)
-        self._check_arrays(rt_inputs)
-        doutputs = self.onnxrt_.run(rt_inputs)
         outputs = [doutputs[n] for n in names]
 
         if self.reshape:
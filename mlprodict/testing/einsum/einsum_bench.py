@@ -5,7 +5,6 @@
 from itertools import permutations
 import numpy
 from onnx import helper, TensorProto
-from cpyquickhelper.numbers import measure_time
 from ... import __max_supported_opset__, get_ir_version
 from ...tools.ort_wrapper import InferenceSession
 from ...onnxrt import OnnxInference
@@ -41,6 +40,8 @@ def _measure_time(stmt, *x, repeat=5, number=5, div_by_number=True,
             raise RuntimeError("{}-{}".format(
                 type(x), getattr(x, 'dtype', '?'))) from e
 
+    from cpyquickhelper.numbers import measure_time  # delayed import
+
     def fct():
         stmt(*x)
 
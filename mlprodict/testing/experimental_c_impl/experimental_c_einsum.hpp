@@ -184,7 +184,7 @@ float vector_dot_product_pointer16(const float* p1, const float* p2, size_t size
     if (size > 8) {
         __m256 r256 = _mm256_setzero_ps();
         for (; size > 8; p1 += 8, p2 += 8, size -= 8)
-            r256 = _mm256_add_ps(r256, _mm256_mul_ps(_mm256_load_ps(p1), _mm256_load_ps(p2)));
+            r256 = _mm256_add_ps(r256, _mm256_mul_ps(_mm256_loadu_ps(p1), _mm256_loadu_ps(p2)));
         __m128 c1, c2, r1;
         c1 = _mm256_extractf128_ps(r256, 1);
         c2 = _mm256_extractf128_ps(r256, 0);
@@ -200,7 +200,7 @@ float vector_dot_product_pointer16(const float* p1, const float* p2, size_t size
         __m128 c1, c2;
         __m128 r1 = _mm_setzero_ps();
         for (; size > 4; p1 += 4, p2 += 4, size -= 4)
-            r1 = _mm_add_ps(r1, _mm_mul_ps(_mm_load_ps(p1), _mm_load_ps(p2)));
+            r1 = _mm_add_ps(r1, _mm_mul_ps(_mm_loadu_ps(p1), _mm_loadu_ps(p2)));
         c1 = _mm_shuffle_ps(r1, r1, _MM_SHUFFLE(2, 3, 0, 1));
         c2 = _mm_add_ps(r1, c1);
         c1 = _mm_movehl_ps(c1, c2);
@@ -249,6 +249,48 @@ def get_extensions():
         define_macros=define_macros,
         language='c++')
 
+    ext_rnn = Extension(
+        'mlprodict.onnxrt.ops_cpu.op_rnn_',
+        [os.path.join(root, 'mlprodict/onnxrt/ops_cpu/op_rnn_.cpp')],
+        extra_compile_args=extra_compile_args,
+        extra_link_args=extra_link_args,
+        include_dirs=[
+            # Path to pybind11 headers
+            get_pybind_include(),
+            get_pybind_include(user=True),
+            os.path.join(root, 'mlprodict/onnxrt/ops_cpu')
+        ],
+        define_macros=define_macros,
+        language='c++')
+
+    ext_string_normalizer = Extension(
+        'mlprodict.onnxrt.ops_cpu.op_string_normalizer_',
+        [os.path.join(root, 'mlprodict/onnxrt/ops_cpu/op_string_normalizer_.cpp')],
+        extra_compile_args=extra_compile_args,
+        extra_link_args=extra_link_args,
+        include_dirs=[
+            # Path to pybind11 headers
+            get_pybind_include(),
+            get_pybind_include(user=True),
+            os.path.join(root, 'mlprodict/onnxrt/ops_cpu')
+        ],
+        define_macros=define_macros,
+        language='c++')
+
+    ext_tokenizer = Extension(
+        'mlprodict.onnxrt.ops_cpu.op_tokenizer_',
+        [os.path.join(root, 'mlprodict/onnxrt/ops_cpu/op_tokenizer_.cpp')],
+        extra_compile_args=extra_compile_args,
+        extra_link_args=extra_link_args,
+        include_dirs=[
+            # Path to pybind11 headers
+            get_pybind_include(),
+            get_pybind_include(user=True),
+            os.path.join(root, 'mlprodict/onnxrt/ops_cpu')
+        ],
+        define_macros=define_macros,
+        language='c++')
+
     ext_tree_ensemble_classifier_p = Extension(
         'mlprodict.onnxrt.ops_cpu.op_tree_ensemble_classifier_p_',
         [os.path.join(root, 'mlprodict/onnxrt/ops_cpu/op_tree_ensemble_classifier_p_.cpp'),
@@ -417,10 +459,13 @@ def get_extensions():
         ext_max_pool,
         ext_non_max_suppression,
         ext_qlinearconv,
+        ext_rnn,
         ext_roi_align,
+        ext_string_normalizer,
         ext_svm_classifier,
         ext_svm_regressor,
         ext_tfidfvectorizer,
+        ext_tokenizer,
         ext_tree_ensemble_classifier,
         ext_tree_ensemble_classifier_p,
         ext_tree_ensemble_regressor,